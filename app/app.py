@@ -1,6 +1,7 @@
 import os
 import re
 import sys
+import threading
 import uuid
 from types import SimpleNamespace
 
@@ -21,9 +22,73 @@ import torch
 from databroker.databroker import DataBroker
 from logs.logger import logger
 from orchestrator.chat_orchestrator import ChatOrchestrator
+from orchestrator.readiness import readiness, start_health_server
 
 torch.classes.__path__ = [os.path.join(torch.__path__[0], torch.classes.__file__)]
 
+# user whose data folder backs the process-wide databroker
+DEFAULT_USER = "test_user"
+
+_services_lock = threading.Lock()
+_services_started = False
+
+
+def user_path(username: str) -> str:
+    """
+    Returns the data folder of a user, creating it if needed.
+    """
+    userpath = f"{os.getcwd()}/data/" + username + "/"
+    if not os.path.exists(userpath):
+        os.makedirs(userpath)
+    return userpath
+
+
+def make_database_config(system_config, username: str, userpath: str):
+    """
+    Builds the databroker settings from the system config.
+    """
+    return SimpleNamespace(
+        username=username,
+        userpath=userpath,
+        embedding_model=system_config.embedding.embedding_model,
+        chunking_method=system_config.chunking.chunking_method,
+        chunking=system_config.chunking,
+        pdf_extractor=system_config.extraction,
+        vector_store=system_config.vector_db,
+        startup=system_config.startup,
+        inference_server=system_config.inference_server,
+        cpu_inference=system_config.cpu_inference,
+        vector_compression=system_config.vector_compression,
+        deduplication=system_config.deduplication,
+        http_client=system_config.http_client,
+    )
+
+
+def start_services() -> ChatOrchestrator:
+    """
+    Starts the process-wide services once: the orchestrator, the health
+    server and the databroker, whose background job warms up the models and
+    ingests new files. Called by serve.py before Streamlit starts, so health
+    checks pass and the warm-up runs before the first browser session, and
+    again (as a no-op) by every session.
+    """
+    global _services_started
+    with _services_lock:
+        orchestrator = ChatOrchestrator()
+        if _services_started:
+            return orchestrator
+
+        system_config = orchestrator.config
+        if system_config.startup.health_port is not None:
+            start_health_server(
+                system_config.startup.health_host, system_config.startup.health_port
+            )
+        DataBroker(
+            make_database_config(system_config, DEFAULT_USER, user_path(DEFAULT_USER))
+        )
+        _services_started = True
+        return orchestrator
+
 
 def init_streamlit():
     """
@@ -33,20 +98,16 @@ def init_streamlit():
     st.title("Science-GPT Prototype")
 
     if "userpath" not in st.session_state:
-        st.session_state.username = st.session_state.get("username", "test_user")
+        st.session_state.username = st.session_state.get("username", DEFAULT_USER)
 
         logger.set_user(st.session_state.get("username", "unknown"))
 
-        st.session_state.userpath = (
-            f"{os.getcwd()}/data/" + st.session_state.username + "/"
-        )
-        if not os.path.exists(st.session_state.userpath):
-            os.makedirs(st.session_state.userpath)
+        st.session_state.userpath = user_path(st.session_state.username)
 
         st.session_state.file_table = get_file_table()
 
     if "orchestrator" not in st.session_state:
-        st.session_state.orchestrator = ChatOrchestrator()
+        st.session_state.orchestrator = start_services()
 
     # !!!! this is a direct reference to the System Config and changes to this
     # dictionary will directly modify the orchestrator's system config
@@ -55,16 +116,16 @@ def init_streamlit():
     globals()["system_config"] = system_config
 
     if "databroker" not in st.session_state:
-        st.session_state.database_config = SimpleNamespace(
-            username=st.session_state.username,
-            userpath=st.session_state.userpath,
-            embedding_model=system_config.embedding.embedding_model,
-            chunking_method=system_config.chunking.chunking_method,
-            pdf_extractor=system_config.extraction,
-            vector_store=system_config.vector_db,
+        st.session_state.database_config = make_database_config(
+            system_config, st.session_state.username, st.session_state.userpath
         )
         st.session_state.databroker = DataBroker(st.session_state.database_config)
 
+    if not readiness.is_ready():
+        st.info(
+            "Models are still loading in the background; the first answer may be slow."
+        )
+
     st.session_state.setdefault("question_state", False)
     st.session_state.setdefault("messages", [])
     st.session_state.setdefault("cost", 0.0)
@@ -463,13 +524,10 @@ def sidebar():
                 system_config.chunking.chunking_method = new_chunking_method
 
                 # THEN create new database config
-                st.session_state.database_config = SimpleNamespace(
-                    username=st.session_state.username,
-                    userpath=st.session_state.userpath,
-                    embedding_model=new_embedding_model,
-                    chunking_method=new_chunking_method,
-                    pdf_extractor=system_config.extraction,
-                    vector_store=system_config.vector_db,
+                st.session_state.database_config = make_database_config(
+                    system_config,
+                    st.session_state.username,
+                    st.session_state.userpath,
                 )
 
                 # FINALLY trigger callback
@@ -0,0 +1,19 @@
+"""
+Entrypoint of the app container.
+
+Starts the process-wide services (health server, orchestrator and the
+databroker's background warm-up) before handing over to Streamlit, which only
+runs auth.py once a browser opens a session. Extra arguments are passed on to
+`streamlit run`, e.g. `python serve.py --server.port 8501`.
+"""
+
+import sys
+
+from streamlit.web import cli as stcli
+
+from app import start_services
+
+if __name__ == "__main__":
+    start_services()
+    sys.argv = ["streamlit", "run", "auth.py", *sys.argv[1:]]
+    sys.exit(stcli.main())
@@ -0,0 +1,161 @@
+"""
+Vector compression benchmark.
+
+Embeds the synthetic corpus once, then builds a CompressedIndex for each
+compression method and reports the bytes per vector, compression ratio,
+search latency and recall@k against an exact float32 inner-product search,
+both for the coarse pass alone and after exact rescoring. Use it to pick
+`vector_compression.method` and `rescore_multiplier` for a collection. Runs
+offline with the "hashing" embedder; real embedders can be selected with
+--embedding-model.
+
+Example (from app/src):
+    python -m benchmarks.compression --chunks 100000 --output results/compression.json
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+from benchmarks.corpus import generate_documents, generate_queries
+from benchmarks.utils import latency_summary, peak_rss_mb, recall_at_k, write_results
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--chunks-per-document", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--embedding-model", default="hashing")
+    parser.add_argument(
+        "--method",
+        dest="methods",
+        action="append",
+        default=None,
+        help="Compression method to test (repeatable); defaults to all",
+    )
+    parser.add_argument("--dimension", type=int, default=256)
+    parser.add_argument("--rescore-multiplier", type=int, default=4)
+    parser.add_argument("--training-size", type=int, default=10000)
+    parser.add_argument(
+        "--in-memory",
+        action="store_true",
+        help="Keep the full-precision vectors in memory instead of on disk",
+    )
+    parser.add_argument("--output", default="compression_benchmark.json")
+    return parser.parse_args(argv)
+
+
+def embed_corpus(args: argparse.Namespace, embedder, chunk_cls) -> tuple:
+    ids, blocks = [], []
+    for _, pairs in generate_documents(
+        args.chunks, args.chunks_per_document, seed=args.seed
+    ):
+        chunks = [
+            chunk_cls(name=name, text=text, data_type="pdf") for name, text in pairs
+        ]
+        ids.extend(name for name, _ in pairs)
+        blocks.append(embedder(chunks).dense)
+    return ids, np.concatenate(blocks)
+
+
+def exact_top_k(
+    ids: List[str], vectors: np.ndarray, queries: np.ndarray, k: int
+) -> List[List[str]]:
+    scores = queries @ vectors.T
+    order = np.argsort(-scores, axis=1)[:, :k]
+    return [[ids[i] for i in row] for row in order]
+
+
+def evaluate(index, queries: np.ndarray, k: int, expected: List[List[str]]) -> Dict:
+    latencies, retrieved = [], []
+    for query in queries:
+        started = time.perf_counter()
+        hits = index.search(query, k)[0]
+        latencies.append((time.perf_counter() - started) * 1000)
+        retrieved.append([id for id, _, _ in hits])
+    return {
+        "latency_ms": latency_summary(latencies),
+        f"recall_at_{k}": recall_at_k(retrieved, expected),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict:
+    # imported lazily so --help works without the models installed
+    from ingestion.chunking import Chunk
+    from ingestion.inference_server import create_embedder
+    from ingestion.vector_compression import (
+        COMPRESSION_METHODS,
+        CompressedIndex,
+        create_compressor,
+    )
+
+    embedder = create_embedder(args.embedding_model)
+    print(f"Embedding {args.chunks} synthetic chunks with {args.embedding_model}")
+    ids, vectors = embed_corpus(args, embedder, Chunk)
+    queries = embedder(
+        [
+            Chunk(name=f"Query_{i}", text=query, data_type="query")
+            for i, query in enumerate(generate_queries(args.queries, args.seed + 1))
+        ]
+    ).dense
+    expected = exact_top_k(ids, vectors, queries, args.top_k)
+
+    results = {"float32": {"bytes_per_vector": 4 * vectors.shape[1]}}
+    for method in args.methods or COMPRESSION_METHODS:
+        print(f"Building the {method} index")
+        path = None if args.in_memory else tempfile.mkdtemp(prefix="sciencegpt-pq-")
+        index = CompressedIndex(
+            create_compressor(method, args.dimension),
+            path=path,
+            rescore_multiplier=args.rescore_multiplier,
+            training_size=min(args.training_size, len(ids)),
+        )
+        started = time.perf_counter()
+        for start in range(0, len(ids), args.chunks_per_document):
+            end = start + args.chunks_per_document
+            index.add(ids[start:end], vectors[start:end])
+        build_seconds = time.perf_counter() - started
+
+        rescored = evaluate(index, queries, args.top_k, expected)
+        # with a multiplier of 1 the rescoring only reorders the coarse top-k,
+        # so its recall is that of the codes alone
+        index.rescore_multiplier = 1
+        coarse = evaluate(index, queries, args.top_k, expected)
+        results[method] = {
+            **index.stats(),
+            "build_seconds": build_seconds,
+            "rescored": rescored,
+            "coarse_only": coarse,
+        }
+        if path is not None:
+            shutil.rmtree(path, ignore_errors=True)
+
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    output = os.path.abspath(args.output)
+    results = run(args)
+    recall = f"recall_at_{args.top_k}"
+    for method, result in results.items():
+        if isinstance(result, dict) and "rescored" in result:
+            print(
+                f"{method}: {result['compression_ratio']:.1f}x, "
+                f"{recall} {result['rescored'][recall]:.3f} rescored / "
+                f"{result['coarse_only'][recall]:.3f} coarse, "
+                f"p50 {result['rescored']['latency_ms']['p50']:.2f} ms"
+            )
+    write_results(output, "compression", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
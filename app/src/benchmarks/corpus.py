@@ -0,0 +1,147 @@
+import random
+from typing import Iterator, List, Tuple
+
+PESTICIDES = [
+    "glyphosate",
+    "malathion",
+    "atrazine",
+    "paraquat",
+    "acephate",
+    "chlorpyrifos",
+    "triticonazole",
+    "imidacloprid",
+    "clothianidin",
+    "thiamethoxam",
+    "2,4-D",
+    "dicamba",
+    "mancozeb",
+    "captan",
+    "diazinon",
+    "permethrin",
+    "cypermethrin",
+    "metolachlor",
+    "fluopyram",
+    "boscalid",
+]
+SPECIES = [
+    "rats",
+    "mice",
+    "dogs",
+    "rabbits",
+    "rainbow trout",
+    "Daphnia magna",
+    "honey bees",
+    "bobwhite quail",
+    "earthworms",
+    "green algae",
+]
+STUDIES = [
+    ("90-day oral toxicity study", "OECD TG 408"),
+    ("two-generation reproduction study", "OECD TG 416"),
+    ("prenatal developmental toxicity study", "OECD TG 414"),
+    ("chronic toxicity and carcinogenicity study", "OECD TG 453"),
+    ("acute oral toxicity study", "OECD TG 423"),
+    ("fish acute toxicity test", "OECD TG 203"),
+    ("Daphnia acute immobilisation test", "OECD TG 202"),
+    ("honey bee acute contact toxicity test", "OECD TG 214"),
+    ("in vitro mammalian chromosomal aberration test", "OECD TG 473"),
+    ("bacterial reverse mutation test", "OECD TG 471"),
+]
+ENDPOINTS = [
+    "body weight gain",
+    "liver weight",
+    "kidney histopathology",
+    "cholinesterase inhibition",
+    "litter size",
+    "pup viability",
+    "thyroid hormone levels",
+    "mortality",
+    "immobilisation",
+    "growth rate",
+]
+FINDINGS = [
+    "No treatment-related effects were observed at any dose level.",
+    "Effects were limited to the highest dose and were considered adaptive.",
+    "A dose-related decrease was observed in both sexes.",
+    "The effects were reversible after a four-week recovery period.",
+    "Findings were consistent with the historical control data of the laboratory.",
+    "The study was considered acceptable for regulatory purposes.",
+]
+
+
+def _chunk_text(rng: random.Random, sentences: int) -> str:
+    pesticide = rng.choice(PESTICIDES)
+    species = rng.choice(SPECIES)
+    study, guideline = rng.choice(STUDIES)
+    parts = [
+        f"In a {study} conducted according to {guideline}, {pesticide} was "
+        f"administered to {species} at doses of 0, {rng.randint(5, 50)}, "
+        f"{rng.randint(51, 300)} and {rng.randint(301, 1000)} mg/kg bw/day."
+    ]
+    for _ in range(sentences - 1):
+        endpoint = rng.choice(ENDPOINTS)
+        if rng.random() < 0.5:
+            parts.append(
+                f"The NOAEL for {endpoint} was {rng.randint(1, 500)} mg/kg bw/day "
+                f"and the LOAEL was {rng.randint(501, 2000)} mg/kg bw/day."
+            )
+        else:
+            parts.append(f"Regarding {endpoint}: {rng.choice(FINDINGS)}")
+    return " ".join(parts)
+
+
+def generate_documents(
+    num_chunks: int,
+    chunks_per_document: int = 500,
+    sentences_per_chunk: int = 8,
+    seed: int = 0,
+) -> Iterator[Tuple[str, List[Tuple[str, str]]]]:
+    """
+    Generates a deterministic synthetic regulatory-toxicology corpus.
+
+    Args:
+        num_chunks (int): Total number of chunks to generate.
+        chunks_per_document (int): Chunks per synthetic document.
+        sentences_per_chunk (int): Sentences per chunk (roughly 25 tokens each).
+        seed (int): Random seed; the same seed always yields the same corpus.
+
+    Yields:
+        Tuple[str, List[Tuple[str, str]]]: A document name and its (chunk name, text) pairs.
+            Chunk names follow the "<file> - Chunk <n>" convention used by the chunkers.
+    """
+    rng = random.Random(seed)
+    document = 0
+    for start in range(0, num_chunks, chunks_per_document):
+        name = f"synthetic_{document:06d}.pdf"
+        count = min(chunks_per_document, num_chunks - start)
+        yield name, [
+            (f"{name} - Chunk {i + 1}", _chunk_text(rng, sentences_per_chunk))
+            for i in range(count)
+        ]
+        document += 1
+
+
+def generate_queries(num_queries: int, seed: int = 1) -> List[str]:
+    """
+    Generates deterministic search queries in the style of user questions.
+    """
+    rng = random.Random(seed)
+    templates = [
+        "What is the NOAEL for {endpoint} of {pesticide} in {species}?",
+        "{pesticide} {study} {species}",
+        "Effects of {pesticide} on {endpoint}",
+        "{guideline} results for {pesticide}",
+    ]
+    queries = []
+    for _ in range(num_queries):
+        study, guideline = rng.choice(STUDIES)
+        queries.append(
+            rng.choice(templates).format(
+                pesticide=rng.choice(PESTICIDES),
+                species=rng.choice(SPECIES),
+                endpoint=rng.choice(ENDPOINTS),
+                study=study,
+                guideline=guideline,
+            )
+        )
+    return queries
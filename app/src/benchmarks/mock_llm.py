@@ -0,0 +1,250 @@
+"""
+Mock LLM endpoint for load tests.
+
+Serves the parts of the Ollama and Azure OpenAI APIs the app uses, with
+configurable latency and error rate, so the request path can be exercised
+without a GPU host or API quota:
+
+    POST /api/generate                                   (Ollama)
+    GET  /api/tags                                       (Ollama health check)
+    POST /openai/deployments/<name>/chat/completions     (Azure OpenAI)
+    GET  /openai/models                                  (Azure health check)
+
+Example (from app/src):
+    python -m benchmarks.mock_llm --port 11434 --latency-ms 300 --tokens-per-second 40
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+# completion length when the request does not cap it
+DEFAULT_COMPLETION_TOKENS = 128
+
+
+class MockLLMServer:
+    """
+    A threaded HTTP server answering every generation with a canned response.
+
+    Each generation sleeps for `latency_ms` plus the completion length divided
+    by `tokens_per_second`, and fails with HTTP 503 with probability
+    `error_rate`. Any model name is accepted for generation; the health
+    checks list `models`.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 200.0,
+        tokens_per_second: float = 0.0,
+        error_rate: float = 0.0,
+        models: Iterable[str] = ("mock",),
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            host (str): Interface to bind.
+            port (int): Port to bind; 0 picks a free port.
+            latency_ms (float): Fixed latency added to every generation.
+            tokens_per_second (float): Simulated decode speed; 0 disables it.
+            error_rate (float): Fraction of generations answered with HTTP 503.
+            models (Iterable[str]): Model names reported by the health checks.
+            seed (int, optional): Seed for the error sampling.
+        """
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.models = list(models)
+        self.requests: Dict[str, int] = {"generate": 0, "errors": 0, "health": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockLLMServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="mock-llm", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serves on the calling thread until interrupted."""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.requests[key] += 1
+
+    def _generate(self, prompt: str, max_tokens: Optional[int]) -> Optional[dict]:
+        """
+        Simulates one generation. Returns None for an injected failure.
+        """
+        self._count("generate")
+        completion_tokens = max_tokens or DEFAULT_COMPLETION_TOKENS
+        delay = self.latency_ms / 1000
+        if self.tokens_per_second > 0:
+            delay += completion_tokens / self.tokens_per_second
+        time.sleep(delay)
+
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+        if failed:
+            self._count("errors")
+            return None
+        return {
+            "text": f"Mock answer to a {len(prompt)} character prompt.",
+            "prompt_tokens": len(prompt.split()),
+            "completion_tokens": completion_tokens,
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args) -> None:
+                pass
+
+            def _send(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self) -> dict:
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def do_GET(self) -> None:
+                path = urlparse(self.path).path.rstrip("/")
+                server._count("health")
+                if path == "/api/tags":
+                    self._send(
+                        200, {"models": [{"name": name} for name in server.models]}
+                    )
+                elif path == "/openai/models":
+                    self._send(200, {"data": [{"id": name} for name in server.models]})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_POST(self) -> None:
+                path = urlparse(self.path).path.rstrip("/")
+                if path == "/api/generate":
+                    request = self._body()
+                    result = server._generate(
+                        request.get("prompt", ""),
+                        request.get("options", {}).get("num_predict"),
+                    )
+                    if result is None:
+                        self._send(503, {"error": "injected failure"})
+                        return
+                    self._send(
+                        200,
+                        {
+                            "model": request.get("model", "mock"),
+                            "response": result["text"],
+                            "done": True,
+                            "prompt_eval_count": result["prompt_tokens"],
+                            "eval_count": result["completion_tokens"],
+                        },
+                    )
+                elif path.startswith("/openai/deployments/") and path.endswith(
+                    "/chat/completions"
+                ):
+                    request = self._body()
+                    prompt = " ".join(
+                        str(message.get("content", ""))
+                        for message in request.get("messages", [])
+                    )
+                    result = server._generate(prompt, request.get("max_tokens"))
+                    if result is None:
+                        self._send(503, {"error": {"message": "injected failure"}})
+                        return
+                    self._send(
+                        200,
+                        {
+                            "id": "chatcmpl-mock",
+                            "object": "chat.completion",
+                            "created": int(time.time()),
+                            "model": request.get("model", "gpt-4o"),
+                            "choices": [
+                                {
+                                    "index": 0,
+                                    "finish_reason": "stop",
+                                    "message": {
+                                        "role": "assistant",
+                                        "content": result["text"],
+                                    },
+                                }
+                            ],
+                            "usage": {
+                                "prompt_tokens": result["prompt_tokens"],
+                                "completion_tokens": result["completion_tokens"],
+                                "total_tokens": result["prompt_tokens"]
+                                + result["completion_tokens"],
+                            },
+                        },
+                    )
+                else:
+                    self._send(404, {"error": "not found"})
+
+        return Handler
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--models", nargs="*", default=["mock"], help="Names listed by health checks"
+    )
+    args = parser.parse_args(argv)
+
+    server = MockLLMServer(
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        models=args.models,
+    )
+    print(f"Mock LLM listening on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Mock OCR endpoint for tests and benchmarks.
+
+Serves the FullOCR inference route OCRReader calls, with configurable latency
+per page and error rate, so page-batched OCR ingestion can be exercised
+without the OCR service:
+
+    POST /v2/ai/infer/     multipart upload of a PDF in the "input" field
+
+Each page of the uploaded PDF gets one OCR item per line of its text layer
+(laid out top to bottom) and no tables.
+
+Example (from app/src):
+    python -m benchmarks.mock_ocr --port 8000 --latency-ms-per-page 200
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from PyPDF2 import PdfReader
+
+# rendering resolution the page shapes and locations are reported in
+DPI = 144
+LINE_HEIGHT = 24
+
+
+def ocr_page(page, page_id: int) -> dict:
+    """A FullOCR page result with one item per text line of the page."""
+    scale = DPI / 72
+    width = int(float(page.mediabox.width) * scale)
+    height = int(float(page.mediabox.height) * scale)
+    lines = [line for line in (page.extract_text() or "").splitlines() if line]
+    items = []
+    for i, line in enumerate(lines):
+        top = 40 + i * LINE_HEIGHT
+        right = min(40 + 10 * len(line), width)
+        items.append(
+            {
+                "text": line,
+                "location": [
+                    [40, top],
+                    [right, top],
+                    [right, top + LINE_HEIGHT],
+                    [40, top + LINE_HEIGHT],
+                ],
+            }
+        )
+    return {
+        "image": f"page_{page_id}.png",
+        "image_shape": [width, height],
+        "json": {"ocr": items, "table": []},
+    }
+
+
+class MockOCRServer:
+    """
+    A threaded HTTP server answering OCR requests from the PDF's text layer.
+
+    Each request sleeps for `latency_ms_per_page` times its page count, and
+    fails with HTTP 503 with probability `error_rate`.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms_per_page: float = 100.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            host (str): Interface to bind.
+            port (int): Port to bind; 0 picks a free port.
+            latency_ms_per_page (float): Simulated OCR time per page.
+            error_rate (float): Fraction of requests answered with HTTP 503.
+            seed (int, optional): Seed for the error sampling.
+        """
+        self.latency_ms_per_page = latency_ms_per_page
+        self.error_rate = error_rate
+        self.requests: Dict[str, int] = {"infer": 0, "pages": 0, "errors": 0}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v2/ai/infer/"
+
+    def start(self) -> "MockOCRServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="mock-ocr", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serves on the calling thread until interrupted."""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockOCRServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _infer(self, pdf: bytes) -> Optional[List[dict]]:
+        """
+        Simulates OCR of one PDF. Returns None for an injected failure.
+        """
+        pages = PdfReader(BytesIO(pdf)).pages
+        with self._lock:
+            self.requests["infer"] += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            failed = self._random.random() < self.error_rate
+        try:
+            time.sleep(self.latency_ms_per_page * len(pages) / 1000)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        if failed:
+            with self._lock:
+                self.requests["errors"] += 1
+            return None
+        with self._lock:
+            self.requests["pages"] += len(pages)
+        return [ocr_page(page, page_id) for page_id, page in enumerate(pages)]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args) -> None:
+                pass
+
+            def _send(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _form(self) -> Dict[str, bytes]:
+                length = int(self.headers.get("Content-Length", 0))
+                message = BytesParser(policy=default_policy).parsebytes(
+                    f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode()
+                    + self.rfile.read(length)
+                )
+                return {
+                    part.get_param("name", header="content-disposition"): (
+                        part.get_payload(decode=True)
+                    )
+                    for part in message.iter_parts()
+                }
+
+            def do_POST(self) -> None:
+                path = urlparse(self.path).path.rstrip("/")
+                if path != "/v2/ai/infer":
+                    self._send(404, {"error": "not found"})
+                    return
+                form = self._form()
+                if "input" not in form:
+                    self._send(422, {"error": "missing input file"})
+                    return
+                result = server._infer(form["input"])
+                if result is None:
+                    self._send(503, {"error": "injected failure"})
+                    return
+                self._send(200, {"result": result})
+
+        return Handler
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-ms-per-page", type=float, default=100.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    server = MockOCRServer(
+        host=args.host,
+        port=args.port,
+        latency_ms_per_page=args.latency_ms_per_page,
+        error_rate=args.error_rate,
+    )
+    print(f"Mock OCR listening on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
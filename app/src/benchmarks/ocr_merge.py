@@ -0,0 +1,245 @@
+"""
+OCR box merging micro-benchmark.
+
+Generates synthetic page layouts (text lines laid out in rows, tables of
+cells, OCR boxes jittered around the PDF text plus extra OCR-only boxes) and
+times `merge_ocr_and_pdf_texts` and `merge_table_cell_and_ocr` against
+straightforward all-pairs reference implementations, checking that both
+produce the same merge. Use it to size OCR post-processing for dense,
+table-heavy pages.
+
+Example (from app/src):
+    python -m benchmarks.ocr_merge --lines 2000 --tables 6 --output results/ocr_merge.json
+"""
+
+import argparse
+import copy
+import os
+import random
+import time
+from typing import Dict, List, Tuple
+
+from benchmarks.utils import latency_summary, write_results
+from reasoning.loaders.utils.box import (
+    bbox_to_points,
+    box_area,
+    box_h,
+    box_w,
+    get_rect_iou,
+    union_points,
+)
+from reasoning.loaders.utils.pdf_ocr import (
+    IOU_THRES,
+    PADDING_THRES,
+    merge_ocr_and_pdf_texts,
+    merge_table_cell_and_ocr,
+)
+
+# A4 at 300 dpi
+PAGE_WIDTH, PAGE_HEIGHT = 2480, 3508
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--lines", type=int, default=1000, help="PDF text boxes")
+    parser.add_argument("--tables", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=20, help="Rows per table")
+    parser.add_argument("--columns", type=int, default=8, help="Columns per table")
+    parser.add_argument(
+        "--extra-ocr", type=float, default=0.2, help="OCR-only boxes per PDF box"
+    )
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="ocr_merge_benchmark.json")
+    return parser.parse_args(argv)
+
+
+def _item(box: List[int], **fields) -> dict:
+    return {"box": box, "bbox": box, "location": bbox_to_points(box), **fields}
+
+
+def generate_page(
+    lines: int,
+    tables: int,
+    rows: int,
+    columns: int,
+    extra_ocr: float = 0.2,
+    seed: int = 0,
+) -> Tuple[List[dict], List[dict], List[dict]]:
+    """
+    Returns the OCR items, PDF text items and table items of a synthetic page.
+    """
+    rng = random.Random(seed)
+    pdf_items, ocr_items, table_items = [], [], []
+
+    # tables stacked down the left half of the page, text on the right half
+    table_height = PAGE_HEIGHT // max(tables, 1)
+    for t in range(tables):
+        top = t * table_height + 20
+        cell_w = (PAGE_WIDTH // 2 - 40) // columns
+        cell_h = (table_height - 40) // rows
+        table_box = [20, top, 20 + cell_w * columns, top + cell_h * rows]
+        table_items.append(_item(table_box, type="table", text=""))
+        for r in range(rows):
+            for c in range(columns):
+                x1, y1 = 20 + c * cell_w, top + r * cell_h
+                table_items.append(
+                    _item([x1, y1, x1 + cell_w, y1 + cell_h], type="cell", text="")
+                )
+                text_box = [x1 + 4, y1 + 4, x1 + cell_w - 4, y1 + cell_h - 4]
+                pdf_items.append(_item(text_box, text=f"cell {t}.{r}.{c}"))
+
+    line_h = max((PAGE_HEIGHT - 40) // max(lines, 1), 8)
+    for i in range(lines):
+        x1 = PAGE_WIDTH // 2 + rng.randint(0, 200)
+        y1 = 20 + (i * line_h) % (PAGE_HEIGHT - 40)
+        width = rng.randint(200, PAGE_WIDTH // 2 - 240)
+        pdf_items.append(_item([x1, y1, x1 + width, y1 + line_h - 2], text=f"line {i}"))
+
+    for item in pdf_items:
+        dx, dy = rng.randint(-3, 3), rng.randint(-3, 3)
+        x1, y1, x2, y2 = item["box"]
+        ocr_items.append(_item([x1 + dx, y1 + dy, x2 + dx, y2 + dy], text=item["text"]))
+    for i in range(int(len(pdf_items) * extra_ocr)):
+        x1, y1 = rng.randint(0, PAGE_WIDTH - 100), rng.randint(0, PAGE_HEIGHT - 30)
+        ocr_items.append(_item([x1, y1, x1 + 90, y1 + 25], text=f"ocr {i}"))
+
+    rng.shuffle(ocr_items)
+    return ocr_items, pdf_items, table_items
+
+
+def reference_merge_ocr_and_pdf_texts(ocr_list, pdf_text_list):
+    """All-pairs version of `merge_ocr_and_pdf_texts`."""
+    not_matched_ocr = []
+    for ocr_item in ocr_list:
+        if not any(
+            get_rect_iou(ocr_item["location"], pdf_item["location"], iou_type=1)
+            > IOU_THRES
+            for pdf_item in pdf_text_list
+        ):
+            ocr_item["matched"] = False
+            not_matched_ocr.append(ocr_item)
+    return pdf_text_list + not_matched_ocr
+
+
+def reference_merge_table_cell_and_ocr(table_list, ocr_list, pdf_list):
+    """All-pairs version of `merge_table_cell_and_ocr`."""
+    cell_list = [item for item in table_list if item["type"] == "cell"]
+    table_list = [item for item in table_list if item["type"] == "table"]
+    table_list = sorted(table_list, key=lambda item: box_area(item["bbox"]))
+
+    all_tables, matched_pdf_ids, matched_cell_ids = [], set(), set()
+    for table in table_list:
+        cur_table_cells = []
+        for cell_id, cell in enumerate(cell_list):
+            if cell_id in matched_cell_ids:
+                continue
+            if get_rect_iou(
+                table["location"], cell["location"], iou_type=1
+            ) > IOU_THRES and box_area(table["bbox"]) > box_area(cell["bbox"]):
+                for item_list, item_type in [(pdf_list, "pdf"), (ocr_list, "ocr")]:
+                    cell["ocr"] = []
+                    for item_id, item in enumerate(item_list):
+                        if item_type == "pdf" and item_id in matched_pdf_ids:
+                            continue
+                        if (
+                            get_rect_iou(item["location"], cell["location"], iou_type=1)
+                            > IOU_THRES
+                        ):
+                            cell["ocr"].append(item)
+                            if item_type == "pdf":
+                                matched_pdf_ids.add(item_id)
+                    if cell["ocr"]:
+                        points = [p for item in cell["ocr"] for p in item["location"]]
+                        union_box = union_points(points)
+                        if (
+                            box_h(union_box) <= box_h(cell["bbox"]) * PADDING_THRES
+                            and box_w(union_box) <= box_w(cell["bbox"]) * PADDING_THRES
+                        ):
+                            break
+                matched_cell_ids.add(cell_id)
+                cur_table_cells.append(cell)
+        all_tables.append(cur_table_cells)
+
+    not_matched = [item for i, item in enumerate(pdf_list) if i not in matched_pdf_ids]
+    return all_tables, not_matched
+
+
+def _texts(items: List[dict]) -> List[str]:
+    return [item["text"] for item in items]
+
+
+def _summarize_tables(result) -> tuple:
+    all_tables, not_matched = result
+    return (
+        [[(_texts(cell["ocr"])) for cell in table] for table in all_tables],
+        _texts(not_matched),
+    )
+
+
+def _time(fn, page, repeats: int) -> Tuple[List[float], object]:
+    samples, result = [], None
+    for _ in range(repeats):
+        args = copy.deepcopy(page)
+        started = time.perf_counter()
+        result = fn(*args)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples, result
+
+
+def run(args: argparse.Namespace) -> Dict:
+    ocr_items, pdf_items, table_items = generate_page(
+        args.lines, args.tables, args.rows, args.columns, args.extra_ocr, args.seed
+    )
+    results: Dict = {
+        "boxes": {
+            "ocr": len(ocr_items),
+            "pdf": len(pdf_items),
+            "table_items": len(table_items),
+        }
+    }
+
+    cases = {
+        "merge_ocr_and_pdf_texts": (
+            merge_ocr_and_pdf_texts,
+            reference_merge_ocr_and_pdf_texts,
+            (ocr_items, pdf_items),
+            _texts,
+        ),
+        "merge_table_cell_and_ocr": (
+            merge_table_cell_and_ocr,
+            reference_merge_table_cell_and_ocr,
+            (table_items, ocr_items, pdf_items),
+            _summarize_tables,
+        ),
+    }
+    for name, (indexed, reference, page, summarize) in cases.items():
+        indexed_ms, indexed_result = _time(indexed, page, args.repeats)
+        reference_ms, reference_result = _time(reference, page, args.repeats)
+        indexed_stats = latency_summary(indexed_ms)
+        reference_stats = latency_summary(reference_ms)
+        results[name] = {
+            "indexed_ms": indexed_stats,
+            "reference_ms": reference_stats,
+            "speedup": reference_stats["p50"] / max(indexed_stats["p50"], 1e-9),
+            "identical": summarize(indexed_result) == summarize(reference_result),
+        }
+    return results
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    output = os.path.abspath(args.output)
+    results = run(args)
+    for name, result in results.items():
+        if isinstance(result, dict) and "speedup" in result:
+            print(
+                f"{name}: p50 {result['indexed_ms']['p50']:.1f} ms indexed / "
+                f"{result['reference_ms']['p50']:.1f} ms all-pairs "
+                f"({result['speedup']:.1f}x), identical: {result['identical']}"
+            )
+    write_results(output, "ocr_merge", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
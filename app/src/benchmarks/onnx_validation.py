@@ -0,0 +1,150 @@
+"""
+ONNX backend validation.
+
+Runs the synthetic corpus through the fp32 PyTorch embedder and reranker and
+through an ONNX Runtime backend ("onnx" or "onnx-int8"), and reports how
+closely the backend agrees with the reference (dense and sparse cosine,
+reranker rank correlation, top-1 agreement and top-k overlap) next to the
+CPU latency of both. Use it to accept a backend before switching a model to
+it in cpu_inference.backends.
+
+Example (from app/src):
+    python -m benchmarks.onnx_validation --backend onnx-int8 --output results/onnx.json
+"""
+
+import argparse
+import os
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.corpus import generate_documents, generate_queries
+from benchmarks.utils import latency_summary, peak_rss_mb, write_results
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--backend", choices=["onnx", "onnx-int8"], default="onnx-int8")
+    parser.add_argument("--reranker-model", default="BAAI/bge-reranker-v2-m3")
+    parser.add_argument("--chunks", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--onnx-cache-dir", default=None)
+    parser.add_argument("--intra-op-threads", type=int, default=None)
+    parser.add_argument("--output", default="onnx_validation.json")
+    return parser.parse_args(argv)
+
+
+def timed(fn: Callable, batches: List) -> tuple:
+    """
+    Calls `fn` on each batch, returning the concatenated outputs and the
+    per-batch latencies in milliseconds.
+    """
+    outputs, latencies = [], []
+    for batch in batches:
+        started = time.perf_counter()
+        outputs.extend(fn(batch))
+        latencies.append((time.perf_counter() - started) * 1000)
+    return outputs, latencies
+
+
+def run(args: argparse.Namespace) -> Dict:
+    # both backends run on the CPU, so the reference is the fp32 torch model
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    # models are imported lazily so --help works without them installed
+    from ingestion.chunking import Chunk
+    from ingestion.embedding import BGEM3Embedder, EmbeddingBatch
+    from ingestion.onnx_backend import (
+        DEFAULT_CACHE_DIR,
+        OnnxBGEM3Embedder,
+        OnnxReranker,
+        compare_embeddings,
+        compare_rankings,
+    )
+    from ingestion.reranker import Reranker
+
+    onnx_options = {
+        "quantize": args.backend == "onnx-int8",
+        "cache_dir": args.onnx_cache_dir or DEFAULT_CACHE_DIR,
+        "intra_op_threads": args.intra_op_threads,
+    }
+    texts = [
+        text
+        for _, pairs in generate_documents(args.chunks, args.chunks, seed=args.seed)
+        for _, text in pairs
+    ]
+    chunks = [
+        Chunk(text=text, name=f"Chunk_{i}", data_type="text")
+        for i, text in enumerate(texts)
+    ]
+    embed_batches = [
+        chunks[i : i + args.batch_size] for i in range(0, len(chunks), args.batch_size)
+    ]
+    queries = generate_queries(args.queries, seed=args.seed + 1)
+    # each query is scored against a fixed window of corpus chunks
+    rerank_batches = [
+        [
+            (query, texts[(i * args.candidates + j) % len(texts)])
+            for j in range(args.candidates)
+        ]
+        for i, query in enumerate(queries)
+    ]
+
+    print(f"Embedding {len(chunks)} chunks with BGE-M3 on torch and {args.backend}")
+    reference_embedder = BGEM3Embedder()
+    reference, torch_embed_ms = timed(
+        lambda batch: [reference_embedder(batch)], embed_batches
+    )
+    del reference_embedder
+    onnx_embedder = OnnxBGEM3Embedder(**onnx_options)
+    candidate, onnx_embed_ms = timed(
+        lambda batch: [onnx_embedder(batch)], embed_batches
+    )
+    del onnx_embedder
+
+    print(f"Reranking {len(queries)} x {args.candidates} pairs")
+    reference_reranker = Reranker(
+        model_name=args.reranker_model, device="cpu", use_fp16=False
+    )
+    reference_scores, torch_rerank_ms = timed(
+        lambda pairs: [reference_reranker.score_pairs(pairs)], rerank_batches
+    )
+    del reference_reranker
+    onnx_reranker = OnnxReranker(model_name=args.reranker_model, **onnx_options)
+    candidate_scores, onnx_rerank_ms = timed(
+        lambda pairs: [onnx_reranker.score_pairs(pairs)], rerank_batches
+    )
+
+    return {
+        "embedding": {
+            "agreement": compare_embeddings(
+                EmbeddingBatch.concatenate(reference),
+                EmbeddingBatch.concatenate(candidate),
+            ),
+            "torch_batch_latency_ms": latency_summary(torch_embed_ms),
+            f"{args.backend}_batch_latency_ms": latency_summary(onnx_embed_ms),
+        },
+        "reranking": {
+            "agreement": compare_rankings(
+                reference_scores, candidate_scores, k=args.top_k
+            ),
+            "torch_query_latency_ms": latency_summary(torch_rerank_ms),
+            f"{args.backend}_query_latency_ms": latency_summary(onnx_rerank_ms),
+        },
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    results = run(args)
+    for section in ("embedding", "reranking"):
+        for key, value in results[section]["agreement"].items():
+            print(f"{section} {key}: {value:.4f}")
+    write_results(os.path.abspath(args.output), "onnx_validation", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+"""
+Query replay and load-test driver.
+
+Replays a JSONL file of recorded queries through ChatOrchestrator.triage_query
+(or DataBroker.search alone) at a fixed concurrency, optionally with Poisson
+arrivals at a target rate, and reports throughput, end-to-end and per-stage
+tail latency and error rates. With --mock-llm the chat model is served by a
+local mock endpoint (benchmarks/mock_llm.py) instead of Ollama or Azure.
+
+Each input line is a JSON object; only "query" is required:
+    {"query": "What is the NOAEL of glyphosate in rats?",
+     "model": "llama3:latest",
+     "rag_params": {"top_k": 5, "reranker_model": "BAAI/bge-reranker-v2-m3"}}
+
+Example (from app/src), fully offline:
+    python -m benchmarks.replay --mock-llm --concurrency 8 --rate 4 \\
+        --set embedding.embedding_model=hashing --set vector_db.database=chromadb \\
+        --set rag_params.reranker_model=passthrough --data ../data
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import toml
+import yaml
+from benchmarks.corpus import generate_queries
+from benchmarks.mock_llm import MockLLMServer
+from benchmarks.utils import (
+    latency_summary,
+    peak_rss_mb,
+    prepare_workdir,
+    write_results,
+)
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# secret sections the orchestrator reads for the hosted models
+AZURE_SECRET_KEYS = ["gpt40-api", "gpt35-api"]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--input", help="JSONL of recorded queries")
+    parser.add_argument(
+        "--queries",
+        type=int,
+        default=100,
+        help="Number of synthetic queries when no --input is given",
+    )
+    parser.add_argument(
+        "--loops", type=int, default=1, help="Times to replay the input"
+    )
+    parser.add_argument("--target", choices=["chat", "search"], default="chat")
+    parser.add_argument("--model", help="Model for records without one")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=0.0,
+        help="Mean arrivals per second (Poisson); 0 replays as fast as workers allow",
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=1, help="Unmeasured queries first"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--set",
+        dest="overrides",
+        action="append",
+        default=[],
+        metavar="SECTION.KEY=VALUE",
+        help="Override a system config value, e.g. rag_params.top_k=3",
+    )
+    parser.add_argument("--mock-llm", action="store_true")
+    parser.add_argument("--mock-latency-ms", type=float, default=200.0)
+    parser.add_argument("--mock-tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--secrets",
+        default=os.path.join(SRC_DIR, "..", "secrets.toml"),
+        help="Secrets file for real endpoints (ignored with --mock-llm)",
+    )
+    parser.add_argument("--data", help="Folder of documents to ingest as base data")
+    parser.add_argument(
+        "--workdir",
+        default=None,
+        help="Working directory for data and the vector store (defaults to a temp dir)",
+    )
+    parser.add_argument("--output", default="replay_benchmark.json")
+    return parser.parse_args(argv)
+
+
+def load_records(args: argparse.Namespace) -> List[dict]:
+    if args.input:
+        with open(args.input) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+    else:
+        records = [{"query": q} for q in generate_queries(args.queries, args.seed)]
+    return records * args.loops
+
+
+def apply_overrides(config, overrides: List[str]) -> None:
+    """
+    Applies "section.key=value" overrides to the system config. Values are
+    parsed as YAML, so numbers, booleans and lists keep their types.
+    """
+    for override in overrides:
+        path, _, value = override.partition("=")
+        section, _, key = path.partition(".")
+        setattr(getattr(config, section), key, yaml.safe_load(value))
+
+
+def setup_workdir(args: argparse.Namespace, mock_url: Optional[str]) -> str:
+    """
+    Lays out a working directory the way the app expects (src/configs,
+    secrets.toml, data/) and changes into it.
+    """
+    workdir = os.path.abspath(
+        args.workdir or tempfile.mkdtemp(prefix="sciencegpt-replay-")
+    )
+    secrets_path = prepare_workdir(workdir)
+
+    configs = os.path.join(workdir, "src", "configs")
+    if not os.path.exists(configs):
+        os.makedirs(os.path.dirname(configs), exist_ok=True)
+        os.symlink(os.path.join(SRC_DIR, "configs"), configs)
+
+    # never overwrite a secrets file that was already in the workdir
+    if os.path.getsize(secrets_path) == 0:
+        if mock_url is not None:
+            secrets = {"localmodel": {"macbook_endpoint": mock_url}}
+            for key in AZURE_SECRET_KEYS:
+                secrets[key] = {
+                    "api_key": "mock",
+                    "api_version": "2024-06-01",
+                    "azure_endpoint": mock_url,
+                }
+            with open(secrets_path, "w") as f:
+                toml.dump(secrets, f)
+        else:
+            shutil.copyfile(args.secrets, secrets_path)
+
+    if args.data:
+        for name in os.listdir(args.data):
+            target = os.path.join(workdir, "data", name)
+            if not os.path.exists(target):
+                os.symlink(os.path.abspath(os.path.join(args.data, name)), target)
+
+    return workdir
+
+
+class Replay:
+    """
+    Runs recorded queries against the app's request path and collects
+    per-request latency and outcomes.
+    """
+
+    def __init__(self, args: argparse.Namespace, orchestrator, rag_defaults) -> None:
+        self.args = args
+        self.orchestrator = orchestrator
+        self.rag_defaults = rag_defaults
+        self.service_ms: List[float] = []
+        self.latency_ms: List[float] = []
+        self.queue_ms: List[float] = []
+        self.outcomes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def _rag_params(self, record: dict):
+        rag_params = self.rag_defaults.model_copy(deep=True)
+        for key, value in record.get("rag_params", {}).items():
+            setattr(rag_params, key, value)
+        return rag_params
+
+    def _chat(self, record: dict) -> str:
+        # each request gets its own config, like a separate user session, but
+        # shares the model registry, response cache and data broker
+        orchestrator = copy.copy(self.orchestrator)
+        orchestrator.config = self.orchestrator.config.model_copy(deep=True)
+        orchestrator.config.rag_params = self._rag_params(record)
+        model = record.get("model") or orchestrator.config.model_params.model_name
+        _, response, _, _, _ = orchestrator.triage_query(record["query"], model)
+
+        from models.models import ERROR_RESPONSE
+        from orchestrator.chat_orchestrator import MODEL_OFFLINE_RESPONSE
+
+        if response == ERROR_RESPONSE:
+            return "error_response"
+        if response == MODEL_OFFLINE_RESPONSE:
+            return "model_offline"
+        return "ok"
+
+    def _search(self, record: dict) -> str:
+        from databroker.databroker import DataBroker
+
+        rag_params = self._rag_params(record)
+        DataBroker().search(
+            [record["query"]],
+            top_k=rag_params.top_k,
+            hybrid_weighting=rag_params.hybrid_weight,
+            keywords=rag_params.keywords,
+            filenames=rag_params.filenames,
+            reranker_model=rag_params.reranker_model,
+        )
+        return "ok"
+
+    def execute(self, record: dict, arrival: float) -> None:
+        started = time.perf_counter()
+        try:
+            if self.args.target == "chat":
+                outcome = self._chat(record)
+            else:
+                outcome = self._search(record)
+        except Exception as e:
+            outcome = type(e).__name__
+        finished = time.perf_counter()
+
+        with self._lock:
+            self.outcomes[outcome] += 1
+            self.service_ms.append((finished - started) * 1000)
+            self.latency_ms.append((finished - arrival) * 1000)
+            self.queue_ms.append((started - arrival) * 1000)
+
+    def run(self, records: List[dict]) -> float:
+        """
+        Replays the records and returns the wall-clock time in seconds.
+
+        With a rate, arrivals are scheduled open-loop so queueing shows up in
+        the end-to-end latency; without one, every record arrives at the start
+        and the workers drain the queue as fast as they can.
+        """
+        rng = random.Random(self.args.seed)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.args.concurrency) as pool:
+            arrival = started
+            for record in records:
+                if self.args.rate > 0:
+                    arrival += rng.expovariate(self.args.rate)
+                    time.sleep(max(0.0, arrival - time.perf_counter()))
+                pool.submit(self.execute, record, arrival)
+        return time.perf_counter() - started
+
+
+def run(args: argparse.Namespace) -> Dict:
+    records = load_records(args)
+    mock = None
+    if args.mock_llm:
+        models = {r["model"] for r in records if r.get("model")}
+        mock = MockLLMServer(
+            latency_ms=args.mock_latency_ms,
+            tokens_per_second=args.mock_tokens_per_second,
+            error_rate=args.mock_error_rate,
+            models=models | {args.model or "mock"},
+            seed=args.seed,
+        ).start()
+
+    workdir = setup_workdir(args, mock.url if mock else None)
+
+    # imported after changing into the workdir: the orchestrator and the
+    # logging setup read configs and secrets relative to the current directory
+    from databroker.databroker import DataBroker
+    from logs.tracing import metrics
+    from orchestrator.chat_orchestrator import ChatOrchestrator
+
+    orchestrator = ChatOrchestrator()
+    config = orchestrator.config
+    apply_overrides(config, args.overrides)
+    if args.model:
+        config.model_params.model_name = args.model
+
+    userpath = os.path.join(workdir, "data", "replay") + "/"
+    os.makedirs(userpath, exist_ok=True)
+
+    print("Initializing data broker")
+    setup_started = time.perf_counter()
+    DataBroker(
+        SimpleNamespace(
+            username="replay",
+            userpath=userpath,
+            embedding_model=config.embedding.embedding_model,
+            chunking_method=config.chunking.chunking_method,
+            chunking=config.chunking,
+            pdf_extractor=config.extraction,
+            vector_store=config.vector_db,
+            reranker_model=config.rag_params.reranker_model,
+            inference_server=config.inference_server,
+            cpu_inference=config.cpu_inference,
+            vector_compression=config.vector_compression,
+            deduplication=config.deduplication,
+            http_client=config.http_client,
+        )
+    )
+    setup_seconds = time.perf_counter() - setup_started
+
+    replay = Replay(args, orchestrator, config.rag_params)
+    warmup, measured = records[: args.warmup], records[args.warmup :]
+    for record in warmup:
+        replay.execute(record, time.perf_counter())
+
+    replay = Replay(args, orchestrator, config.rag_params)
+    metrics.reset()
+    print(
+        f"Replaying {len(measured)} queries ({args.target}) with concurrency "
+        f"{args.concurrency}" + (f" at {args.rate}/s" if args.rate > 0 else "")
+    )
+    wall_seconds = replay.run(measured)
+
+    if mock is not None:
+        mock.stop()
+
+    total = sum(replay.outcomes.values())
+    errors = total - replay.outcomes["ok"]
+    results = {
+        "setup_seconds": setup_seconds,
+        "requests": total,
+        "wall_seconds": wall_seconds,
+        "throughput_qps": total / wall_seconds if wall_seconds else 0.0,
+        "latency_ms": latency_summary(replay.latency_ms),
+        "service_ms": latency_summary(replay.service_ms),
+        "queue_ms": latency_summary(replay.queue_ms),
+        "outcomes": dict(replay.outcomes),
+        "error_rate": errors / total if total else 0.0,
+        "stages": metrics.summary(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    if mock is not None:
+        results["mock_llm"] = dict(mock.requests)
+    return results
+
+
+def print_report(results: Dict) -> None:
+    latency = results["latency_ms"]
+    print(
+        f"\n{results['requests']} requests in {results['wall_seconds']:.1f}s "
+        f"({results['throughput_qps']:.2f} req/s), "
+        f"error rate {results['error_rate']:.1%}"
+    )
+    if latency.get("count"):
+        print(
+            f"latency p50 {latency['p50']:.0f} ms, p95 {latency['p95']:.0f} ms, "
+            f"p99 {latency['p99']:.0f} ms"
+        )
+    print(f"{'stage':<40} {'count':>7} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, stage in results["stages"].items():
+        if name.endswith(".duration_ms"):
+            print(
+                f"{name[: -len('.duration_ms')]:<40} {stage['count']:>7} "
+                f"{stage['p50']:>9.1f} {stage['p95']:>9.1f} {stage['p99']:>9.1f}"
+            )
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    output = os.path.abspath(args.output)
+    if args.input:
+        args.input = os.path.abspath(args.input)
+    if args.data:
+        args.data = os.path.abspath(args.data)
+    args.secrets = os.path.abspath(args.secrets)
+    results = run(args)
+    print_report(results)
+    write_results(output, "replay", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
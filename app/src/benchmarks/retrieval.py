@@ -0,0 +1,174 @@
+"""
+Offline retrieval benchmark.
+
+Generates a synthetic corpus, ingests it through DataBroker and measures
+ingestion throughput, search latency, peak RSS and recall@k of the vector
+store against an exact (FLAT) inner-product search. Runs fully offline with
+the embedded Chroma backend, the "hashing" embedder and the "passthrough"
+reranker; real models and a Milvus server can be selected with flags.
+
+Example (from app/src):
+    python -m benchmarks.retrieval --chunks 10000 --output results/retrieval.json
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Dict, List
+
+import numpy as np
+from benchmarks.corpus import generate_documents, generate_queries
+from benchmarks.utils import (
+    latency_summary,
+    peak_rss_mb,
+    prepare_workdir,
+    recall_at_k,
+    write_results,
+)
+from databroker.databroker import DataBroker
+from ingestion.chunking import Chunk
+from logs.tracing import metrics
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--chunks", type=int, default=10000)
+    parser.add_argument("--chunks-per-document", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=["chromadb", "milvus"], default="chromadb")
+    parser.add_argument("--host", default="localhost", help="Milvus host")
+    parser.add_argument("--port", type=int, default=19530, help="Milvus port")
+    parser.add_argument("--embedding-model", default="hashing")
+    parser.add_argument("--reranker-model", default="passthrough")
+    parser.add_argument(
+        "--workdir",
+        default=None,
+        help="Working directory for the vector store (defaults to a temp dir)",
+    )
+    parser.add_argument("--output", default="retrieval_benchmark.json")
+    return parser.parse_args(argv)
+
+
+def make_chunks(pairs, chunk_cls, data_type="pdf") -> list:
+    return [
+        chunk_cls(name=name, text=text, data_type=data_type) for name, text in pairs
+    ]
+
+
+def dense_matrix(embedder, chunks) -> np.ndarray:
+    return embedder(chunks).dense
+
+
+def exact_top_k(
+    args: argparse.Namespace, embedder, chunk_cls, query_vectors: np.ndarray
+) -> List[List[str]]:
+    """
+    Exact inner-product search over the whole corpus, streamed one document at
+    a time so memory stays O(queries * k) regardless of corpus size.
+    """
+    k = args.top_k
+    best_scores = np.full((len(query_vectors), k), -np.inf, dtype=np.float32)
+    best_ids = np.full((len(query_vectors), k), "", dtype=object)
+
+    for _, pairs in generate_documents(
+        args.chunks, args.chunks_per_document, seed=args.seed
+    ):
+        ids = np.array([name for name, _ in pairs], dtype=object)
+        scores = query_vectors @ dense_matrix(embedder, make_chunks(pairs, chunk_cls)).T
+
+        merged_scores = np.concatenate([best_scores, scores], axis=1)
+        merged_ids = np.concatenate(
+            [best_ids, np.broadcast_to(ids, scores.shape)], axis=1
+        )
+        order = np.argsort(-merged_scores, axis=1)[:, :k]
+        best_scores = np.take_along_axis(merged_scores, order, axis=1)
+        best_ids = np.take_along_axis(merged_ids, order, axis=1)
+
+    return [list(row) for row in best_ids]
+
+
+def run(args: argparse.Namespace) -> Dict:
+    workdir = args.workdir or tempfile.mkdtemp(prefix="sciencegpt-bench-")
+    secrets_path = prepare_workdir(workdir)
+
+    config = SimpleNamespace(
+        username="benchmark",
+        userpath=os.path.join(workdir, "user") + "/",
+        embedding_model=args.embedding_model,
+        chunking_method="recursive_character",
+        pdf_extractor=SimpleNamespace(extraction_method="pypdf2"),
+        vector_store=SimpleNamespace(
+            database=args.backend, host=args.host, port=args.port
+        ),
+        reranker_model=args.reranker_model,
+    )
+    os.makedirs(config.userpath, exist_ok=True)
+    broker = DataBroker(config, secrets_path)
+    broker.clear_db("base")
+
+    print(f"Ingesting {args.chunks} synthetic chunks into {args.backend}")
+    ingest_started = time.perf_counter()
+    for document, pairs in generate_documents(
+        args.chunks, args.chunks_per_document, seed=args.seed
+    ):
+        broker.insert_chunks(make_chunks(pairs, Chunk), source=document)
+    ingest_seconds = time.perf_counter() - ingest_started
+
+    queries = generate_queries(args.queries, seed=args.seed + 1)
+    query_chunks = make_chunks(
+        [(f"Query_{i}", q) for i, q in enumerate(queries)], Chunk, "query"
+    )
+
+    print(f"Running {len(queries)} searches")
+    metrics.reset()
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        broker.search(
+            [query],
+            top_k=args.top_k,
+            reranker_model=args.reranker_model,
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+    stages = metrics.summary()
+
+    print("Computing exact top-k for recall")
+    retrieved = [
+        [result.id for result in results]
+        for results in broker.vectorstore["base"].search(
+            broker.embedder(query_chunks), args.top_k
+        )
+    ]
+    expected = exact_top_k(
+        args, broker.embedder, Chunk, dense_matrix(broker.embedder, query_chunks)
+    )
+
+    return {
+        "ingest": {
+            "chunks": args.chunks,
+            "seconds": ingest_seconds,
+            "chunks_per_second": args.chunks / ingest_seconds,
+        },
+        "search": {
+            "queries": len(queries),
+            "latency_ms": latency_summary(latencies),
+            f"recall_at_{args.top_k}": recall_at_k(retrieved, expected),
+        },
+        "stages": stages,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    output = os.path.abspath(args.output)
+    results = run(args)
+    write_results(output, "retrieval", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Citation span matching benchmark.
+
+Builds contexts from the synthetic corpus (a few retrieved chunks each) and
+answer quotes copied from them with small edits, then times the evidence
+matching of `find_text` and `find_start_end_phrase` on a SpanIndex built once
+per context against the previous `difflib.SequenceMatcher` implementation
+over the raw context, checking that both return the same spans.
+
+Example (from app/src):
+    python -m benchmarks.span_matching --contexts 50 --chunks-per-context 8 --output results/span_matching.json
+"""
+
+import argparse
+import os
+import random
+import time
+from difflib import SequenceMatcher
+from typing import Dict, List, Tuple
+
+from benchmarks.corpus import generate_documents
+from benchmarks.utils import latency_summary, write_results
+from reasoning.indices.qa.utils import SpanIndex, find_start_end_phrase, find_text
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--contexts", type=int, default=20)
+    parser.add_argument("--chunks-per-context", type=int, default=8)
+    parser.add_argument("--sentences-per-chunk", type=int, default=20)
+    parser.add_argument("--quotes-per-context", type=int, default=5)
+    parser.add_argument(
+        "--edit-rate", type=float, default=0.03, help="Characters changed in quotes"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="span_matching_benchmark.json")
+    return parser.parse_args(argv)
+
+
+def reference_find_text(search_span, context, min_length=5):
+    """The SequenceMatcher implementation of `find_text`."""
+    search_span, context = search_span.lower(), context.lower()
+    context = context.replace("\n", " ")
+
+    matches_span = []
+    if len(search_span) > min_length:
+        for sentence in search_span.split("\n"):
+            match_results = SequenceMatcher(
+                None, sentence, context, autojunk=False
+            ).get_matching_blocks()
+            matched_blocks = [
+                (start, start + length)
+                for _, start, length in match_results
+                if length > max(len(sentence) * 0.25, min_length)
+            ]
+            if matched_blocks:
+                start_index = min(start for start, _ in matched_blocks)
+                end_index = max(end for _, end in matched_blocks)
+                if end_index - start_index > max(len(sentence) * 0.35, min_length):
+                    matches_span.append((start_index, end_index))
+
+    if matches_span:
+        matches_span = [
+            (
+                min(start for start, _ in matches_span),
+                max(end for _, end in matches_span),
+            )
+        ]
+    return matches_span
+
+
+def reference_find_start_end_phrase(
+    start_phrase, end_phrase, context, min_length=5, max_excerpt_length=300
+):
+    """The SequenceMatcher implementation of `find_start_end_phrase`."""
+    context = context.lower().replace("\n", " ")
+
+    matches, matched_length = [], 0
+    for sentence in [start_phrase.lower(), end_phrase.lower()]:
+        match = SequenceMatcher(
+            None, sentence, context, autojunk=False
+        ).find_longest_match()
+        if match.size > max(len(sentence) * 0.35, min_length):
+            matches.append((match.b, match.b + match.size))
+            matched_length += match.size
+
+    if len(matches) == 2 and matches[1][0] < matches[0][0]:
+        matches = [matches[0]]
+    if not matches:
+        return None, matched_length
+    start_idx = min(start for start, _ in matches)
+    end_idx = min(max(end for _, end in matches), start_idx + max_excerpt_length)
+    return (start_idx, end_idx), matched_length
+
+
+def _quote(rng: random.Random, text: str, edit_rate: float) -> str:
+    start = rng.randrange(max(len(text) - 200, 1))
+    quote = text[start : start + rng.randint(60, 400)]
+    return "".join(
+        rng.choice("abcdefghij ") if rng.random() < edit_rate else char
+        for char in quote
+    )
+
+
+def generate_cases(args: argparse.Namespace) -> List[Tuple[List[str], List[str]]]:
+    """
+    Returns (context chunks, quotes) per context. Most quotes come from one of
+    the context's chunks; some come from chunks outside it.
+    """
+    rng = random.Random(args.seed)
+    total = args.contexts * args.chunks_per_context * 2
+    chunks = [
+        text
+        for _, pairs in generate_documents(
+            total,
+            chunks_per_document=total,
+            sentences_per_chunk=args.sentences_per_chunk,
+            seed=args.seed,
+        )
+        for _, text in pairs
+    ]
+    cases = []
+    for c in range(args.contexts):
+        context = chunks[
+            c * args.chunks_per_context : (c + 1) * args.chunks_per_context
+        ]
+        quotes = [
+            _quote(
+                rng,
+                rng.choice(context if rng.random() < 0.8 else chunks),
+                args.edit_rate,
+            )
+            for _ in range(args.quotes_per_context)
+        ]
+        cases.append((context, quotes))
+    return cases
+
+
+def _match_reference(context: List[str], quotes: List[str]) -> list:
+    results = []
+    for quote in quotes:
+        half = len(quote) // 2
+        for text in context:
+            results.append(reference_find_text(quote, text))
+            results.append(
+                reference_find_start_end_phrase(quote[:half], quote[half:], text)
+            )
+    return results
+
+
+def _match_indexed(context: List[str], quotes: List[str]) -> list:
+    indices = [SpanIndex(text) for text in context]
+    results = []
+    for quote in quotes:
+        half = len(quote) // 2
+        for index in indices:
+            results.append(find_text(quote, index))
+            results.append(find_start_end_phrase(quote[:half], quote[half:], index))
+    return results
+
+
+def run(args: argparse.Namespace) -> Dict:
+    cases = generate_cases(args)
+    timings: Dict[str, List[float]] = {"reference": [], "indexed": []}
+    identical = True
+    for context, quotes in cases:
+        outputs = {}
+        for name, match in [
+            ("reference", _match_reference),
+            ("indexed", _match_indexed),
+        ]:
+            started = time.perf_counter()
+            outputs[name] = match(context, quotes)
+            timings[name].append((time.perf_counter() - started) * 1000)
+        identical = identical and outputs["reference"] == outputs["indexed"]
+
+    reference = latency_summary(timings["reference"])
+    indexed = latency_summary(timings["indexed"])
+    return {
+        "context_chars": sum(len(text) for text in cases[0][0]) if cases else 0,
+        "reference_ms_per_context": reference,
+        "indexed_ms_per_context": indexed,
+        "speedup": reference["p50"] / max(indexed["p50"], 1e-9) if cases else 0.0,
+        "identical": identical,
+    }
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    output = os.path.abspath(args.output)
+    results = run(args)
+    print(
+        f"p50 per context: {results['indexed_ms_per_context']['p50']:.1f} ms indexed / "
+        f"{results['reference_ms_per_context']['p50']:.1f} ms SequenceMatcher "
+        f"({results['speedup']:.1f}x), identical: {results['identical']}"
+    )
+    write_results(output, "span_matching", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+
+def latency_summary(samples_ms: Sequence[float]) -> Dict[str, float]:
+    """
+    Summarizes latency samples (in milliseconds).
+    """
+    if len(samples_ms) == 0:
+        return {"count": 0}
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        "count": int(len(samples)),
+        "mean": float(samples.mean()),
+        "p50": float(np.percentile(samples, 50)),
+        "p95": float(np.percentile(samples, 95)),
+        "p99": float(np.percentile(samples, 99)),
+        "max": float(samples.max()),
+    }
+
+
+def peak_rss_mb() -> float:
+    """
+    Returns the peak resident set size of this process in MB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def recall_at_k(retrieved: List[List[str]], expected: List[List[str]]) -> float:
+    """
+    Mean fraction of the expected IDs found in the retrieved IDs, per query.
+    """
+    scores = [len(set(r) & set(e)) / len(e) for r, e in zip(retrieved, expected) if e]
+    return float(np.mean(scores)) if scores else 0.0
+
+
+def prepare_workdir(workdir: str) -> str:
+    """
+    Creates an isolated working directory laid out the way the app expects
+    (data/, an empty secrets.toml) and changes into it, so benchmarks never
+    touch the real data folder or vector store.
+
+    Returns:
+        str: The path of the secrets file.
+    """
+    os.makedirs(os.path.join(workdir, "data"), exist_ok=True)
+    secrets_path = os.path.join(workdir, "secrets.toml")
+    if not os.path.exists(secrets_path):
+        open(secrets_path, "w").close()
+    os.chdir(workdir)
+    return secrets_path
+
+
+def write_results(path: str, name: str, config: dict, results: dict) -> None:
+    """
+    Writes benchmark results as JSON, with enough context to compare runs
+    across releases.
+    """
+    payload = {
+        "benchmark": name,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": config,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+    print(f"Wrote {name} results to {path}")
@@ -1,10 +1,14 @@
 import logging
 import os
 import string
+import threading
+from dataclasses import replace
 from types import SimpleNamespace
 from typing import Dict, List, Optional
 
+import numpy as np
 import toml
+from ingestion.chunk_policy import ChunkPolicy, TokenBudgetChunker
 from ingestion.chunking import (
     Chunk,
     Chunker,
@@ -13,22 +17,49 @@ from ingestion.chunking import (
     RecursiveCharacterChunker,
     SplitSentencesChunker,
 )
+from ingestion.deduplication import NearDuplicateIndex
 from ingestion.embedding import (
     BGEM3Embedder,
     Embedder,
+    EmbeddingBatch,
+    HashingEmbedder,
     HuggingFaceEmbedder,
     OllamaEmbedder,
+    RemoteEmbedder,
 )
 from ingestion.extraction import (
     ContentExtractor,
     DoclingPDFExtract,
+    PagedText,
     PDFData,
     PyPDF2Extract,
 )
+from ingestion.extraction_cache import CachedExtractor, ExtractionCache
+from ingestion.onnx_backend import (
+    ONNX_EMBEDDERS,
+    ONNX_INT8_BACKEND,
+    ONNX_RERANKERS,
+    TORCH_BACKEND,
+    OnnxBGEM3Embedder,
+    OnnxReranker,
+)
 from ingestion.raw_data import Data
-from ingestion.vectordb import ChromaDB, MilvusDB, SearchResult, VectorDB
-from ingestion.reranker import Reranker
-from orchestrator.utils import SingletonMeta
+from ingestion.reranker import PassthroughReranker, RemoteReranker, Reranker
+from ingestion.vector_compression import CompressedIndex, create_compressor
+from ingestion.vectordb import (
+    ChromaDB,
+    CompressedVectorDB,
+    MilvusDB,
+    SearchResult,
+    VectorDB,
+)
+from logs.tracing import span
+from models.http_client import EndpointPolicy
+from orchestrator.inference_scheduler import BACKGROUND, inference_scheduler, priority
+from orchestrator.readiness import WARM, readiness
+from orchestrator.response_cache import ContentVersions
+from orchestrator.single_flight import SingleFlight
+from orchestrator.utils import SingletonMeta, available_cpus
 from tqdm import tqdm
 
 # Carter: I've left the logger as python's default for now because
@@ -36,6 +67,17 @@ from tqdm import tqdm
 # write to azure. We can change this later when we're ready.
 logger = logging.getLogger(__name__)
 
+# pipeline components that are built on first use
+COMPONENTS = ("embedder", "reranker", "chunker", "extractors")
+# dense sizes of embedders that are slow to load, so the vector store can be
+# opened before the model is
+EMBEDDING_DIMENSIONS = {"BAAI/bge-m3": 1024}
+# chunks per embedding job during ingestion; smaller jobs let interactive
+# queries overtake a large document sooner
+INGEST_EMBED_BATCH = 64
+# chunks of a page-wise extracted document embedded and stored at a time
+STREAM_INSERT_CHUNKS = 4 * INGEST_EMBED_BATCH
+
 
 class DataBroker(metaclass=SingletonMeta):
     """
@@ -60,7 +102,15 @@ class DataBroker(metaclass=SingletonMeta):
                 "base": {},
                 "user": {},
             }
-            self._init_databroker_pipeline(database_config)
+            self._content_versions = ContentVersions(
+                os.path.join(os.getcwd(), "vectorstore", "versions")
+            )
+            self._search_flight = SingleFlight()
+            self._components = {}
+            self._component_locks = {name: threading.Lock() for name in COMPONENTS}
+            self._insert_lock = threading.RLock()
+            self._startup_generation = 0
+            self._init_databroker_pipeline(database_config, startup=True)
 
     def get_database_config(self) -> SimpleNamespace:
         """
@@ -74,6 +124,109 @@ class DataBroker(metaclass=SingletonMeta):
         """
         return self._database_config.embedding_model
 
+    def get_content_version(self, collection="base") -> str:
+        """
+        Returns an opaque version string for a collection. It changes whenever
+        documents are inserted into or removed from the collection, by this or
+        any other process sharing the vectorstore directory, or the collection
+        itself changes (e.g. a new embedding model or chunker).
+        """
+        return self._content_versions.get(self.collection_name[collection])
+
+    def _bump_content_version(self, collection="base") -> None:
+        self._content_versions.bump(self.collection_name[collection])
+
+    def _component(self, name: str, factory):
+        """
+        Returns a pipeline component, building it on first use. Concurrent
+        first callers wait for a single build, which is tracked in the
+        readiness registry.
+        """
+        component = self._components.get(name)
+        if component is None:
+            with self._component_locks[name]:
+                component = self._components.get(name)
+                if component is None:
+                    with readiness.track(name):
+                        component = factory()
+                    self._components[name] = component
+        return component
+
+    @property
+    def embedder(self) -> Embedder:
+        return self._component("embedder", self._create_embedder)
+
+    @property
+    def chunker(self) -> Chunker:
+        return self._component("chunker", self._create_chunker)
+
+    @property
+    def extractors(self) -> Dict[str, ContentExtractor]:
+        return self._component("extractors", self._create_extractors)
+
+    @property
+    def reranker(self) -> Reranker:
+        return self._component(
+            "reranker",
+            lambda: self._create_reranker(model_name=self.current_reranker_model),
+        )
+
+    @reranker.setter
+    def reranker(self, reranker: Reranker) -> None:
+        self._components["reranker"] = reranker
+
+    def _embedding_dimension(self) -> int:
+        """
+        Returns the dense embedding size without loading the model when it is known.
+        """
+        dimension = EMBEDDING_DIMENSIONS.get(self._database_config.embedding_model)
+        return dimension or self.embedder.embedding_dimension
+
+    def _inference_server_url(self) -> Optional[str]:
+        """
+        Returns the shared inference server URL if models should be served by
+        it instead of loaded in this process.
+        """
+        inference_server = getattr(self._database_config, "inference_server", None)
+        if getattr(inference_server, "enable", False):
+            return inference_server.url
+        return None
+
+    def _http_policy(self) -> Optional[EndpointPolicy]:
+        """
+        Returns the configured HTTP client settings for model endpoints, so
+        the embedder and reranker share one client per host with the chat model.
+        """
+        http_client = getattr(self._database_config, "http_client", None)
+        if http_client is None:
+            return None
+        return EndpointPolicy(**http_client.model_dump())
+
+    def _onnx_options(self, model_name: str) -> Optional[dict]:
+        """
+        Returns the ONNX model options if `cpu_inference.backends` selects an
+        ONNX Runtime backend for the model, None for the PyTorch backend.
+        """
+        cpu_inference = getattr(self._database_config, "cpu_inference", None)
+        backend = getattr(cpu_inference, "backends", {}).get(model_name, TORCH_BACKEND)
+        if backend == TORCH_BACKEND:
+            return None
+        return {
+            "quantize": backend == ONNX_INT8_BACKEND,
+            "cache_dir": cpu_inference.onnx_cache_dir,
+            "intra_op_threads": inference_scheduler.intra_op_threads,
+        }
+
+    def _infer(self, model, fn, *args, **kwargs):
+        """
+        Runs a model call on the process-wide inference scheduler. Models
+        served by another process (Ollama, the inference server) are called
+        directly, since they do not use this process's CPUs.
+        """
+        if isinstance(model, (OllamaEmbedder, RemoteEmbedder, RemoteReranker)):
+            return fn(*args, **kwargs)
+        return inference_scheduler.run(fn, *args, **kwargs)
+
     def _create_embedder(self) -> Embedder:
         """
         Creates an embedder based on the configured embedding model.
@@ -85,13 +238,23 @@ class DataBroker(metaclass=SingletonMeta):
         OLLAMA_MODELS = ["mxbai-embed-large", "nomic-embed-text", "bge-m3:567m"]
         HFACE_MODELS = ["sentence-transformers/all-mpnet-base-v2"]
         BGEM3_MODELS = ["BAAI/bge-m3"]
+        # model-free embedder for tests and offline benchmarks
+        HASHING_MODELS = ["hashing"]
 
         embedding_model = self._database_config.embedding_model
         print("Using embedding model: ", embedding_model)
-        if embedding_model in OLLAMA_MODELS:
+        if self._inference_server_url() and embedding_model not in OLLAMA_MODELS:
+            embedder = RemoteEmbedder(
+                endpoint=self._inference_server_url(),
+                model_name=embedding_model,
+                policy=self._http_policy(),
+            )
+        elif embedding_model in OLLAMA_MODELS:
             macbook_endpoint = self._secrets["localmodel"]["macbook_endpoint"]
             embedder = OllamaEmbedder(
-                model_name=embedding_model, endpoint=macbook_endpoint
+                model_name=embedding_model,
+                endpoint=macbook_endpoint,
+                policy=self._http_policy(),
             )
             try:
                 embedder.test_connection()
@@ -103,9 +266,16 @@ class DataBroker(metaclass=SingletonMeta):
         elif embedding_model in HFACE_MODELS:
             print("Using HuggingFaceEmbedder")
             embedder = HuggingFaceEmbedder(model_name=embedding_model)
+        elif embedding_model in ONNX_EMBEDDERS and self._onnx_options(embedding_model):
+            print("Using OnnxBGEM3Embedder")
+            embedder = OnnxBGEM3Embedder(
+                model_name=embedding_model, **self._onnx_options(embedding_model)
+            )
         elif embedding_model in BGEM3_MODELS:
             print("Using BGEM3Embedder")
             embedder = BGEM3Embedder()
+        elif embedding_model in HASHING_MODELS:
+            embedder = HashingEmbedder()
         else:
             raise ValueError(f"Unsupported embedding method: {embedding_model}")
 
@@ -119,8 +289,15 @@ class DataBroker(metaclass=SingletonMeta):
         Raises:
             ValueError: If the configured chunking method is not supported
         """
+        policy = self._chunk_policy()
         if self._database_config.chunking_method == "docling_hybrid":
-            chunker = DoclingHybridChunker()
+            if policy is not None:
+                # size the Docling chunks to the budget up front
+                chunker = DoclingHybridChunker(
+                    max_tokens=policy.max_tokens, tokenizer=policy.tokenizer_name
+                )
+            else:
+                chunker = DoclingHybridChunker()
         elif self._database_config.chunking_method == "docling_hierarchical":
             chunker = DoclingHierarchicalChunker()
         elif self._database_config.chunking_method == "split_sentences":
@@ -148,8 +325,31 @@ class DataBroker(metaclass=SingletonMeta):
             raise ValueError(
                 f"Unsupported chunking method: {self._database_config.chunking_method}"
             )
+        if policy is not None:
+            chunker = TokenBudgetChunker(chunker, policy)
         return chunker
 
+    def _chunk_policy(self) -> Optional[ChunkPolicy]:
+        """
+        The token budget for chunks, derived from the embedder and the
+        configured reranker, or None if the limits are not enforced.
+        """
+        chunking = getattr(self._database_config, "chunking", None)
+        if chunking is None or not chunking.enforce_token_limits:
+            return None
+        policy = ChunkPolicy.from_models(
+            embedding_model=self._database_config.embedding_model,
+            reranker_model=self.current_reranker_model,
+            reranker_query_tokens=chunking.reranker_query_tokens,
+            max_tokens=chunking.max_chunk_tokens,
+        )
+        logger.info(
+            "Chunks are limited to %d tokens (%s)",
+            policy.max_tokens,
+            policy.tokenizer_name,
+        )
+        return policy
+
     def _create_extractors(self) -> Dict[str, ContentExtractor]:
         """
         Creates a dictionary of extractors for different data types.
@@ -158,11 +358,37 @@ class DataBroker(metaclass=SingletonMeta):
         Returns:
             Dict[str, ContentExtractor]: A dictionary mapping data types to their respective extractors
         """
+        pdf_extractor = self._database_config.pdf_extractor
         extractors = {}
-        if self._database_config.pdf_extractor.extraction_method == "pypdf2":
-            extractors["pdf"] = PyPDF2Extract()
-        elif self._database_config.pdf_extractor.extraction_method == "docling":
-            extractors["pdf"] = DoclingPDFExtract()
+        if pdf_extractor.extraction_method == "pypdf2":
+            extractors["pdf"] = PyPDF2Extract(
+                streaming=getattr(pdf_extractor, "streaming", False)
+            )
+        elif pdf_extractor.extraction_method == "docling":
+            workers = getattr(pdf_extractor, "parallel_workers", 1)
+            extractors["pdf"] = DoclingPDFExtract(
+                # sharded conversion splits the CPUs between its processes
+                num_threads=(
+                    available_cpus()
+                    if workers > 1
+                    else inference_scheduler.intra_op_threads
+                ),
+                workers=workers,
+                pages_per_shard=getattr(pdf_extractor, "pages_per_shard", 50),
+            )
+
+        if getattr(pdf_extractor, "cache", False):
+            cache = ExtractionCache(
+                pdf_extractor.cache_dir, max_bytes=pdf_extractor.cache_max_mb << 20
+            )
+            extractors = {
+                data_type: (
+                    CachedExtractor(extractor, cache)
+                    if extractor.cache_key is not None
+                    else extractor
+                )
+                for data_type, extractor in extractors.items()
+            }
         return extractors
 
     def _create_vectorstore(self, embedding_dimension: int) -> Dict[str, VectorDB]:
@@ -191,8 +417,49 @@ class DataBroker(metaclass=SingletonMeta):
                 f"Unsupported vector store type: {self._database_config.vector_store.database}"
             )
 
+        compression = getattr(self._database_config, "vector_compression", None)
+        if compression is not None and compression.method != "none":
+            vectorstore = {
+                collection: CompressedVectorDB(
+                    store,
+                    CompressedIndex(
+                        create_compressor(compression.method, compression.dimension),
+                        path=os.path.join(
+                            os.getcwd(),
+                            "vectorstore",
+                            "compressed",
+                            self.collection_name[collection],
+                        ),
+                        rescore_multiplier=compression.rescore_multiplier,
+                        training_size=compression.training_size,
+                    ),
+                )
+                for collection, store in vectorstore.items()
+            }
+
         return vectorstore
 
+    def _create_deduplicators(self) -> Dict[str, Optional[NearDuplicateIndex]]:
+        """
+        Returns the near-duplicate index of each collection, or None for
+        every collection if deduplication is disabled.
+        """
+        deduplication = getattr(self._database_config, "deduplication", None)
+        if deduplication is None or not deduplication.enable:
+            return {collection: None for collection in self.collection_name}
+        return {
+            collection: NearDuplicateIndex(
+                path=os.path.join(os.getcwd(), "vectorstore", "dedup", name),
+                threshold=deduplication.threshold,
+                num_perm=deduplication.num_perm,
+                bands=deduplication.bands,
+                shingle_size=deduplication.shingle_size,
+                min_words=deduplication.min_words,
+                match_numbers=deduplication.match_numbers,
+            )
+            for collection, name in self.collection_name.items()
+        }
+
     def _validate_extractor_chunker_compatibility(self):
         """
         Validates that the configured extractor and chunker are compatible.
@@ -227,6 +494,12 @@ class DataBroker(metaclass=SingletonMeta):
 
     def _init_databroker_cache(self, collection="base"):
         chunks = self.vectorstore[collection].get_all_ids()
+        # ids of the stored chunks, kept up to date by insert and delete so
+        # inserts do not list the whole collection
+        self._stored_ids[collection] = set(chunks)
+        if self.deduplicators[collection] is not None:
+            # duplicates are not stored, but their files were ingested
+            chunks = chunks + list(self.deduplicators[collection].duplicates)
         collection_name = self.collection_name[collection]
         for chunk in tqdm(chunks):
             file = chunk.split(" - Chunk ")[0]
@@ -239,16 +512,37 @@ class DataBroker(metaclass=SingletonMeta):
         Creates a reranker based on the specified model name.
 
         Args:
-            model_name (str): Name of the reranker model to use
+            model_name (str): Name of the reranker model to use, or "passthrough"
+                to keep the vector store order without loading a model
 
         Returns:
             Reranker: An instance of the Reranker class
         """
+        if model_name == PassthroughReranker.model_name:
+            return PassthroughReranker()
+        if self._inference_server_url():
+            return RemoteReranker(
+                endpoint=self._inference_server_url(),
+                model_name=model_name,
+                policy=self._http_policy(),
+            )
+        if model_name in ONNX_RERANKERS and self._onnx_options(model_name):
+            return OnnxReranker(model_name=model_name, **self._onnx_options(model_name))
         return Reranker(model_name=model_name)
 
-    def _init_databroker_pipeline(self, database_config: SimpleNamespace) -> None:
+    def _init_databroker_pipeline(
+        self, database_config: SimpleNamespace, startup: bool = False
+    ) -> None:
         """
         Initializes the data broker pipeline.
+
+        Args:
+            database_config (SimpleNamespace): The database settings.
+            startup (bool): Whether this is the first initialization of the
+                process. Only then do the warm-up and root data ingestion run in
+                the background (see `startup` in the config); re-initializations
+                after uploads or settings changes ingest and prune synchronously,
+                so the files are searchable once this returns.
         """
         logger.info("Initializing data broker pipeline")
         self._database_config = database_config
@@ -270,6 +564,15 @@ class DataBroker(metaclass=SingletonMeta):
 
         suffix = f"_{strip(self._database_config.embedding_model)}_{strip(self._database_config.chunking_method)}"
 
+        self.current_reranker_model = getattr(
+            self._database_config, "reranker_model", "BAAI/bge-reranker-v2-m3"
+        )
+        # a different token budget chunks differently, so it gets its own
+        # collections and every file is chunked again
+        policy = self._chunk_policy()
+        if policy is not None:
+            suffix += f"_{policy.max_tokens}tokens"
+
         self.collection_name = {
             "base": "{}_{}".format(self._database_config.vector_store.database, suffix),
             "user": "{}_{}".format(strip(self._database_config.username), suffix),
@@ -281,21 +584,132 @@ class DataBroker(metaclass=SingletonMeta):
         if self.collection_name["user"] not in self.data_cache["user"]:
             self.data_cache["user"][self.collection_name["user"]] = {}
 
-        self.embedder = self._create_embedder()
-        self.chunker = self._create_chunker()
-        self.extractors = self._create_extractors()
-        self.vectorstore = self._create_vectorstore(
-            embedding_dimension=self.embedder.embedding_dimension
+        # models, converters and tokenizers are loaded on first use, or ahead
+        # of time by the background warm-up
+        self._components = {}
+        for name in COMPONENTS:
+            readiness.register(name)
+
+        self._stored_ids = {}
+        with readiness.track("vectorstore"):
+            self.vectorstore = self._create_vectorstore(
+                embedding_dimension=self._embedding_dimension()
+            )
+            self.deduplicators = self._create_deduplicators()
+            self._init_databroker_cache(collection="base")
+            self._init_databroker_cache(collection="user")
+
+        cpu_inference = getattr(self._database_config, "cpu_inference", None)
+        if cpu_inference is not None:
+            inference_scheduler.configure(
+                workers=cpu_inference.workers,
+                intra_op_threads=cpu_inference.intra_op_threads,
+                max_background_pending=cpu_inference.max_background_pending,
+            )
+
+        readiness.register("ingestion", required=False)
+        startup_config = getattr(self._database_config, "startup", None)
+        background_warmup = startup and getattr(
+            startup_config, "background_warmup", False
+        )
+        background_ingestion = startup and getattr(
+            startup_config, "background_ingestion", False
         )
-        self.reranker = self._create_reranker()
-        self.current_reranker_model = "BAAI/bge-reranker-v2-m3"
 
-        self._init_databroker_cache(collection="base")
-        self._init_databroker_cache(collection="user")
+        if not background_ingestion:
+            self._ingest_all()
+
+        self._startup_generation += 1
+        if background_warmup or background_ingestion:
+            threading.Thread(
+                target=self._background_startup,
+                args=(
+                    self._startup_generation,
+                    background_warmup,
+                    background_ingestion,
+                ),
+                name="databroker-startup",
+                daemon=True,
+            ).start()
 
-        self._ingest_root_data(collection="base")
-        self._ingest_root_data(collection="user")
-        self._ingest_and_prune_data(collection="user")
+    def _superseded(self, generation: Optional[int]) -> bool:
+        # the pipeline was re-initialized (e.g. new embedding model) since the
+        # background job started
+        return generation is not None and generation != self._startup_generation
+
+    def _background_startup(
+        self, generation: int, warmup: bool, ingestion: bool
+    ) -> None:
+        """
+        Runs the warm-up and then the root data ingestion off the UI thread,
+        behind interactive requests in the inference queue.
+        """
+        with priority(BACKGROUND):
+            if warmup:
+                self.warm_up(generation)
+            if ingestion and not self._superseded(generation):
+                try:
+                    self._ingest_all()
+                except Exception:
+                    logger.exception("Background ingestion failed")
+
+    def warm_up(self, generation: Optional[int] = None) -> None:
+        """
+        Loads every pipeline component and runs a tiny inference through the
+        embedder and reranker, so the first request does not pay for model
+        loading or kernel initialization.
+        """
+        steps = [
+            (
+                "embedder",
+                lambda: self._infer(
+                    self.embedder,
+                    self.embedder,
+                    [Chunk(text="warm-up", name="Query_0", data_type="query")],
+                ),
+                True,
+            ),
+            (
+                "reranker",
+                lambda: self._infer(
+                    self.reranker,
+                    self.reranker.rerank,
+                    query="warm-up",
+                    results=[
+                        SearchResult(
+                            id="warm-up",
+                            distance=0.0,
+                            metadata={},
+                            document="warm-up",
+                            embedding=[],
+                        )
+                    ],
+                    top_k=1,
+                ),
+                True,
+            ),
+            ("chunker", lambda: self.chunker, False),
+            ("extractors", lambda: self.extractors, False),
+        ]
+        for name, step, inference in steps:
+            if self._superseded(generation):
+                return
+            try:
+                step()
+            except Exception:
+                logger.exception(f"Warm-up of the {name} failed")
+                continue
+            if inference:
+                readiness.set(name, WARM)
+
+    def _ingest_all(self) -> None:
+        """
+        Ingests new files from both data roots and prunes removed user files.
+        """
+        with readiness.track("ingestion"):
+            self._ingest_root_data(collection="base")
+            self._ingest_root_data(collection="user")
+            self._ingest_and_prune_data(collection="user")
 
     def _ingest_root_data(self, collection="base"):
         """
@@ -331,38 +745,146 @@ class DataBroker(metaclass=SingletonMeta):
 
         del_chunks = []
         for pdf_file in tqdm(remove_files):
-            del_chunks.extend(self.data_cache[collection][pdf_file])
+            del_chunks.extend(self.data_cache[collection][collection_name][pdf_file])
             self.data_cache[collection][collection_name].pop(pdf_file)
 
         if del_chunks:
             self.vectorstore[collection].delete(ids=del_chunks)
+            self._stored_ids[collection].difference_update(del_chunks)
+            self._forget_duplicates(del_chunks, collection)
+            self._bump_content_version(collection)
+
+    def _forget_duplicates(self, ids: List[str], collection="base") -> None:
+        """
+        Removes deleted chunks from the near-duplicate index. Files with
+        duplicates of a deleted chunk are dropped from the data cache, so the
+        next ingestion pass stores their chunks again.
+        """
+        deduplicator = self.deduplicators[collection]
+        if deduplicator is None:
+            return
+        files = self.data_cache[collection][self.collection_name[collection]]
+        for orphan in deduplicator.remove(ids):
+            files.pop(orphan.split(" - Chunk ")[0], None)
 
     def insert(self, data: Data, collection="base") -> List[str]:
         """
         Process and insert the given raw data into the vector store.
         Supports both standard embeddings and BGEM3 hybrid embeddings.
+        Extraction and embedding run at background priority.
         """
-        collection_name = self.collection_name[collection]
-        extractor = self.extractors.get(data.data_type)
-        extracted_content = extractor(data)
+        with priority(BACKGROUND):
+            extractor = self.extractors.get(data.data_type)
+            if isinstance(extractor, CachedExtractor):
+                # cache hits skip the inference queue
+                extracted_content = extractor.lookup(data)
+                if extracted_content is None:
+                    extracted_content = inference_scheduler.run(extractor.extract, data)
+            else:
+                extracted_content = inference_scheduler.run(extractor, data)
+
+            if isinstance(extracted_content, PagedText):
+                return self._insert_stream(extracted_content, data.name, collection)
+            chunks = self.chunker(extracted_content)
+            return self.insert_chunks(chunks, source=data.name, collection=collection)
 
-        chunks = self.chunker(extracted_content)
-        existing_ids = {id: "" for id in self.vectorstore[collection].get_all_ids()}
+    def _insert_stream(
+        self, content: PagedText, source: str, collection="base"
+    ) -> List[str]:
+        """
+        Chunks page-wise extracted content while its pages are read, and
+        embeds and stores every STREAM_INSERT_CHUNKS chunks, so embedding
+        starts before extraction finishes and the full text is never held
+        in memory.
+        """
+        names, group = [], []
+        for chunk in self.chunker.iter_chunks(content):
+            group.append(chunk)
+            if len(group) == STREAM_INSERT_CHUNKS:
+                names.extend(self.insert_chunks(group, source, collection))
+                group = []
+        if group or not names:
+            names.extend(self.insert_chunks(group, source, collection))
+        # insert_chunks recorded only the last group
+        self.data_cache[collection][self.collection_name[collection]][source] = names
+        return names
 
-        new_chunks = []
-        metadatum = []
-        for chunk in chunks:
-            if chunk.name not in existing_ids:
-                new_chunks.append(chunk)
-                metadatum.append({"source": data.name, "id": chunk.name})
+    def insert_chunks(
+        self, chunks: List[Chunk], source: str, collection="base"
+    ) -> List[str]:
+        """
+        Embed and insert already chunked content into the vector store.
+        Chunks whose IDs are already stored are skipped; inserts are
+        serialized so background ingestion and uploads cannot race.
 
-        self.data_cache[collection][collection_name][data.name] = chunks
+        Args:
+            chunks (List[Chunk]): The chunks to insert.
+            source (str): The name of the file the chunks came from.
+            collection (str, optional): Which collection to insert into. Defaults to "base".
 
-        if len(new_chunks) > 0:
-            embeddings = self.embedder(new_chunks)
-            self.vectorstore[collection].insert(embeddings, metadatum)
-        else:
-            print("No new documents to add")
+        Returns:
+            List[str]: The names of all given chunks.
+        """
+        with self._insert_lock, priority(BACKGROUND):
+            collection_name = self.collection_name[collection]
+            stored_ids = self._stored_ids[collection]
+            deduplicator = self.deduplicators[collection]
+            duplicate_ids = deduplicator.duplicates if deduplicator is not None else {}
+
+            new_chunks = [
+                chunk
+                for chunk in chunks
+                if chunk.name not in stored_ids and chunk.name not in duplicate_ids
+            ]
+            canonicals = [None] * len(new_chunks)
+            if deduplicator is not None:
+                canonicals = deduplicator.match(
+                    [chunk.name for chunk in new_chunks],
+                    [chunk.text for chunk in new_chunks],
+                )
+            duplicates = [
+                chunk for chunk, canonical in zip(new_chunks, canonicals) if canonical
+            ]
+            unique_chunks = [
+                chunk
+                for chunk, canonical in zip(new_chunks, canonicals)
+                if canonical is None
+            ]
+            metadatum = [
+                {"source": source, "id": chunk.name} for chunk in unique_chunks
+            ]
+            for chunk, metadata in zip(unique_chunks, metadatum):
+                if chunk.pages is not None:
+                    metadata["first_page"], metadata["last_page"] = chunk.pages
+            if duplicates:
+                logger.info(
+                    "Skipping %d near-duplicate chunks of %s", len(duplicates), source
+                )
+
+            self.data_cache[collection][collection_name][source] = [
+                chunk.name for chunk in chunks
+            ]
+
+            if len(unique_chunks) > 0:
+                embeddings = EmbeddingBatch.concatenate(
+                    [
+                        self._infer(
+                            self.embedder,
+                            self.embedder,
+                            unique_chunks[start : start + INGEST_EMBED_BATCH],
+                        )
+                        for start in range(0, len(unique_chunks), INGEST_EMBED_BATCH)
+                    ]
+                )
+                self.vectorstore[collection].insert(embeddings, metadatum)
+                stored_ids.update(chunk.name for chunk in unique_chunks)
+                self._bump_content_version(collection)
+            else:
+                print("No new documents to add")
+            if deduplicator is not None:
+                deduplicator.add(
+                    [chunk.name for chunk in new_chunks], canonicals, source
+                )
 
         return [chunk.name for chunk in chunks]
 
@@ -372,6 +894,21 @@ class DataBroker(metaclass=SingletonMeta):
         """
         logging.info("Clearing the database")
         self.vectorstore[collection].clear()
+        self._stored_ids[collection] = set()
+        if self.deduplicators[collection] is not None:
+            self.deduplicators[collection].clear()
+        self._bump_content_version(collection)
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Returns the dense embedding of a single query string.
+        """
+        embeddings = self._infer(
+            self.embedder,
+            self.embedder,
+            [Chunk(text=query, name="Query_0", data_type="query")],
+        )
+        return embeddings.dense[0]
 
     def search(
         self,
@@ -397,21 +934,90 @@ class DataBroker(metaclass=SingletonMeta):
 
         Returns:
             List[List[SearchResult]]: A list of lists of SearchResult objects containing
-                the search results for each query, sorted by relevance
+                the search results for each query, sorted by relevance. Identical
+                concurrent searches share one computation; treat the results as read-only.
+        """
+        key = (
+            self.collection_name[collection],
+            self.get_content_version(collection),
+            tuple(queries),
+            top_k,
+            hybrid_weighting,
+            tuple(keywords or ()),
+            tuple(filenames or ()),
+            reranker_model,
+        )
+        with span("databroker.search", collection=collection, top_k=top_k) as s:
+            results, shared = self._search_flight.do(
+                key,
+                lambda: self._search(
+                    queries,
+                    top_k,
+                    collection,
+                    hybrid_weighting,
+                    keywords,
+                    filenames,
+                    reranker_model,
+                ),
+            )
+            s.set_attribute("coalesced", shared)
+        return results
+
+    def _with_duplicate_sources(
+        self, results: List[List[SearchResult]], collection: str
+    ) -> List[List[SearchResult]]:
+        """
+        Lists the other sources of deduplicated chunks under
+        metadata["duplicate_sources"].
+        """
+        deduplicator = self.deduplicators[collection]
+        if deduplicator is None:
+            return results
+        return [
+            [
+                (
+                    replace(
+                        result,
+                        metadata={**result.metadata, "duplicate_sources": sources},
+                    )
+                    if (sources := deduplicator.duplicate_sources(result.id))
+                    else result
+                )
+                for result in query_results
+            ]
+            for query_results in results
+        ]
+
+    def _search(
+        self,
+        queries: List[str],
+        top_k: int,
+        collection: str,
+        hybrid_weighting: float,
+        keywords: Optional[list[str]],
+        filenames: Optional[list[str]],
+        reranker_model: str,
+    ) -> List[List[SearchResult]]:
+        """
+        Embeds the queries, runs the vector search and reranks the results.
         """
         query_chunks = [
             Chunk(text=query, name=f"Query_{i}", data_type="query")
             for i, query in enumerate(queries)
         ]
-        query_embeddings = self.embedder(query_chunks)
+        with span("search.embed", queries=len(queries)):
+            query_embeddings = self._infer(self.embedder, self.embedder, query_chunks)
 
-        raw_results = self.vectorstore[collection].search(
-            query_embeddings,
-            top_k + 15,  # Get more results than needed for reranking
-            keywords,
-            filenames,
-            hybrid_weighting,
-        )
+        with span("search.ann", limit=top_k + 15) as s:
+            raw_results = self.vectorstore[collection].search(
+                query_embeddings,
+                top_k + 15,  # Get more results than needed for reranking
+                keywords,
+                filenames,
+                hybrid_weighting,
+            )
+            s.add_metric("hits", sum(len(result) for result in raw_results))
+        raw_results = self._with_duplicate_sources(raw_results, collection)
 
         if reranker_model != self.current_reranker_model:
             self.reranker = self._create_reranker(model_name=reranker_model)
@@ -420,15 +1026,20 @@ class DataBroker(metaclass=SingletonMeta):
 
         reranked_results = []
 
-        for query, result_list in zip(queries, raw_results):
-            if not result_list:
-                reranked_results.append([])
-                continue
+        with span("search.rerank", model=reranker_model):
+            for query, result_list in zip(queries, raw_results):
+                if not result_list:
+                    reranked_results.append([])
+                    continue
 
-            reranked_items = self.reranker.rerank(
-                query=query, results=result_list, top_k=min(top_k, len(result_list))
-            )
+                reranked_items = self._infer(
+                    self.reranker,
+                    self.reranker.rerank,
+                    query=query,
+                    results=result_list,
+                    top_k=min(top_k, len(result_list)),
+                )
 
-            reranked_results.append(reranked_items)
+                reranked_results.append(reranked_items)
 
         return reranked_results
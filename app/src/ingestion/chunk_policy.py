@@ -0,0 +1,217 @@
+"""
+Token budgets for chunks.
+
+Chunkers size their output in characters (RecursiveCharacterChunker),
+sentences, or in tokens with a generous limit (DoclingHybridChunker). A
+chunk longer than the embedder or reranker accepts costs quadratic attention
+time and is then truncated anyway. A ChunkPolicy derives one token budget
+from the configured models: the embedder's input limit, and the reranker's
+limit minus the tokens reserved for the query it is paired with. A
+TokenBudgetChunker wraps any chunker, splits chunks over the budget at
+token boundaries and logs the chunk-length distribution of each document.
+"""
+
+import logging
+import re
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from transformers import AutoTokenizer
+
+from .chunking import Chunk, Chunker
+from .extraction import ExtractedContent
+
+logger = logging.getLogger(__name__)
+
+# maximum input tokens of each model
+EMBEDDER_MAX_TOKENS = {
+    "BAAI/bge-m3": 8192,
+    "bge-m3:567m": 8192,
+    "mxbai-embed-large": 512,
+    "nomic-embed-text": 8192,
+    "sentence-transformers/all-mpnet-base-v2": 384,
+}
+# (query, passage) pairs; the rerankers truncate at their max_length of 512
+RERANKER_MAX_TOKENS = {
+    "BAAI/bge-reranker-v2-m3": 512,
+    "BAAI/bge-reranker-base": 512,
+    "BAAI/bge-reranker-large": 512,
+    "BAAI/bge-re-anchor-v2-gemma": 512,
+    "BAAI/bge-reranker-v2-minicpm-layerwise": 512,
+}
+# Hugging Face tokenizers of models served under other names
+TOKENIZERS = {
+    "bge-m3:567m": "BAAI/bge-m3",
+    "mxbai-embed-large": "mixedbread-ai/mxbai-embed-large-v1",
+    "nomic-embed-text": "nomic-ai/nomic-embed-text-v1.5",
+}
+DEFAULT_TOKENIZER = "BAAI/bge-m3"
+# budget for models of unknown limits, e.g. the hashing embedder
+DEFAULT_MAX_TOKENS = 8192
+
+_SENTENCE_END = re.compile(r"[.!?;:]\s")
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(name: str):
+    """Loads a fast tokenizer once per process."""
+    return AutoTokenizer.from_pretrained(name, use_fast=True)
+
+
+def length_summary(lengths: Sequence[int], budget: int) -> Dict[str, float]:
+    """Distribution of chunk lengths in tokens."""
+    if not lengths:
+        return {"chunks": 0}
+    ordered = sorted(lengths)
+    return {
+        "chunks": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)],
+        "max": ordered[-1],
+        "over_budget": sum(length > budget for length in ordered),
+    }
+
+
+class ChunkPolicy:
+    """
+    A token budget per chunk, counted with a fast tokenizer.
+    """
+
+    def __init__(
+        self, max_tokens: int, tokenizer_name: str = DEFAULT_TOKENIZER, tokenizer=None
+    ):
+        """
+        Args:
+            max_tokens (int): Maximum tokens per chunk.
+            tokenizer_name (str): Hugging Face tokenizer to count with, loaded
+                on first use.
+            tokenizer (optional): An already loaded fast tokenizer to use instead.
+        """
+        self.max_tokens = max_tokens
+        self.tokenizer_name = tokenizer_name
+        self._tokenizer = tokenizer
+
+    @classmethod
+    def from_models(
+        cls,
+        embedding_model: str,
+        reranker_model: Optional[str] = None,
+        reranker_query_tokens: int = 64,
+        max_tokens: Optional[int] = None,
+    ) -> "ChunkPolicy":
+        """
+        Derives the budget from the models' input limits.
+
+        Args:
+            embedding_model (str): The configured embedding model.
+            reranker_model (str, optional): The configured reranker; chunks must
+                fit next to a query of `reranker_query_tokens` tokens.
+            reranker_query_tokens (int): Tokens reserved for the query (and the
+                special tokens) in each reranker input.
+            max_tokens (int, optional): A lower cap, e.g. to bound embedding
+                cost below the embedder's limit.
+        """
+        limits = [DEFAULT_MAX_TOKENS]
+        if embedding_model in EMBEDDER_MAX_TOKENS:
+            limits.append(EMBEDDER_MAX_TOKENS[embedding_model])
+        if reranker_model in RERANKER_MAX_TOKENS:
+            limits.append(RERANKER_MAX_TOKENS[reranker_model] - reranker_query_tokens)
+        if max_tokens:
+            limits.append(max_tokens)
+        tokenizer_name = TOKENIZERS.get(embedding_model, embedding_model)
+        if "/" not in tokenizer_name:
+            tokenizer_name = DEFAULT_TOKENIZER
+        return cls(max_tokens=max(min(limits), 1), tokenizer_name=tokenizer_name)
+
+    @property
+    def tokenizer(self):
+        if self._tokenizer is None:
+            self._tokenizer = get_tokenizer(self.tokenizer_name)
+        return self._tokenizer
+
+    def count(self, texts: List[str]) -> List[int]:
+        """Token counts of the texts, without special tokens."""
+        if not texts:
+            return []
+        encoded = self.tokenizer(texts, add_special_tokens=False, verbose=False)
+        return [len(ids) for ids in encoded["input_ids"]]
+
+    def _split(self, chunk: Chunk) -> List[Chunk]:
+        offsets = self.tokenizer(
+            chunk.text,
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            verbose=False,
+        )["offset_mapping"]
+        pieces, start = [], 0
+        while start < len(offsets):
+            end = min(start + self.max_tokens, len(offsets))
+            if end < len(offsets):
+                # prefer ending on a sentence boundary in the second half
+                window = chunk.text[offsets[start][0] : offsets[end][0]]
+                boundaries = [m.end() for m in _SENTENCE_END.finditer(window)]
+                if boundaries and boundaries[-1] > len(window) // 2:
+                    cut = offsets[start][0] + boundaries[-1]
+                    end = next(
+                        i for i in range(start + 1, end + 1) if offsets[i][0] >= cut
+                    )
+            text_end = offsets[end][0] if end < len(offsets) else len(chunk.text)
+            pieces.append(chunk.text[offsets[start][0] : text_end].strip())
+            start = end
+        return [
+            Chunk(
+                text=text,
+                name=chunk.name if i == 0 else f"{chunk.name} part {i + 1}",
+                data_type=chunk.data_type,
+                pages=chunk.pages,
+            )
+            for i, text in enumerate(pieces)
+            if text
+        ]
+
+    def enforce(self, chunks: List[Chunk]) -> List[Chunk]:
+        """
+        Returns the chunks with every chunk over the budget split into
+        consecutive pieces within it. The first piece keeps the chunk's name;
+        the others are named "<name> part <n>".
+        """
+        bounded = []
+        for chunk, length in zip(chunks, self.count([c.text for c in chunks])):
+            bounded.extend([chunk] if length <= self.max_tokens else self._split(chunk))
+        return bounded
+
+
+class TokenBudgetChunker(Chunker):
+    """
+    Applies a ChunkPolicy to the output of another chunker and logs the
+    token-length distribution of each document's chunks (also kept in
+    `reports`, keyed by document name).
+    """
+
+    def __init__(self, chunker: Chunker, policy: ChunkPolicy) -> None:
+        self.chunker = chunker
+        self.policy = policy
+        self.reports: Dict[str, Dict[str, float]] = {}
+
+    def _report(self, name: str, lengths: List[int], split: int) -> None:
+        summary = length_summary(lengths, self.policy.max_tokens)
+        summary["split"] = split
+        self.reports[name] = summary
+        logger.info("Chunk tokens of %s: %s", name, summary)
+
+    def __call__(self, content: ExtractedContent) -> List[Chunk]:
+        chunks = self.chunker(content)
+        lengths = self.policy.count([chunk.text for chunk in chunks])
+        bounded = self.policy.enforce(chunks)
+        self._report(content.name, lengths, len(bounded) - len(chunks))
+        return bounded
+
+    def iter_chunks(self, content: ExtractedContent) -> Iterator[Chunk]:
+        lengths, split = [], 0
+        for chunk in self.chunker.iter_chunks(content):
+            lengths.extend(self.policy.count([chunk.text]))
+            bounded = self.policy.enforce([chunk])
+            split += len(bounded) - 1
+            yield from bounded
+        self._report(content.name, lengths, split)
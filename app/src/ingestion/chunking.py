@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import List
+from typing import Iterator, List, Optional, Tuple
 
 import nltk
 from docling.chunking import HierarchicalChunker, HybridChunker
@@ -10,7 +11,7 @@ from nltk.tokenize import sent_tokenize
 from tqdm import tqdm
 from transformers import AutoTokenizer
 
-from .extraction import DoclingDocument, ExtractedContent
+from .extraction import DoclingDocument, ExtractedContent, PagedText
 from .raw_data import Data
 
 
@@ -23,9 +24,12 @@ class Chunk(Data):
         name (str): The name of the chunk.
         data_type (RAW_DATA_TYPES): The type of the original data source.
         text (str): The content of the chunk.
+        pages (Tuple[int, int], optional): First and last source page, when
+            the content was extracted page by page.
     """
 
     text: str
+    pages: Optional[Tuple[int, int]] = None
 
     def __post_init__(self):
         super().__init__(name=self.name, data_type=self.data_type)
@@ -49,6 +53,41 @@ class Chunker(ABC):
         """
         pass
 
+    def iter_chunks(self, content: ExtractedContent) -> Iterator[Chunk]:
+        """
+        Yields the chunks of the content as they are produced. Chunkers that
+        can consume PagedText page by page override this, so chunks are
+        emitted before the whole document has been extracted; by default the
+        content is chunked at once.
+        """
+        yield from self(content)
+
+
+class _PageSpans:
+    """
+    Maps character offsets in a rolling text buffer to the pages the text
+    came from.
+    """
+
+    def __init__(self) -> None:
+        self.starts: List[int] = []
+        self.pages: List[int] = []
+
+    def append(self, offset: int, page: int) -> None:
+        self.starts.append(offset)
+        self.pages.append(page)
+
+    def page_range(self, start: int, end: int) -> Tuple[int, int]:
+        first = self.pages[max(bisect_right(self.starts, start) - 1, 0)]
+        last = self.pages[max(bisect_right(self.starts, max(end - 1, start)) - 1, 0)]
+        return first, last
+
+    def drop(self, offset: int) -> None:
+        """Forgets the first `offset` characters of the buffer."""
+        keep = max(bisect_right(self.starts, offset) - 1, 0)
+        self.starts = [max(start - offset, 0) for start in self.starts[keep:]]
+        self.pages = self.pages[keep:]
+
 
 class SplitSentencesChunker(Chunker):
     """
@@ -82,6 +121,51 @@ class SplitSentencesChunker(Chunker):
             for i, sentence in enumerate(sentences)
         ]
 
+    # a sentence carried over page breaks is emitted once it grows this long
+    MAX_CARRY_CHARS = 10000
+
+    def iter_chunks(self, content: ExtractedContent) -> Iterator[Chunk]:
+        """
+        Splits PagedText page by page. The last sentence of each page is
+        carried over to the next, as it may continue there.
+        """
+        if not isinstance(content, PagedText):
+            yield from self(content)
+            return
+
+        carry, carry_page, number = "", 0, 0
+        for page_no, text in content.iter_pages():
+            sentences = sent_tokenize(f"{carry} {text}" if carry else text)
+            if not sentences:
+                continue
+            first_page = carry_page if carry else page_no
+            for i, sentence in enumerate(sentences[:-1]):
+                number += 1
+                yield Chunk(
+                    text=sentence,
+                    name=f"{content.name} - Sentence {number}",
+                    data_type=content.data_type,
+                    pages=(first_page if i == 0 else page_no, page_no),
+                )
+            carry_page = first_page if len(sentences) == 1 else page_no
+            carry = sentences[-1]
+            if len(carry) > self.MAX_CARRY_CHARS:
+                number += 1
+                yield Chunk(
+                    text=carry,
+                    name=f"{content.name} - Sentence {number}",
+                    data_type=content.data_type,
+                    pages=(carry_page, page_no),
+                )
+                carry = ""
+        if carry:
+            yield Chunk(
+                text=carry,
+                name=f"{content.name} - Sentence {number + 1}",
+                data_type=content.data_type,
+                pages=(carry_page, page_no),
+            )
+
 
 class RecursiveCharacterChunker(Chunker):
     def __init__(self, chunk_size=1600, chunk_overlap=160, is_separator_regex=False):
@@ -90,7 +174,10 @@ class RecursiveCharacterChunker(Chunker):
             chunk_overlap=chunk_overlap,
             length_function=len,
             is_separator_regex=is_separator_regex,
+            add_start_index=True,
         )
+        # PagedText is split whenever this much text is buffered
+        self.stream_buffer_chars = 8 * chunk_size
 
     def __call__(self, content: ExtractedContent) -> List[Chunk]:
         text = content.get_text()
@@ -104,6 +191,44 @@ class RecursiveCharacterChunker(Chunker):
             for i, c in tqdm(enumerate(chunks))
         ]
 
+    def iter_chunks(self, content: ExtractedContent) -> Iterator[Chunk]:
+        """
+        Splits PagedText as pages arrive. The buffered text is split once it
+        exceeds `stream_buffer_chars`; every chunk but the last is emitted,
+        and splitting resumes from the start of the last chunk, which keeps
+        the overlap between consecutive chunks across page breaks.
+        """
+        if not isinstance(content, PagedText):
+            yield from self(content)
+            return
+
+        buffer, spans, number = "", _PageSpans(), 0
+
+        def split(final: bool) -> Iterator[Chunk]:
+            nonlocal buffer, number
+            documents = self.text_splitter.create_documents([buffer])
+            emit = documents if final else documents[:-1]
+            for document in emit:
+                start = document.metadata["start_index"]
+                number += 1
+                yield Chunk(
+                    text=document.page_content,
+                    name=f"{content.name} - Chunk {number}",
+                    data_type=content.data_type,
+                    pages=spans.page_range(start, start + len(document.page_content)),
+                )
+            if not final and emit:
+                cut = documents[-1].metadata["start_index"]
+                buffer = buffer[cut:]
+                spans.drop(cut)
+
+        for page_no, text in content.iter_pages():
+            spans.append(len(buffer), page_no)
+            buffer += text + "\n"
+            if len(buffer) >= self.stream_buffer_chars:
+                yield from split(final=False)
+        yield from split(final=True)
+
 
 class DoclingHierarchicalChunker(Chunker):
     """
@@ -131,7 +256,7 @@ class DoclingHierarchicalChunker(Chunker):
                 f"DoclingChunker requires DoclingDocument input, but got {type(content)}. "
                 "Use DoclingExtract or a different chunker."
             )
-        chunks_iter = self.chunker.chunk(content.conv_result.document)
+        chunks_iter = self.chunker.chunk(content.document)
         chunks = [
             Chunk(
                 text=chunk.text,
@@ -149,13 +274,17 @@ class DoclingHybridChunker(Chunker):
     including headings, captions, and metadata.
     """
 
-    def __init__(self):
+    def __init__(self, max_tokens: int = 8192, tokenizer: str = "BAAI/bge-m3"):
         """
         Initialize the HybridDoclingChunker.
+
+        Args:
+            max_tokens (int): Maximum tokens per chunk.
+            tokenizer (str): Hugging Face tokenizer the chunk sizes are counted with.
         """
-        self.tokenizer = AutoTokenizer.from_pretrained("BAAI/bge-m3")
+        self.tokenizer = AutoTokenizer.from_pretrained(tokenizer)
         self.chunker = HybridChunker(
-            tokenizer=self.tokenizer, max_tokens=8192, merge_peers=True
+            tokenizer=self.tokenizer, max_tokens=max_tokens, merge_peers=True
         )
 
     def __call__(self, content: DoclingDocument) -> List[Chunk]:
@@ -174,10 +303,8 @@ class DoclingHybridChunker(Chunker):
                 "Use DoclingExtract or a different chunker."
             )
 
-        # Use the conv_result.document structure for chunking (same as HierarchicalChunker)
-        document = (
-            content.conv_result.document
-        )  # This matches the HierarchicalChunker's approach
+        # Use the document structure for chunking (same as HierarchicalChunker)
+        document = content.document
 
         # Now, chunk the document
         chunk_iter = self.chunker.chunk(document)
@@ -0,0 +1,373 @@
+"""
+Near-duplicate chunk detection with MinHash LSH.
+
+Each chunk is reduced to a MinHash signature of its word shingles. The
+signatures of stored (canonical) chunks are bucketed by band; a new chunk is
+compared only with the chunks that share a band bucket with it, and counts as
+a duplicate of the most similar one if their estimated Jaccard similarity
+reaches `threshold`. Unless `match_numbers` is off, both chunks must also
+contain the same numbers in the same order: chunks that differ only in a dose,
+limit or date are nearly identical by shingles but are not duplicates.
+Duplicates are not embedded or stored; the index maps them to their canonical
+chunk and keeps the other sources they appeared in.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# largest prime below 2**32: (a * x + b) mod P stays exact in uint64
+_PRIME = np.uint64(4294967291)
+
+
+def shingle_hashes(text: str, shingle_size: int = 5) -> np.ndarray:
+    """
+    CRC32 hashes of the distinct lowercase word `shingle_size`-grams of text.
+    """
+    tokens = re.findall(r"\w+", text.lower())
+    shingles = {
+        " ".join(tokens[i : i + shingle_size])
+        for i in range(max(len(tokens) - shingle_size + 1, 0))
+    }
+    return np.array([zlib.crc32(s.encode()) for s in shingles], dtype=np.uint64)
+
+
+def number_key(text: str) -> int:
+    """
+    CRC32 hash of the numbers in text (e.g. "0.3", "1,000", "408"), in order.
+    """
+    return zlib.crc32(" ".join(re.findall(r"\d+(?:[.,]\d+)*", text)).encode())
+
+
+class NearDuplicateIndex:
+    """
+    MinHash LSH index over the canonical chunks of one collection.
+
+    Signatures, number keys and ids are appended to `path`/signatures.u32,
+    numbers.u32 and ids.txt, duplicate records to duplicates.jsonl; the band
+    buckets are rebuilt in memory on load. If `path` is None nothing is
+    persisted.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: float = 0.85,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        min_words: int = 30,
+        match_numbers: bool = True,
+        seed: int = 1,
+    ) -> None:
+        """
+        Args:
+            path (str, optional): Directory the index is persisted in.
+            threshold (float): Estimated Jaccard similarity of the shingle sets
+                at which a chunk counts as a duplicate.
+            num_perm (int): Signature length; must be divisible by `bands`.
+            bands (int): LSH bands. More bands find candidates at lower
+                similarity at the cost of more comparisons.
+            shingle_size (int): Words per shingle.
+            min_words (int): Shorter chunks (headings, captions) are never
+                treated as duplicates.
+            match_numbers (bool): Only treat chunks with the same numbers as
+                duplicates.
+            seed (int): Seed of the hash permutations.
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands")
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.min_words = min_words
+        self.match_numbers = match_numbers
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_PRIME), num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), num_perm, dtype=np.uint64)
+
+        self.ids: List[str] = []
+        self._buffer = np.zeros((0, num_perm), dtype=np.uint32)
+        self.signatures = self._buffer
+        self.number_keys: List[int] = []
+        self._buckets: List[Dict[int, List[int]]] = [
+            defaultdict(list) for _ in range(bands)
+        ]
+        # duplicate id -> canonical id, canonical id -> {duplicate id: source}
+        self.duplicates: Dict[str, str] = {}
+        self.sources: Dict[str, Dict[str, str]] = defaultdict(dict)
+        self._pending: Dict[str, Tuple[np.ndarray, int]] = {}
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            self._load()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _settings(self) -> dict:
+        return {
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "shingle_size": self.shingle_size,
+            "match_numbers": self.match_numbers,
+        }
+
+    def _load(self) -> None:
+        if not os.path.exists(self._file("index.json")):
+            with open(self._file("index.json"), "w") as f:
+                json.dump(self._settings(), f)
+            return
+        with open(self._file("index.json")) as f:
+            if json.load(f) != self._settings():
+                logger.warning(
+                    "Near-duplicate index at %s was built with other settings; "
+                    "starting a new one",
+                    self.path,
+                )
+                self.clear()
+                return
+        if not os.path.exists(self._file("ids.txt")):
+            return
+        with open(self._file("ids.txt")) as f:
+            self.ids = f.read().splitlines()
+        self._buffer = self.signatures = np.fromfile(
+            self._file("signatures.u32"), dtype=np.uint32
+        ).reshape(-1, self.num_perm)[: len(self.ids)]
+        self.number_keys = np.fromfile(
+            self._file("numbers.u32"), dtype=np.uint32
+        ).tolist()[: len(self.ids)]
+        for row, signature in enumerate(self.signatures):
+            self._bucket(row, signature)
+        if os.path.exists(self._file("duplicates.jsonl")):
+            with open(self._file("duplicates.jsonl")) as f:
+                for line in f:
+                    record = json.loads(line)
+                    self._record(record["id"], record["canonical"], record["source"])
+
+    def _band_keys(self, signature: np.ndarray) -> List[int]:
+        return [hash(band.tobytes()) for band in np.split(signature, self.bands)]
+
+    def _bucket(self, row: int, signature: np.ndarray) -> None:
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            buckets[key].append(row)
+
+    def _append_signatures(self, signatures: List[np.ndarray]) -> None:
+        # grows the buffer geometrically instead of copying it on every insert
+        rows = len(self.signatures)
+        needed = rows + len(signatures)
+        if needed > len(self._buffer):
+            buffer = np.zeros(
+                (max(needed, 2 * len(self._buffer)), self.num_perm), np.uint32
+            )
+            buffer[:rows] = self.signatures
+            self._buffer = buffer
+        if signatures:
+            self._buffer[rows:needed] = np.stack(signatures)
+        self.signatures = self._buffer[:needed]
+
+    def _record(self, id: str, canonical: str, source: str) -> None:
+        self.duplicates[id] = canonical
+        self.sources[canonical][id] = source
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        MinHash signature of the text, or None if it is shorter than
+        `min_words`.
+        """
+        if len(re.findall(r"\w+", text)) < self.min_words:
+            return None
+        hashes = shingle_hashes(text, self.shingle_size) % _PRIME
+        permuted = (np.outer(hashes, self._a) + self._b) % _PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _number_key(self, text: str) -> int:
+        return number_key(text) if self.match_numbers else 0
+
+    def _most_similar(
+        self,
+        signature: np.ndarray,
+        signatures: np.ndarray,
+        rows: Sequence[int],
+        key: int,
+        keys: Sequence[int],
+    ) -> Optional[int]:
+        rows = [row for row in rows if keys[row] == key]
+        if not rows:
+            return None
+        rows = np.fromiter(rows, dtype=np.int64)
+        similarity = (signatures[rows] == signature).mean(axis=1)
+        best = int(np.argmax(similarity))
+        return int(rows[best]) if similarity[best] >= self.threshold else None
+
+    def match(self, ids: Sequence[str], texts: Sequence[str]) -> List[Optional[str]]:
+        """
+        Returns the canonical id each chunk duplicates, or None for chunks to
+        store. A chunk may also duplicate an earlier unique chunk of the same
+        call. The signatures of the unique chunks are kept until `add`.
+        """
+        canonicals: List[Optional[str]] = []
+        batch_ids: List[str] = []
+        batch_signatures: List[np.ndarray] = []
+        batch_keys: List[int] = []
+        batch_buckets: List[Dict[int, List[int]]] = [
+            defaultdict(list) for _ in range(self.bands)
+        ]
+        for id, text in zip(ids, texts):
+            signature = self.signature(text)
+            if signature is None:
+                canonicals.append(None)
+                continue
+            numbers = self._number_key(text)
+            keys = self._band_keys(signature)
+            stored = {
+                row
+                for buckets, key in zip(self._buckets, keys)
+                for row in buckets.get(key, ())
+            }
+            row = self._most_similar(
+                signature, self.signatures, stored, numbers, self.number_keys
+            )
+            if row is not None:
+                canonicals.append(self.ids[row])
+                continue
+            in_batch = {
+                row
+                for buckets, key in zip(batch_buckets, keys)
+                for row in buckets.get(key, ())
+            }
+            row = (
+                self._most_similar(
+                    signature,
+                    np.stack(batch_signatures),
+                    in_batch,
+                    numbers,
+                    batch_keys,
+                )
+                if in_batch
+                else None
+            )
+            if row is not None:
+                canonicals.append(batch_ids[row])
+                continue
+            canonicals.append(None)
+            for buckets, key in zip(batch_buckets, keys):
+                buckets[key].append(len(batch_ids))
+            batch_ids.append(id)
+            batch_signatures.append(signature)
+            batch_keys.append(numbers)
+            self._pending[id] = (signature, numbers)
+        return canonicals
+
+    def add(
+        self, ids: Sequence[str], canonicals: Sequence[Optional[str]], source: str
+    ) -> None:
+        """
+        Commits the result of `match` once the unique chunks are stored:
+        indexes their signatures and records the duplicates and their source.
+        """
+        new_ids, new_signatures, new_keys, records = [], [], [], []
+        for id, canonical in zip(ids, canonicals):
+            if canonical is not None:
+                self._record(id, canonical, source)
+                records.append({"id": id, "canonical": canonical, "source": source})
+            elif id in self._pending:
+                signature, key = self._pending.pop(id)
+                new_ids.append(id)
+                new_signatures.append(signature)
+                new_keys.append(key)
+        self._pending.clear()
+
+        for id, signature in zip(new_ids, new_signatures):
+            self._bucket(len(self.ids), signature)
+            self.ids.append(id)
+        self._append_signatures(new_signatures)
+        self.number_keys.extend(new_keys)
+        if self.path is None:
+            return
+        with open(self._file("signatures.u32"), "ab") as f:
+            for signature in new_signatures:
+                f.write(signature.tobytes())
+        with open(self._file("numbers.u32"), "ab") as f:
+            f.write(np.array(new_keys, dtype=np.uint32).tobytes())
+        with open(self._file("ids.txt"), "a") as f:
+            f.write("".join(f"{id}\n" for id in new_ids))
+        with open(self._file("duplicates.jsonl"), "a") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+
+    def remove(self, ids: Sequence[str]) -> List[str]:
+        """
+        Forgets the given chunks, canonical or duplicate, and rewrites the
+        index files.
+
+        Returns:
+            List[str]: Duplicates whose canonical chunk was removed; their
+                text is no longer stored anywhere, so their sources must be
+                ingested again.
+        """
+        removed = set(ids)
+        orphans = [
+            duplicate
+            for canonical in removed
+            for duplicate in self.sources.get(canonical, {})
+            if duplicate not in removed
+        ]
+        removed.update(orphans)
+        for id in removed:
+            canonical = self.duplicates.pop(id, None)
+            if canonical is not None:
+                self.sources.get(canonical, {}).pop(id, None)
+            self.sources.pop(id, None)
+
+        keep = [row for row, id in enumerate(self.ids) if id not in removed]
+        ids, signatures = [self.ids[row] for row in keep], self.signatures[keep]
+        self._buckets = [defaultdict(list) for _ in range(self.bands)]
+        for row, signature in enumerate(signatures):
+            self._bucket(row, signature)
+        self.ids = ids
+        self._buffer = self.signatures = signatures
+        self.number_keys = [self.number_keys[row] for row in keep]
+
+        if self.path is not None:
+            self.signatures.tofile(self._file("signatures.u32"))
+            np.array(self.number_keys, dtype=np.uint32).tofile(
+                self._file("numbers.u32")
+            )
+            with open(self._file("ids.txt"), "w") as f:
+                f.write("".join(f"{id}\n" for id in self.ids))
+            with open(self._file("duplicates.jsonl"), "w") as f:
+                for canonical, duplicates in self.sources.items():
+                    for id, source in duplicates.items():
+                        record = {"id": id, "canonical": canonical, "source": source}
+                        f.write(json.dumps(record) + "\n")
+        return orphans
+
+    def clear(self) -> None:
+        self.ids = []
+        self._buffer = self.signatures = np.zeros((0, self.num_perm), np.uint32)
+        self.number_keys = []
+        self._buckets = [defaultdict(list) for _ in range(self.bands)]
+        self.duplicates, self.sources = {}, defaultdict(dict)
+        self._pending = {}
+        if self.path is not None:
+            shutil.rmtree(self.path, ignore_errors=True)
+            os.makedirs(self.path, exist_ok=True)
+            with open(self._file("index.json"), "w") as f:
+                json.dump(self._settings(), f)
+
+    def duplicate_sources(self, canonical: str) -> List[str]:
+        """The other sources a canonical chunk was found in, sorted."""
+        return sorted(set(self.sources.get(canonical, {}).values()))
+
+    def stats(self) -> Dict[str, int]:
+        return {"canonical_chunks": len(self.ids), "duplicates": len(self.duplicates)}
@@ -1,12 +1,16 @@
+import base64
 import random
+import re
+import zlib
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Sequence
 
 import numpy as np
+import scipy.sparse
 import torch
-from langchain_community.embeddings.ollama import OllamaEmbeddings
 from langchain_huggingface.embeddings import HuggingFaceEmbeddings
+from models.http_client import EndpointPolicy, get_http_client
 from pymilvus.model.hybrid import BGEM3EmbeddingFunction
 from tqdm import tqdm
 
@@ -37,6 +41,174 @@ class Embedding(Data):
         super().__init__(name=self.name, data_type=self.data_type)
 
 
+def sparse_to_dict(sparse) -> Dict[int, float]:
+    """
+    Normalizes a sparse vector to a {token_id: weight} dict. BGE-M3 returns
+    one-row scipy sparse arrays; the other embedders return dicts.
+    """
+    if sparse is None:
+        return {}
+    if isinstance(sparse, dict):
+        return {int(k): float(v) for k, v in sparse.items()}
+    row = sparse.tocoo()
+    return {int(k): float(v) for k, v in zip(row.col, row.data)}
+
+
+def sparse_matrix(
+    rows: Sequence[Dict[int, float]], dimension: Optional[int] = None
+) -> scipy.sparse.csr_array:
+    """
+    Builds a CSR matrix with one row per {token_id: weight} dict.
+
+    Args:
+        rows (Sequence[Dict[int, float]]): The sparse vectors.
+        dimension (int, optional): The number of columns (vocabulary size).
+            Defaults to the largest token id plus one.
+    """
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(row) for row in rows])
+    indices = np.fromiter(
+        (int(k) for row in rows for k in row), dtype=np.int64, count=indptr[-1]
+    )
+    values = np.fromiter(
+        (v for row in rows for v in row.values()), dtype=np.float32, count=indptr[-1]
+    )
+    if dimension is None:
+        dimension = int(indices.max()) + 1 if len(indices) else 1
+    return scipy.sparse.csr_array(
+        (values, indices, indptr), shape=(len(rows), dimension)
+    )
+
+
+@dataclass
+class EmbeddingBatch:
+    """
+    Columnar embeddings of a list of chunks.
+
+    Attributes:
+        ids (List[str]): The chunk names.
+        texts (List[str]): The chunk texts.
+        data_types (List[str]): The data type of each chunk.
+        dense (np.ndarray): One contiguous float32 matrix, one row per chunk.
+        sparse (Optional[scipy.sparse.csr_array]): One CSR matrix with a
+            token-weight row per chunk, if the embedder produces sparse vectors.
+
+    The vector stores read the columns directly. Indexing with an int or
+    iterating yields per-chunk Embedding views (sparse vectors as dicts);
+    indexing with a slice yields a smaller batch.
+    """
+
+    ids: List[str]
+    texts: List[str]
+    data_types: List[str]
+    dense: np.ndarray
+    sparse: Optional[scipy.sparse.csr_array] = None
+
+    def __post_init__(self):
+        self.dense = np.ascontiguousarray(self.dense, dtype=np.float32)
+        if self.sparse is not None:
+            self.sparse = scipy.sparse.csr_array(self.sparse, dtype=np.float32)
+
+    @classmethod
+    def from_chunks(
+        cls,
+        chunks: List[Chunk],
+        dense: np.ndarray,
+        sparse: Optional[scipy.sparse.csr_array] = None,
+    ) -> "EmbeddingBatch":
+        return cls(
+            ids=[chunk.name for chunk in chunks],
+            texts=[chunk.text for chunk in chunks],
+            data_types=[chunk.data_type for chunk in chunks],
+            dense=dense,
+            sparse=sparse,
+        )
+
+    @classmethod
+    def from_embeddings(cls, embeddings: Sequence[Embedding]) -> "EmbeddingBatch":
+        """Packs per-chunk Embedding objects into a batch."""
+        if isinstance(embeddings, EmbeddingBatch):
+            return embeddings
+        sparse = None
+        if any(e.sparse_vector is not None for e in embeddings):
+            sparse = sparse_matrix(
+                [sparse_to_dict(e.sparse_vector) for e in embeddings]
+            )
+        return cls(
+            ids=[e.name for e in embeddings],
+            texts=[e.docs for e in embeddings],
+            data_types=[e.data_type for e in embeddings],
+            dense=np.stack([np.asarray(e.dense_vector) for e in embeddings]),
+            sparse=sparse,
+        )
+
+    @classmethod
+    def concatenate(cls, batches: Sequence["EmbeddingBatch"]) -> "EmbeddingBatch":
+        """Joins batches row-wise, widening sparse matrices to a common vocabulary."""
+        if len(batches) == 1:
+            return batches[0]
+        sparse = None
+        if all(batch.sparse is not None for batch in batches):
+            dimension = max(batch.sparse.shape[1] for batch in batches)
+            sparse = scipy.sparse.vstack(
+                [
+                    scipy.sparse.csr_array(
+                        (b.sparse.data, b.sparse.indices, b.sparse.indptr),
+                        shape=(len(b), dimension),
+                    )
+                    for b in batches
+                ],
+                format="csr",
+            )
+        return cls(
+            ids=[id for batch in batches for id in batch.ids],
+            texts=[text for batch in batches for text in batch.texts],
+            data_types=[t for batch in batches for t in batch.data_types],
+            dense=np.concatenate([batch.dense for batch in batches]),
+            sparse=sparse,
+        )
+
+    def sparse_row(self, i: int) -> Dict[int, float]:
+        """The sparse vector of row `i` as a {token_id: weight} dict."""
+        if self.sparse is None:
+            return {}
+        start, end = self.sparse.indptr[i], self.sparse.indptr[i + 1]
+        return dict(
+            zip(
+                self.sparse.indices[start:end].tolist(),
+                self.sparse.data[start:end].tolist(),
+            )
+        )
+
+    def sparse_rows(self) -> List[Dict[int, float]]:
+        return [self.sparse_row(i) for i in range(len(self))]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return EmbeddingBatch(
+                ids=self.ids[index],
+                texts=self.texts[index],
+                data_types=self.data_types[index],
+                dense=self.dense[index],
+                sparse=self.sparse[index] if self.sparse is not None else None,
+            )
+        if index < 0:
+            index += len(self)
+        return Embedding(
+            name=self.ids[index],
+            data_type=self.data_types[index],
+            docs=self.texts[index],
+            dense_vector=self.dense[index],
+            sparse_vector=self.sparse_row(index) if self.sparse is not None else None,
+        )
+
+    def __iter__(self) -> Iterator[Embedding]:
+        return (self[i] for i in range(len(self)))
+
+
 class Embedder(ABC):
     """
     Abstract base class for embedding text chunks into vectors.
@@ -45,6 +217,8 @@ class Embedder(ABC):
     def __init__(self):
         self.setup_device()
         self.embedding_dimension: Optional[int] = None
+        # number of sparse vector columns (vocabulary size), if known
+        self.sparse_dimension: Optional[int] = None
 
     def setup_device(self):
         self.device = "cpu"
@@ -54,7 +228,7 @@ class Embedder(ABC):
             self.use_fp16 = True
 
     @abstractmethod
-    def __call__(self, chunks: List[Chunk]) -> List[Embedding]:
+    def __call__(self, chunks: List[Chunk]) -> EmbeddingBatch:
         """
         Embed a list of text chunks into vectors.
 
@@ -62,7 +236,7 @@ class Embedder(ABC):
             chunks (List[Chunk]): List of Chunk objects to be embedded.
 
         Returns:
-            List[Embedding]: A list of Embedding objects containing the embedded vectors and metadata.
+            EmbeddingBatch: The dense (and sparse) vectors of all chunks, in order.
         """
         pass
 
@@ -87,20 +261,16 @@ class HuggingFaceEmbedder(Embedder):
         )
         self.embedding_dimension = self.model.client.get_sentence_embedding_dimension()
 
-    def __call__(self, chunks: List[Chunk]) -> Embedding:
+    def __call__(self, chunks: List[Chunk]) -> EmbeddingBatch:
         """
-        Embed a list of text chunks into a single aggregated Embedding using the Sentence Transformer model.
+        Embed a list of text chunks using the Sentence Transformer model.
 
         Args:
             chunks (List[Chunk]): List of Chunk objects to be embedded.
 
         Returns:
-            Embedding: An Embedding object containing:
-                - name: list of chunk names,
-                - data_type: the data type of the first chunk,
-                - docs: list of texts,
-                - dense_vector: a stacked NumPy array of dense embeddings,
-                - sparse_vector: a list of empty dicts (no sparse data available).
+            EmbeddingBatch: The dense vectors of the model and the BGE-M3
+                sparse vectors of all chunks, in order.
         """
         docs = [chunk.text for chunk in chunks]
 
@@ -112,19 +282,11 @@ class HuggingFaceEmbedder(Embedder):
             dense_list.append(vector)
             sparse_list.append(sparse_embeddings["sparse"])
 
-        dense_vectors = np.stack(dense_list, axis=0)
-        sparse_vectors = np.stack(sparse_list, axis=0)
-
-        return [
-            Embedding(
-                name=chunk.name,
-                data_type=chunk.data_type,
-                docs=chunk.text,
-                dense_vector=dense_vectors[i],
-                sparse_vector=sparse_vectors[i],
-            )
-            for i, chunk in enumerate(chunks)
-        ]
+        return EmbeddingBatch.from_chunks(
+            chunks,
+            dense=np.asarray(dense_list, dtype=np.float32),
+            sparse=scipy.sparse.vstack(sparse_list, format="csr") if chunks else None,
+        )
 
 
 class OllamaEmbedder(Embedder):
@@ -132,67 +294,77 @@ class OllamaEmbedder(Embedder):
     An embedder that uses API calls to our Ollama instances hosting embedding models to generate embeddings.
     """
 
-    def __init__(self, model_name: str, endpoint: str):
+    def __init__(
+        self, model_name: str, endpoint: str, policy: Optional[EndpointPolicy] = None
+    ):
         """
         Initialize the embedding API call for the embedding model on Ollama.
 
         Args:
             model_name (str): The name of the embedding model to use.
             endpoint (str): The API endpoint for the Ollama instance.
+            policy (EndpointPolicy, optional): The configured HTTP client settings.
         """
         super().__init__()
         self.model_name = model_name
-        self.base_embedder = OllamaEmbeddings(model=self.model_name, base_url=endpoint)
+        self.endpoint = endpoint.rstrip("/")
+        # shares the pooled keep-alive connections used for Ollama generation
+        self.client = get_http_client(self.endpoint, policy)
         self.sparse_embedder = BGEM3EmbeddingFunction(
             use_fp16=self.use_fp16, device=self.device
         )
 
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a single text with the Ollama embeddings API.
+
+        Args:
+            text (str): The text to embed.
+
+        Returns:
+            List[float]: The dense embedding vector.
+        """
+        response = self.client.post(
+            f"{self.endpoint}/api/embeddings",
+            json={"model": self.model_name, "prompt": text},
+        )
+        response.raise_for_status()
+        return response.json()["embedding"]
+
     def test_connection(self):
         """Test the connection to the embedding service. Fallback to HuggingFace embeddings if this fails."""
         try:
-            test_embedding = self.model.embed_query("test")
+            test_embedding = self.embed_query("test")
             self.embedding_dimension = len(test_embedding)
         except Exception as e:
             raise RuntimeError("Embedding model initialization failed") from e
 
-    def __call__(self, chunks: List[Chunk]) -> Embedding:
+    def __call__(self, chunks: List[Chunk]) -> EmbeddingBatch:
         """
-        Embed a list of text chunks into a single aggregated Embedding using the Ollama hosted model.
+        Embed a list of text chunks using the Ollama hosted model.
 
         Args:
             chunks (List[Chunk]): List of Chunk objects to be embedded.
 
         Returns:
-            Embedding: An Embedding object containing:
-                - name: list of chunk names,
-                - data_type: the data type of the first chunk,
-                - docs: list of texts,
-                - dense_vector: a stacked NumPy array of dense embeddings,
-                - sparse_vector: a list of empty dicts (no sparse data available).
+            EmbeddingBatch: The dense vectors of the model and the BGE-M3
+                sparse vectors of all chunks, in order.
         """
         docs = [chunk.text for chunk in chunks]
 
         dense_list = []
         sparse_list = []
         for text in tqdm(docs, desc="Ollama Embedding"):
-            vector = self.model.embed_query(text)
+            vector = self.embed_query(text)
             sparse_embeddings = self.sparse_embedder([text])
             dense_list.append(vector)
             sparse_list.append(sparse_embeddings["sparse"])
 
-        dense_vectors = np.stack(dense_list, axis=0)
-        sparse_vectors = np.stack(sparse_list, axis=0)
-
-        return [
-            Embedding(
-                name=chunk.name,
-                data_type=chunk.data_type,
-                docs=chunk.text,
-                dense_vector=dense_vectors[i],
-                sparse_vector=sparse_vectors[i],
-            )
-            for i, chunk in enumerate(chunks)
-        ]
+        return EmbeddingBatch.from_chunks(
+            chunks,
+            dense=np.asarray(dense_list, dtype=np.float32),
+            sparse=scipy.sparse.vstack(sparse_list, format="csr") if chunks else None,
+        )
 
 
 class BGEM3Embedder(Embedder):
@@ -202,14 +374,18 @@ class BGEM3Embedder(Embedder):
     otherwise, it uses a random embedding generator.
     """
 
+    # texts per forward pass; each batch is padded to its longest text
+    BATCH_SIZE = 16
+
     def __init__(self):
         super().__init__()
         self.embedder = BGEM3EmbeddingFunction(
             use_fp16=self.use_fp16, device=self.device
         )
         self.embedding_dimension = self.embedder.dim["dense"]
+        self.sparse_dimension = self.embedder.dim["sparse"]
 
-    def __call__(self, chunks: List[Chunk]) -> List[Embedding]:
+    def __call__(self, chunks: List[Chunk]) -> EmbeddingBatch:
         """
         Embed a list of text chunks using the BGEM3 model (both dense & sparse).
 
@@ -217,29 +393,174 @@ class BGEM3Embedder(Embedder):
             chunks (List[Chunk]): List of Chunk objects to be embedded.
 
         Returns:
-            List[Embedding]: A list of Embedding objects containing the embedded vectors and metadata.
+            EmbeddingBatch: The dense and sparse vectors of all chunks, in order.
         """
         docs = [chunk.text for chunk in chunks]
 
-        dense_list = []
-        sparse_list = []
-        for text in tqdm(docs, desc="BGEM3 Embedding"):
+        # embed in length-sorted batches to keep padding low, then restore order
+        order = np.array(
+            sorted(range(len(docs)), key=lambda i: len(docs[i])), dtype=np.intp
+        )
+        dense = np.empty((len(docs), self.embedding_dimension), dtype=np.float32)
+        sparse_parts = []
+        for start in tqdm(
+            range(0, len(order), self.BATCH_SIZE), desc="BGEM3 Embedding"
+        ):
+            batch = order[start : start + self.BATCH_SIZE]
             embeddings = self.embedder(
-                [text]
-            )  # {"dense": np.ndarray, "sparse": list[dict[str, float]]}
-            dense_list.extend(embeddings["dense"])
-            sparse_list.append(embeddings["sparse"])
-
-        dense_vectors = np.stack(dense_list, axis=0)
-        sparse_vectors = np.stack(sparse_list, axis=0)
-
-        return [
-            Embedding(
-                name=chunk.name,
-                data_type=chunk.data_type,
-                docs=chunk.text,
-                dense_vector=dense_vectors[i],
-                sparse_vector=sparse_vectors[i],
+                [docs[i] for i in batch]
+            )  # {"dense": list[np.ndarray], "sparse": csr_array (one row per text)}
+            dense[batch] = np.asarray(embeddings["dense"], dtype=np.float32)
+            sparse_parts.append(embeddings["sparse"])
+
+        # rows of the stacked sparse matrix are in sorted order
+        sparse = None
+        if sparse_parts:
+            inverse = np.empty_like(order)
+            inverse[order] = np.arange(len(order))
+            sparse = scipy.sparse.vstack(sparse_parts, format="csr")[inverse]
+        return EmbeddingBatch.from_chunks(chunks, dense=dense, sparse=sparse)
+
+
+class HashingEmbedder(Embedder):
+    """
+    A deterministic, model-free embedder based on feature hashing.
+
+    Unigrams and bigrams are hashed into a signed dense vector and a sparse
+    token-weight vector. The vectors carry lexical similarity only, which is
+    enough to exercise ingestion and search in tests and offline benchmarks
+    without downloading model weights.
+    """
+
+    SPARSE_DIMENSION = 2**20
+
+    def __init__(self, embedding_dimension: int = 256):
+        """
+        Args:
+            embedding_dimension (int): The size of the dense vectors.
+        """
+        super().__init__()
+        self.embedding_dimension = embedding_dimension
+        self.sparse_dimension = self.SPARSE_DIMENSION
+
+    def _hashes(self, text: str) -> np.ndarray:
+        tokens = re.findall(r"\w+", text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return np.array(
+            [zlib.crc32(feature.encode()) for feature in features], dtype=np.uint64
+        )
+
+    def embed_text(self, text: str):
+        """
+        Embed a single text.
+
+        Returns:
+            Tuple[np.ndarray, Dict[int, float]]: The unit-norm dense vector and
+                the L2-normalized sparse vector.
+        """
+        hashes = self._hashes(text)
+        dense = np.zeros(self.embedding_dimension, dtype=np.float32)
+        if len(hashes) == 0:
+            return dense, {}
+
+        signs = np.where(hashes & 1, 1.0, -1.0).astype(np.float32)
+        np.add.at(
+            dense, ((hashes >> 1) % self.embedding_dimension).astype(np.intp), signs
+        )
+        dense /= max(np.linalg.norm(dense), 1e-12)
+
+        indices, counts = np.unique(hashes % self.SPARSE_DIMENSION, return_counts=True)
+        weights = counts / np.linalg.norm(counts)
+        sparse = {int(i): float(w) for i, w in zip(indices, weights)}
+        return dense, sparse
+
+    def __call__(self, chunks: List[Chunk]) -> EmbeddingBatch:
+        """
+        Embed a list of text chunks with feature hashing.
+
+        Args:
+            chunks (List[Chunk]): List of Chunk objects to be embedded.
+
+        Returns:
+            EmbeddingBatch: The dense and sparse vectors of all chunks, in order.
+        """
+        dense = np.empty((len(chunks), self.embedding_dimension), dtype=np.float32)
+        sparse = []
+        for i, chunk in enumerate(chunks):
+            dense[i], row = self.embed_text(chunk.text)
+            sparse.append(row)
+        return EmbeddingBatch.from_chunks(
+            chunks, dense=dense, sparse=sparse_matrix(sparse, self.sparse_dimension)
+        )
+
+
+class RemoteEmbedder(Embedder):
+    """
+    Embeds through the shared inference server (ingestion/inference_server.py),
+    so UI replicas do not each hold a copy of the model.
+
+    Dense vectors travel as base64-encoded float32 and sparse vectors as
+    index/value lists; both are returned as an EmbeddingBatch, like the
+    local embedders.
+    """
+
+    # texts per request; the server re-batches across requests and replicas
+    REQUEST_SIZE = 64
+
+    def __init__(
+        self, endpoint: str, model_name: str, policy: Optional[EndpointPolicy] = None
+    ):
+        """
+        Args:
+            endpoint (str): Base URL of the inference server.
+            model_name (str): The embedding model the server must be hosting.
+            policy (EndpointPolicy, optional): The configured HTTP client settings.
+
+        Raises:
+            ValueError: If the server hosts a different embedding model.
+        """
+        super().__init__()
+        self.endpoint = endpoint.rstrip("/")
+        self.model_name = model_name
+        self.client = get_http_client(self.endpoint, policy)
+
+        info = self.client.get(f"{self.endpoint}/info")
+        info.raise_for_status()
+        info = info.json()
+        if info["embedding_model"] != model_name:
+            raise ValueError(
+                f"Inference server at {endpoint} hosts {info['embedding_model']}, "
+                f"not {model_name}"
             )
-            for i, chunk in enumerate(chunks)
-        ]
+        self.embedding_dimension = info["embedding_dimension"]
+        self.sparse_dimension = info.get("sparse_dimension")
+
+    def __call__(self, chunks: List[Chunk]) -> EmbeddingBatch:
+        """
+        Embed a list of text chunks on the inference server.
+
+        Args:
+            chunks (List[Chunk]): List of Chunk objects to be embedded.
+
+        Returns:
+            EmbeddingBatch: The dense and sparse vectors of all chunks, in order.
+        """
+        dense = np.empty((len(chunks), self.embedding_dimension), dtype=np.float32)
+        sparse = []
+        for start in range(0, len(chunks), self.REQUEST_SIZE):
+            batch = chunks[start : start + self.REQUEST_SIZE]
+            response = self.client.post(
+                f"{self.endpoint}/embed",
+                json={
+                    "model": self.model_name,
+                    "texts": [chunk.text for chunk in batch],
+                },
+            )
+            response.raise_for_status()
+            result = response.json()
+            for i, (vector, row) in enumerate(zip(result["dense"], result["sparse"])):
+                dense[start + i] = np.frombuffer(base64.b64decode(vector), np.float32)
+                sparse.append(dict(zip(row["indices"], row["values"])))
+        return EmbeddingBatch.from_chunks(
+            chunks, dense=dense, sparse=sparse_matrix(sparse, self.sparse_dimension)
+        )
@@ -1,16 +1,26 @@
+import multiprocessing
 import pathlib
+import re
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Literal
+from importlib.metadata import version
+from typing import Any, Callable, Iterator, List, Literal, Optional, Tuple
 
 import PyPDF2
 from docling.datamodel.base_models import InputFormat
-from docling.datamodel.pipeline_options import PdfPipelineOptions, TableFormerMode
+from docling.datamodel.pipeline_options import (
+    AcceleratorOptions,
+    PdfPipelineOptions,
+    TableFormerMode,
+)
 from docling.document_converter import (
     ConversionResult,
     DocumentConverter,
     PdfFormatOption,
 )
+from docling_core.types.doc import DoclingDocument as DoclingCoreDocument
+from orchestrator.utils import available_cpus
 
 from .raw_data import RAW_DATA_TYPES, Data
 
@@ -69,22 +79,49 @@ class Text(ExtractedContent):
         return self.text
 
 
+@dataclass
+class PagedText(ExtractedContent):
+    """
+    Text extracted page by page on demand. Every call to `iter_pages` reads
+    the source again, so the full text is never held in memory.
+
+    Attributes:
+        read_pages (Callable[[], Iterator[str]]): Returns an iterator over
+            the text of each page.
+    """
+
+    read_pages: Callable[[], Iterator[str]]
+
+    def __post_init__(self):
+        super().__post_init__()
+
+    def iter_pages(self) -> Iterator[Tuple[int, str]]:
+        """Yields (1-based page number, page text)."""
+        return enumerate(self.read_pages(), start=1)
+
+    def get_text(self) -> str:
+        return "\n".join(text for _, text in self.iter_pages()).strip()
+
+
 @dataclass
 class DoclingDocument(ExtractedContent):
     """
     Represents the extracted docling document from a data source using Docling.
 
     Attributes:
-        conv_result (ConversionResult): The docling document conversion result.
+        document (DoclingCoreDocument): The converted document.
+        conv_result (ConversionResult, optional): The full conversion result;
+            None when the document was loaded from the extraction cache.
     """
 
-    conv_result: ConversionResult
+    document: DoclingCoreDocument
+    conv_result: Optional[ConversionResult] = None
 
     def __post_init__(self):
         super().__post_init__()
 
     def get_text(self) -> str:
-        return self.conv_result.document.export_to_markdown()
+        return self.document.export_to_markdown()
 
 
 class ContentExtractor(ABC):
@@ -101,6 +138,18 @@ class ContentExtractor(ABC):
         """
         self.data_type = data_type
 
+    # Identifies the extractor and the settings that affect its output in
+    # the extraction cache; None if the extractor does not support caching.
+    cache_key: Optional[str] = None
+
+    def serialize(self, content: ExtractedContent) -> bytes:
+        """Encodes extracted content for the extraction cache."""
+        raise NotImplementedError
+
+    def deserialize(self, payload: bytes, data: Data) -> ExtractedContent:
+        """Decodes content written by `serialize`."""
+        raise NotImplementedError
+
     @abstractmethod
     def __call__(self, data: Data) -> ExtractedContent:
         """
@@ -120,11 +169,27 @@ class PyPDF2Extract(ContentExtractor):
     Concrete implementation of ContentExtractor for PDF data sources using PyPDF2.
     """
 
-    def __init__(self) -> None:
+    cache_key = f"pypdf2-{version('PyPDF2')}"
+
+    def __init__(self, streaming: bool = False) -> None:
         """
         Instantiates a PyPDF2Extract object.
+
+        Args:
+            streaming (bool): Return PagedText that extracts pages lazily
+                while it is chunked, instead of the whole text at once.
         """
         super().__init__(data_type="pdf")
+        self.streaming = streaming
+        if streaming:
+            # there is no single result to cache; pages are re-read on demand
+            self.cache_key = None
+
+    @staticmethod
+    def _read_pages(filepath: pathlib.Path) -> Iterator[str]:
+        with open(filepath, "rb") as file:
+            for page in PyPDF2.PdfReader(file).pages:
+                yield page.extract_text()
 
     def __call__(self, data: PDFData) -> Text:
         """
@@ -134,34 +199,163 @@ class PyPDF2Extract(ContentExtractor):
             data (PDFData): The PDF data to extract text from.
 
         Returns:
-            Text: A Text object containing the extracted text from the PDF.
+            Text: A Text object containing the extracted text from the PDF, or
+                PagedText in streaming mode.
 
         Raises:
             IOError: If there's an error reading the PDF file.
             ValueError: If there's an error extracting text from the PDF.
         """
         try:
-            with open(data.filepath, "rb") as file:
-                reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-                return Text(text=text.strip(), name=data.name, data_type="pdf")
+            if self.streaming:
+                # parse the cross-reference table now so broken files fail here
+                with open(data.filepath, "rb") as file:
+                    PyPDF2.PdfReader(file)
+                return PagedText(
+                    read_pages=lambda: self._read_pages(data.filepath),
+                    name=data.name,
+                    data_type="pdf",
+                )
+            pages = list(self._read_pages(data.filepath))
+            return Text(text="\n".join(pages).strip(), name=data.name, data_type="pdf")
         except IOError as e:
             raise IOError(f"Error reading PDF file: {e}")
         except Exception as e:
             raise ValueError(f"Error extracting text from PDF: {e}")
 
+    def serialize(self, content: Text) -> bytes:
+        return content.text.encode()
+
+    def deserialize(self, payload: bytes, data: PDFData) -> Text:
+        return Text(text=payload.decode(), name=data.name, data_type="pdf")
+
+
+def _pipeline_options(
+    do_table_structure: bool,
+    table_former_mode: Literal["fast", "accurate"],
+    num_threads: Optional[int],
+) -> PdfPipelineOptions:
+    mode = (
+        TableFormerMode.ACCURATE
+        if table_former_mode == "accurate"
+        else TableFormerMode.FAST
+    )
+
+    pipeline_options = PdfPipelineOptions(do_table_structure=do_table_structure)
+    pipeline_options.table_structure_options.mode = mode
+    if num_threads is not None:
+        pipeline_options.accelerator_options = AcceleratorOptions(
+            num_threads=num_threads
+        )
+    return pipeline_options
+
+
+# converter of a page-shard worker process, built once by its initializer
+_shard_converter: Optional[DocumentConverter] = None
+
+
+def _init_shard_worker(*options) -> None:
+    global _shard_converter
+    _shard_converter = DocumentConverter(
+        format_options={
+            InputFormat.PDF: PdfFormatOption(
+                pipeline_options=_pipeline_options(*options)
+            )
+        }
+    )
+
+
+def _convert_shard(filepath: str, first_page: int, last_page: int) -> str:
+    """Converts pages [first_page, last_page] (1-based) to DoclingDocument JSON."""
+    result = _shard_converter.convert(filepath, page_range=(first_page, last_page))
+    return result.document.model_dump_json()
+
+
+_ITEM_REF = re.compile(r"^#/(\w+)/(\d+)$")
+
+
+def _shift_refs(node: Any, offsets: dict, page_delta: int) -> Any:
+    """
+    Renumbers the JSON references ("#/texts/3") of a serialized document by
+    the per-list offsets, and its page numbers by page_delta.
+    """
+    if isinstance(node, list):
+        return [_shift_refs(item, offsets, page_delta) for item in node]
+    if not isinstance(node, dict):
+        return node
+    shifted = {}
+    for key, value in node.items():
+        match = _ITEM_REF.match(value) if isinstance(value, str) else None
+        if key in ("self_ref", "$ref", "cref") and match and match[1] in offsets:
+            value = f"#/{match[1]}/{int(match[2]) + offsets[match[1]]}"
+        elif key == "page_no" and isinstance(value, int):
+            value += page_delta
+        else:
+            value = _shift_refs(value, offsets, page_delta)
+        shifted[key] = value
+    return shifted
+
+
+def merge_documents(
+    documents: List[DoclingCoreDocument], page_ranges: List[Tuple[int, int]]
+) -> DoclingCoreDocument:
+    """
+    Concatenates the documents converted from consecutive page ranges of one
+    PDF into a single document. Item references are renumbered, and page
+    numbers are moved into each shard's range if the converter numbered its
+    pages from 1.
+    """
+    merged = None
+    for document, (first_page, _) in zip(documents, page_ranges):
+        shard = document.model_dump(mode="json", by_alias=True)
+        pages = [int(page) for page in shard.get("pages", {})]
+        # a shard numbered from 1 has pages below its first page; its first
+        # pages may be missing (e.g. blank), so shift by the requested range
+        page_delta = first_page - 1 if pages and min(pages) < first_page else 0
+        if merged is None:
+            merged = _shift_refs(shard, {}, page_delta)
+            merged["pages"] = {
+                str(int(page) + page_delta): info
+                for page, info in merged.get("pages", {}).items()
+            }
+            continue
+        offsets = {
+            key: len(value)
+            for key, value in merged.items()
+            if isinstance(value, list) and key != "version"
+        }
+        shard = _shift_refs(shard, offsets, page_delta)
+        for key in offsets:
+            merged[key].extend(shard.get(key, []))
+        for root in ("body", "furniture"):
+            if root in merged and root in shard:
+                merged[root]["children"].extend(shard[root]["children"])
+        merged["pages"].update(
+            {
+                str(int(page) + page_delta): info
+                for page, info in shard.get("pages", {}).items()
+            }
+        )
+    return DoclingCoreDocument.model_validate(merged)
+
 
 class DoclingPDFExtract(ContentExtractor):
     """
     Concrete implementation of ContentExtractor for PDF data sources using Docling.
+
+    With `workers` > 1, PDFs longer than `pages_per_shard` pages are split
+    into page ranges that are converted in parallel by a pool of worker
+    processes (each with its own converter) and merged back into one
+    document with the original page numbers.
     """
 
     def __init__(
         self,
         do_table_structure: bool = False,
         table_former_mode: Literal["fast", "accurate"] = "accurate",
+        num_threads: Optional[int] = None,
+        workers: int = 1,
+        pages_per_shard: int = 50,
     ) -> None:
         """
         Instantiates a DoclingPDFExtract object.
@@ -171,6 +365,13 @@ class DoclingPDFExtract(ContentExtractor):
             table_former_mode ("fast" | "accurate"): Mode for table extraction.
                                                    "fast" is quicker but less precise,
                                                    "accurate" is slower but more precise.
+            num_threads (int, optional): CPU threads for the layout and table models.
+                                         Defaults to Docling's own setting, or to
+                                         the available CPUs when sharding.
+                                         Split between the workers when sharding.
+            workers (int): Worker processes for page-parallel conversion;
+                           1 converts every PDF in this process.
+            pages_per_shard (int): Pages converted per worker task.
         """
         super().__init__(data_type="pdf")
 
@@ -179,20 +380,58 @@ class DoclingPDFExtract(ContentExtractor):
                 f"Invalid table former mode: {table_former_mode}. Must be 'fast' or 'accurate'."
             )
 
-        mode = (
-            TableFormerMode.ACCURATE
-            if table_former_mode == "accurate"
-            else TableFormerMode.FAST
+        pipeline_options = _pipeline_options(
+            do_table_structure, table_former_mode, num_threads
         )
-
-        pipeline_options = PdfPipelineOptions(do_table_structure=do_table_structure)
-        pipeline_options.table_structure_options.mode = mode
-
         format_options = {
             InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)
         }
 
         self.converter = DocumentConverter(format_options=format_options)
+        # the thread count and sharding do not change the output
+        self.cache_key = (
+            f"docling-{version('docling')}:tables={do_table_structure}:"
+            f"mode={table_former_mode}"
+        )
+
+        self.workers = workers
+        self.pages_per_shard = pages_per_shard
+        # each worker gets its share of the threads, so the workers together
+        # do not oversubscribe the CPUs
+        self._shard_options = (
+            do_table_structure,
+            table_former_mode,
+            max(1, (num_threads or available_cpus()) // workers),
+        )
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _shard_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process that runs torch threads can deadlock
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_shard_worker,
+                initargs=self._shard_options,
+            )
+        return self._pool
+
+    def _convert_sharded(self, data: PDFData, pages: int) -> DoclingDocument:
+        page_ranges = [
+            (first, min(first + self.pages_per_shard - 1, pages))
+            for first in range(1, pages + 1, self.pages_per_shard)
+        ]
+        shards = self._shard_pool().map(
+            _convert_shard,
+            [str(data.filepath)] * len(page_ranges),
+            [first for first, _ in page_ranges],
+            [last for _, last in page_ranges],
+        )
+        document = merge_documents(
+            [DoclingCoreDocument.model_validate_json(shard) for shard in shards],
+            page_ranges,
+        )
+        return DoclingDocument(document=document, name=data.name, data_type="pdf")
 
     def __call__(self, data: PDFData) -> DoclingDocument:
         """
@@ -204,5 +443,25 @@ class DoclingPDFExtract(ContentExtractor):
         Returns:
             DoclingDocument: A DoclingDocument object containing the converted document.
         """
+        if self.workers > 1:
+            pages = len(PyPDF2.PdfReader(data.filepath).pages)
+            if pages > self.pages_per_shard:
+                return self._convert_sharded(data, pages)
+
         result = self.converter.convert(data.filepath)
-        return DoclingDocument(conv_result=result, name=data.name, data_type="pdf")
+        return DoclingDocument(
+            document=result.document,
+            conv_result=result,
+            name=data.name,
+            data_type="pdf",
+        )
+
+    def serialize(self, content: DoclingDocument) -> bytes:
+        return content.document.model_dump_json().encode()
+
+    def deserialize(self, payload: bytes, data: PDFData) -> DoclingDocument:
+        return DoclingDocument(
+            document=DoclingCoreDocument.model_validate_json(payload),
+            name=data.name,
+            data_type="pdf",
+        )
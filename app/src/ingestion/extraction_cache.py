@@ -0,0 +1,167 @@
+"""
+On-disk cache of extraction results.
+
+Converting a PDF (layout analysis, table models) is by far the slowest
+ingestion stage, and its result depends only on the file's bytes and the
+extractor settings. Results are stored gzip-compressed under a key made of
+the SHA-256 of the file and the extractor's `cache_key`, so switching the
+chunker or embedder, or rebuilding a collection, only re-runs the stages
+after extraction. The least recently used entries are evicted once the cache
+exceeds `max_bytes`.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from typing import Dict, Optional, Tuple
+
+from .extraction import ContentExtractor, ExtractedContent, PDFData
+
+logger = logging.getLogger(__name__)
+
+# bump when the serialized format of any extractor changes
+CACHE_VERSION = 1
+
+
+def file_digest(path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    A size-bounded directory of gzip-compressed blobs, evicted least
+    recently used first (by file modification time, which a hit refreshes).
+    Entries are written to a temporary file and renamed into place, so
+    concurrent processes never read a partial entry.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 2 << 30) -> None:
+        self.path = os.path.expanduser(path)
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.gz")
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entry(key)
+        try:
+            with gzip.open(entry, "rb") as f:
+                payload = f.read()
+        except FileNotFoundError:
+            self.stats["misses"] += 1
+            return None
+        except (OSError, EOFError):
+            logger.warning("Discarding unreadable extraction cache entry %s", entry)
+            self._remove(entry)
+            self.stats["misses"] += 1
+            return None
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        self.stats["hits"] += 1
+        return payload
+
+    def put(self, key: str, payload: bytes) -> None:
+        fd, temp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(
+                fileobj=raw, mode="wb", compresslevel=6
+            ) as f:
+                f.write(payload)
+            os.replace(temp_path, self._entry(key))
+        except BaseException:
+            self._remove(temp_path)
+            raise
+        self._evict()
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.path):
+                if entry.name.endswith(".gz"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+                self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        for entry in os.scandir(self.path):
+            if entry.name.endswith((".gz", ".tmp")):
+                self._remove(entry.path)
+
+
+class CachedExtractor(ContentExtractor):
+    """
+    Wraps an extractor that implements `cache_key`, `serialize` and
+    `deserialize` with an ExtractionCache.
+    """
+
+    def __init__(self, extractor: ContentExtractor, cache: ExtractionCache) -> None:
+        super().__init__(data_type=extractor.data_type)
+        self.extractor = extractor
+        self.cache = cache
+        # file path -> ((size, mtime), digest), so a file is hashed once
+        self._digests: Dict[str, Tuple[Tuple[int, float], str]] = {}
+
+    def _key(self, data: PDFData) -> str:
+        path = os.fspath(data.filepath)
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime)
+        known = self._digests.get(path)
+        if known is None or known[0] != signature:
+            known = (signature, file_digest(path))
+            self._digests[path] = known
+        return hashlib.sha256(
+            f"{CACHE_VERSION}:{self.extractor.cache_key}:{known[1]}".encode()
+        ).hexdigest()
+
+    def lookup(self, data: PDFData) -> Optional[ExtractedContent]:
+        """
+        Returns the cached extraction of the data, or None on a miss.
+        """
+        payload = self.cache.get(self._key(data))
+        if payload is None:
+            return None
+        try:
+            return self.extractor.deserialize(payload, data)
+        except Exception:
+            logger.warning("Could not load the cached extraction of %s", data.name)
+            return None
+
+    def extract(self, data: PDFData) -> ExtractedContent:
+        """
+        Runs the wrapped extractor and caches its result.
+        """
+        content = self.extractor(data)
+        try:
+            self.cache.put(self._key(data), self.extractor.serialize(content))
+        except OSError as e:
+            logger.warning(f"Could not cache the extraction of {data.name}: {e}")
+        return content
+
+    def __call__(self, data: PDFData) -> ExtractedContent:
+        content = self.lookup(data)
+        return content if content is not None else self.extract(data)
@@ -0,0 +1,402 @@
+"""
+Shared inference server for the embedder and reranker.
+
+Hosts one copy of the embedding model and the reranker models for every UI
+replica on the host, and micro-batches concurrent requests from all of them
+into single forward passes. Clients are RemoteEmbedder and RemoteReranker;
+enable them with `inference_server.enable` in system_config.yaml.
+
+Endpoints (JSON over HTTP):
+    GET  /info    hosted models, embedding dimension and batching stats
+    POST /embed   {"model": str, "texts": [str]}
+                  -> {"dense": [base64 float32], "sparse": [{"indices", "values"}]}
+    POST /rerank  {"model": str, "query": str, "documents": [str]}
+                  -> {"scores": [float]}
+
+Only the embedding model and the rerankers listed in
+`rag_params.supported_rerankers` of the system config are served; requests for
+other models are rejected.
+
+Example (from app/src):
+    python -m ingestion.inference_server --port 8600 --embedding-model BAAI/bge-m3
+"""
+
+import argparse
+import base64
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
+
+from .chunking import Chunk
+from .embedding import BGEM3Embedder, Embedder, HashingEmbedder, HuggingFaceEmbedder
+from .onnx_backend import (
+    BACKENDS,
+    DEFAULT_CACHE_DIR,
+    ONNX_INT8_BACKEND,
+    ONNX_RERANKERS,
+    TORCH_BACKEND,
+    OnnxBGEM3Embedder,
+    OnnxReranker,
+)
+from .reranker import PassthroughReranker, Reranker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 5.0
+DEFAULT_CONFIG_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "configs", "system_config.yaml"
+)
+
+
+def configured_rerankers(config_path: str = DEFAULT_CONFIG_PATH) -> List[str]:
+    """Returns the supported rerankers of a system config file."""
+    with open(config_path) as f:
+        config = yaml.safe_load(f)
+    return list(config["rag_params"]["supported_rerankers"])
+
+
+class _Request:
+    def __init__(self, items: List[Any]) -> None:
+        self.items = items
+        self.done = threading.Event()
+        self.results: Optional[List[Any]] = None
+        self.error: Optional[BaseException] = None
+
+
+class MicroBatcher:
+    """
+    Groups concurrent requests into batches for one worker thread.
+
+    The worker takes the oldest request, then keeps collecting requests for
+    up to `max_wait_ms` or until `max_batch_size` items are queued, and runs
+    `fn` once on all their items. Each caller gets back the results for its
+    own items, or the exception if the batch failed. A single request larger
+    than `max_batch_size` is run on its own.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        name: str = "batcher",
+    ) -> None:
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.stats = {"requests": 0, "batches": 0, "items": 0}
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, items: List[Any]) -> List[Any]:
+        """
+        Queues the items and blocks until their results are ready.
+        """
+        if not items:
+            return []
+        request = _Request(items)
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.results
+
+    def _collect(self) -> List[_Request]:
+        batch = [self._queue.get()]
+        size = len(batch[0].items)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.items)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            items = [item for request in batch for item in request.items]
+            try:
+                results = self.fn(items)
+            except Exception as e:
+                logger.exception("Batch of %d items failed", len(items))
+                for request in batch:
+                    request.error = e
+                    request.done.set()
+                continue
+
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["items"] += len(items)
+            offset = 0
+            for request in batch:
+                request.results = results[offset : offset + len(request.items)]
+                offset += len(request.items)
+                request.done.set()
+
+
+def create_embedder(model_name: str, onnx_options: Optional[dict] = None) -> Embedder:
+    """
+    Builds a local embedder for the server to host, on ONNX Runtime if
+    `onnx_options` are given.
+    """
+    if model_name == "BAAI/bge-m3" and onnx_options:
+        return OnnxBGEM3Embedder(model_name=model_name, **onnx_options)
+    if model_name == "BAAI/bge-m3":
+        return BGEM3Embedder()
+    if model_name == "hashing":
+        return HashingEmbedder()
+    if model_name.startswith("sentence-transformers/"):
+        return HuggingFaceEmbedder(model_name=model_name)
+    raise ValueError(
+        f"Unsupported embedding model for the inference server: {model_name}"
+    )
+
+
+class InferenceServer:
+    """
+    Hosts the models and their micro-batchers behind a threaded HTTP server.
+    Reranker models in `allowed_reranker_models` (and those loaded at startup)
+    are loaded on first request; any other model is rejected.
+    """
+
+    def __init__(
+        self,
+        embedding_model: str,
+        reranker_models: List[str],
+        host: str = "127.0.0.1",
+        port: int = 8600,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        embedding_onnx_options: Optional[dict] = None,
+        reranker_onnx_options: Optional[dict] = None,
+        allowed_reranker_models: Optional[List[str]] = None,
+    ) -> None:
+        self.embedding_model = embedding_model
+        self.allowed_reranker_models = set(reranker_models) | set(
+            allowed_reranker_models or []
+        )
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.reranker_onnx_options = reranker_onnx_options
+
+        logger.info("Loading embedding model %s", embedding_model)
+        self.embedder = create_embedder(embedding_model, embedding_onnx_options)
+        self.embed_batcher = MicroBatcher(
+            self._embed, max_batch_size, max_wait_ms, name="embed-batcher"
+        )
+        self._rerank_batchers: Dict[str, MicroBatcher] = {}
+        self._rerank_lock = threading.Lock()
+        for model_name in reranker_models:
+            self._rerank_batcher(model_name)
+
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+
+    def _embed(self, texts: List[str]) -> List[dict]:
+        chunks = [
+            Chunk(text=text, name=f"Text_{i}", data_type="query")
+            for i, text in enumerate(texts)
+        ]
+        batch = self.embedder(chunks)
+        results = []
+        for i in range(len(batch)):
+            sparse = batch.sparse_row(i)
+            results.append(
+                {
+                    "dense": base64.b64encode(batch.dense[i].tobytes()).decode(),
+                    "sparse": {
+                        "indices": list(sparse),
+                        "values": list(sparse.values()),
+                    },
+                }
+            )
+        return results
+
+    def _rerank_batcher(self, model_name: str) -> MicroBatcher:
+        with self._rerank_lock:
+            batcher = self._rerank_batchers.get(model_name)
+            if batcher is None:
+                if model_name not in self.allowed_reranker_models:
+                    raise ValueError(
+                        f"This server does not host the reranker {model_name}"
+                    )
+                logger.info("Loading reranker model %s", model_name)
+                if model_name == PassthroughReranker.model_name:
+                    reranker = PassthroughReranker()
+                # the LLM-based rerankers have no ONNX export and stay on torch
+                elif model_name in ONNX_RERANKERS and self.reranker_onnx_options:
+                    reranker = OnnxReranker(
+                        model_name=model_name, **self.reranker_onnx_options
+                    )
+                else:
+                    reranker = Reranker(model_name=model_name)
+                batcher = MicroBatcher(
+                    reranker.score_pairs,
+                    self.max_batch_size,
+                    self.max_wait_ms,
+                    name=f"rerank-batcher-{model_name}",
+                )
+                self._rerank_batchers[model_name] = batcher
+            return batcher
+
+    def info(self) -> dict:
+        return {
+            "embedding_model": self.embedding_model,
+            "embedding_dimension": self.embedder.embedding_dimension,
+            "sparse_dimension": self.embedder.sparse_dimension,
+            "reranker_models": sorted(self._rerank_batchers),
+            "allowed_reranker_models": sorted(self.allowed_reranker_models),
+            "batching": {
+                "embed": dict(self.embed_batcher.stats),
+                **{
+                    f"rerank:{name}": dict(batcher.stats)
+                    for name, batcher in self._rerank_batchers.items()
+                },
+            },
+        }
+
+    def embed(self, request: dict) -> dict:
+        if request.get("model", self.embedding_model) != self.embedding_model:
+            raise ValueError(
+                f"This server hosts {self.embedding_model}, not {request['model']}"
+            )
+        results = self.embed_batcher.submit(request["texts"])
+        return {
+            "dense": [result["dense"] for result in results],
+            "sparse": [result["sparse"] for result in results],
+        }
+
+    def rerank(self, request: dict) -> dict:
+        batcher = self._rerank_batcher(request["model"])
+        pairs = [(request["query"], document) for document in request["documents"]]
+        return {"scores": batcher.submit(pairs)}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args) -> None:
+                pass
+
+            def _send(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                if self.path.rstrip("/") in ("/info", "/healthz"):
+                    self._send(200, server.info())
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_POST(self) -> None:
+                routes = {"/embed": server.embed, "/rerank": server.rerank}
+                route = routes.get(self.path.rstrip("/"))
+                if route is None:
+                    self._send(404, {"error": "not found"})
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    self._send(200, route(json.loads(self.rfile.read(length))))
+                except (KeyError, ValueError) as e:
+                    self._send(400, {"error": str(e)})
+                except Exception as e:
+                    logger.exception("Inference request failed")
+                    self._send(500, {"error": str(e)})
+
+        return Handler
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self) -> None:
+        logger.info("Inference server listening on %s", self.url)
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def start(self) -> "InferenceServer":
+        """Serves on a daemon thread (for tests and benchmarks)."""
+        threading.Thread(
+            target=self._server.serve_forever, name="inference-server", daemon=True
+        ).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--embedding-model", default="BAAI/bge-m3")
+    parser.add_argument(
+        "--reranker-model",
+        dest="reranker_models",
+        action="append",
+        default=None,
+        help="Reranker to load at startup (repeatable); others load on first use",
+    )
+    parser.add_argument(
+        "--config",
+        default=DEFAULT_CONFIG_PATH,
+        help="System config whose rag_params.supported_rerankers may be served",
+    )
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS)
+    parser.add_argument("--embedding-backend", choices=BACKENDS, default=TORCH_BACKEND)
+    parser.add_argument("--reranker-backend", choices=BACKENDS, default=TORCH_BACKEND)
+    parser.add_argument("--onnx-cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--intra-op-threads", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    def onnx_options(backend: str) -> Optional[dict]:
+        if backend == TORCH_BACKEND:
+            return None
+        return {
+            "quantize": backend == ONNX_INT8_BACKEND,
+            "cache_dir": args.onnx_cache_dir,
+            "intra_op_threads": args.intra_op_threads,
+        }
+
+    logging.basicConfig(level=logging.INFO)
+    InferenceServer(
+        embedding_model=args.embedding_model,
+        reranker_models=args.reranker_models or ["BAAI/bge-reranker-v2-m3"],
+        host=args.host,
+        port=args.port,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        embedding_onnx_options=onnx_options(args.embedding_backend),
+        reranker_onnx_options=onnx_options(args.reranker_backend),
+        allowed_reranker_models=configured_rerankers(args.config),
+    ).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+"""
+ONNX Runtime CPU backend for BGE-M3 and the XLM-RoBERTa bge rerankers.
+
+On first use, each model is exported from its Hugging Face weights to ONNX
+and, for the "onnx-int8" backend, dynamically quantized to int8 weights.
+The files are cached in `cache_dir` and reused across processes. The
+sessions run on the CPU execution provider with all graph optimizations
+and an intra-op thread pool sized to the CPUs this process may use.
+
+The backend is selected per model under `cpu_inference.backends` in
+system_config.yaml. To check a quantized model against the fp32 PyTorch
+one, run `python -m benchmarks.onnx_validation`.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import onnxruntime as ort
+import torch
+from huggingface_hub import hf_hub_download
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from orchestrator.utils import available_cpus
+from transformers import AutoModel, AutoModelForSequenceClassification, AutoTokenizer
+
+from .chunking import Chunk
+from .embedding import Embedder, EmbeddingBatch, sparse_matrix
+from .reranker import rerank_by_scores
+
+logger = logging.getLogger(__name__)
+
+TORCH_BACKEND = "torch"
+ONNX_BACKEND = "onnx"
+ONNX_INT8_BACKEND = "onnx-int8"
+BACKENDS = (TORCH_BACKEND, ONNX_BACKEND, ONNX_INT8_BACKEND)
+
+DEFAULT_CACHE_DIR = "vectorstore/cache/onnx"
+# cross-encoders with an XLM-RoBERTa classification head; the LLM-based
+# rerankers (gemma, minicpm) cannot be exported this way
+ONNX_RERANKERS = [
+    "BAAI/bge-reranker-v2-m3",
+    "BAAI/bge-reranker-base",
+    "BAAI/bge-reranker-large",
+]
+ONNX_EMBEDDERS = ["BAAI/bge-m3"]
+
+_export_lock = threading.Lock()
+
+
+def create_session(
+    path: str, intra_op_threads: Optional[int] = None
+) -> ort.InferenceSession:
+    """
+    Opens an ONNX model for CPU inference.
+
+    Args:
+        path (str): Path of the .onnx file.
+        intra_op_threads (int, optional): Threads per operator. Defaults to
+            the CPUs available to the process.
+    """
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.intra_op_num_threads = intra_op_threads or available_cpus()
+    # a single request runs one graph at a time, so parallelism lives inside ops
+    options.inter_op_num_threads = 1
+    return ort.InferenceSession(
+        path, sess_options=options, providers=["CPUExecutionProvider"]
+    )
+
+
+class _BGEM3Graph(torch.nn.Module):
+    """
+    BGE-M3 dense and sparse heads in one graph: the normalized CLS vector
+    and the ReLU token weights of the sparse linear layer.
+    """
+
+    def __init__(self, model_name: str) -> None:
+        super().__init__()
+        self.model = AutoModel.from_pretrained(model_name)
+        self.sparse_linear = torch.nn.Linear(self.model.config.hidden_size, 1)
+        self.sparse_linear.load_state_dict(
+            torch.load(
+                hf_hub_download(model_name, "sparse_linear.pt"), map_location="cpu"
+            )
+        )
+
+    def forward(self, input_ids, attention_mask):
+        hidden = self.model(
+            input_ids=input_ids, attention_mask=attention_mask
+        ).last_hidden_state
+        dense = torch.nn.functional.normalize(hidden[:, 0], dim=-1)
+        token_weights = torch.relu(self.sparse_linear(hidden)).squeeze(-1)
+        return dense, token_weights
+
+
+class _RerankerGraph(torch.nn.Module):
+    def __init__(self, model_name: str) -> None:
+        super().__init__()
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask).logits[
+            :, 0
+        ]
+
+
+def _export(graph: torch.nn.Module, tokenizer, path: str) -> None:
+    sample = tokenizer(["warm-up"], return_tensors="pt")
+    graph.eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            graph,
+            (sample["input_ids"], sample["attention_mask"]),
+            path,
+            input_names=["input_ids", "attention_mask"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+            },
+            opset_version=17,
+        )
+
+
+def onnx_model_path(
+    model_name: str, kind: str, quantize: bool, cache_dir: str = DEFAULT_CACHE_DIR
+) -> str:
+    """
+    Returns the cached ONNX file for a model, exporting (and quantizing) it
+    first if needed.
+
+    Args:
+        model_name (str): Hugging Face model name.
+        kind (str): "embedder" or "reranker".
+        quantize (bool): Whether to return the dynamically int8-quantized model.
+        cache_dir (str): Where exported models are kept.
+    """
+    model_dir = os.path.join(
+        os.path.expanduser(cache_dir), model_name.replace("/", "--")
+    )
+    fp32_path = os.path.join(model_dir, "model.onnx")
+    int8_path = os.path.join(model_dir, "model.int8.onnx")
+    path = int8_path if quantize else fp32_path
+
+    with _export_lock:
+        if os.path.exists(path):
+            return path
+        os.makedirs(model_dir, exist_ok=True)
+
+        if not os.path.exists(fp32_path):
+            logger.info("Exporting %s to ONNX", model_name)
+            tokenizer = AutoTokenizer.from_pretrained(model_name)
+            graph = (
+                _BGEM3Graph(model_name)
+                if kind == "embedder"
+                else _RerankerGraph(model_name)
+            )
+            # export to a temporary directory and move into place, so other
+            # processes never see a partial file; weights above 2GB (BGE-M3)
+            # are written next to the graph as external data
+            with tempfile.TemporaryDirectory(dir=model_dir) as tmp:
+                _export(graph, tokenizer, os.path.join(tmp, "model.onnx"))
+                for name in os.listdir(tmp):
+                    os.replace(os.path.join(tmp, name), os.path.join(model_dir, name))
+
+        if quantize:
+            logger.info("Quantizing %s to int8", model_name)
+            tmp_path = int8_path + ".tmp"
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, int8_path)
+
+    return path
+
+
+class OnnxBGEM3Embedder(Embedder):
+    """
+    BGE-M3 dense and sparse embeddings on ONNX Runtime.
+
+    Produces the same outputs as BGEM3Embedder: a unit-norm dense vector and
+    a sparse token-weight vector keyed by token id (the maximum weight of each
+    token, without special tokens).
+    """
+
+    def __init__(
+        self,
+        model_name: str = "BAAI/bge-m3",
+        quantize: bool = True,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        intra_op_threads: Optional[int] = None,
+        batch_size: int = 16,
+        max_length: int = 8192,
+    ):
+        """
+        Args:
+            model_name (str): The BGE-M3 model to export.
+            quantize (bool): Use dynamic int8 quantization.
+            cache_dir (str): Where exported models are kept.
+            intra_op_threads (int, optional): Threads per operator.
+            batch_size (int): Texts per forward pass.
+            max_length (int): Maximum tokens per text.
+        """
+        super().__init__()
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.session = create_session(
+            onnx_model_path(model_name, "embedder", quantize, cache_dir),
+            intra_op_threads,
+        )
+        self.embedding_dimension = self.session.get_outputs()[0].shape[-1]
+        self.sparse_dimension = len(self.tokenizer)
+        self._special_ids = set(self.tokenizer.all_special_ids)
+
+    def _sparse(self, input_ids: np.ndarray, weights: np.ndarray) -> Dict[int, float]:
+        sparse: Dict[int, float] = {}
+        for token_id, weight in zip(input_ids.tolist(), weights.tolist()):
+            if token_id in self._special_ids or weight <= 0:
+                continue
+            if weight > sparse.get(token_id, 0.0):
+                sparse[token_id] = weight
+        return sparse
+
+    def __call__(self, chunks: List[Chunk]) -> EmbeddingBatch:
+        """
+        Embed a list of text chunks with the ONNX model.
+
+        Args:
+            chunks (List[Chunk]): List of Chunk objects to be embedded.
+
+        Returns:
+            EmbeddingBatch: The dense and sparse vectors of all chunks, in order.
+        """
+        docs = [chunk.text for chunk in chunks]
+        order = sorted(range(len(docs)), key=lambda i: len(docs[i]))
+        dense = np.empty((len(docs), self.embedding_dimension), dtype=np.float32)
+        sparse: List[Dict[int, float]] = [{}] * len(docs)
+
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start : start + self.batch_size]
+            tokens = self.tokenizer(
+                [docs[i] for i in batch],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            batch_dense, token_weights = self.session.run(
+                None,
+                {
+                    "input_ids": tokens["input_ids"].astype(np.int64),
+                    "attention_mask": tokens["attention_mask"].astype(np.int64),
+                },
+            )
+            dense[batch] = batch_dense
+            for row, i in enumerate(batch):
+                mask = tokens["attention_mask"][row].astype(bool)
+                sparse[i] = self._sparse(
+                    tokens["input_ids"][row][mask], token_weights[row][mask]
+                )
+
+        return EmbeddingBatch.from_chunks(
+            chunks, dense=dense, sparse=sparse_matrix(sparse, self.sparse_dimension)
+        )
+
+
+class OnnxReranker:
+    """
+    bge cross-encoder reranker on ONNX Runtime, with the same interface and
+    scores (sigmoid of the logit when normalize is set) as Reranker.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "BAAI/bge-reranker-v2-m3",
+        quantize: bool = True,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        intra_op_threads: Optional[int] = None,
+        batch_size: int = 32,
+        normalize: bool = True,
+        max_length: int = 512,
+    ):
+        """
+        Args:
+            model_name: The bge reranker to export (see ONNX_RERANKERS)
+            quantize: Use dynamic int8 quantization
+            cache_dir: Where exported models are kept
+            intra_op_threads: Threads per operator
+            batch_size: Pairs per forward pass
+            normalize: Map scores to [0, 1] with a sigmoid
+            max_length: Maximum tokens per (query, document) pair
+        """
+        if model_name not in ONNX_RERANKERS:
+            raise ValueError(f"No ONNX backend for reranker {model_name}")
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.normalize = normalize
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.session = create_session(
+            onnx_model_path(model_name, "reranker", quantize, cache_dir),
+            intra_op_threads,
+        )
+
+    def score_pairs(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """
+        Score (query, document) pairs with the cross-encoder.
+
+        Args:
+            pairs: List of (query, document) tuples
+
+        Returns:
+            List of relevance scores, one per pair
+        """
+        scores = []
+        for start in range(0, len(pairs), self.batch_size):
+            batch = pairs[start : start + self.batch_size]
+            tokens = self.tokenizer(
+                [query for query, _ in batch],
+                [document for _, document in batch],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            (logits,) = self.session.run(
+                None,
+                {
+                    "input_ids": tokens["input_ids"].astype(np.int64),
+                    "attention_mask": tokens["attention_mask"].astype(np.int64),
+                },
+            )
+            if self.normalize:
+                logits = 1 / (1 + np.exp(-logits))
+            scores.extend(float(score) for score in logits)
+        return scores
+
+    def rerank(self, query: str, results: List[Any], top_k: int = 10) -> List[Any]:
+        """
+        Rerank SearchResult objects.
+
+        Args:
+            query: The search query string
+            results: List of SearchResult objects to rerank
+            top_k: Number of top results to return
+
+        Returns:
+            List of reranked SearchResult objects
+        """
+        if not results:
+            return []
+        scores = self.score_pairs([(query, result.document) for result in results])
+        return rerank_by_scores(results, scores, top_k)
+
+
+def _sparse_cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    dot = sum(weight * b.get(key, 0.0) for key, weight in a.items())
+    norm = np.sqrt(sum(w * w for w in a.values()) * sum(w * w for w in b.values()))
+    return float(dot / norm) if norm else 1.0
+
+
+def compare_embeddings(
+    reference: EmbeddingBatch, candidate: EmbeddingBatch
+) -> Dict[str, float]:
+    """
+    Agreement of candidate embeddings with reference (fp32) embeddings:
+    cosine similarity of the dense vectors and of the sparse vectors.
+    """
+    dense, sparse = [], []
+    for i in range(len(reference)):
+        a = reference.dense[i].astype(np.float64)
+        b = candidate.dense[i].astype(np.float64)
+        dense.append(float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b))))
+        sparse.append(_sparse_cosine(reference.sparse_row(i), candidate.sparse_row(i)))
+    return {
+        "dense_cosine_mean": float(np.mean(dense)),
+        "dense_cosine_min": float(np.min(dense)),
+        "sparse_cosine_mean": float(np.mean(sparse)),
+        "sparse_cosine_min": float(np.min(sparse)),
+    }
+
+
+def _ranks(scores: np.ndarray) -> np.ndarray:
+    ranks = np.empty(len(scores))
+    ranks[np.argsort(-scores)] = np.arange(len(scores))
+    return ranks
+
+
+def compare_rankings(
+    reference: List[List[float]], candidate: List[List[float]], k: int = 5
+) -> Dict[str, float]:
+    """
+    Agreement of candidate reranker scores with reference (fp32) scores, per
+    query: Spearman rank correlation, top-1 agreement, top-k overlap and the
+    largest absolute score difference.
+    """
+    spearman, top1, overlap, max_diff = [], [], [], 0.0
+    for ref, cand in zip(reference, candidate):
+        ref, cand = np.asarray(ref), np.asarray(cand)
+        if len(ref) > 1:
+            spearman.append(float(np.corrcoef(_ranks(ref), _ranks(cand))[0, 1]))
+        top1.append(float(np.argmax(ref) == np.argmax(cand)))
+        ref_top = set(np.argsort(-ref)[:k].tolist())
+        cand_top = set(np.argsort(-cand)[:k].tolist())
+        overlap.append(len(ref_top & cand_top) / len(ref_top))
+        max_diff = max(max_diff, float(np.max(np.abs(ref - cand))))
+    return {
+        "spearman_mean": float(np.mean(spearman)) if spearman else 1.0,
+        "spearman_min": float(np.min(spearman)) if spearman else 1.0,
+        "top1_agreement": float(np.mean(top1)),
+        f"top{k}_overlap": float(np.mean(overlap)),
+        "max_abs_score_diff": max_diff,
+    }
@@ -1,5 +1,6 @@
 import torch
 from typing import Optional, List, Dict, Any, Tuple
+from models.http_client import EndpointPolicy, get_http_client
 from pymilvus.model.reranker import BGERerankFunction
 
 
@@ -101,3 +102,124 @@ class Reranker:
             )
 
         return reranked_results
+
+    def score_pairs(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """
+        Score (query, document) pairs with the cross-encoder.
+
+        Unlike rerank, the pairs may belong to different queries, which lets
+        the inference server batch concurrent rerank requests together.
+
+        Args:
+            pairs: List of (query, document) tuples
+
+        Returns:
+            List of relevance scores, one per pair
+        """
+        scores = []
+        for start in range(0, len(pairs), self.batch_size):
+            batch = [list(pair) for pair in pairs[start : start + self.batch_size]]
+            batch_scores = self.reranker.reranker.compute_score(
+                batch, normalize=self.normalize
+            )
+            # a single pair is scored as a bare float
+            if not isinstance(batch_scores, list):
+                batch_scores = [batch_scores]
+            scores.extend(float(score) for score in batch_scores)
+        return scores
+
+
+def rerank_by_scores(results: List[Any], scores: List[float], top_k: int) -> List[Any]:
+    """
+    Orders SearchResult objects by score (highest first) and stores each
+    score in the result's distance field, as Reranker.rerank does.
+    """
+    order = sorted(range(len(results)), key=lambda i: scores[i], reverse=True)
+    return [
+        type(results[i])(
+            id=results[i].id,
+            distance=float(scores[i]),
+            metadata=results[i].metadata,
+            document=results[i].document,
+            embedding=results[i].embedding,
+        )
+        for i in order[:top_k]
+    ]
+
+
+class PassthroughReranker:
+    """
+    A reranker that keeps the vector store's order. Used when no cross-encoder
+    should be loaded, e.g. in offline benchmarks.
+    """
+
+    model_name = "passthrough"
+
+    def rerank(self, query: str, results: List[Any], top_k: int = 10) -> List[Any]:
+        """
+        Return the first top_k SearchResult objects unchanged.
+
+        Args:
+            query: The search query string (unused)
+            results: List of SearchResult objects to rerank
+            top_k: Number of top results to return
+
+        Returns:
+            List of SearchResult objects
+        """
+        return results[:top_k]
+
+    def score_pairs(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """
+        Equal scores for every pair, so a stable sort keeps the original order.
+        """
+        return [0.0] * len(pairs)
+
+
+class RemoteReranker:
+    """
+    Reranks through the shared inference server (ingestion/inference_server.py),
+    so UI replicas do not each hold a copy of the cross-encoder.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        model_name: str = "BAAI/bge-reranker-v2-m3",
+        policy: Optional[EndpointPolicy] = None,
+    ):
+        """
+        Args:
+            endpoint: Base URL of the inference server
+            model_name: The reranker model the server should use
+            policy: The configured HTTP client settings
+        """
+        self.endpoint = endpoint.rstrip("/")
+        self.model_name = model_name
+        self.client = get_http_client(self.endpoint, policy)
+
+    def rerank(self, query: str, results: List[Any], top_k: int = 10) -> List[Any]:
+        """
+        Rerank SearchResult objects with scores computed on the server.
+
+        Args:
+            query: The search query string
+            results: List of SearchResult objects to rerank
+            top_k: Number of top results to return
+
+        Returns:
+            List of reranked SearchResult objects
+        """
+        if not results:
+            return []
+
+        response = self.client.post(
+            f"{self.endpoint}/rerank",
+            json={
+                "model": self.model_name,
+                "query": query,
+                "documents": [result.document for result in results],
+            },
+        )
+        response.raise_for_status()
+        return rerank_by_scores(results, response.json()["scores"], top_k)
@@ -0,0 +1,432 @@
+"""
+Compressed dense vectors with exact rescoring.
+
+A CompressedIndex keeps only compact codes of the dense vectors in memory and
+the full-precision float32 vectors in a file on disk. A search scores every
+code for a coarse first pass, then rescores the best `rescore_multiplier *
+top_k` candidates exactly against the full-precision vectors read from disk.
+
+Compressors (bytes per 1024-d vector; float32 is 4096):
+    pca     learned projection to `dimension` components, stored as float16
+            (512 bytes at 256 components)
+    truncate  the first `dimension` components, renormalized (Matryoshka
+            style; only meaningful for models trained for it), float16
+    int8    per-dimension symmetric scalar quantization (1024 bytes)
+    binary  one sign bit per dimension after centering (128 bytes)
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# rows scored per block in the coarse pass, to bound temporary memory
+SCORE_BLOCK_ROWS = 16384
+COMPRESSION_METHODS = ("pca", "truncate", "int8", "binary")
+
+
+class Compressor(ABC):
+    """
+    Encodes dense vectors into compact codes and scores queries against them.
+    Scores only need to rank vectors like the inner product does.
+    """
+
+    name: str
+
+    def fit(self, vectors: np.ndarray) -> None:
+        """Learns the encoding parameters from a sample of vectors."""
+
+    @property
+    def fitted(self) -> bool:
+        return True
+
+    @abstractmethod
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        pass
+
+    @abstractmethod
+    def score(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Returns approximate (queries x codes) inner-product scores."""
+
+    @abstractmethod
+    def bytes_per_vector(self, dimension: int) -> int:
+        pass
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        pass
+
+
+class PCACompressor(Compressor):
+    """
+    Projects vectors onto their top `dimension` principal components.
+    With `learned=False` the first `dimension` coordinates are kept instead
+    (Matryoshka truncation).
+    """
+
+    def __init__(self, dimension: int = 256, learned: bool = True) -> None:
+        self.dimension = dimension
+        self.learned = learned
+        self.name = "pca" if learned else "truncate"
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+
+    @property
+    def fitted(self) -> bool:
+        return self.components is not None or not self.learned
+
+    def fit(self, vectors: np.ndarray) -> None:
+        if not self.learned:
+            return
+        self.mean = vectors.mean(axis=0)
+        _, _, vt = np.linalg.svd(vectors - self.mean, full_matrices=False)
+        self.components = vt[: self.dimension].astype(np.float32)
+
+    def _project(self, vectors: np.ndarray) -> np.ndarray:
+        if not self.learned:
+            truncated = vectors[:, : self.dimension]
+            norms = np.linalg.norm(truncated, axis=1, keepdims=True)
+            return truncated / np.maximum(norms, 1e-12)
+        return (vectors - self.mean) @ self.components.T
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return self._project(vectors).astype(np.float16)
+
+    def score(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        return self._project(queries).astype(np.float32) @ codes.astype(np.float32).T
+
+    def bytes_per_vector(self, dimension: int) -> int:
+        return 2 * min(self.dimension, dimension)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        if not self.learned:
+            return {}
+        return {"mean": self.mean, "components": self.components}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        if self.learned:
+            self.mean = state["mean"]
+            self.components = state["components"]
+
+
+class Int8Compressor(Compressor):
+    """
+    Symmetric per-dimension int8 quantization; the scale of each dimension
+    is its largest absolute value in the training sample.
+    """
+
+    name = "int8"
+
+    def __init__(self) -> None:
+        self.scale: Optional[np.ndarray] = None
+
+    @property
+    def fitted(self) -> bool:
+        return self.scale is not None
+
+    def fit(self, vectors: np.ndarray) -> None:
+        self.scale = (np.abs(vectors).max(axis=0) / 127).astype(np.float32)
+        self.scale[self.scale == 0] = 1.0
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.clip(np.rint(vectors / self.scale), -127, 127).astype(np.int8)
+
+    def score(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        return (queries * self.scale) @ codes.astype(np.float32).T
+
+    def bytes_per_vector(self, dimension: int) -> int:
+        return dimension
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"scale": self.scale}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        self.scale = state["scale"]
+
+
+class BinaryCompressor(Compressor):
+    """
+    One bit per dimension: the sign of the vector after subtracting the
+    training mean. Queries are scored asymmetrically (the float query
+    against the +-1 code), which ranks better than Hamming distance.
+    """
+
+    name = "binary"
+
+    def __init__(self) -> None:
+        self.mean: Optional[np.ndarray] = None
+
+    @property
+    def fitted(self) -> bool:
+        return self.mean is not None
+
+    def fit(self, vectors: np.ndarray) -> None:
+        self.mean = vectors.mean(axis=0).astype(np.float32)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.packbits(vectors > self.mean, axis=1)
+
+    def score(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        dimension = len(self.mean)
+        bits = np.unpackbits(codes, axis=1, count=dimension).astype(np.float32)
+        centered = queries - self.mean
+        # q . (2 * bits - 1)
+        return 2 * centered @ bits.T - centered.sum(axis=1, keepdims=True)
+
+    def bytes_per_vector(self, dimension: int) -> int:
+        return (dimension + 7) // 8
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"mean": self.mean}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        self.mean = state["mean"]
+
+
+def create_compressor(method: str, dimension: int = 256) -> Compressor:
+    """
+    Args:
+        method (str): One of COMPRESSION_METHODS.
+        dimension (int): Output dimension for "pca" and "truncate".
+    """
+    if method == "pca":
+        return PCACompressor(dimension, learned=True)
+    if method == "truncate":
+        return PCACompressor(dimension, learned=False)
+    if method == "int8":
+        return Int8Compressor()
+    if method == "binary":
+        return BinaryCompressor()
+    raise ValueError(f"Unsupported compression method: {method}")
+
+
+class CompressedIndex:
+    """
+    Exact-rescored search over compressed dense vectors.
+
+    The codes, the ids and a live-row mask are kept in memory; the
+    full-precision vectors are appended to `path`/vectors.f32 and read back
+    through a memory map for rescoring. The compressor is fitted once
+    `training_size` vectors have been added; until then (and for rows added
+    since the last encoding) vectors are scored exactly. If `path` is None
+    the full-precision vectors are kept in memory (for benchmarks).
+    """
+
+    def __init__(
+        self,
+        compressor: Compressor,
+        path: Optional[str] = None,
+        rescore_multiplier: int = 4,
+        training_size: int = 10000,
+    ) -> None:
+        self.compressor = compressor
+        self.path = path
+        self.rescore_multiplier = rescore_multiplier
+        self.training_size = training_size
+        self.dimension: Optional[int] = None
+        self.ids: List[str] = []
+        # codes of rows [0, len(codes)); later rows are scored exactly
+        self.codes: Optional[np.ndarray] = None
+        self.alive = np.zeros(0, dtype=bool)
+        self._row: Dict[str, int] = {}
+        self._vectors: Optional[np.ndarray] = None
+        self._lock = threading.RLock()
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            self._load()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _load(self) -> None:
+        if not os.path.exists(self._file("index.json")):
+            return
+        with open(self._file("index.json")) as f:
+            meta = json.load(f)
+        if meta["method"] != self.compressor.name:
+            logger.warning(
+                "Compressed index at %s uses %s, not %s; rebuilding it",
+                self.path,
+                meta["method"],
+                self.compressor.name,
+            )
+            self.clear()
+            return
+        self.dimension = meta["dimension"]
+        with open(self._file("ids.txt")) as f:
+            self.ids = f.read().splitlines()
+        self.alive = np.load(self._file("alive.npy"))
+        self._row = {id: row for row, id in enumerate(self.ids) if self.alive[row]}
+        if meta["fitted"]:
+            state = np.load(self._file("compressor.npz"))
+            self.compressor.load_state({key: state[key] for key in state.files})
+        if self.compressor.fitted and self.ids:
+            self.codes = self._encode_all()
+
+    def _save_meta(self) -> None:
+        if self.path is None:
+            return
+        fitted = self.codes is not None
+        with open(self._file("index.json"), "w") as f:
+            json.dump(
+                {
+                    "method": self.compressor.name,
+                    "dimension": self.dimension,
+                    "fitted": fitted,
+                },
+                f,
+            )
+        np.save(self._file("alive.npy"), self.alive)
+        if fitted:
+            np.savez(self._file("compressor.npz"), **self.compressor.state())
+
+    def _full_vectors(self) -> np.ndarray:
+        if self.path is None:
+            return self._vectors
+        return np.memmap(
+            self._file("vectors.f32"),
+            dtype=np.float32,
+            mode="r",
+            shape=(len(self.ids), self.dimension),
+        )
+
+    def _encode_all(self) -> np.ndarray:
+        # block by block, so the full-precision file is never read at once
+        full = self._full_vectors()
+        return np.concatenate(
+            [
+                self.compressor.encode(
+                    np.asarray(full[start : start + SCORE_BLOCK_ROWS])
+                )
+                for start in range(0, len(full), SCORE_BLOCK_ROWS)
+            ]
+        )
+
+    def __len__(self) -> int:
+        return int(self.alive.sum())
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """
+        Appends vectors; an id that is already present is replaced.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        ids = list(ids)
+        with self._lock:
+            self.dimension = vectors.shape[1]
+            for id in ids:
+                old = self._row.get(id)
+                if old is not None:
+                    self.alive[old] = False
+            self._row.update({id: len(self.ids) + i for i, id in enumerate(ids)})
+            self.ids.extend(ids)
+            self.alive = np.concatenate([self.alive, np.ones(len(ids), dtype=bool)])
+
+            if self.path is None:
+                self._vectors = (
+                    vectors
+                    if self._vectors is None
+                    else np.concatenate([self._vectors, vectors])
+                )
+            else:
+                with open(self._file("vectors.f32"), "ab") as f:
+                    f.write(vectors.tobytes())
+                with open(self._file("ids.txt"), "a") as f:
+                    f.write("".join(f"{id}\n" for id in ids))
+
+            if self.codes is not None:
+                self.codes = np.concatenate(
+                    [self.codes, self.compressor.encode(vectors)]
+                )
+            elif self.compressor.fitted or len(self.ids) >= self.training_size:
+                full = self._full_vectors()
+                if not self.compressor.fitted:
+                    self.compressor.fit(np.asarray(full[: self.training_size]))
+                self.codes = self._encode_all()
+            self._save_meta()
+
+    def delete(self, ids: Sequence[str]) -> None:
+        with self._lock:
+            for id in ids:
+                row = self._row.pop(id, None)
+                if row is not None:
+                    self.alive[row] = False
+            self._save_meta()
+
+    def clear(self) -> None:
+        with self._lock:
+            self.ids, self._row = [], {}
+            self.codes, self._vectors = None, None
+            self.alive = np.zeros(0, dtype=bool)
+            if self.path is not None:
+                shutil.rmtree(self.path, ignore_errors=True)
+                os.makedirs(self.path, exist_ok=True)
+
+    def _coarse(self, queries: np.ndarray, candidates: int) -> List[np.ndarray]:
+        """Rows of the best `candidates` codes per query."""
+        best = [np.zeros(0, dtype=np.int64) for _ in queries]
+        best_scores = [np.zeros(0, dtype=np.float32) for _ in queries]
+        for start in range(0, len(self.codes), SCORE_BLOCK_ROWS):
+            end = min(start + SCORE_BLOCK_ROWS, len(self.codes))
+            scores = self.compressor.score(queries, self.codes[start:end])
+            scores[:, ~self.alive[start:end]] = -np.inf
+            for q in range(len(queries)):
+                merged = np.concatenate([best_scores[q], scores[q]])
+                rows = np.concatenate([best[q], np.arange(start, end)])
+                if len(merged) > candidates:
+                    keep = np.argpartition(-merged, candidates - 1)[:candidates]
+                    merged, rows = merged[keep], rows[keep]
+                best_scores[q], best[q] = merged, rows
+        return [rows[np.isfinite(s)] for rows, s in zip(best, best_scores)]
+
+    def search(
+        self, queries: np.ndarray, top_k: int
+    ) -> List[List[Tuple[str, float, np.ndarray]]]:
+        """
+        Returns the (id, exact inner product, full-precision vector) of the
+        `top_k` best vectors per query.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        with self._lock:
+            if not self.ids:
+                return [[] for _ in queries]
+            full = self._full_vectors()
+            coded = 0 if self.codes is None else len(self.codes)
+            # rows without codes yet are always rescored
+            uncoded = np.arange(coded, len(self.ids))
+            uncoded = uncoded[self.alive[coded:]]
+            coarse = (
+                self._coarse(queries, top_k * self.rescore_multiplier)
+                if coded
+                else [np.zeros(0, dtype=np.int64) for _ in queries]
+            )
+
+            results = []
+            for q, rows in enumerate(coarse):
+                rows = np.sort(np.concatenate([rows, uncoded]))  # sequential reads
+                vectors = np.asarray(full[rows])
+                scores = vectors @ queries[q]
+                order = np.argsort(-scores)[:top_k]
+                results.append(
+                    [(self.ids[rows[i]], float(scores[i]), vectors[i]) for i in order]
+                )
+        return results
+
+    def stats(self) -> Dict[str, float]:
+        """Memory of the codes compared with the float32 vectors."""
+        dimension = self.dimension or 0
+        code_bytes = self.compressor.bytes_per_vector(dimension)
+        return {
+            "method": self.compressor.name,
+            "vectors": len(self),
+            "bytes_per_vector": code_bytes,
+            "compression_ratio": 4 * dimension / code_bytes if code_bytes else 0.0,
+        }
@@ -3,7 +3,7 @@ import os
 import random
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Any, Callable, List, Mapping, Optional, Set
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set
 
 import chromadb
 import numpy as np
@@ -21,11 +21,15 @@ from pymilvus import (
     utility,
 )
 
-from .embedding import Embedding, BGEM3Embedder
+from .embedding import Embedding, EmbeddingBatch, BGEM3Embedder
+from .vector_compression import CompressedIndex
 
 # Get a logger for this module.
 logger = logging.getLogger(__name__)
 
+# first and last source page of a chunk, when extracted page by page
+PAGE_FIELDS = ("first_page", "last_page")
+
 
 @dataclass
 class SearchResult:
@@ -43,14 +47,15 @@ class VectorDB(ABC):
 
     @abstractmethod
     def insert(
-        self, embedding: Embedding, metadatum: Optional[List[dict]] = None
+        self, embeddings: EmbeddingBatch, metadatum: Optional[List[dict]] = None
     ) -> None:
         """
         Insert embeddings into the vector database.
 
 
         Args:
-            embedding (Embedding): Embedding object to insert.
+            embeddings (EmbeddingBatch): The embeddings to insert (a list of
+                Embedding objects is also accepted).
             metadatum (Optional[List[dict]]): Optional metadata list.
         """
         pass
@@ -113,6 +118,8 @@ class ChromaDB(VectorDB):
     Concrete implementation of VectorDB using Chroma.
     """
 
+    MAX_BATCH_SIZE = 5000
+
     def __init__(
         self,
         collection_name: str,
@@ -129,36 +136,33 @@ class ChromaDB(VectorDB):
         self.collection = self.client.get_or_create_collection(name=collection_name)
 
     def insert(
-        self, embeddings: List[Embedding], metadatum: Optional[List[dict]] = None
+        self, embeddings: EmbeddingBatch, metadatum: Optional[List[dict]] = None
     ) -> None:
         """
-        Insert an aggregated Embedding into the Chroma collection.
-        """
-        # Expecting aggregated embedding with:
-        #   embedding.name -> list of IDs
-        #   embedding.docs -> list of document texts
-        #   embedding.dense_vector -> 2D numpy array (one row per document)
-        documents = [embedding.docs for embedding in embeddings]
-        ids = [embedding.name for embedding in embeddings]
-        # Convert each dense vector row into a list.
-        vectors = [embedding.dense_vector.tolist() for embedding in embeddings]
-        self.collection.add(
-            ids=ids,
-            embeddings=vectors,
-            documents=documents,
-            metadatum=metadatum,
-        )
+        Insert a batch of embeddings into the Chroma collection.
+        """
+        batch = EmbeddingBatch.from_embeddings(embeddings)
+        # Chroma rejects adds above its max batch size; the dense matrix is
+        # passed as float32 row views without converting to Python lists
+        for start in range(0, len(batch), self.MAX_BATCH_SIZE):
+            end = start + self.MAX_BATCH_SIZE
+            self.collection.add(
+                ids=batch.ids[start:end],
+                embeddings=batch.dense[start:end],
+                documents=batch.texts[start:end],
+                metadatas=metadatum[start:end] if metadatum else None,
+            )
 
     def search(
         self,
-        query_embeddings: List[Embedding],
+        query_embeddings: EmbeddingBatch,
         top_k: int = 5,
         keywords: Optional[List[str]] = None,
         filenames: Optional[List[str]] = None,
         hybrid_weighting: float = 0.5,
     ) -> List[List[SearchResult]]:
         """
-        Process query strings internally to compute embeddings, then perform the search.
+        Search the collection with the dense query embeddings.
         """
         where_document = None
         if keywords:
@@ -168,16 +172,14 @@ class ChromaDB(VectorDB):
                 where_document = {"$contains": keywords[0]}
         where = {"source": {"$in": filenames}} if filenames else None
 
-        dense_vectors = [
-            embedding.dense_vector.tolist() for embedding in query_embeddings
-        ]
+        dense_vectors = EmbeddingBatch.from_embeddings(query_embeddings).dense
 
         results = self.collection.query(
             query_embeddings=dense_vectors,
             n_results=top_k,
             where=where,
             where_document=where_document,
-            include=["documents", "embeddings", "metadatum", "distances"],
+            include=["documents", "embeddings", "metadatas", "distances"],
         )
 
         all_results = []
@@ -193,7 +195,7 @@ class ChromaDB(VectorDB):
                 for _id, distance, metadata, document, embedding in zip(
                     results["ids"][i],
                     results["distances"][i],
-                    results["metadatum"][i],
+                    results["metadatas"][i],
                     results["documents"][i],
                     results["embeddings"][i],
                 )
@@ -224,6 +226,21 @@ class ChromaDB(VectorDB):
             [metadata["source"] for metadata in self.collection.get()["metadatas"]]
         )
 
+    def get_documents(self, ids: List[str]) -> Dict[str, SearchResult]:
+        """
+        Fetches the documents and metadata stored under the given IDs, keyed
+        by ID. The distance and embedding fields are left empty.
+        """
+        results = self.collection.get(ids=ids, include=["documents", "metadatas"])
+        return {
+            _id: SearchResult(
+                id=_id, distance=0.0, metadata=metadata, document=document, embedding=[]
+            )
+            for _id, document, metadata in zip(
+                results["ids"], results["documents"], results["metadatas"]
+            )
+        }
+
     def clear(self) -> None:
         """
         Clear all records from the collection.
@@ -240,9 +257,14 @@ class MilvusDB(VectorDB):
     The collection schema is always:
         - id (VARCHAR primary key)
         - text (VARCHAR)
+        - filename (VARCHAR)
+        - first_page, last_page (INT64, 0 if unknown)
         - sparse_vector (SPARSE_FLOAT_VECTOR)
         - dense_vector (FLOAT_VECTOR)
 
+    Collections created before the page fields were added keep working
+    without them; their chunks have no page range.
+
     When if_hybrid_search is True, the sparse vector is computed via BGEM3 and used during search.
     Otherwise, sparse_vector is filled with empty dictionaries and only dense_vector is used.
     """
@@ -295,6 +317,8 @@ class MilvusDB(VectorDB):
                     enable_analyzer=True,
                     enable_match=True,
                 ),
+                FieldSchema(name="first_page", dtype=DataType.INT64),
+                FieldSchema(name="last_page", dtype=DataType.INT64),
                 FieldSchema(name="sparse_vector", dtype=DataType.SPARSE_FLOAT_VECTOR),
                 FieldSchema(
                     name="dense_vector", dtype=DataType.FLOAT_VECTOR, dim=self.dim
@@ -327,33 +351,52 @@ class MilvusDB(VectorDB):
             )
 
         self.client.load_collection(self.collection_name)
+        fields = self.client.describe_collection(self.collection_name)["fields"]
+        self.has_pages = set(PAGE_FIELDS) <= {field["name"] for field in fields}
+
+    def _output_fields(self, *fields: str) -> List[str]:
+        if self.has_pages:
+            fields += PAGE_FIELDS
+        return list(fields)
+
+    def _metadata(self, entity: dict) -> dict:
+        metadata = {"filename": entity.get("filename", "")}
+        if entity.get("first_page"):
+            for field in PAGE_FIELDS:
+                metadata[field] = entity[field]
+        return metadata
 
     def insert(
-        self, embeddings: List[Embedding], metadatum: Optional[List[dict]] = None
+        self, embeddings: EmbeddingBatch, metadatum: Optional[List[dict]] = None
     ) -> None:
         """
         Inserts documents into Milvus.
 
-        Computes the dense vector using the provided dense_embedder.
-        Computes the sparse vector using BGEM3 if hybrid search is enabled;
-        otherwise, fills the sparse_vector field with empty dicts.
+        Dense vectors are passed as float32 rows of the batch matrix and
+        sparse vectors as token-weight dicts read from its CSR matrix (empty
+        if the embedder has no sparse output).
 
         Args:
-            embedding: An object that contains:
-                - docs: a list of document texts.
-                - name: a list of unique IDs.
+            embeddings (EmbeddingBatch): The ids, texts and vectors to insert.
             metadatum (Optional[List[dict]]): Additional metadata for each document.
         """
+        batch = EmbeddingBatch.from_embeddings(embeddings)
         entities = [
             {
-                "id": embedding.name,
-                "text": embedding.docs,
+                "id": id,
+                "text": text,
                 "filename": metadata["source"],
-                "dense_vector": embedding.dense_vector.tolist(),
-                "sparse_vector": embedding.sparse_vector,
+                "dense_vector": dense,
+                "sparse_vector": batch.sparse_row(i),
             }
-            for embedding, metadata in zip(embeddings, metadatum)
+            for i, (id, text, dense, metadata) in enumerate(
+                zip(batch.ids, batch.texts, batch.dense, metadatum)
+            )
         ]
+        if self.has_pages:
+            for entity, metadata in zip(entities, metadatum):
+                for field in PAGE_FIELDS:
+                    entity[field] = metadata.get(field, 0)
 
         self.client.insert(collection_name=self.collection_name, data=entities)
         self.client.flush(collection_name=self.collection_name)
@@ -365,7 +408,7 @@ class MilvusDB(VectorDB):
 
     def search(
         self,
-        query_embeddings: List[Embedding],
+        query_embeddings: EmbeddingBatch,
         top_k: int = 5,
         keywords: Optional[List[str]] = None,
         filenames: Optional[List[str]] = None,
@@ -380,7 +423,7 @@ class MilvusDB(VectorDB):
         - Both embeddings are used for hybrid search.
 
         Args:
-            query_embeddings (List[Embedding]): Query embeddings.
+            query_embeddings (EmbeddingBatch): Query embeddings.
             top_k (int): Number of results to return per query.
             keywords (Optional[List[str]]): Keywords for filtering.
             filenames (Optional[List[str]]): Filenames for filtering.
@@ -398,8 +441,9 @@ class MilvusDB(VectorDB):
 
         filter_expr = " AND ".join(filter_list) if len(filter_list) > 0 else None
 
+        query_embeddings = EmbeddingBatch.from_embeddings(query_embeddings)
         dense_req = AnnSearchRequest(
-            [embedding.dense_vector.tolist() for embedding in query_embeddings],
+            list(query_embeddings.dense),
             "dense_vector",
             {"metric_type": "IP"},
             expr=filter_expr,
@@ -407,7 +451,7 @@ class MilvusDB(VectorDB):
         )
 
         sparse_req = AnnSearchRequest(
-            [embedding.sparse_vector for embedding in query_embeddings],
+            query_embeddings.sparse_rows(),
             "sparse_vector",
             {"metric_type": "IP"},
             expr=filter_expr,
@@ -420,7 +464,7 @@ class MilvusDB(VectorDB):
             reqs=[sparse_req, dense_req],
             ranker=WeightedRanker(hybrid_weighting, 1 - hybrid_weighting),
             limit=top_k,
-            output_fields=["id", "text", "filename", "dense_vector"],
+            output_fields=self._output_fields("id", "text", "filename", "dense_vector"),
         )
 
         # Process the search results.
@@ -432,7 +476,7 @@ class MilvusDB(VectorDB):
                     SearchResult(
                         id=str(hit["id"]),
                         distance=hit["distance"],
-                        metadata={"filename": hit["entity"].get("filename", "")},
+                        metadata=self._metadata(hit["entity"]),
                         document=hit["entity"].get("text", ""),
                         embedding=hit["entity"].get("dense_vector", []),
                     )
@@ -462,6 +506,123 @@ class MilvusDB(VectorDB):
         )
         return set([result.get("entity", {}).get("document") for result in results])
 
+    def get_documents(self, ids: List[str]) -> Dict[str, SearchResult]:
+        """
+        Fetches the text and filename stored under the given IDs, keyed by
+        ID. The distance and embedding fields are left empty.
+        """
+        results = self.client.get(
+            collection_name=self.collection_name,
+            ids=ids,
+            output_fields=self._output_fields("id", "text", "filename"),
+        )
+        return {
+            str(result["id"]): SearchResult(
+                id=str(result["id"]),
+                distance=0.0,
+                metadata=self._metadata(result),
+                document=result.get("text", ""),
+                embedding=[],
+            )
+            for result in results
+        }
+
     def clear(self) -> None:
         """Clears all documents from the collection."""
         self.client.delete(collection_name=self.collection_name, expr='id != "NULL"')
+
+
+class CompressedVectorDB(VectorDB):
+    """
+    Wraps a ChromaDB or MilvusDB collection with a CompressedIndex of its
+    dense vectors.
+
+    Inserts, deletes and clears go to both. Plain dense searches are served
+    by the compressed index (a coarse pass over the codes, then exact
+    rescoring against the full-precision vectors on disk) and the documents
+    are fetched from the wrapped store by ID; the result distance is the
+    exact inner product. Searches with keyword or filename filters, Milvus
+    hybrid searches (hybrid_weighting > 0) and searches issued before the
+    index has any vectors fall through to the wrapped store. So does every
+    search of a collection that already held vectors the index has not seen
+    (compression enabled on an existing collection) until it is cleared and
+    re-ingested.
+    """
+
+    def __init__(self, store: VectorDB, index: CompressedIndex):
+        self.store = store
+        self.index = index
+        self.covers_store = len(index) == len(store.get_all_ids())
+        if not self.covers_store:
+            logger.warning(
+                "Compressed index has %d vectors but the collection has more; "
+                "searching the collection directly until it is re-ingested",
+                len(index),
+            )
+
+    def insert(
+        self, embeddings: EmbeddingBatch, metadatum: Optional[List[dict]] = None
+    ) -> None:
+        batch = EmbeddingBatch.from_embeddings(embeddings)
+        self.store.insert(batch, metadatum)
+        self.index.add(batch.ids, batch.dense)
+
+    def search(
+        self,
+        query_embeddings: EmbeddingBatch,
+        top_k: int = 5,
+        keywords: Optional[List[str]] = None,
+        filenames: Optional[List[str]] = None,
+        hybrid_weighting: float = 0.5,
+    ) -> List[List[SearchResult]]:
+        hybrid = isinstance(self.store, MilvusDB) and hybrid_weighting > 0
+        if (
+            keywords
+            or filenames
+            or hybrid
+            or not self.covers_store
+            or len(self.index) == 0
+        ):
+            return self.store.search(
+                query_embeddings, top_k, keywords, filenames, hybrid_weighting
+            )
+
+        query_embeddings = EmbeddingBatch.from_embeddings(query_embeddings)
+        hits = self.index.search(query_embeddings.dense, top_k)
+        documents = self.store.get_documents(
+            list({id for query_hits in hits for id, _, _ in query_hits})
+        )
+        all_results = []
+        for query_hits in hits:
+            query_results = []
+            for id, score, vector in query_hits:
+                document = documents.get(id)
+                if document is None:
+                    # deleted from the store but not yet from the index
+                    continue
+                query_results.append(
+                    SearchResult(
+                        id=id,
+                        distance=score,
+                        metadata=document.metadata,
+                        document=document.document,
+                        embedding=vector.tolist(),
+                    )
+                )
+            all_results.append(query_results)
+        return all_results
+
+    def delete(self, ids: List[str]) -> None:
+        self.store.delete(ids)
+        self.index.delete(ids)
+
+    def get_all_ids(self) -> List[str]:
+        return self.store.get_all_ids()
+
+    def get_all_files(self) -> Set[str]:
+        return self.store.get_all_files()
+
+    def clear(self) -> None:
+        self.store.clear()
+        self.index.clear()
+        self.covers_store = True
@@ -3,6 +3,7 @@ import logging
 from typing import Optional
 
 import toml
+from logs.tracing import set_tracer
 from opencensus.ext.azure.log_exporter import AzureLogHandler
 from opencensus.ext.azure.trace_exporter import AzureExporter
 from opencensus.trace.samplers import ProbabilitySampler
@@ -33,6 +34,8 @@ class LogManager(logging.Logger, metaclass=SingletonMeta):
         super().__init__(name, level)
         logging.addLevelName(SURVEY_LEVEL, "SURVEY")
         self.extra_info = {"user": "unknown"}
+        # only set when Azure is configured; see logs.tracing for local spans
+        self.tracer = None
 
         # configure console logging
         handler = logging.StreamHandler()
@@ -57,6 +60,7 @@ class LogManager(logging.Logger, metaclass=SingletonMeta):
                     sampler=ProbabilitySampler(1.0),
                 )
             )
+            set_tracer(self.tracer)
 
     def set_user(self, user: str):
         self.extra_info["user"] = user
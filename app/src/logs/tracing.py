@@ -0,0 +1,194 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional
+
+# Set TRACE_JSONL_PATH to append one JSON line per finished span.
+TRACE_JSONL_PATH = os.getenv("TRACE_JSONL_PATH")
+# Number of recent samples kept per histogram for percentile estimates.
+HISTOGRAM_SAMPLES = 2048
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+# OpenCensus tracer spans are mirrored to; set by logs.logger when Azure
+# logging is configured. Kept here so tracing does not import the logger,
+# which reads secrets.toml on import.
+_tracer = None
+
+
+def set_tracer(tracer) -> None:
+    """Mirrors every span to the given OpenCensus tracer (None to stop)."""
+    global _tracer
+    _tracer = tracer
+
+
+class Histogram:
+    """
+    Count, sum, min and max over all samples plus percentiles over the most
+    recent `HISTOGRAM_SAMPLES` samples.
+    """
+
+    def __init__(self, max_samples: int = HISTOGRAM_SAMPLES) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.samples: Deque[float] = deque(maxlen=max_samples)
+
+    def record(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.samples.append(value)
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return 0.0
+        index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max if self.count else 0.0,
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe, in-process collection of named histograms.
+    """
+
+    def __init__(self) -> None:
+        self._histograms: Dict[str, Histogram] = defaultdict(Histogram)
+        self._lock = threading.Lock()
+
+    def record(self, name: str, value: float) -> None:
+        with self._lock:
+            self._histograms[name].record(value)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                name: histogram.summary()
+                for name, histogram in sorted(self._histograms.items())
+            }
+
+    def dump(self, path: str) -> None:
+        """Writes the current histogram summaries to a JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+metrics = MetricsRegistry()
+
+
+class Span:
+    """
+    A timed stage of a request. Durations are recorded in milliseconds under
+    "<name>.duration_ms"; values passed to `add_metric` are recorded under
+    "<name>.<key>".
+    """
+
+    def __init__(self, name: str, parent: Optional["Span"], **attributes) -> None:
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attributes: Dict[str, Any] = dict(attributes)
+        self.metrics: Dict[str, float] = {}
+        self.start = time.time()
+        self.duration_ms = 0.0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+        if _tracer is not None:
+            _tracer.add_attribute_to_current_span(key, str(value))
+
+    def add_metric(self, key: str, value: float) -> None:
+        self.metrics[key] = value
+        self.set_attribute(key, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "metrics": self.metrics,
+        }
+
+
+_export_lock = threading.Lock()
+
+
+def _export(span: Span) -> None:
+    metrics.record(f"{span.name}.duration_ms", span.duration_ms)
+    for key, value in span.metrics.items():
+        metrics.record(f"{span.name}.{key}", value)
+
+    if TRACE_JSONL_PATH:
+        line = json.dumps(span.to_dict(), default=str)
+        with _export_lock, open(TRACE_JSONL_PATH, "a") as f:
+            f.write(line + "\n")
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """
+    Times a stage of the request path.
+
+    Spans nest through a context variable, so stages called from within
+    another span share its trace id. Every span feeds the in-process
+    histograms and, when TRACE_JSONL_PATH is set, the JSONL exporter. If Azure
+    logging is configured, an OpenCensus span is opened as well.
+
+    Example:
+        with span("search.rerank", top_k=top_k) as s:
+            ...
+            s.add_metric("candidates", len(results))
+    """
+    current = Span(name, _current_span.get(), **attributes)
+    token = _current_span.set(current)
+    started = time.perf_counter()
+    try:
+        tracer = _tracer
+        if tracer is not None:
+            with tracer.span(name=name):
+                for key, value in attributes.items():
+                    tracer.add_attribute_to_current_span(key, str(value))
+                yield current
+        else:
+            yield current
+    except BaseException as e:
+        current.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        current.duration_ms = (time.perf_counter() - started) * 1000
+        _current_span.reset(token)
+        _export(current)
+
+
+def current_span() -> Optional[Span]:
+    """Returns the innermost active span, if any."""
+    return _current_span.get()
@@ -0,0 +1,361 @@
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import ConnectTimeout
+
+logger = logging.getLogger(__name__)
+
+# Status codes that indicate a transient problem on the model host.
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+
+@dataclass(frozen=True)
+class EndpointPolicy:
+    """
+    Connection, timeout, retry and circuit breaker settings for one endpoint.
+
+    Attributes:
+        max_connections (int): Maximum number of concurrent connections to the host.
+        connect_timeout (float): Seconds to wait for a TCP connection.
+        read_timeout (float): Seconds to wait for the server to send a response.
+        max_retries (int): Number of retries for connection errors and retryable statuses.
+        backoff_base (float): Base delay in seconds for exponential backoff.
+        backoff_max (float): Upper bound for a single backoff delay.
+        failure_threshold (int): Consecutive failures before the circuit opens.
+        reset_timeout (float): Seconds the circuit stays open before a trial request.
+    """
+
+    max_connections: int = 8
+    connect_timeout: float = 3.05
+    read_timeout: float = 120.0
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (0-based) attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+
+class CircuitOpenError(RequestsConnectionError):
+    """
+    Raised when a request is refused because the endpoint's circuit is open.
+
+    Subclasses requests' ConnectionError so callers that already handle an
+    offline model host treat a tripped circuit the same way.
+    """
+
+
+class CircuitBreaker:
+    """
+    A thread-safe closed / open / half-open circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and all
+    requests fail fast for `reset_timeout` seconds. A single trial request is
+    then let through; its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> None:
+        """
+        Checks whether a request may proceed.
+
+        Raises:
+            CircuitOpenError: If the circuit is open or a trial request is in flight.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError("Circuit is open for this endpoint.")
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                raise CircuitOpenError("Circuit is half-open; trial request in flight.")
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning("Opening circuit after %d failures.", self._failures)
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+@dataclass
+class HTTPResponse:
+    """
+    A fully read response returned by the async client.
+
+    Attributes:
+        status_code (int): The HTTP status code.
+        content (bytes): The raw response body.
+        headers (Dict[str, str]): The response headers.
+    """
+
+    status_code: int
+    content: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class EndpointClient:
+    """
+    A pooled, keep-alive HTTP client for a single host.
+
+    Sync requests go through one shared `requests.Session` whose connection
+    pool is capped at `policy.max_connections`; async requests go through one
+    `aiohttp.ClientSession` per event loop with the same per-host limit. Both
+    paths share the retry policy and the circuit breaker.
+    """
+
+    def __init__(self, base_url: str, policy: Optional[EndpointPolicy] = None):
+        """
+        Args:
+            base_url (str): The scheme and host (e.g. "http://ollama:11434").
+            policy (EndpointPolicy, optional): Settings for this endpoint.
+        """
+        self.base_url = base_url
+        self.policy = policy or EndpointPolicy()
+        self.breaker = CircuitBreaker(
+            failure_threshold=self.policy.failure_threshold,
+            reset_timeout=self.policy.reset_timeout,
+        )
+        self._slots = threading.BoundedSemaphore(self.policy.max_connections)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.policy.max_connections,
+            pool_block=True,
+            max_retries=0,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # an aiohttp session is bound to the loop it was created in
+        self._async_sessions = weakref.WeakKeyDictionary()
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        return (self.policy.connect_timeout, self.policy.read_timeout)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a request, retrying connection errors and transient statuses with
+        jittered exponential backoff. Read timeouts are not retried since the
+        model may still be generating.
+
+        Returns:
+            requests.Response: The last response received.
+
+        Raises:
+            CircuitOpenError: If the endpoint's circuit is open.
+            requests.exceptions.RequestException: If the request ultimately fails.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.policy.max_retries + 1):
+            self.breaker.allow()
+            try:
+                with self._slots:
+                    response = self.session.request(method, url, **kwargs)
+            except (RequestsConnectionError, ConnectTimeout):
+                self.breaker.record_failure()
+                if attempt == self.policy.max_retries:
+                    raise
+            except requests.exceptions.RequestException:
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    self.breaker.record_success()
+                    return response
+                self.breaker.record_failure()
+                if attempt == self.policy.max_retries:
+                    return response
+            delay = self.policy.backoff(attempt)
+            logger.warning(
+                "Request to %s failed (attempt %d), retrying in %.2fs",
+                url,
+                attempt + 1,
+                delay,
+            )
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def _async_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session = self._async_sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit_per_host=self.policy.max_connections
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    connect=self.policy.connect_timeout,
+                    sock_read=self.policy.read_timeout,
+                ),
+            )
+            self._async_sessions[loop] = session
+        return session
+
+    async def arequest(self, method: str, url: str, **kwargs) -> HTTPResponse:
+        """
+        Async counterpart of `request`, with the same retry and circuit semantics.
+
+        Returns:
+            HTTPResponse: The last response received, fully read.
+
+        Raises:
+            CircuitOpenError: If the endpoint's circuit is open.
+            aiohttp.ClientError: If the request ultimately fails.
+        """
+        session = self._async_session()
+        for attempt in range(self.policy.max_retries + 1):
+            self.breaker.allow()
+            try:
+                async with session.request(method, url, **kwargs) as resp:
+                    response = HTTPResponse(
+                        status_code=resp.status,
+                        content=await resp.read(),
+                        headers=dict(resp.headers),
+                    )
+            except aiohttp.SocketTimeoutError:
+                # read timeout, the model may still be generating
+                self.breaker.record_failure()
+                raise
+            except aiohttp.ClientConnectionError:
+                self.breaker.record_failure()
+                if attempt == self.policy.max_retries:
+                    raise
+            except aiohttp.ClientError:
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    self.breaker.record_success()
+                    return response
+                self.breaker.record_failure()
+                if attempt == self.policy.max_retries:
+                    return response
+            delay = self.policy.backoff(attempt)
+            logger.warning(
+                "Request to %s failed (attempt %d), retrying in %.2fs",
+                url,
+                attempt + 1,
+                delay,
+            )
+            await asyncio.sleep(delay)
+
+    async def aget(self, url: str, **kwargs) -> HTTPResponse:
+        return await self.arequest("GET", url, **kwargs)
+
+    async def apost(self, url: str, **kwargs) -> HTTPResponse:
+        return await self.arequest("POST", url, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+    async def aclose(self) -> None:
+        """Closes the async session of the running event loop."""
+        session = self._async_sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+
+class HTTPClientPool:
+    """
+    Process-wide registry of EndpointClients, one per scheme://host:port.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, EndpointClient] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def endpoint_key(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def get(self, url: str, policy: Optional[EndpointPolicy] = None) -> EndpointClient:
+        """
+        Returns the shared client for the host of `url`, creating it with
+        `policy` on first use. Clients are never rebuilt, since other callers
+        hold them; a different policy for an existing host is ignored.
+        """
+        key = self.endpoint_key(url)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = EndpointClient(key, policy)
+                self._clients[key] = client
+            elif policy is not None and policy != client.policy:
+                logger.warning(
+                    "HTTP client for %s already exists; keeping its policy", key
+                )
+            return client
+
+    def close(self) -> None:
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+
+http_clients = HTTPClientPool()
+
+
+def get_http_client(
+    url: str, policy: Optional[EndpointPolicy] = None
+) -> EndpointClient:
+    """
+    Returns the shared, pooled client for the host of the given url.
+    """
+    return http_clients.get(url, policy)
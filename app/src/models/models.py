@@ -1,10 +1,16 @@
 from abc import ABC, abstractmethod
 
-import requests
 from langchain_community.callbacks import get_openai_callback
 from langchain_openai import AzureChatOpenAI
+from logs.tracing import span
+from models.http_client import EndpointPolicy, HTTPClientPool, get_http_client
 from orchestrator.config import SystemConfig
-from requests.exceptions import ConnectTimeout
+from requests.exceptions import RequestException
+
+# health checks only list models, so they should answer quickly
+HEALTH_CHECK_TIMEOUT = 5.0
+# returned by LocalAIModel when the endpoint answers with an error status
+ERROR_RESPONSE = "Error occurred"
 
 
 class ChatModel(ABC):
@@ -29,29 +35,35 @@ class OpenAIChatModel(ChatModel):
         )
 
     def __call__(self, query: str, override_config=None):
-        with get_openai_callback() as cb:
+        with span("llm.openai") as s, get_openai_callback() as cb:
 
             # for cases like query reformatting, we want to override specific
-            # model parameters such as temperature. unfortunately I havent't found a nice way to do this.
-            if override_config:
-                old_params = {key: getattr(self.model, key) for key in override_config}
-                for key, value in override_config.items():
-                    setattr(self.model, key, value)
-
-            response = self.model.invoke(query)
-
-            # after we get the model response, reset the default model parameters
-            if override_config:
-                for key, value in old_params.items():
-                    setattr(self.model, key, value)
+            # model parameters such as temperature. these are passed per request
+            # so the shared client is never mutated by concurrent sessions.
+            response = self.model.invoke(query, **(override_config or {}))
 
+            s.add_metric("prompt_tokens", cb.prompt_tokens)
+            s.add_metric("completion_tokens", cb.completion_tokens)
             return str(response.content), cb.total_cost
 
     def test_connection(self):
+        """
+        Checks that the Azure endpoint is reachable and the key is accepted by
+        listing the available models instead of generating text.
+        """
+        url = self.config.model_auth.url
         try:
-            response, _ = self.__call__("Test connection")
-            return True
-        except ConnectTimeout:
+            client = get_http_client(
+                url, EndpointPolicy(**self.config.http_client.model_dump())
+            )
+            response = client.get(
+                f"{url.rstrip('/')}/openai/models",
+                params={"api-version": self.config.model_auth.version},
+                headers={"api-key": self.config.model_auth.api_key},
+                timeout=(client.policy.connect_timeout, HEALTH_CHECK_TIMEOUT),
+            )
+            return response.status_code == 200
+        except RequestException:
             return False
 
 
@@ -70,39 +82,58 @@ class LocalAIModel(ChatModel):
                 "num_ctx": self.config.model_params.num_ctx,
             },
         }
+        self.client = get_http_client(
+            self.macbook_endpoint,
+            EndpointPolicy(**self.config.http_client.model_dump()),
+        )
 
     def __call__(self, query: str, override_config=None):
-        # Add the query to the request body when calling the model
-        self.macbookmodel["prompt"] = query
-
+        # Build a fresh request body so concurrent calls on the shared model
+        # (and override_config) never mutate the defaults
+        request_body = {**self.macbookmodel, "prompt": query}
         if override_config:
-            temp_config = self.macbookmodel.copy()
-            temp_config["options"].update(override_config)
-
-            response = requests.post(
-                self.macbook_endpoint, json=temp_config, stream=False
-            )
-        else:
-            response = requests.post(
-                self.macbook_endpoint, json=self.macbookmodel, stream=False
-            )
-
-        # Check if the response was successful
-        if response.status_code == 200:
-            response_json = response.json()  # Assuming the response is in JSON format
-            # Extract the relevant content from the response
-            return (
-                str(response_json.get("response", "")),
-                0.0,
-            )  # Return the response content and a dummy cost
-        else:
-            # Handle error response
-            print(f"Error: {response.status_code}, {response.text}")
-            return "Error occurred", 0.0  # You can customize the error handling
+            request_body["options"] = {
+                **self.macbookmodel["options"],
+                **override_config,
+            }
+
+        with span("llm.local", model=self.macbookmodel["model"]) as s:
+            response = self.client.post(self.macbook_endpoint, json=request_body)
+            s.set_attribute("status_code", response.status_code)
+
+            # Check if the response was successful
+            if response.status_code == 200:
+                response_json = (
+                    response.json()
+                )  # Assuming the response is in JSON format
+                # Ollama reports token counts for the prompt and the generation
+                s.add_metric("prompt_tokens", response_json.get("prompt_eval_count", 0))
+                s.add_metric("completion_tokens", response_json.get("eval_count", 0))
+                # Extract the relevant content from the response
+                return (
+                    str(response_json.get("response", "")),
+                    0.0,
+                )  # Return the response content and a dummy cost
+            else:
+                # Handle error response
+                print(f"Error: {response.status_code}, {response.text}")
+                return ERROR_RESPONSE, 0.0  # You can customize the error handling
 
     def test_connection(self):
+        """
+        Checks that the Ollama host is up and has the model pulled by listing
+        its tags instead of generating text.
+        """
+        tags_url = HTTPClientPool.endpoint_key(self.macbook_endpoint) + "/api/tags"
         try:
-            response, _ = self.__call__("Test connection")
-            return True
-        except ConnectTimeout:
+            response = self.client.get(
+                tags_url,
+                timeout=(self.client.policy.connect_timeout, HEALTH_CHECK_TIMEOUT),
+            )
+        except RequestException:
+            return False
+
+        if response.status_code != 200:
             return False
+        names = {model.get("name") for model in response.json().get("models", [])}
+        return self.macbookmodel["model"] in names
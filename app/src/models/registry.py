@@ -0,0 +1,110 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import toml
+from models.models import ChatModel, LocalAIModel, OpenAIChatModel
+from orchestrator.config import SystemConfig
+from orchestrator.utils import SingletonMeta
+
+logger = logging.getLogger(__name__)
+
+OPENAI_MODELS = ["GPT-3.5", "GPT-4.0"]
+
+
+class ModelRegistry(metaclass=SingletonMeta):
+    """
+    Process-wide cache of model clients and secrets.
+
+    Clients are built lazily on first use and reused for every later turn
+    that asks for the same (model name, params) key. The least recently used
+    entries are evicted once `max_entries` is exceeded. Health checks are
+    cached for `health_ttl` seconds so sidebar reruns do not hit the model
+    host on every interaction.
+    """
+
+    def __init__(self, max_entries: int = 16, health_ttl: float = 30.0) -> None:
+        self.max_entries = max_entries
+        self.health_ttl = health_ttl
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._health: Dict[Hashable, Tuple[float, bool]] = {}
+        self._secrets: Dict[str, Tuple[float, dict]] = {}
+        self._lock = threading.RLock()
+
+    def load_secrets(self, path: str = "secrets.toml") -> dict:
+        """
+        Returns the parsed secrets file, re-reading it only when it changes on disk.
+        """
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            cached = self._secrets.get(path)
+            if cached is None or cached[0] != mtime:
+                cached = (mtime, toml.load(path))
+                self._secrets[path] = cached
+            return cached[1]
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Returns the object cached under `key`, building it with `factory` on a miss.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+            logger.info("Building model client for %s", key[:2])
+            value = factory()
+            self._entries[key] = value
+            if len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._health.pop(evicted, None)
+            return value
+
+    @staticmethod
+    def chat_model_key(model_name: str, config: SystemConfig) -> tuple:
+        """
+        Builds the cache key for a chat model from everything its client bakes in.
+        """
+        params = config.model_params.model_dump(exclude={"supported_models"})
+        params["model_name"] = model_name
+        auth = config.model_auth
+        if model_name in OPENAI_MODELS:
+            endpoint = (auth.url, auth.version, auth.api_key)
+        else:
+            endpoint = (auth.macbook_endpoint,)
+        return (
+            "chat",
+            model_name,
+            tuple(sorted(params.items())),
+            endpoint,
+            tuple(sorted(config.http_client.model_dump().items())),
+        )
+
+    def get_chat_model(self, model_name: str, config: SystemConfig) -> ChatModel:
+        """
+        Returns a cached chat model client for the current config.
+        """
+        if model_name in OPENAI_MODELS:
+            factory = lambda: OpenAIChatModel(config)
+        else:
+            factory = lambda: LocalAIModel(config)
+        return self.get(self.chat_model_key(model_name, config), factory)
+
+    def is_healthy(self, model_name: str, config: SystemConfig) -> bool:
+        """
+        Returns whether the model host is reachable, using a cached result when fresh.
+        """
+        key = self.chat_model_key(model_name, config)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._health.get(key)
+        if cached is not None and now - cached[0] < self.health_ttl:
+            return cached[1]
+
+        healthy = self.get_chat_model(model_name, config).test_connection()
+        with self._lock:
+            self._health[key] = (now, healthy)
+        return healthy
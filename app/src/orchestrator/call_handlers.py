@@ -1,4 +1,5 @@
 from orchestrator.config import SystemConfig
+from orchestrator.single_flight import llm_flight
 from prompt.base_prompt import PromptComponent
 from reasoning.agents import (
     GoogleSearchTool,
@@ -10,6 +11,7 @@ from reasoning.agents import (
 from reasoning.llms import AzureChatOpenAI
 
 from models.models import ChatModel
+from models.registry import ModelRegistry
 
 
 class LLMCallHandler:
@@ -23,26 +25,58 @@ class LLMCallHandler:
     def get_prompt(self, query: str):
         return self.prompt.get_prompt(query), self.prompt.get_cost()
 
-    def call_llm(self, query: str):
+    def generate(self, prompt: str):
         """
-        Returns the LLM response and the cost of the query
+        Returns the LLM response and cost for an already built prompt.
+        Identical concurrent prompts to the same model share one generation;
+        only the caller that ran it is charged the cost.
         """
-        prompt, prompt_cost = self.get_prompt(query)
         print("-----The Prompt-----")
         print(prompt)
         print("--------------------")
-        response, cost = self.model(prompt)
+        key = (
+            ModelRegistry.chat_model_key(
+                self.config.model_params.model_name, self.config
+            ),
+            prompt,
+        )
+        (response, cost), shared = llm_flight.do(key, lambda: self.model(prompt))
+        return response, 0.0 if shared else cost
+
+    def call_llm(self, query: str):
+        """
+        Returns the LLM response and the cost of the query
+        """
+        prompt, prompt_cost = self.get_prompt(query)
+        response, cost = self.generate(prompt)
         return prompt, response, cost + prompt_cost
 
 
 # TODO: Fix this class up - need to refactor all of models
 class AgentCallHandler:
     def __init__(
-        self, model_key, secrets, prompt: PromptComponent, config: SystemConfig
+        self,
+        model_key,
+        secrets,
+        prompt: PromptComponent,
+        config: SystemConfig,
+        registry: ModelRegistry = None,
     ) -> None:
         self.config = config
         self.prompt = prompt
+        registry = registry or ModelRegistry()
+
+        key = (
+            "rewoo",
+            model_key,
+            secrets[model_key]["api_version"],
+            secrets[model_key]["azure_endpoint"],
+            secrets[model_key]["api_key"],
+        )
+        self.model = registry.get(key, lambda: self._build_agent(model_key, secrets))
 
+    @staticmethod
+    def _build_agent(model_key, secrets) -> RewooAgent:
         # Hard coded model right now...
         llm = AzureChatOpenAI(
             api_key=secrets[model_key]["api_key"],
@@ -58,7 +92,7 @@ class AgentCallHandler:
             LocalSearchTool(),
         ]
 
-        self.model = RewooAgent(planner_llm=llm, solver_llm=llm, plugins=plugins)
+        return RewooAgent(planner_llm=llm, solver_llm=llm, plugins=plugins)
 
     def get_prompt(self, query: str):
         return self.prompt.get_prompt(query), self.prompt.get_cost()
@@ -1,17 +1,38 @@
 import os
 from typing import List, Optional
 
-import toml
+from databroker.databroker import DataBroker
 from logs.logger import logger
+from logs.tracing import current_span, span
 from orchestrator.call_handlers import AgentCallHandler, LLMCallHandler
 from orchestrator.config import SystemConfig
+from orchestrator.response_cache import (
+    CachedResponse,
+    ResponseCache,
+    chunk_ids_from_context,
+)
 from orchestrator.utils import DEFAULT_SYSTEM_PROMPT, SingletonMeta, load_config
 from prompt.base_prompt import ConcretePrompt
 from prompt.prompts import ModerationDecorator, OnlyUseContextDecorator
 from prompt.retrieval import ContextRetrieval
-from requests.exceptions import ConnectTimeout
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import Timeout
 
-from models.models import LocalAIModel, OpenAIChatModel
+from models.models import ERROR_RESPONSE
+from models.registry import OPENAI_MODELS, ModelRegistry
+
+# returned in place of an answer when the chat model cannot be reached
+MODEL_OFFLINE_RESPONSE = "The model you selected is not online."
+
+
+def _freeze(params: dict) -> tuple:
+    """Turns a flat config dict into a hashable, order-independent tuple."""
+    return tuple(
+        sorted(
+            (key, tuple(value) if isinstance(value, list) else value)
+            for key, value in params.items()
+        )
+    )
 
 
 class ChatOrchestrator(metaclass=SingletonMeta):
@@ -21,37 +42,89 @@ class ChatOrchestrator(metaclass=SingletonMeta):
         )
         self.model = None
         self.system_prompt = DEFAULT_SYSTEM_PROMPT
+        self.registry = ModelRegistry()
+        cache_params = self.config.response_cache
+        self.response_cache = ResponseCache(
+            max_entries=cache_params.max_entries,
+            ttl_seconds=cache_params.ttl_seconds,
+            similarity_threshold=cache_params.similarity_threshold,
+        )
 
     def load_model(self, model: str) -> None:
         """
-        Load secrets from toml file into config object.
+        Load secrets from toml file into config object and fetch the matching
+        model client from the registry. Clients are only rebuilt when the model
+        or its parameters change.
         """
-        secrets = toml.load("secrets.toml")
+        secrets = self.registry.load_secrets("secrets.toml")
         self.model_key = "gpt40-api"
         self.secrets = secrets
-        if model in ["GPT-3.5", "GPT-4.0"]:
+        self.config.model_params.model_name = model
+        if model in OPENAI_MODELS:
             self.model_key = model.lower().replace("-", "").replace(".", "") + "-api"
             self.config.model_auth.version = secrets[self.model_key]["api_version"]
             self.config.model_auth.api_key = secrets[self.model_key]["api_key"]
             self.config.model_auth.url = secrets[self.model_key]["azure_endpoint"]
-            self.model = OpenAIChatModel(self.config)
         else:
             self.config.model_auth.macbook_endpoint = (
                 secrets["localmodel"]["macbook_endpoint"] + "/api/generate/"
             )
-            self.model = LocalAIModel(self.config)
 
-        self.config.model_params.model_name = model
+        self.model = self.registry.get_chat_model(model, self.config)
 
     def test_connection(self, model_name: str) -> bool:
         """
-        Test connection to the local or remote chat model.
+        Test connection to the local or remote chat model. This lists the
+        models on the host rather than generating text, and is cached briefly.
         """
+        return self.registry.is_healthy(model_name, self.config)
 
-        if model_name in ["GPT-3.5", "GPT-4.0"]:
-            return OpenAIChatModel(self.config).test_connection()
+    def _is_cacheable(self) -> bool:
+        """
+        Only deterministic turns are cached: temperature 0 and no agent, since
+        the agent pulls in live web results.
+        """
+        return (
+            self.config.response_cache.enable
+            and self.config.model_params.temperature == 0.0
+            and not self.config.agent_params.enable
+        )
 
-        return LocalAIModel(self.config).test_connection()
+    def _cache_config_key(self) -> tuple:
+        """
+        Everything besides the query and corpus that determines the answer:
+        the system prompt, model and sampling params, and the RAG params
+        (which include the set of enabled prompt decorators).
+        """
+        return (
+            self.system_prompt,
+            _freeze(self.config.model_params.model_dump(exclude={"supported_models"})),
+            _freeze(self.config.rag_params.model_dump(exclude={"supported_rerankers"})),
+        )
+
+    def _content_version(self) -> tuple:
+        """
+        Versions of the collections the current turn would search.
+        """
+        if not self.config.rag_params.use_rag:
+            return ()
+        collections = ["base"]
+        if self.config.rag_params.useknowledgebase:
+            collections.append("user")
+        databroker = DataBroker()
+        return tuple(databroker.get_content_version(c) for c in collections)
+
+    def _query_embedding(self, query: str):
+        """
+        Embeds the query for similarity matching, or returns None when
+        similarity matching is disabled or there is no retrieval.
+        """
+        if (
+            not self.config.rag_params.use_rag
+            or self.config.response_cache.similarity_threshold >= 1.0
+        ):
+            return None
+        return DataBroker().embed_query(query)
 
     def triage_query(
         self, query: str, model: str
@@ -62,10 +135,38 @@ class ChatOrchestrator(metaclass=SingletonMeta):
 
         Returns the response text content (str) and cost (float)
         """
+        with span("chat.triage_query", model=model):
+            return self._triage_query(query, model)
+
+    def _triage_query(
+        self, query: str, model: str
+    ) -> tuple[str, str, float, list[str], str]:
 
         chunks = []
         rewriten_query = ""
         self.load_model(model)
+
+        cache_key = None
+        if self._is_cacheable():
+            cache_key = self._cache_config_key()
+            content_version = self._content_version()
+            cached = self.response_cache.get(query, cache_key, content_version)
+            current_span().set_attribute(
+                "response_cache", "miss" if cached is None else "exact"
+            )
+            if cached is not None:
+                logger.info(
+                    "Response cache hit",
+                    xtra={"response_cache": "exact", **self.response_cache.stats()},
+                )
+                return (
+                    cached.prompt,
+                    cached.response,
+                    0.0,
+                    cached.chunks,
+                    cached.rewritten_query,
+                )
+
         prompt = ConcretePrompt(self.system_prompt)
 
         if self.config.rag_params.use_rag:
@@ -93,13 +194,53 @@ class ChatOrchestrator(metaclass=SingletonMeta):
         try:
             if self.config.agent_params.enable:
                 handler = AgentCallHandler(
-                    self.model_key, self.secrets, prompt, self.config
+                    self.model_key, self.secrets, prompt, self.config, self.registry
                 )
             else:
                 handler = LLMCallHandler(self.model, prompt, self.config)
 
-            llm_prompt, response, cost = handler.call_llm(query)
-            chunks = prompt.get_chunks()
+            if cache_key is None:
+                llm_prompt, response, cost = handler.call_llm(query)
+                chunks = prompt.get_chunks()
+            else:
+                llm_prompt, cost = handler.get_prompt(query)
+                chunks = prompt.get_chunks()
+                chunk_ids = chunk_ids_from_context(chunks)
+                embedding = self._query_embedding(query)
+
+                cached = None
+                if embedding is not None:
+                    cached = self.response_cache.get_similar(
+                        embedding, cache_key, content_version, chunk_ids
+                    )
+                if cached is not None:
+                    current_span().set_attribute("response_cache", "semantic")
+                    logger.info(
+                        "Response cache hit",
+                        xtra={
+                            "response_cache": "semantic",
+                            **self.response_cache.stats(),
+                        },
+                    )
+                    response = cached.response
+                else:
+                    response, generation_cost = handler.generate(llm_prompt)
+                    cost += generation_cost
+
+                if response != ERROR_RESPONSE:
+                    self.response_cache.put(
+                        query,
+                        cache_key,
+                        CachedResponse(
+                            prompt=llm_prompt,
+                            response=response,
+                            chunks=chunks,
+                            rewritten_query=prompt.get_rewrite_query(),
+                            chunk_ids=chunk_ids,
+                            content_version=content_version,
+                            embedding=embedding,
+                        ),
+                    )
 
             filtered_config = self.config.model_dump(
                 exclude={  # hides all the options. only shows you what you're using
@@ -109,6 +250,13 @@ class ChatOrchestrator(metaclass=SingletonMeta):
                     "embedding": {"supported_embedders"},
                     "model_auth": {"api_key", "macbook_endpoint"},
                     "model_params": {"supported_models"},
+                    "http_client": True,
+                    "response_cache": True,
+                    "startup": True,
+                    "inference_server": True,
+                    "cpu_inference": True,
+                    "vector_compression": True,
+                    "deduplication": True,
                 }
             )
 
@@ -123,10 +271,11 @@ class ChatOrchestrator(metaclass=SingletonMeta):
             print(type(filtered_config))
 
         # Carter: we will want a better solution here but we need error handling for the time being.
-        # This catches errors when the local models are offline
-        except ConnectTimeout:
+        # This catches errors when the local models are offline (including an
+        # open circuit on the shared HTTP client) or too slow to answer
+        except (Timeout, RequestsConnectionError):
             logger.error("Unable to connect to local model.")
-            return "N/A", "The model you selected is not online.", 0.0
+            return "N/A", MODEL_OFFLINE_RESPONSE, 0.0, [], ""
 
         return llm_prompt, response, cost, chunks, rewriten_query
 
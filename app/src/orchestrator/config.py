@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict
 from typing_extensions import Literal
@@ -31,11 +31,24 @@ class ModelParams(BaseModel):
 class Extraction(BaseModel):
     supported_extractors: List[str]
     extraction_method: str
+    # on-disk cache of extraction results, keyed by file content
+    cache: bool = True
+    cache_dir: str = "vectorstore/cache/extraction"
+    cache_max_mb: int = 2048
+    # page-parallel Docling conversion; 1 worker converts PDFs in-process
+    parallel_workers: int = 1
+    pages_per_shard: int = 50
+    # PyPDF2 only: extract and chunk page by page
+    streaming: bool = False
 
 
 class Chunking(BaseModel):
     supported_chunkers: List[str]
     chunking_method: str
+    # split chunks over the embedder's and reranker's input limits
+    enforce_token_limits: bool = True
+    max_chunk_tokens: Optional[int] = None
+    reranker_query_tokens: int = 64
 
 
 class Embedding(BaseModel):
@@ -61,6 +74,70 @@ class RAGParams(BaseModel):
     filenames: Optional[list[str]]
     reranker_model: Optional[str] = "BAAI/bge-reranker-v2-m3"
     supported_rerankers: Optional[List[str]] = None
+    max_context_tokens: Optional[int] = 6000
+    context_reserve_tokens: int = 256
+    context_dedup_threshold: float = 0.8
+
+
+class HTTPClientParams(BaseModel):
+    max_connections: int = 8
+    connect_timeout: float = 3.05
+    read_timeout: float = 120.0
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+
+
+class ResponseCacheParams(BaseModel):
+    enable: bool = True
+    max_entries: int = 256
+    ttl_seconds: float = 3600.0
+    similarity_threshold: float = 0.95
+
+
+class StartupParams(BaseModel):
+    background_warmup: bool = True
+    background_ingestion: bool = True
+    health_host: str = "0.0.0.0"
+    health_port: Optional[int] = 8502
+
+
+class InferenceServerParams(BaseModel):
+    enable: bool = False
+    url: str = "http://localhost:8600"
+
+
+class CPUInferenceParams(BaseModel):
+    # model name -> "torch", "onnx" or "onnx-int8"; unlisted models use torch
+    backends: Dict[str, Literal["torch", "onnx", "onnx-int8"]] = {}
+    onnx_cache_dir: str = "vectorstore/cache/onnx"
+    # inference scheduler: model calls that may run at once, threads per call
+    # (defaults to the available CPUs / workers) and queued ingestion calls
+    workers: int = 1
+    intra_op_threads: Optional[int] = None
+    max_background_pending: int = 4
+
+
+class VectorCompressionParams(BaseModel):
+    method: Literal["none", "pca", "truncate", "int8", "binary"] = "none"
+    # output dimension of pca and truncate
+    dimension: int = 256
+    rescore_multiplier: int = 4
+    training_size: int = 10000
+
+
+class DeduplicationParams(BaseModel):
+    enable: bool = False
+    # estimated Jaccard similarity of the chunks' word shingles
+    threshold: float = 0.85
+    num_perm: int = 128
+    bands: int = 16
+    shingle_size: int = 5
+    min_words: int = 30
+    # only chunks with the same numbers (doses, limits, dates) are duplicates
+    match_numbers: bool = True
 
 
 class SystemConfig(BaseModel):
@@ -74,3 +151,10 @@ class SystemConfig(BaseModel):
     embedding: Embedding
     vector_db: VectorDB
     rag_params: RAGParams
+    http_client: HTTPClientParams = HTTPClientParams()
+    response_cache: ResponseCacheParams = ResponseCacheParams()
+    startup: StartupParams = StartupParams()
+    inference_server: InferenceServerParams = InferenceServerParams()
+    cpu_inference: CPUInferenceParams = CPUInferenceParams()
+    vector_compression: VectorCompressionParams = VectorCompressionParams()
+    deduplication: DeduplicationParams = DeduplicationParams()
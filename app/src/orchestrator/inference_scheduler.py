@@ -0,0 +1,215 @@
+import contextvars
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from logs.tracing import metrics
+from orchestrator.utils import available_cpus
+
+logger = logging.getLogger(__name__)
+
+# queue priorities; lower runs first
+INTERACTIVE = 0
+BACKGROUND = 1
+QUEUE_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "inference_priority", default=INTERACTIVE
+)
+
+
+@contextmanager
+def priority(level: int) -> Iterator[None]:
+    """
+    Runs the model calls made in this block at the given priority, e.g.
+    `with priority(BACKGROUND):` around ingestion. Calls default to
+    INTERACTIVE.
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def set_thread_budget(threads: int) -> None:
+    """
+    Sets the intra-op thread count of OpenMP/MKL and PyTorch. The environment
+    variables only affect libraries that initialize after this call; PyTorch
+    is also set directly.
+    """
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(threads)
+    try:
+        # a model call runs one op at a time; parallelism lives inside ops
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # can only be set before the first parallel torch operation
+        pass
+
+
+class _Job:
+    def __init__(self, fn: Callable, args: tuple, kwargs: dict, level: int) -> None:
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.level = level
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class InferenceScheduler:
+    """
+    Runs model calls (embedding, reranking, document conversion) on a fixed
+    pool of worker threads that share the process's CPU budget.
+
+    Each of the `workers` threads gets `intra_op_threads` threads for torch,
+    OpenMP and ONNX Runtime, so concurrent sessions queue for the CPUs
+    instead of oversubscribing them. Jobs wait in a priority queue: every
+    interactive call runs before any queued background (ingestion) call,
+    and at most `max_background_pending` background calls may be queued at
+    once. Queue wait times are recorded as `inference.queue_wait.<queue>`
+    in the tracing metrics.
+
+    Calls made from a worker thread (nested model calls) run inline.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        intra_op_threads: Optional[int] = None,
+        max_background_pending: int = 4,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._workers: list = []
+        self._local = threading.local()
+        self.stats: Dict[str, Dict[str, int]] = {
+            name: {"submitted": 0, "completed": 0, "failed": 0}
+            for name in QUEUE_NAMES.values()
+        }
+        self.configure(workers, intra_op_threads, max_background_pending)
+
+    def configure(
+        self,
+        workers: int = 1,
+        intra_op_threads: Optional[int] = None,
+        max_background_pending: int = 4,
+    ) -> None:
+        """
+        Sets the pool size and thread budget. Only takes effect before the
+        workers start (on the first submitted job); later calls with
+        different values are ignored with a warning.
+
+        Args:
+            workers (int): Number of model calls that may run at once.
+            intra_op_threads (int, optional): Threads per model call. Defaults
+                to the available CPUs divided by `workers`.
+            max_background_pending (int): Queued background calls before
+                further background submitters block.
+        """
+        workers = max(1, workers)
+        threads = intra_op_threads or max(1, available_cpus() // workers)
+        with self._lock:
+            if self._workers:
+                if (workers, threads) != (self.workers, self.intra_op_threads):
+                    logger.warning(
+                        "Inference scheduler already started with %d workers x "
+                        "%d threads; ignoring the new configuration",
+                        self.workers,
+                        self.intra_op_threads,
+                    )
+                return
+            self.workers = workers
+            self.intra_op_threads = threads
+            self._background_slots = threading.BoundedSemaphore(max_background_pending)
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._workers:
+                return
+            set_thread_budget(self.intra_op_threads)
+            for i in range(self.workers):
+                worker = threading.Thread(
+                    target=self._run, name=f"inference-worker-{i}", daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+            logger.info(
+                "Inference scheduler started: %d workers x %d threads",
+                self.workers,
+                self.intra_op_threads,
+            )
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Queues `fn(*args, **kwargs)` at the caller's priority (see `priority`)
+        and returns a Future for its result.
+        """
+        if not self._workers:
+            self._start()
+        level = _priority.get()
+        if level == BACKGROUND:
+            self._background_slots.acquire()
+        job = _Job(fn, args, kwargs, level)
+        self.stats[QUEUE_NAMES[level]]["submitted"] += 1
+        self._queue.put((level, next(self._sequence), job))
+        return job.future
+
+    def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Runs `fn(*args, **kwargs)` on the pool and blocks for its result.
+        """
+        if getattr(self._local, "is_worker", False):
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+    def pending(self) -> Dict[str, int]:
+        """Number of queued (not yet running) jobs per queue."""
+        counts = {name: 0 for name in QUEUE_NAMES.values()}
+        with self._queue.mutex:
+            for level, _, _ in self._queue.queue:
+                counts[QUEUE_NAMES[level]] += 1
+        return counts
+
+    def _run(self) -> None:
+        self._local.is_worker = True
+        try:
+            import torch
+
+            torch.set_num_threads(self.intra_op_threads)
+        except ImportError:
+            pass
+
+        while True:
+            level, _, job = self._queue.get()
+            name = QUEUE_NAMES[level]
+            if level == BACKGROUND:
+                self._background_slots.release()
+            metrics.record(
+                f"inference.queue_wait.{name}",
+                (time.perf_counter() - job.enqueued_at) * 1000,
+            )
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            try:
+                job.future.set_result(job.fn(*job.args, **job.kwargs))
+                self.stats[name]["completed"] += 1
+            except BaseException as e:
+                self.stats[name]["failed"] += 1
+                job.future.set_exception(e)
+
+
+inference_scheduler = InferenceScheduler()
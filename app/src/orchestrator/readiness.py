@@ -0,0 +1,152 @@
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+COLD = "cold"
+LOADING = "loading"
+# in memory and able to serve requests
+LOADED = "loaded"
+# loaded and has run a first inference, so kernels and caches are initialized
+WARM = "warm"
+FAILED = "failed"
+
+
+@dataclass
+class SubsystemState:
+    state: str = COLD
+    required: bool = True
+    load_seconds: Optional[float] = None
+    error: Optional[str] = None
+    updated_at: float = 0.0
+
+
+class Readiness:
+    """
+    Process-wide record of which subsystems (models, converters, vector store,
+    background ingestion) are available.
+
+    The app is ready once every required subsystem is loaded; optional ones,
+    such as background ingestion, are reported but do not block readiness.
+    """
+
+    def __init__(self) -> None:
+        self._states: Dict[str, SubsystemState] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, required: bool = True) -> None:
+        """Adds a subsystem in the cold state, or resets an existing one."""
+        with self._lock:
+            self._states[name] = SubsystemState(
+                required=required, updated_at=time.time()
+            )
+
+    def set(self, name: str, state: str, **fields) -> None:
+        with self._lock:
+            current = self._states.setdefault(name, SubsystemState())
+            current.state = state
+            current.updated_at = time.time()
+            for key, value in fields.items():
+                setattr(current, key, value)
+
+    def state(self, name: str) -> str:
+        with self._lock:
+            current = self._states.get(name)
+            return current.state if current else COLD
+
+    @contextmanager
+    def track(self, name: str, state: str = LOADED) -> Iterator[None]:
+        """
+        Marks `name` as loading for the duration of the block, then as
+        `state` (or failed if the block raises).
+        """
+        self.set(name, LOADING, error=None)
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.set(name, FAILED, error=f"{type(e).__name__}: {e}")
+            raise
+        self.set(name, state, load_seconds=time.perf_counter() - started)
+
+    def is_ready(self) -> bool:
+        """
+        True once every required subsystem is loaded. Not ready while no
+        required subsystem has been registered yet.
+        """
+        with self._lock:
+            required = [s for s in self._states.values() if s.required]
+            return bool(required) and all(s.state in (LOADED, WARM) for s in required)
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {name: asdict(s) for name, s in sorted(self._states.items())}
+
+
+readiness = Readiness()
+
+
+class _HealthHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        path = self.path.split("?")[0].rstrip("/")
+        if path == "/healthz":
+            status, payload = 200, {"status": "ok"}
+        elif path == "/readyz":
+            state = self.server.readiness
+            ready = state.is_ready()
+            status = 200 if ready else 503
+            payload = {"ready": ready, "subsystems": state.snapshot()}
+        else:
+            status, payload = 404, {"error": "not found"}
+
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_health_server: Optional[ThreadingHTTPServer] = None
+_health_lock = threading.Lock()
+
+
+def start_health_server(
+    host: str = "0.0.0.0", port: int = 8502, state: Readiness = readiness
+) -> None:
+    """
+    Serves /healthz (liveness) and /readyz (readiness with per-subsystem
+    state) on a side port. Streamlit has no hook for custom routes, so this
+    runs its own small HTTP server on a daemon thread. Safe to call on every
+    rerun; only the first call starts the server.
+
+    Args:
+        host (str): The interface to listen on.
+        port (int): The port to listen on.
+        state (Readiness): The readiness reported on /readyz, by default the
+            process-wide one.
+    """
+    global _health_server
+    with _health_lock:
+        if _health_server is not None:
+            return
+        try:
+            _health_server = ThreadingHTTPServer((host, port), _HealthHandler)
+        except OSError as e:
+            logger.warning(f"Health endpoint not started on {host}:{port}: {e}")
+            return
+        _health_server.readiness = state
+        _health_server.daemon_threads = True
+        threading.Thread(
+            target=_health_server.serve_forever, name="health-server", daemon=True
+        ).start()
+        logger.info(f"Health endpoint listening on {host}:{port}")
@@ -0,0 +1,240 @@
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Hashable, List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class CachedResponse:
+    """
+    A cached chat turn together with what it was derived from.
+
+    Attributes:
+        prompt (str): The prompt that was sent to the LLM.
+        response (str): The LLM response.
+        chunks (List[str]): The formatted context chunks shown to the user.
+        rewritten_query (str): The retrieval query produced by the rewriter.
+        chunk_ids (Tuple[str, ...]): IDs of the retrieved chunks, in order.
+        content_version (Hashable): Version of the searched collections at answer time.
+        embedding (Optional[np.ndarray]): Unit-normalized query embedding, if available.
+        created_at (float): Monotonic timestamp of insertion.
+    """
+
+    prompt: str
+    response: str
+    chunks: List[str]
+    rewritten_query: str
+    chunk_ids: Tuple[str, ...]
+    content_version: Hashable
+    embedding: Optional[np.ndarray] = None
+    created_at: float = field(default_factory=time.monotonic)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalizes a query for exact matching: lowercase, collapsed whitespace,
+    no trailing punctuation.
+    """
+    query = re.sub(r"\s+", " ", query.strip().lower())
+    return query.rstrip("?.!; ")
+
+
+def chunk_ids_from_context(chunks: List[str]) -> Tuple[str, ...]:
+    """
+    Extracts chunk IDs from the "Context Source: <id>" header that
+    ContextRetrieval puts on each chunk.
+    """
+    ids = []
+    for chunk in chunks:
+        header = chunk.split("\n", 1)[0]
+        ids.append(header.replace("Context Source:", "", 1).strip())
+    return tuple(ids)
+
+
+class ResponseCache:
+    """
+    An LRU + TTL cache of full chat responses.
+
+    Entries are looked up in two ways:
+      * `get` matches the normalized query exactly and skips the whole turn
+        (rewrite, search, rerank and generation).
+      * `get_similar` runs after retrieval and matches a query whose embedding
+        is within `similarity_threshold` cosine similarity of a cached one and
+        which retrieved the same chunk IDs, so only generation is skipped.
+
+    Both require the same config key (model, sampling params, prompt
+    decorators, RAG params) and the same collection content version, so any
+    ingest or deletion invalidates older entries.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 3600.0,
+        similarity_threshold: float = 0.95,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.hits = {"exact": 0, "semantic": 0}
+        self.misses = {"exact": 0, "semantic": 0}
+        self._entries: "OrderedDict[Tuple[Hashable, str], CachedResponse]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, entry: CachedResponse, content_version: Hashable) -> bool:
+        return (
+            entry.content_version == content_version
+            and time.monotonic() - entry.created_at < self.ttl_seconds
+        )
+
+    def _record(
+        self, tier: str, entry: Optional[CachedResponse]
+    ) -> Optional[CachedResponse]:
+        if entry is None:
+            self.misses[tier] += 1
+        else:
+            self.hits[tier] += 1
+        return entry
+
+    def get(
+        self, query: str, config_key: Hashable, content_version: Hashable
+    ) -> Optional[CachedResponse]:
+        """
+        Returns the cached response for an exact (normalized) query match.
+        """
+        key = (config_key, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._is_fresh(entry, content_version):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return self._record("exact", entry)
+
+    def get_similar(
+        self,
+        embedding: np.ndarray,
+        config_key: Hashable,
+        content_version: Hashable,
+        chunk_ids: Tuple[str, ...],
+    ) -> Optional[CachedResponse]:
+        """
+        Returns the most similar cached response that retrieved the same chunks,
+        if its similarity is at least `similarity_threshold`.
+        """
+        query_vector = _unit(embedding)
+        with self._lock:
+            candidates = [
+                (key, entry)
+                for key, entry in self._entries.items()
+                if key[0] == config_key
+                and entry.embedding is not None
+                and entry.chunk_ids == chunk_ids
+                and self._is_fresh(entry, content_version)
+            ]
+            best = None
+            if candidates:
+                matrix = np.stack([entry.embedding for _, entry in candidates])
+                scores = matrix @ query_vector
+                index = int(np.argmax(scores))
+                if scores[index] >= self.similarity_threshold:
+                    best = candidates[index]
+                    self._entries.move_to_end(best[0])
+            return self._record("semantic", best[1] if best else None)
+
+    def put(
+        self,
+        query: str,
+        config_key: Hashable,
+        entry: CachedResponse,
+    ) -> None:
+        """
+        Stores a response under the normalized query, evicting the least
+        recently used entries beyond `max_entries`.
+        """
+        if entry.embedding is not None:
+            entry.embedding = _unit(entry.embedding)
+        key = (config_key, normalize_query(query))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns per-tier hit/miss counters and the overall hit rate per turn.
+        """
+        with self._lock:
+            hits, misses = dict(self.hits), dict(self.misses)
+            entries = len(self._entries)
+        # every cacheable turn does exactly one exact lookup
+        turns = hits["exact"] + misses["exact"]
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": sum(hits.values()) / turns if turns else 0.0,
+            "entries": entries,
+        }
+
+
+class ContentVersions:
+    """
+    Content versions of collections, kept as one marker file per collection
+    in a directory shared by every process (and replica) using the vector
+    store, so an insert anywhere invalidates the cached answers everywhere.
+
+    A bump writes a new random marker; concurrent bumps cannot restore an
+    earlier version.
+    """
+
+    def __init__(self, root: str) -> None:
+        """
+        Args:
+            root (str): Directory of the marker files.
+        """
+        self.root = root
+
+    def _path(self, collection_name: str) -> str:
+        return os.path.join(self.root, collection_name)
+
+    def get(self, collection_name: str) -> str:
+        """
+        Returns an opaque version string for the collection.
+        """
+        try:
+            with open(self._path(collection_name)) as f:
+                marker = f.read()
+        except FileNotFoundError:
+            marker = ""
+        return f"{collection_name}:{marker}"
+
+    def bump(self, collection_name: str) -> None:
+        """
+        Marks the collection's content as changed.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(collection_name)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(uuid.uuid4().hex)
+        os.replace(temp_path, path)
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
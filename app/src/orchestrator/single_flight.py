@@ -0,0 +1,87 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# How long a finished call keeps serving identical requests, in seconds.
+DEFAULT_COALESCING_WINDOW = 2.0
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.finished_at: Optional[float] = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls into one computation.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive with the same key while it is running wait for it and receive the
+    same result or exception. A finished result keeps being shared for
+    `window` seconds so requests that arrive just after it completes are
+    coalesced too; after that the next call recomputes.
+
+    Results are shared objects, so callers must treat them as read-only.
+    """
+
+    def __init__(self, window: float = DEFAULT_COALESCING_WINDOW) -> None:
+        self.window = window
+        self.coalesced = 0
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        expired = [
+            key
+            for key, call in self._calls.items()
+            if call.finished_at is not None and now - call.finished_at >= self.window
+        ]
+        for key in expired:
+            del self._calls[key]
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Runs `fn` unless an identical call is in flight or finished within the window.
+
+        Args:
+            key (Hashable): Identity of the request (normalized inputs and config).
+            fn (Callable[[], Any]): The computation to run.
+
+        Returns:
+            Tuple[Any, bool]: The result and whether it was shared from another caller.
+        """
+        with self._lock:
+            self._prune(time.monotonic())
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                # failures are only shared with callers already waiting
+                self._calls.pop(key, None)
+            raise
+        finally:
+            call.finished_at = time.monotonic()
+            call.done.set()
+        return call.result, False
+
+
+# Shared by every code path that calls a chat model (generation and rewrite).
+llm_flight = SingleFlight()
@@ -1,3 +1,5 @@
+import os
+
 import hydra
 from omegaconf import DictConfig
 
@@ -40,3 +42,12 @@ def load_config(config_name: str, config_dir: str):
         config = hydra.utils.instantiate(dict_config, _convert_="all")
 
     return config
+
+
+def available_cpus() -> int:
+    """
+    Number of CPUs this process may run on (respects container CPU sets).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
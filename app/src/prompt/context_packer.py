@@ -0,0 +1,155 @@
+import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, List, Optional, Set
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+# Context windows for hosted models. Local (Ollama) models use num_ctx instead.
+MODEL_CONTEXT_WINDOWS = {
+    "GPT-4.0": 128000,
+    "GPT-3.5": 16385,
+}
+
+TIKTOKEN_MODELS = {
+    "GPT-4.0": "gpt-4o",
+    "GPT-3.5": "gpt-3.5-turbo",
+}
+
+# fallback when no tiktoken encoding can be loaded; English averages about
+# four characters per token, so three overestimates and keeps within budget
+CHARS_PER_TOKEN = 3
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(model_name: str) -> Callable[[str], int]:
+    """
+    Returns a token counting function for the given chat model.
+
+    GPT models use their tiktoken encoding. Ollama does not expose its
+    tokenizers, so local models are counted with cl100k_base, which is within
+    a few percent of the Llama 3 / Mistral tokenizers on English text.
+
+    tiktoken downloads its encodings on first use unless they are in
+    TIKTOKEN_CACHE_DIR (the Docker image bundles them). If neither works,
+    e.g. air-gapped, tokens are estimated from the text length.
+    """
+    try:
+        try:
+            encoding = tiktoken.encoding_for_model(TIKTOKEN_MODELS[model_name])
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        logger.warning(
+            "No tiktoken encoding available for %s; estimating token counts",
+            model_name,
+            exc_info=True,
+        )
+        return lambda text: -(-len(text) // CHARS_PER_TOKEN)
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+@dataclass
+class ContextCandidate:
+    """
+    A retrieved chunk considered for the prompt.
+
+    Attributes:
+        text (str): The formatted chunk as it would appear in the prompt.
+        document (str): The raw chunk text, used for duplicate detection.
+        score (float): Relevance, higher is better. Vector store distances
+            are not comparable across stores (Chroma's L2 is lower-is-better),
+            so ContextRetrieval passes the negated rank of the search results.
+    """
+
+    text: str
+    document: str
+    score: float
+
+
+def _shingles(text: str, size: int = 5) -> Set[str]:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+class ContextPacker:
+    """
+    Selects retrieved chunks to fit a token budget.
+
+    Candidates are taken in reranker score order. A candidate is dropped when
+    most of its word 5-grams already appear in a selected chunk (overlapping
+    or near-duplicate chunks), or when it does not fit in what is left of the
+    budget. If even the best chunk does not fit, it is truncated to the budget
+    so the prompt is never left without context.
+    """
+
+    def __init__(
+        self,
+        count_tokens: Callable[[str], int],
+        budget: int,
+        max_chunks: Optional[int] = None,
+        dedup_threshold: float = 0.8,
+        separator: str = "\n\n---\n\n",
+    ) -> None:
+        """
+        Args:
+            count_tokens (Callable[[str], int]): Token counter for the target model.
+            budget (int): Maximum number of tokens for the packed context.
+            max_chunks (int, optional): Maximum number of chunks to keep.
+            dedup_threshold (float): Shingle containment above which a chunk is a duplicate.
+            separator (str): String placed between chunks.
+        """
+        self.count_tokens = count_tokens
+        self.budget = budget
+        self.max_chunks = max_chunks
+        self.dedup_threshold = dedup_threshold
+        self.separator = separator
+
+    def _is_duplicate(self, shingles: Set[str], selected: List[Set[str]]) -> bool:
+        for other in selected:
+            overlap = len(shingles & other) / max(1, min(len(shingles), len(other)))
+            if overlap >= self.dedup_threshold:
+                return True
+        return False
+
+    def _truncate(self, text: str, budget: int) -> str:
+        # shrink by the measured ratio until it fits; converges in a few steps
+        while text and self.count_tokens(text) > budget:
+            ratio = budget / self.count_tokens(text)
+            text = text[: max(0, int(len(text) * ratio) - 1)]
+        return text
+
+    def pack(self, candidates: List[ContextCandidate]) -> List[str]:
+        """
+        Returns the formatted chunks to place in the prompt, best first.
+        """
+        separator_tokens = self.count_tokens(self.separator)
+        remaining = self.budget
+        selected, selected_shingles = [], []
+
+        for candidate in sorted(candidates, key=lambda c: c.score, reverse=True):
+            if self.max_chunks is not None and len(selected) >= self.max_chunks:
+                break
+
+            shingles = _shingles(candidate.document)
+            if self._is_duplicate(shingles, selected_shingles):
+                continue
+
+            cost = self.count_tokens(candidate.text)
+            if selected:
+                cost += separator_tokens
+            if cost <= remaining:
+                selected.append(candidate.text)
+                selected_shingles.append(shingles)
+                remaining -= cost
+            elif not selected and remaining > 0:
+                selected.append(self._truncate(candidate.text, remaining))
+                selected_shingles.append(shingles)
+                remaining = 0
+
+        return selected
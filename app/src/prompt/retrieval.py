@@ -2,10 +2,19 @@ from typing import List, Optional
 
 from databroker.databroker import DataBroker
 from logs.logger import logger
+from logs.tracing import span
 from orchestrator.config import SystemConfig
+from orchestrator.single_flight import llm_flight
 from prompt.base_prompt import PromptComponent, PromptDecorator
+from prompt.context_packer import (
+    MODEL_CONTEXT_WINDOWS,
+    ContextCandidate,
+    ContextPacker,
+    get_token_counter,
+)
 
 from models.models import ChatModel
+from models.registry import ModelRegistry
 
 DEFAULT_QUERY_REWRITER: str = """
     You are an expert in simplifying scientific literature search queries for toxicology and pesticide research. 
@@ -86,13 +95,51 @@ class ContextRetrieval(PromptDecorator):
         self.rewrite_query = self._prompt.rewrite_query
         self.hybrid_weight = (hybrid_weight,)
 
-    def get_prompt(self, query: str) -> str:
+    def get_context_budget(self, base_prompt: str, count_tokens) -> int:
+        """
+        Returns the number of tokens available for retrieved context: the
+        model's window minus the generation headroom, the rest of the prompt
+        and a safety reserve, capped at max_context_tokens.
+        """
+        model_params = self.config.model_params
+        rag_params = self.config.rag_params
+        window = MODEL_CONTEXT_WINDOWS.get(
+            model_params.model_name, model_params.num_ctx
+        )
+        budget = (
+            window
+            - model_params.max_tokens
+            - count_tokens(base_prompt)
+            - rag_params.context_reserve_tokens
+        )
+        if rag_params.max_context_tokens is not None:
+            budget = min(budget, rag_params.max_context_tokens)
+        return max(budget, 0)
 
-        # Rewrite
-        retrieval_query, cost = self.rewrite_model(
-            DEFAULT_QUERY_REWRITER.format(question=query),
-            override_config={"temperature": 0.0},
+    def get_prompt(self, query: str) -> str:
+        with span("retrieval.get_prompt", collection=self.collection):
+            return self._get_prompt(query)
+
+    def _get_prompt(self, query: str) -> str:
+
+        # Rewrite (identical concurrent rewrites share one LLM call)
+        rewrite_prompt = DEFAULT_QUERY_REWRITER.format(question=query)
+        key = (
+            ModelRegistry.chat_model_key(
+                self.config.model_params.model_name, self.config
+            ),
+            rewrite_prompt,
+            "rewrite",
         )
+        with span("retrieval.rewrite"):
+            (retrieval_query, cost), shared = llm_flight.do(
+                key,
+                lambda: self.rewrite_model(
+                    rewrite_prompt, override_config={"temperature": 0.0}
+                ),
+            )
+        if shared:
+            cost = 0.0
         self.rewrite_query = retrieval_query
         self.cost += cost
         print("Query was rewritten. The retrieval query is:\n", retrieval_query)
@@ -106,9 +153,10 @@ class ContextRetrieval(PromptDecorator):
             },
         )
 
+        # over-fetch so the packer can replace near-duplicates
         results = self.databroker.search(
             [retrieval_query],
-            top_k=self.config.rag_params.top_k,
+            top_k=2 * self.config.rag_params.top_k,
             collection=self.collection,
             keywords=self.config.rag_params.keywords,
             filenames=self.config.rag_params.filenames,
@@ -120,15 +168,39 @@ class ContextRetrieval(PromptDecorator):
         if len(results) == 0 or len(results[0]) == 0:
             return "No results found for the query. Please relay that no documents were retrieved for the given query."
 
-        self.chunks = [
-            f"Context Source: {chunk.id}\nDocument: {chunk.document}\nDistance: {chunk.distance}"
+        # search results are best first, whether reranked or in vector store
+        # order, so pack by rank rather than by the store-specific distance
+        candidates = [
+            ContextCandidate(
+                text=f"Context Source: {chunk.id}\nDocument: {chunk.document}\nDistance: {chunk.distance}",
+                document=chunk.document,
+                score=-rank,
+            )
             for result in results
-            for chunk in result
+            for rank, chunk in enumerate(result)
         ]
 
-        context_text = "\n\n---\n\n".join(self.chunks)
-
-        return self._prompt.get_prompt(query).format(
+        # the wrapped prompt may itself retrieve (stacked decorators), so build
+        # it once for both the budget and the final prompt
+        inner_prompt = self._prompt.get_prompt(query)
+        base_prompt = inner_prompt.format(
+            decorate=self.PromptTemplate.format(context="", decorate="{decorate}")
+        )
+        count_tokens = get_token_counter(self.config.model_params.model_name)
+        packer = ContextPacker(
+            count_tokens=count_tokens,
+            budget=self.get_context_budget(base_prompt, count_tokens),
+            max_chunks=self.config.rag_params.top_k,
+            dedup_threshold=self.config.rag_params.context_dedup_threshold,
+        )
+        with span("retrieval.pack", budget=packer.budget) as s:
+            self.chunks = packer.pack(candidates)
+            context_text = packer.separator.join(self.chunks)
+            s.add_metric("candidates", len(candidates))
+            s.add_metric("chunks", len(self.chunks))
+            s.add_metric("context_tokens", count_tokens(context_text))
+
+        return inner_prompt.format(
             decorate=self.PromptTemplate.format(
                 context=context_text, decorate="{decorate}"
             )
@@ -1,5 +1,8 @@
+import logging
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
-from typing import Type
+from typing import Iterator, Type
 
 from decouple import config
 from llama_index.core.readers.base import BaseReader
@@ -24,6 +27,8 @@ from reasoning.loaders import (
 )
 from theflow.settings import settings as flowsettings
 
+logger = logging.getLogger(__name__)
+
 web_reader = WebReader()
 unstructured = UnstructuredReader()
 adobe_reader = AdobeReader()
@@ -39,7 +44,10 @@ adobe_reader.vlm_endpoint = azure_reader.vlm_endpoint = docling_reader.vlm_endpo
 
 
 KH_DEFAULT_FILE_EXTRACTORS: dict[str, BaseReader] = {
-    ".xlsx": PandasExcelReader(),
+    ".xlsx": PandasExcelReader(
+        streaming=getattr(flowsettings, "KH_EXCEL_STREAMING", False),
+        rows_per_document=getattr(flowsettings, "KH_EXCEL_ROWS_PER_DOCUMENT", 1000),
+    ),
     ".docx": unstructured,
     ".pptx": unstructured,
     ".xls": unstructured,
@@ -57,6 +65,42 @@ KH_DEFAULT_FILE_EXTRACTORS: dict[str, BaseReader] = {
 }
 
 
+def get_file_extractors(
+    pdf_mode: str = "normal",
+    override_file_extractors: dict[str, Type[BaseReader]] | None = None,
+) -> dict[str, BaseReader]:
+    """Get the reader of each file extension for the given pdf mode"""
+    file_extractors: dict[str, BaseReader] = {
+        ext: reader for ext, reader in KH_DEFAULT_FILE_EXTRACTORS.items()
+    }
+    for ext, cls in (override_file_extractors or {}).items():
+        file_extractors[ext] = cls()
+
+    if pdf_mode == "normal":
+        file_extractors[".pdf"] = PDFReader()
+    elif pdf_mode == "ocr":
+        file_extractors[".pdf"] = OCRReader()
+    elif pdf_mode == "multimodal":
+        file_extractors[".pdf"] = AdobeReader()
+    else:
+        file_extractors[".pdf"] = MathpixPDFReader()
+
+    return file_extractors
+
+
+def _read_file(
+    file_path: str | Path,
+    pdf_mode: str,
+    override_file_extractors: dict[str, Type[BaseReader]],
+) -> list[Document]:
+    """Read one file into Documents, in a worker process"""
+    reader = DirectoryReader(
+        input_files=[file_path],
+        file_extractor=get_file_extractors(pdf_mode, override_file_extractors),
+    )
+    return reader()
+
+
 class DocumentIngestor(BaseComponent):
     """Ingest common office document types into Document for indexing
 
@@ -74,6 +118,9 @@ class DocumentIngestor(BaseComponent):
         text_splitter: splitter to split the document into text nodes
         override_file_extractors: override file extractors for specific file extensions
             The default file extractors are stored in `KH_DEFAULT_FILE_EXTRACTORS`
+        num_workers: number of processes reading files in parallel. With more
+            than 1, each file is read, split and parsed on its own, and a file
+            that fails to read is logged and skipped instead of failing the batch
     """
 
     pdf_mode: str = "normal"  # "normal", "mathpix", "ocr", "multimodal"
@@ -85,31 +132,95 @@ class DocumentIngestor(BaseComponent):
         backup_separators=["\n", ".", " ", "\u200b"],
     )
     override_file_extractors: dict[str, Type[BaseReader]] = {}
+    num_workers: int = 1
 
     def _get_reader(self, input_files: list[str | Path]):
         """Get appropriate readers for the input files based on file extension"""
-        file_extractors: dict[str, BaseReader] = {
-            ext: reader for ext, reader in KH_DEFAULT_FILE_EXTRACTORS.items()
-        }
-        for ext, cls in self.override_file_extractors.items():
-            file_extractors[ext] = cls()
-
-        if self.pdf_mode == "normal":
-            file_extractors[".pdf"] = PDFReader()
-        elif self.pdf_mode == "ocr":
-            file_extractors[".pdf"] = OCRReader()
-        elif self.pdf_mode == "multimodal":
-            file_extractors[".pdf"] = AdobeReader()
-        else:
-            file_extractors[".pdf"] = MathpixPDFReader()
-
         main_reader = DirectoryReader(
             input_files=input_files,
-            file_extractor=file_extractors,
+            file_extractor=get_file_extractors(
+                self.pdf_mode, self.override_file_extractors
+            ),
         )
 
         return main_reader
 
+    def _transform(self, documents: list[Document]) -> list[Document]:
+        """Split the documents into nodes and run the document parsers"""
+        nodes = self.text_splitter(documents)
+        if self.doc_parsers:
+            for parser in self.doc_parsers:
+                nodes = parser(nodes)
+        return nodes
+
+    def _read_parallel(
+        self, file_paths: list[str | Path]
+    ) -> Iterator[tuple[int, list[Document]]]:
+        """Read the files in a process pool, yielding (index, documents) per file
+        as they complete. At most two files per worker are in flight, so
+        finished files do not pile up ahead of a slow consumer."""
+        workers = min(self.num_workers, len(file_paths))
+        queue = iter(enumerate(file_paths))
+        failed = []
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            pending = {}
+
+            def submit():
+                for index, file_path in queue:
+                    future = pool.submit(
+                        _read_file,
+                        file_path,
+                        self.pdf_mode,
+                        dict(self.override_file_extractors),
+                    )
+                    pending[future] = (index, file_path)
+                    return
+
+            for _ in range(2 * workers):
+                submit()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, file_path = pending.pop(future)
+                    submit()
+                    try:
+                        documents = future.result()
+                    except Exception as e:
+                        logger.warning(f"Failed to read {file_path}: {e}")
+                        failed.append(str(file_path))
+                        continue
+                    yield index, documents
+
+        if failed:
+            self.log_progress(".failed_files", failed_files=failed)
+
+    def stream(self, file_paths: list[str | Path] | str | Path) -> Iterator[Document]:
+        """Ingest the file paths, yielding each file's nodes as soon as it has
+        been read, split and parsed (in completion order when reading in
+        parallel)
+
+        Args:
+            file_paths: list of file paths or a single file path
+
+        Yields:
+            parsed Documents
+        """
+        if not isinstance(file_paths, list):
+            file_paths = [file_paths]
+
+        if self.num_workers <= 1 or len(file_paths) <= 1:
+            yield from self.run(file_paths)
+            return
+
+        num_nodes = 0
+        for _, documents in self._read_parallel(file_paths):
+            nodes = self._transform(documents)
+            num_nodes += len(nodes)
+            yield from nodes
+        self.log_progress(".num_docs", num_docs=num_nodes)
+
     def run(self, file_paths: list[str | Path] | str | Path) -> list[Document]:
         """Ingest the file paths into Document
 
@@ -122,6 +233,17 @@ class DocumentIngestor(BaseComponent):
         if not isinstance(file_paths, list):
             file_paths = [file_paths]
 
+        if self.num_workers > 1 and len(file_paths) > 1:
+            # keep the input order of the files
+            per_file = {
+                index: self._transform(documents)
+                for index, documents in self._read_parallel(file_paths)
+            }
+            nodes = [node for index in sorted(per_file) for node in per_file[index]]
+            print(f"Read {len(per_file)} files into {len(nodes)} nodes.")
+            self.log_progress(".num_docs", num_docs=len(nodes))
+            return nodes
+
         documents = self._get_reader(input_files=file_paths)()
         print(f"Read {len(file_paths)} files into {len(documents)} documents.")
         nodes = self.text_splitter(documents)
@@ -21,7 +21,7 @@ from .format_context import (
     EVIDENCE_MODE_TABLE,
     EVIDENCE_MODE_TEXT,
 )
-from .utils import find_text
+from .utils import SpanIndex, find_text
 
 try:
     from ktem.llms.manager import llms
@@ -300,10 +300,12 @@ class AnswerWithContextPipeline(BaseComponent):
             return spans
 
         evidences = answer.metadata["citation"].evidences
+        # index each context once for all the quotes
+        indices = [SpanIndex(doc.text) for doc in docs]
         for quote in evidences:
             matched_excerpts = []
-            for doc in docs:
-                matches = find_text(quote, doc.text)
+            for doc, index in zip(docs, indices):
+                matches = find_text(quote, index)
 
                 for start, end in matches:
                     if "|" not in doc.text[start:end]:
@@ -10,7 +10,7 @@ from reasoning.llms import PromptTemplate
 
 from .citation_qa import CITATION_TIMEOUT, MAX_IMAGES, AnswerWithContextPipeline
 from .format_context import EVIDENCE_MODE_FIGURE
-from .utils import find_start_end_phrase
+from .utils import SpanIndex, find_start_end_phrase
 
 DEFAULT_QA_CITATION_PROMPT = """
 Use the following pieces of context to answer the question at the end.
@@ -326,6 +326,8 @@ class AnswerWithInlineCitation(AnswerWithContextPipeline):
             return spans
 
         evidences = answer.metadata["citation"]
+        # index each context once for all the evidences
+        indices = [SpanIndex(doc.text) for doc in docs]
 
         for e_id, evidence in enumerate(evidences):
             start_phrase, end_phrase = evidence.start_phrase, evidence.end_phrase
@@ -338,9 +340,9 @@ class AnswerWithInlineCitation(AnswerWithContextPipeline):
             best_match_length = 0
             best_match_doc_idx = None
 
-            for doc in docs:
+            for doc, index in zip(docs, indices):
                 match, match_length = find_start_end_phrase(
-                    start_phrase, end_phrase, doc.text
+                    start_phrase, end_phrase, index
                 )
                 if best_match is None or (
                     match is not None and match_length > best_match_length
@@ -4,6 +4,7 @@ from functools import partial
 import tiktoken
 from reasoning.base import BaseComponent, Document, RetrievedDocument
 from reasoning.indices.splitters import TokenSplitter
+from reasoning.loaders.pdf_loader import resolve_thumbnail
 
 EVIDENCE_MODE_TEXT = 0
 EVIDENCE_MODE_TABLE = 1
@@ -74,7 +75,7 @@ class PrepareEvidencePipeline(BaseComponent):
                 )
             elif retrieved_item.metadata.get("type", "") == "image":
                 evidence_modes.append(EVIDENCE_MODE_FIGURE)
-                retrieved_content = retrieved_item.metadata.get("image_origin", "")
+                retrieved_content = resolve_thumbnail(retrieved_item)
                 retrieved_caption = html.escape(retrieved_item.get_content())
                 evidence += (
                     f"<br><b>Figure from {source}</b>\n"
@@ -1,26 +1,113 @@
+import math
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
 from difflib import SequenceMatcher
 
 
+class SpanIndex:
+    """Index of the character n-grams of a context, used to find the blocks an
+    answer sentence shares with it
+
+    `difflib.SequenceMatcher` compares each sentence against every position of
+    the context. Since only blocks longer than a threshold count as evidence,
+    every such block starts with an n-gram of `anchor_size` characters that
+    occurs in the context; only those anchor positions are extended. The
+    blocks found, and their tie-breaking, are the same as SequenceMatcher's.
+
+    The context is normalized as the matching functions expect (lowercased,
+    newlines as spaces). Build it once per context and pass it to `find_text`
+    or `find_start_end_phrase` in place of the context string.
+    """
+
+    def __init__(self, context: str, anchor_size: int = 6):
+        self.context = context.lower().replace("\n", " ")
+        self.anchor_size = anchor_size
+        grams = defaultdict(list)
+        for j in range(len(self.context) - anchor_size + 1):
+            grams[self.context[j : j + anchor_size]].append(j)
+        self._grams = dict(grams)
+
+    def longest_match(self, a, alo, ahi, blo, bhi, min_size=None):
+        """Longest block a[i:i+k] == context[j:j+k] with i, k in [alo, ahi) and
+        j, k in [blo, bhi), as `SequenceMatcher.find_longest_match`: ties go to
+        the earliest i, then the earliest j
+
+        Returns:
+            (i, j, k), or None if no block has at least `min_size` characters
+            (default and minimum `anchor_size`)
+        """
+        b, q = self.context, self.anchor_size
+        best, best_size = None, max(min_size or q, q) - 1
+        for i in range(alo, ahi - q + 1):
+            if ahi - i <= best_size:
+                # no longer block can start here
+                break
+            positions = self._grams.get(a[i : i + q])
+            if not positions:
+                continue
+            for j in positions[
+                bisect_left(positions, blo) : bisect_right(positions, bhi - q)
+            ]:
+                # a block extending to the left was already measured
+                if i > alo and j > blo and a[i - 1] == b[j - 1]:
+                    continue
+                k = q
+                while i + k < ahi and j + k < bhi and a[i + k] == b[j + k]:
+                    k += 1
+                if k > best_size:
+                    best, best_size = (i, j, k), k
+        return best
+
+    def matching_blocks(self, a, min_size):
+        """The blocks of `SequenceMatcher.get_matching_blocks` with at least
+        `min_size` characters, in order"""
+        blocks = []
+        queue = [(0, len(a), 0, len(self.context))]
+        while queue:
+            alo, ahi, blo, bhi = queue.pop()
+            # without a long enough block here, there is none in the sub-ranges
+            match = self.longest_match(a, alo, ahi, blo, bhi, min_size)
+            if match is None:
+                continue
+            i, j, k = match
+            blocks.append(match)
+            if alo < i and blo < j:
+                queue.append((alo, i, blo, j))
+            if i + k < ahi and j + k < bhi:
+                queue.append((i + k, ahi, j + k, bhi))
+        return sorted(blocks)
+
+
+def _min_block_size(threshold):
+    """Smallest integer size strictly greater than `threshold`"""
+    return math.floor(threshold) + 1
+
+
 def find_text(search_span, context, min_length=5):
-    search_span, context = search_span.lower(), context.lower()
+    index = context if isinstance(context, SpanIndex) else SpanIndex(context)
+    search_span, context = search_span.lower(), index.context
 
     sentence_list = search_span.split("\n")
-    context = context.replace("\n", " ")
 
     matches_span = []
     # don't search for small text
     if len(search_span) > min_length:
         for sentence in sentence_list:
-            match_results = SequenceMatcher(
-                None,
-                sentence,
-                context,
-                autojunk=False,
-            ).get_matching_blocks()
+            threshold = max(len(sentence) * 0.25, min_length)
+            min_size = _min_block_size(threshold)
+            if min_size >= index.anchor_size:
+                match_results = index.matching_blocks(sentence, min_size)
+            else:
+                match_results = SequenceMatcher(
+                    None,
+                    sentence,
+                    context,
+                    autojunk=False,
+                ).get_matching_blocks()
 
             matched_blocks = []
             for _, start, length in match_results:
-                if length > max(len(sentence) * 0.25, min_length):
+                if length > threshold:
                     matched_blocks.append((start, start + length))
 
             if matched_blocks:
@@ -45,9 +132,8 @@ def find_start_end_phrase(
     start_phrase, end_phrase, context, min_length=5, max_excerpt_length=300
 ):
     start_phrase, end_phrase = start_phrase.lower(), end_phrase.lower()
-    context = context.lower()
-
-    context = context.replace("\n", " ")
+    index = context if isinstance(context, SpanIndex) else SpanIndex(context)
+    context = index.context
 
     matches = []
     matched_length = 0
@@ -55,12 +141,19 @@ def find_start_end_phrase(
         if sentence is None:
             continue
 
-        match = SequenceMatcher(
-            None, sentence, context, autojunk=False
-        ).find_longest_match()
-        if match.size > max(len(sentence) * 0.35, min_length):
-            matches.append((match.b, match.b + match.size))
-            matched_length += match.size
+        threshold = max(len(sentence) * 0.35, min_length)
+        min_size = _min_block_size(threshold)
+        if min_size >= index.anchor_size:
+            match = index.longest_match(
+                sentence, 0, len(sentence), 0, len(context), min_size
+            )
+        else:
+            match = SequenceMatcher(
+                None, sentence, context, autojunk=False
+            ).find_longest_match()
+        if match is not None and match[2] > threshold:
+            matches.append((match[1], match[1] + match[2]))
+            matched_length += match[2]
 
     # check if second match is before the first match
     if len(matches) == 2 and matches[1][0] < matches[0][0]:
@@ -7,6 +7,7 @@ from typing import Optional, Sequence, cast
 
 from reasoning.base import BaseComponent, Document, RetrievedDocument
 from reasoning.embeddings import BaseEmbeddings
+from reasoning.loaders.pdf_loader import resolve_thumbnail
 from reasoning.storages import BaseDocumentStore, BaseVectorStore
 from theflow.settings import settings as flowsettings
 
@@ -62,7 +63,7 @@ class VectorIndexing(BaseIndexing):
                     markdown_content += f"\nSection: {section}"
                 if "type" in docs[i].metadata:
                     if docs[i].metadata["type"] == "image":
-                        image_origin = docs[i].metadata["image_origin"]
+                        image_origin = resolve_thumbnail(docs[i])
                         image_origin = f'<p><img src="{image_origin}"></p>'
                         markdown_content += f"\nImage origin: {image_origin}"
                 if docs[i].text:
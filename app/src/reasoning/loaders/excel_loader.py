@@ -5,11 +5,75 @@ Pandas parser for .xlsx files.
 """
 
 from pathlib import Path
-from typing import Any, List, Optional, Union
+from typing import Any, Iterator, List, Optional, Union
 
 from llama_index.core.readers.base import BaseReader
 from reasoning.base import Document
 
+# workbook formats openpyxl can stream
+STREAMING_SUFFIXES = {".xlsx", ".xlsm"}
+
+
+def iter_row_windows(
+    file: Path,
+    sheet_name: Optional[list] = None,
+    rows_per_window: int = 1000,
+    col_joiner: str = " ",
+) -> Iterator[tuple[int, str, int, int, str, list[str]]]:
+    """Read a workbook row by row with openpyxl in read-only mode, without
+    loading whole sheets in memory
+
+    Empty rows are skipped. The first non-empty row of each sheet is taken as
+    its header, as `pd.read_excel` does.
+
+    Args:
+        file: path to the workbook
+        sheet_name: names or indices of the sheets to read, default all
+        rows_per_window: number of rows per window
+        col_joiner: separator of the cell values in a row
+
+    Yields:
+        (sheet index, sheet name, first row, last row, header, rows) per
+        window, with 1-based row numbers as shown in Excel
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError(
+            "install openpyxl using `pip3 install openpyxl` to use streaming mode"
+        )
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        for idx, worksheet in enumerate(workbook.worksheets):
+            if sheet_name is not None and not (
+                worksheet.title in sheet_name or idx in sheet_name
+            ):
+                continue
+            header, rows, first_row, last_row = None, [], None, None
+            for row_number, values in enumerate(
+                worksheet.iter_rows(values_only=True), start=1
+            ):
+                if all(value is None or value == "" for value in values):
+                    continue
+                line = col_joiner.join(
+                    "" if value is None else str(value) for value in values
+                ).strip()
+                if header is None:
+                    header = line
+                    continue
+                if not rows:
+                    first_row = row_number
+                rows.append(line)
+                last_row = row_number
+                if len(rows) == rows_per_window:
+                    yield idx, worksheet.title, first_row, last_row, header, rows
+                    rows = []
+            if rows:
+                yield idx, worksheet.title, first_row, last_row, header, rows
+    finally:
+        workbook.close()
+
 
 class PandasExcelReader(BaseReader):
     r"""Pandas-based CSV parser.
@@ -23,6 +87,11 @@ class PandasExcelReader(BaseReader):
             Refer to https://pandas.pydata.org/docs/reference/api/pandas.read_excel.html
             for more information. Set to empty dict by default,
             this means defaults will be used.
+        streaming (bool): Read .xlsx files row by row with openpyxl and emit one
+            Document per window of `rows_per_document` rows, each starting with
+            the sheet's header row, instead of one Document for the workbook.
+            `pandas_config` does not apply in this mode.
+        rows_per_document (int): Rows per Document in streaming mode.
 
     """
 
@@ -32,6 +101,8 @@ class PandasExcelReader(BaseReader):
         pandas_config: Optional[dict] = None,
         row_joiner: str = "\n",
         col_joiner: str = " ",
+        streaming: bool = False,
+        rows_per_document: int = 1000,
         **kwargs: Any,
     ) -> None:
         """Init params."""
@@ -39,6 +110,8 @@ class PandasExcelReader(BaseReader):
         self._pandas_config = pandas_config or {}
         self._row_joiner = row_joiner if row_joiner else "\n"
         self._col_joiner = col_joiner if col_joiner else " "
+        self._streaming = streaming
+        self._rows_per_document = rows_per_document
 
     def load_data(
         self,
@@ -60,6 +133,11 @@ class PandasExcelReader(BaseReader):
             List[Document]: A list of`Document objects containing the
                 values from the specified column in the Excel file.
         """
+        if self._streaming and Path(file).suffix.lower() in STREAMING_SUFFIXES:
+            return list(
+                self.lazy_load_data(file, include_sheetname, sheet_name, extra_info)
+            )
+
         import itertools
 
         try:
@@ -103,6 +181,39 @@ class PandasExcelReader(BaseReader):
 
         return output
 
+    def lazy_load_data(
+        self,
+        file: Path,
+        include_sheetname: bool = False,
+        sheet_name: Optional[Union[str, int, list]] = None,
+        extra_info: Optional[dict] = None,
+        **kwargs,
+    ) -> Iterator[Document]:
+        """Stream the workbook as Documents of `rows_per_document` rows
+
+        Each Document holds the sheet's header row followed by its rows, with
+        the sheet name and the Excel row range in the metadata.
+        """
+        if sheet_name is not None:
+            sheet_name = (
+                [sheet_name] if not isinstance(sheet_name, list) else sheet_name
+            )
+
+        for idx, key, first_row, last_row, header, rows in iter_row_windows(
+            Path(file), sheet_name, self._rows_per_document, self._col_joiner
+        ):
+            lines = [key, header] if include_sheetname else [header]
+            yield Document(
+                text=self._row_joiner.join(lines + rows),
+                metadata={
+                    "page_label": idx + 1,
+                    "sheet_name": key,
+                    "row_start": first_row,
+                    "row_end": last_row,
+                    **(extra_info or {}),
+                },
+            )
+
 
 class ExcelReader(BaseReader):
     r"""Spreadsheet exporter respecting multiple worksheets
@@ -116,6 +227,11 @@ class ExcelReader(BaseReader):
             Refer to https://pandas.pydata.org/docs/reference/api/pandas.read_excel.html
             for more information. Set to empty dict by default,
             this means defaults will be used.
+        streaming (bool): Read .xlsx files row by row with openpyxl and emit one
+            Document per window of `rows_per_document` rows, each starting with
+            the sheet's header row, instead of one Document for the workbook.
+            `pandas_config` does not apply in this mode.
+        rows_per_document (int): Rows per Document in streaming mode.
 
     """
 
@@ -125,6 +241,8 @@ class ExcelReader(BaseReader):
         pandas_config: Optional[dict] = None,
         row_joiner: str = "\n",
         col_joiner: str = " ",
+        streaming: bool = False,
+        rows_per_document: int = 1000,
         **kwargs: Any,
     ) -> None:
         """Init params."""
@@ -132,6 +250,8 @@ class ExcelReader(BaseReader):
         self._pandas_config = pandas_config or {}
         self._row_joiner = row_joiner if row_joiner else "\n"
         self._col_joiner = col_joiner if col_joiner else " "
+        self._streaming = streaming
+        self._rows_per_document = rows_per_document
 
     def load_data(
         self,
@@ -153,6 +273,10 @@ class ExcelReader(BaseReader):
             List[Document]: A list of`Document objects containing the
                 values from the specified column in the Excel file.
         """
+        if self._streaming and Path(file).suffix.lower() in STREAMING_SUFFIXES:
+            return list(
+                self.lazy_load_data(file, include_sheetname, sheet_name, extra_info)
+            )
 
         try:
             import pandas as pd
@@ -190,3 +314,42 @@ class ExcelReader(BaseReader):
             output.append(Document(text=content, metadata=metadata))
 
         return output
+
+    def lazy_load_data(
+        self,
+        file: Path,
+        include_sheetname: bool = True,
+        sheet_name: Optional[Union[str, int, list]] = None,
+        extra_info: Optional[dict] = None,
+        **kwargs,
+    ) -> Iterator[Document]:
+        """Stream the workbook as Documents of `rows_per_document` rows
+
+        Each Document holds the sheet's header row followed by its rows, with
+        the sheet name and the Excel row range in the metadata.
+        """
+        if sheet_name is not None:
+            sheet_name = (
+                [sheet_name] if not isinstance(sheet_name, list) else sheet_name
+            )
+
+        file = Path(file)
+        extra_info = extra_info or {}
+
+        for idx, key, first_row, last_row, header, rows in iter_row_windows(
+            file, sheet_name, self._rows_per_document, self._col_joiner
+        ):
+            content = self._row_joiner.join([header] + rows).strip()
+            if include_sheetname:
+                content = (
+                    f"(Sheet {key} of file {file.name}, rows {first_row}-{last_row})"
+                    f"\n{content}"
+                )
+            metadata = {
+                "page_label": idx + 1,
+                "sheet_name": key,
+                "row_start": first_row,
+                "row_end": last_row,
+                **extra_info,
+            }
+            yield Document(text=content, metadata=metadata)
@@ -1,11 +1,19 @@
+import hashlib
+import json
 import logging
 import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import BytesIO
 from pathlib import Path
 from typing import List, Optional
 from uuid import uuid4
 
 import requests
 from llama_index.core.readers.base import BaseReader
+from PyPDF2 import PdfReader, PdfWriter
 from reasoning.base import Document
 from tenacity import after_log, retry, stop_after_attempt, wait_exponential
 
@@ -15,6 +23,21 @@ from .utils.table import strip_special_chars_markdown
 logger = logging.getLogger(__name__)
 
 DEFAULT_OCR_ENDPOINT = "http://127.0.0.1:8000/v2/ai/infer/"
+DEFAULT_OCR_CACHE_DIR = "vectorstore/cache/ocr"
+DEFAULT_OCR_CACHE_MB = 512
+
+# page number in the artifact image name of a page, e.g. "page_3.png"
+_IMAGE_PAGE = re.compile(r"(\d+)(\.\w+)$")
+
+
+def offset_page_image(page: dict, offset: int) -> dict:
+    """Renumber the artifact image of a page OCR'd in a batch starting at page
+    `offset`, since the server numbers the pages of every request from 0"""
+    image = page.get("image")
+    if not isinstance(image, str) or not offset:
+        return page
+    image = _IMAGE_PAGE.sub(lambda match: f"{int(match[1]) + offset}{match[2]}", image)
+    return {**page, "image": image}
 
 
 @retry(
@@ -31,6 +54,21 @@ def tenacious_api_post(url, file_path, table_only, **kwargs):
     return resp
 
 
+@retry(
+    stop=stop_after_attempt(4),
+    wait=wait_exponential(multiplier=2, exp_base=2, min=1, max=30),
+    after=after_log(logger, logging.WARNING),
+)
+def tenacious_api_post_pages(url, content: bytes, file_name, table_only, **kwargs):
+    """Post an in-memory PDF (a batch of pages). Batches are small and retried
+    independently, so the backoff is much shorter than for whole files"""
+    files = {"input": (file_name, content, "application/pdf")}
+    data = {"job_id": uuid4(), "table_only": table_only}
+    resp = requests.post(url=url, files=files, data=data, **kwargs)
+    resp.raise_for_status()
+    return resp
+
+
 class OCRReader(BaseReader):
     """Read PDF using OCR, with high focus on table extraction
 
@@ -48,15 +86,154 @@ class OCRReader(BaseReader):
             (http://127.0.0.1:8000/v2/ai/infer/)
         use_ocr: whether to use OCR to read text (e.g: from images, tables) in the PDF
             If False, only the table and text within table cells will be extracted.
+        pages_per_request: number of pages sent in each OCR request
+            (`OCR_READER_PAGES_PER_REQUEST`, default 10)
+        max_concurrency: maximum number of OCR requests in flight
+            (`OCR_READER_CONCURRENCY`, default 4)
+        cache_dir: directory of the OCR results of each page batch, keyed by
+            file content (`OCR_READER_CACHE_DIR`). Retrying a file only sends
+            the batches that failed
+        cache_max_mb: size bound of `cache_dir` (`OCR_READER_CACHE_MB`,
+            default 512); the least recently used batches are evicted
     """
 
-    def __init__(self, endpoint: Optional[str] = None, use_ocr=True):
+    def __init__(
+        self,
+        endpoint: Optional[str] = None,
+        use_ocr=True,
+        pages_per_request: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        cache_max_mb: Optional[int] = None,
+    ):
         """Init the OCR reader with OCR endpoint (FullOCR pipeline)"""
         super().__init__()
         self.ocr_endpoint = endpoint or os.getenv(
             "OCR_READER_ENDPOINT", DEFAULT_OCR_ENDPOINT
         )
         self.use_ocr = use_ocr
+        self.pages_per_request = pages_per_request or int(
+            os.getenv("OCR_READER_PAGES_PER_REQUEST", 10)
+        )
+        self.max_concurrency = max_concurrency or int(
+            os.getenv("OCR_READER_CONCURRENCY", 4)
+        )
+        self.cache_dir = Path(
+            os.path.expanduser(
+                cache_dir or os.getenv("OCR_READER_CACHE_DIR", DEFAULT_OCR_CACHE_DIR)
+            )
+        )
+        self.cache_max_bytes = (
+            cache_max_mb or int(os.getenv("OCR_READER_CACHE_MB", DEFAULT_OCR_CACHE_MB))
+        ) << 20
+        self._cache_lock = threading.Lock()
+
+    def _ocr_batch(self, reader, lock, file_path: Path, key: str, start: int, end: int):
+        """OCR pages [start, end) of the PDF, or read them from the cache"""
+        entry = self.cache_dir / f"{key}_{start}_{end}.json"
+        try:
+            with entry.open() as f:
+                result = json.load(f)
+            os.utime(entry)
+            return result
+        except (OSError, ValueError):
+            pass
+
+        # PdfReader is not thread-safe
+        with lock:
+            writer = PdfWriter()
+            for page_number in range(start, end):
+                writer.add_page(reader.pages[page_number])
+            content = BytesIO()
+            writer.write(content)
+
+        resp = tenacious_api_post_pages(
+            url=self.ocr_endpoint,
+            content=content.getvalue(),
+            file_name=f"{file_path.stem}_{start}_{end}.pdf",
+            table_only=not self.use_ocr,
+        )
+        result = resp.json()["result"]
+        if len(result) != end - start:
+            raise ValueError(
+                f"OCR returned {len(result)} pages for pages {start}-{end - 1} "
+                f"of {file_path.name}"
+            )
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(result, f)
+        os.replace(temp_path, entry)
+        self._evict()
+        return result
+
+    def _evict(self) -> None:
+        """Remove the least recently used batches (by modification time, which
+        a hit refreshes) once the cache exceeds its size bound"""
+        with self._cache_lock:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.cache_max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+
+    def ocr_pages(self, file_path: Path) -> list[dict]:
+        """OCR the PDF in page batches, `max_concurrency` requests at a time
+
+        Returns:
+            the OCR result of every page, in page order, with the artifact
+            image of each page numbered within the whole document
+        """
+        digest = hashlib.sha256()
+        with file_path.open("rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        key = f"{digest.hexdigest()}_{'tables' if not self.use_ocr else 'full'}"
+
+        reader = PdfReader(str(file_path))
+        num_pages = len(reader.pages)
+        lock = threading.Lock()
+        batches = [
+            (start, min(start + self.pages_per_request, num_pages))
+            for start in range(0, num_pages, self.pages_per_request)
+        ]
+
+        results, errors = {}, []
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            futures = {
+                executor.submit(
+                    self._ocr_batch, reader, lock, file_path, key, start, end
+                ): start
+                for start, end in batches
+            }
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    logger.warning(
+                        f"OCR failed for {file_path.name} from page "
+                        f"{futures[future]}: {e}"
+                    )
+                    errors.append(e)
+
+        if errors:
+            # the successful batches are cached, a retry only redoes the others
+            raise errors[0]
+        return [
+            offset_page_image(page, start)
+            for start in sorted(results)
+            for page in results[start]
+        ]
 
     def load_data(
         self, file_path: Path, extra_info: Optional[dict] = None, **kwargs
@@ -78,11 +255,8 @@ class OCRReader(BaseReader):
             # overriding response content if specified
             ocr_results = kwargs["response_content"]
         else:
-            # call original API
-            resp = tenacious_api_post(
-                url=self.ocr_endpoint, file_path=file_path, table_only=not self.use_ocr
-            )
-            ocr_results = resp.json()["result"]
+            # call the API in concurrent page batches
+            ocr_results = self.ocr_pages(file_path)
 
         debug_path = kwargs.pop("debug_path", None)
         artifact_path = kwargs.pop("artifact_path", None)
@@ -1,4 +1,10 @@
 import base64
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -9,7 +15,16 @@ from llama_index.readers.file import PDFReader
 from PIL import Image
 from reasoning.base import Document
 
+logger = logging.getLogger(__name__)
+
 PDF_LOADER_DPI = config("PDF_LOADER_DPI", default=40, cast=int)
+PDF_THUMBNAIL_CACHE_DIR = config(
+    "PDF_THUMBNAIL_CACHE_DIR", default="vectorstore/cache/thumbnails"
+)
+PDF_THUMBNAIL_CACHE_MB = config("PDF_THUMBNAIL_CACHE_MB", default=512, cast=int)
+PDF_THUMBNAIL_PRERENDER_PAGES = config(
+    "PDF_THUMBNAIL_PRERENDER_PAGES", default=0, cast=int
+)
 
 
 def get_page_thumbnails(
@@ -55,14 +70,169 @@ def convert_image_to_base64(img: Image.Image) -> str:
     return img_base64
 
 
+def file_hash(file_path: Path | str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of the file content"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ThumbnailCache:
+    """Page thumbnails rendered on first request and kept on disk as PNG.
+
+    Entries are keyed by (file hash, page, dpi), so renamed or re-uploaded
+    copies of a PDF share them. Once the directory exceeds `max_bytes`, the
+    least recently used entries (by modification time, which a hit refreshes)
+    are evicted.
+
+    Args:
+        cache_dir: directory of the rendered thumbnails
+        max_bytes: size bound of the directory
+        dpi: resolution of the thumbnails
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = PDF_THUMBNAIL_CACHE_DIR,
+        max_bytes: int = PDF_THUMBNAIL_CACHE_MB << 20,
+        dpi: int = PDF_LOADER_DPI,
+    ) -> None:
+        self.cache_dir = Path(os.path.expanduser(cache_dir))
+        self.max_bytes = max_bytes
+        self.dpi = dpi
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry(self, digest: str, page: int) -> Path:
+        return self.cache_dir / f"{digest}_{page}_{self.dpi}.png"
+
+    def get(self, file_path: Path | str, digest: str, page: int) -> str:
+        """Get the thumbnail of a page as a base64 data URI, rendering it from
+        `file_path` if it is not cached"""
+        entry = self._entry(digest, page)
+        try:
+            png = entry.read_bytes()
+            os.utime(entry)
+        except OSError:
+            png = self.render(file_path, digest, [page])[0]
+        return "data:image/png;base64," + base64.b64encode(png).decode("utf-8")
+
+    def render(
+        self, file_path: Path | str, digest: str, pages: list[int]
+    ) -> list[bytes]:
+        """Render the pages into the cache and return their PNG bytes"""
+        try:
+            import fitz
+        except ImportError:
+            raise ImportError("Please install PyMuPDF: 'pip install PyMuPDF'")
+
+        output = []
+        with fitz.open(file_path) as doc:
+            for page_number in pages:
+                pm = doc.load_page(page_number).get_pixmap(dpi=self.dpi)
+                img = Image.frombytes("RGB", [pm.width, pm.height], pm.samples)
+                img_bytes = BytesIO()
+                img.save(img_bytes, format="PNG")
+                output.append(img_bytes.getvalue())
+                self._put(self._entry(digest, page_number), output[-1])
+        self._evict()
+        return output
+
+    def _put(self, entry: Path, png: bytes) -> None:
+        # write then rename, so readers never see a partial PNG
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(png)
+            os.replace(temp_path, entry)
+        except OSError:
+            os.remove(temp_path)
+            raise
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".png"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+
+
+_thumbnail_cache: Optional[ThumbnailCache] = None
+_prerender_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="thumbnails")
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    global _thumbnail_cache
+    if _thumbnail_cache is None:
+        _thumbnail_cache = ThumbnailCache()
+    return _thumbnail_cache
+
+
+def resolve_thumbnail(doc: Document) -> str:
+    """Get the image of a thumbnail Document as a base64 data URI
+
+    Thumbnails read lazily only store where the page is; the image is rendered
+    on first request. Documents with an inline `image_origin` return it as is.
+    The source is the path the PDF was ingested from, which may be gone by
+    now: a thumbnail that is neither cached nor renderable resolves to "".
+    """
+    if "image_origin" in doc.metadata or "thumbnail_hash" not in doc.metadata:
+        return doc.metadata.get("image_origin", "")
+    try:
+        return get_thumbnail_cache().get(
+            doc.metadata["thumbnail_source"],
+            doc.metadata["thumbnail_hash"],
+            doc.metadata["thumbnail_page"],
+        )
+    except Exception as e:
+        logger.warning(
+            f"Could not render page {doc.metadata['thumbnail_page']} of "
+            f"{doc.metadata['thumbnail_source']}: {e}"
+        )
+        return ""
+
+
+def _prerender(file_path: Path, digest: str, pages: list[int]) -> None:
+    try:
+        get_thumbnail_cache().render(file_path, digest, pages)
+    except Exception as e:
+        logger.warning(f"Could not pre-render thumbnails of {file_path}: {e}")
+
+
 class PDFThumbnailReader(PDFReader):
-    """PDF parser with thumbnail for each page."""
+    """PDF parser with thumbnail for each page.
+
+    Args:
+        lazy_thumbnails: store only the file hash and page of each thumbnail
+            and render it on request (see `resolve_thumbnail`), instead of
+            inlining every page's image in the document metadata
+        prerender_pages: number of leading pages rendered into the thumbnail
+            cache in the background at ingest (lazy thumbnails only)
+    """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        lazy_thumbnails: bool = True,
+        prerender_pages: int = PDF_THUMBNAIL_PRERENDER_PAGES,
+    ) -> None:
         """
         Initialize PDFReader.
         """
         super().__init__(return_full_document=False)
+        self.lazy_thumbnails = lazy_thumbnails
+        self.prerender_pages = prerender_pages
 
     def load_data(
         self,
@@ -93,22 +263,38 @@ class PDFThumbnailReader(PDFReader):
         page_numbers = list(range(len(page_numbers_str)))
 
         print("Page numbers:", len(page_numbers))
-        page_thumbnails = get_page_thumbnails(file, page_numbers)
+        if self.lazy_thumbnails:
+            digest = file_hash(file)
+            thumbnails = [
+                {
+                    "thumbnail_source": str(file),
+                    "thumbnail_hash": digest,
+                    "thumbnail_page": page_number,
+                }
+                for page_number in page_numbers
+            ]
+            if self.prerender_pages > 0:
+                _prerender_pool.submit(
+                    _prerender, file, digest, page_numbers[: self.prerender_pages]
+                )
+        else:
+            thumbnails = [
+                {"image_origin": page_thumbnail}
+                for page_thumbnail in get_page_thumbnails(file, page_numbers)
+            ]
 
         documents.extend(
             [
                 Document(
                     text="Page thumbnail",
                     metadata={
-                        "image_origin": page_thumbnail,
+                        **thumbnail,
                         "type": "thumbnail",
                         "page_label": page_number,
                         **(extra_info if extra_info is not None else {}),
                     },
                 )
-                for (page_thumbnail, page_number) in zip(
-                    page_thumbnails, page_numbers_str
-                )
+                for (thumbnail, page_number) in zip(thumbnails, page_numbers_str)
                 if is_int_page_number[page_number]
             ]
         )
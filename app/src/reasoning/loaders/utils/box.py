@@ -1,4 +1,7 @@
-from typing import List, Tuple
+from collections import defaultdict
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
 
 
 def bbox_to_points(box: List[int]):
@@ -142,3 +145,110 @@ def sort_funsd_reading_order(lines: List[dict], box_key_name: str = "box"):
     sorted_list.append(lines[0])
 
     return sorted_list
+
+
+def locations_to_array(locations: Sequence[List[Tuple[int, int]]]) -> np.ndarray:
+    """Convert locations ([(x1, y1), (x2, y1), (x2, y2), (x1, y2)]) to an
+    (n, 4) array of [x1, y1, x2, y2], using the same corners as `get_rect_iou`"""
+    return np.array(
+        [[loc[0][0], loc[0][1], loc[2][0], loc[2][1]] for loc in locations],
+        dtype=np.float64,
+    ).reshape(-1, 4)
+
+
+def rect_iou(box: np.ndarray, boxes: np.ndarray, iou_type: int = 0) -> np.ndarray:
+    """Vectorized `get_rect_iou` of one [x1, y1, x2, y2] box against an (n, 4)
+    array of boxes"""
+    assert iou_type in [0, 1], "Only support 0: origin iou, 1: intersection / min(area)"
+
+    inter_w = np.maximum(
+        0, np.minimum(box[2], boxes[:, 2]) - np.maximum(box[0], boxes[:, 0])
+    )
+    inter_h = np.maximum(
+        0, np.minimum(box[3], boxes[:, 3]) - np.maximum(box[1], boxes[:, 1])
+    )
+    inter_area = inter_w * inter_h
+    box_area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+
+    if iou_type == 0:
+        return inter_area / (box_area + areas - inter_area)
+    return inter_area / np.maximum(np.minimum(box_area, areas), 1)
+
+
+class BoxIndex:
+    """Uniform grid over [x1, y1, x2, y2] boxes, to find the boxes overlapping
+    a query box without comparing it against every box
+
+    Each box is registered in every grid cell it touches; boxes spanning more
+    than `max_cells` cells (e.g. whole tables) are kept in a list that is
+    checked on every query. Boxes with no area can't overlap anything and are
+    left out.
+
+    Args:
+        boxes: (n, 4) array of boxes
+        cell_size: side of the grid cells, by default twice the median box side
+        max_cells: most cells a box is registered in
+    """
+
+    def __init__(
+        self, boxes: np.ndarray, cell_size: Optional[float] = None, max_cells=64
+    ):
+        self.boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        valid = np.flatnonzero(
+            (self.boxes[:, 2] > self.boxes[:, 0])
+            & (self.boxes[:, 3] > self.boxes[:, 1])
+        )
+        if cell_size is None:
+            sides = np.concatenate(
+                [
+                    self.boxes[valid, 2] - self.boxes[valid, 0],
+                    self.boxes[valid, 3] - self.boxes[valid, 1],
+                ]
+            )
+            cell_size = 2 * float(np.median(sides)) if len(sides) else 1.0
+        self.cell_size = max(cell_size, 1.0)
+        self.max_cells = max_cells
+
+        self._cells: dict[tuple[int, int], list[int]] = defaultdict(list)
+        large = []
+        for i in valid:
+            cx1, cy1, cx2, cy2 = self._cell_range(self.boxes[i])
+            if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > max_cells:
+                large.append(i)
+                continue
+            for cx in range(cx1, cx2 + 1):
+                for cy in range(cy1, cy2 + 1):
+                    self._cells[(cx, cy)].append(i)
+        self._cells = {key: np.array(ids) for key, ids in self._cells.items()}
+        self._large = np.array(large, dtype=np.int64)
+        self._valid = valid
+
+    def _cell_range(self, box: np.ndarray) -> tuple[int, int, int, int]:
+        x1, y1, x2, y2 = (int(np.floor(v / self.cell_size)) for v in box)
+        return x1, y1, x2, y2
+
+    def query(self, box: np.ndarray) -> np.ndarray:
+        """Ids (ascending) of the boxes whose intersection with `box` has a
+        positive area"""
+        box = np.asarray(box, dtype=np.float64)
+        if box[2] <= box[0] or box[3] <= box[1]:
+            return np.empty(0, dtype=np.int64)
+
+        cx1, cy1, cx2, cy2 = self._cell_range(box)
+        if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > self.max_cells:
+            # a large query box: scanning every box is cheaper
+            candidates = self._valid
+        else:
+            found = [self._large]
+            for cx in range(cx1, cx2 + 1):
+                for cy in range(cy1, cy2 + 1):
+                    if (cx, cy) in self._cells:
+                        found.append(self._cells[(cx, cy)])
+            candidates = np.unique(np.concatenate(found)).astype(np.int64)
+
+        boxes = self.boxes[candidates]
+        overlap = (
+            np.minimum(box[2], boxes[:, 2]) > np.maximum(box[0], boxes[:, 0])
+        ) & (np.minimum(box[3], boxes[:, 3]) > np.maximum(box[1], boxes[:, 1]))
+        return candidates[overlap]
@@ -2,13 +2,17 @@ from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 
+import numpy as np
+
 from .box import (
+    BoxIndex,
     bbox_to_points,
     box_area,
     box_h,
     box_w,
-    get_rect_iou,
+    locations_to_array,
     points_to_bbox,
+    rect_iou,
     scale_box,
     scale_points,
     sort_funsd_reading_order,
@@ -74,15 +78,16 @@ def merge_ocr_and_pdf_texts(
     if debug_info is not None:
         cv2, debug_im = debug_info
 
-    for ocr_item in ocr_list:
-        matched = False
-        for pdf_item in pdf_text_list:
-            if (
-                get_rect_iou(ocr_item["location"], pdf_item["location"], iou_type=1)
-                > IOU_THRES
-            ):
-                matched = True
-                break
+    # only compare each OCR box with the PDF boxes it overlaps
+    pdf_boxes = locations_to_array([item["location"] for item in pdf_text_list])
+    pdf_index = BoxIndex(pdf_boxes)
+    ocr_boxes = locations_to_array([item["location"] for item in ocr_list])
+
+    for ocr_item, ocr_box in zip(ocr_list, ocr_boxes):
+        candidates = pdf_index.query(ocr_box)
+        matched = bool(
+            np.any(rect_iou(ocr_box, pdf_boxes[candidates], iou_type=1) > IOU_THRES)
+        )
 
         color = (255, 0, 0)
         if not matched:
@@ -138,8 +143,19 @@ def merge_table_cell_and_ocr(
     table_list = sorted(table_list, key=lambda item: box_area(item["bbox"]))
 
     all_tables = []
-    matched_pdf_ids = []
-    matched_cell_ids = []
+    matched_pdf = np.zeros(len(pdf_list), dtype=bool)
+    matched_cells = np.zeros(len(cell_list), dtype=bool)
+
+    # spatial indices, so each table / cell is only compared with the
+    # cells / texts it overlaps
+    cell_boxes = locations_to_array([cell["location"] for cell in cell_list])
+    cell_areas = np.array([box_area(cell["bbox"]) for cell in cell_list])
+    cell_index = BoxIndex(cell_boxes)
+    item_boxes = {
+        "pdf": locations_to_array([item["location"] for item in pdf_list]),
+        "ocr": locations_to_array([item["location"] for item in ocr_list]),
+    }
+    item_indices = {key: BoxIndex(boxes) for key, boxes in item_boxes.items()}
 
     for table in table_list:
         if debug_info is not None:
@@ -151,65 +167,68 @@ def merge_table_cell_and_ocr(
                 thickness=5,
             )
 
+        table_box = locations_to_array([table["location"]])[0]
+        cell_ids = cell_index.query(table_box)
+        cell_ids = cell_ids[~matched_cells[cell_ids]]
+        cell_ids = cell_ids[
+            (rect_iou(table_box, cell_boxes[cell_ids], iou_type=1) > IOU_THRES)
+            & (box_area(table["bbox"]) > cell_areas[cell_ids])
+        ]
+
         cur_table_cells = []
-        for cell_id, cell in enumerate(cell_list):
-            if cell_id in matched_cell_ids:
-                continue
-
-            if get_rect_iou(
-                table["location"], cell["location"], iou_type=1
-            ) > IOU_THRES and box_area(table["bbox"]) > box_area(cell["bbox"]):
-                color = [128, 0, 128]
-                # cell matched to table
-                for item_list, item_type in [(pdf_list, "pdf"), (ocr_list, "ocr")]:
-                    cell["ocr"] = []
-                    for item_id, item in enumerate(item_list):
-                        if item_type == "pdf" and item_id in matched_pdf_ids:
-                            continue
-                        if (
-                            get_rect_iou(item["location"], cell["location"], iou_type=1)
-                            > IOU_THRES
-                        ):
-                            cell["ocr"].append(item)
-                            if item_type == "pdf":
-                                matched_pdf_ids.append(item_id)
-
-                    if len(cell["ocr"]) > 0:
-                        # check if union of matched ocr does
-                        # not extend over cell boundary,
-                        # if True, continue to use OCR_list to match
-                        all_box_points_in_cell = []
-                        for item in cell["ocr"]:
-                            all_box_points_in_cell.extend(item["location"])
-                        union_box = union_points(all_box_points_in_cell)
-                        cell_okay = (
-                            box_h(union_box) <= box_h(cell["bbox"]) * PADDING_THRES
-                            and box_w(union_box) <= box_w(cell["bbox"]) * PADDING_THRES
-                        )
-                    else:
-                        cell_okay = False
-
-                    if cell_okay:
-                        if item_type == "pdf":
-                            color = [255, 0, 255]
-                        break
-
-                if debug_info is not None:
-                    cv2.rectangle(
-                        debug_im,
-                        cell["location"][0],
-                        cell["location"][2],
-                        color=color,
-                        thickness=3,
+        for cell_id in cell_ids:
+            cell = cell_list[cell_id]
+            cell_box = cell_boxes[cell_id]
+            color = [128, 0, 128]
+            # cell matched to table
+            for item_list, item_type in [(pdf_list, "pdf"), (ocr_list, "ocr")]:
+                boxes = item_boxes[item_type]
+                item_ids = item_indices[item_type].query(cell_box)
+                if item_type == "pdf":
+                    item_ids = item_ids[~matched_pdf[item_ids]]
+                item_ids = item_ids[
+                    rect_iou(cell_box, boxes[item_ids], iou_type=1) > IOU_THRES
+                ]
+                cell["ocr"] = [item_list[item_id] for item_id in item_ids]
+                if item_type == "pdf":
+                    matched_pdf[item_ids] = True
+
+                if len(cell["ocr"]) > 0:
+                    # check if union of matched ocr does
+                    # not extend over cell boundary,
+                    # if True, continue to use OCR_list to match
+                    all_box_points_in_cell = []
+                    for item in cell["ocr"]:
+                        all_box_points_in_cell.extend(item["location"])
+                    union_box = union_points(all_box_points_in_cell)
+                    cell_okay = (
+                        box_h(union_box) <= box_h(cell["bbox"]) * PADDING_THRES
+                        and box_w(union_box) <= box_w(cell["bbox"]) * PADDING_THRES
                     )
+                else:
+                    cell_okay = False
+
+                if cell_okay:
+                    if item_type == "pdf":
+                        color = [255, 0, 255]
+                    break
+
+            if debug_info is not None:
+                cv2.rectangle(
+                    debug_im,
+                    cell["location"][0],
+                    cell["location"][2],
+                    color=color,
+                    thickness=3,
+                )
 
-                matched_cell_ids.append(cell_id)
-                cur_table_cells.append(cell)
+            matched_cells[cell_id] = True
+            cur_table_cells.append(cell)
 
         all_tables.append(cur_table_cells)
 
     not_matched_items = [
-        item for _id, item in enumerate(pdf_list) if _id not in matched_pdf_ids
+        item for _id, item in enumerate(pdf_list) if not matched_pdf[_id]
     ]
     if debug_info is not None:
         for item in not_matched_items:
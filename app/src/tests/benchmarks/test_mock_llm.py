@@ -0,0 +1,46 @@
+import os
+import sys
+
+import requests
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from benchmarks.mock_llm import MockLLMServer
+
+
+def test_ollama_generate_and_health_check():
+    with MockLLMServer(latency_ms=0, models=["llama3:latest"]) as server:
+        response = requests.post(
+            f"{server.url}/api/generate/",
+            json={"model": "llama3:latest", "prompt": "hello there", "stream": False},
+        )
+        tags = requests.get(f"{server.url}/api/tags").json()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["response"]
+    assert body["prompt_eval_count"] == 2
+    assert {"name": "llama3:latest"} in tags["models"]
+    assert server.requests["generate"] == 1
+
+
+def test_azure_chat_completion():
+    with MockLLMServer(latency_ms=0) as server:
+        response = requests.post(
+            f"{server.url}/openai/deployments/gpt-4o/chat/completions",
+            params={"api-version": "2024-06-01"},
+            json={"messages": [{"role": "user", "content": "hi"}], "max_tokens": 16},
+        )
+
+    body = response.json()
+    assert body["choices"][0]["message"]["content"]
+    assert body["usage"]["completion_tokens"] == 16
+
+
+def test_injected_errors():
+    with MockLLMServer(latency_ms=0, error_rate=1.0) as server:
+        response = requests.post(f"{server.url}/api/generate", json={"prompt": "x"})
+
+    assert response.status_code == 503
+    assert server.requests["errors"] == 1
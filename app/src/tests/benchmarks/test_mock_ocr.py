@@ -0,0 +1,73 @@
+import os
+import sys
+
+import requests
+from PyPDF2 import PdfWriter
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from benchmarks.mock_ocr import MockOCRServer
+from reasoning.loaders.ocr_loader import OCRReader
+
+
+def _blank_pdf(path, num_pages):
+    writer = PdfWriter()
+    for _ in range(num_pages):
+        writer.add_blank_page(width=612, height=792)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+def test_pages_are_ocred_in_concurrent_cached_batches(tmp_path):
+    pdf = _blank_pdf(tmp_path / "scan.pdf", 25)
+    with MockOCRServer(latency_ms_per_page=20) as server:
+        reader = OCRReader(
+            endpoint=server.url,
+            pages_per_request=10,
+            max_concurrency=3,
+            cache_dir=str(tmp_path / "cache"),
+        )
+        pages = reader.ocr_pages(pdf)
+
+        assert [page["image_shape"] for page in pages] == [[1224, 1584]] * 25
+        # the server numbers each batch's pages from 0
+        assert [page["image"] for page in pages] == [
+            f"page_{page_id}.png" for page_id in range(25)
+        ]
+        assert server.requests["infer"] == 3 and server.requests["pages"] == 25
+        assert server.max_in_flight > 1
+
+        # every batch is cached by file content
+        assert reader.ocr_pages(pdf) == pages
+        assert server.requests["infer"] == 3
+
+
+def test_least_recently_used_batches_are_evicted(tmp_path):
+    pdf = _blank_pdf(tmp_path / "scan.pdf", 3)
+    cache_dir = tmp_path / "cache"
+    with MockOCRServer(latency_ms_per_page=0) as server:
+        reader = OCRReader(
+            endpoint=server.url, pages_per_request=1, cache_dir=str(cache_dir)
+        )
+        reader.ocr_pages(pdf)
+        entries = sorted(cache_dir.iterdir())
+        assert len(entries) == 3
+
+        # room for two batches: the least recently used one is evicted
+        reader.cache_max_bytes = sum(entry.stat().st_size for entry in entries[:2])
+        for age, entry in zip([2, 0, 1], entries):
+            os.utime(entry, (age, age))
+        reader._evict()
+        assert sorted(cache_dir.iterdir()) == [entries[0], entries[2]]
+
+        # only the evicted batch is sent again
+        assert len(reader.ocr_pages(pdf)) == 3
+        assert server.requests["infer"] == 4
+
+
+def test_unknown_route_and_missing_upload():
+    with MockOCRServer(latency_ms_per_page=0) as server:
+        assert requests.post(server.url, data={"job_id": "1"}).status_code == 422
+        assert requests.post(server.url.replace("infer", "other")).status_code == 404
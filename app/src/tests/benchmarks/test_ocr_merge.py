@@ -0,0 +1,70 @@
+import copy
+import os
+import random
+import sys
+
+import numpy as np
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from benchmarks.ocr_merge import (
+    _summarize_tables,
+    _texts,
+    generate_page,
+    reference_merge_ocr_and_pdf_texts,
+    reference_merge_table_cell_and_ocr,
+)
+from reasoning.loaders.utils.box import BoxIndex, get_rect_iou, rect_iou
+from reasoning.loaders.utils.pdf_ocr import (
+    merge_ocr_and_pdf_texts,
+    merge_table_cell_and_ocr,
+)
+
+
+def test_index_finds_exactly_the_overlapping_boxes():
+    rng = random.Random(0)
+    boxes = []
+    for _ in range(500):
+        x1, y1 = rng.randint(0, 1000), rng.randint(0, 1000)
+        boxes.append([x1, y1, x1 + rng.randint(0, 300), y1 + rng.randint(0, 40)])
+    boxes.append([0, 0, 1000, 1000])  # spans the whole grid
+    index = BoxIndex(np.array(boxes))
+
+    for query in [[100, 100, 400, 130], [0, 0, 5, 5], [990, 990, 1500, 1500]]:
+        expected = [
+            i
+            for i, box in enumerate(boxes)
+            if min(query[2], box[2]) > max(query[0], box[0])
+            and min(query[3], box[3]) > max(query[1], box[1])
+        ]
+        assert index.query(np.array(query)).tolist() == expected
+
+
+def test_vectorized_iou_matches_get_rect_iou():
+    a = [(0, 0), (10, 0), (10, 10), (0, 10)]
+    others = [[(5, 5), (20, 5), (20, 20), (5, 20)], [(2, 2), (4, 2), (4, 4), (2, 4)]]
+    boxes = np.array([[o[0][0], o[0][1], o[2][0], o[2][1]] for o in others], float)
+    for iou_type in (0, 1):
+        assert np.allclose(
+            rect_iou(np.array([0, 0, 10, 10], float), boxes, iou_type=iou_type),
+            [get_rect_iou(a, o, iou_type=iou_type) for o in others],
+        )
+
+
+def test_indexed_merges_match_all_pairs_merges():
+    ocr_items, pdf_items, table_items = generate_page(
+        lines=150, tables=2, rows=6, columns=4, seed=3
+    )
+
+    merged = merge_ocr_and_pdf_texts(copy.deepcopy(ocr_items), pdf_items)
+    expected = reference_merge_ocr_and_pdf_texts(copy.deepcopy(ocr_items), pdf_items)
+    assert _texts(merged) == _texts(expected)
+    assert len(merged) > len(pdf_items)  # some OCR-only boxes are kept
+
+    args = (table_items, ocr_items, pdf_items)
+    tables = merge_table_cell_and_ocr(*copy.deepcopy(args))
+    assert _summarize_tables(tables) == _summarize_tables(
+        reference_merge_table_cell_and_ocr(*copy.deepcopy(args))
+    )
+    assert [len(table) for table in tables[0]] == [24, 24]
@@ -0,0 +1,65 @@
+import os
+import sys
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from benchmarks.corpus import generate_documents
+from benchmarks.retrieval import make_chunks, parse_args, run
+from databroker.databroker import DataBroker
+from ingestion.chunking import Chunk
+from ingestion.embedding import HashingEmbedder
+
+
+def test_hashing_embedder_is_deterministic_and_lexical():
+    embedder = HashingEmbedder(embedding_dimension=64)
+    chunks = make_chunks(
+        [
+            ("a", "glyphosate residues in wheat grain"),
+            ("b", "glyphosate residues in barley grain"),
+            ("c", "aquatic toxicity of malathion to fish"),
+        ],
+        Chunk,
+    )
+    batch = embedder(chunks)
+    assert (batch.dense == embedder(chunks).dense).all()
+    similarity = batch.dense @ batch.dense.T
+    assert similarity[0, 1] > similarity[0, 2]
+
+
+def test_offline_run_on_a_tiny_corpus(tmp_path, monkeypatch):
+    # run() changes into its working directory
+    monkeypatch.chdir(tmp_path)
+    DataBroker._instances = {}
+    args = parse_args(
+        [
+            "--chunks",
+            "120",
+            "--chunks-per-document",
+            "40",
+            "--queries",
+            "5",
+            "--top-k",
+            "3",
+            "--workdir",
+            str(tmp_path / "work"),
+        ]
+    )
+    results = run(args)
+
+    assert results["search"]["queries"] == 5
+    assert results["search"]["recall_at_3"] >= 0.9
+    assert results["stages"]["databroker.search.duration_ms"]["count"] == 5
+
+    broker = DataBroker()
+    store = broker.vectorstore["base"]
+    documents = [document for document, _ in generate_documents(120, 40, seed=0)]
+    assert len(store.get_all_ids()) == 120
+    # every chunk is stored with its source file
+    assert store.get_all_files() == set(documents)
+
+    # chunks that are already stored are skipped
+    document, pairs = next(iter(generate_documents(120, 40, seed=0)))
+    names = broker.insert_chunks(make_chunks(pairs, Chunk), source=document)
+    assert len(names) == 40
+    assert len(store.get_all_ids()) == 120
@@ -0,0 +1,56 @@
+import os
+import random
+import sys
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from benchmarks.span_matching import (
+    reference_find_start_end_phrase,
+    reference_find_text,
+)
+from reasoning.indices.qa.utils import SpanIndex, find_start_end_phrase, find_text
+
+CONTEXT = (
+    "In a 90-day oral toxicity study conducted according to OECD TG 408,\n"
+    "glyphosate was administered to rats at doses of 0, 50, 300 and 1000 mg/kg "
+    "bw/day. The NOAEL for body weight was 300 mg/kg bw/day and the LOAEL was "
+    "1000 mg/kg bw/day. No treatment-related findings were observed in the liver."
+)
+
+
+def test_spans_match_sequence_matcher():
+    index = SpanIndex(CONTEXT)
+    quote = "The NOAEL for body weight was 300 mg/kg bw/day"
+    expected = reference_find_text(quote, CONTEXT)
+
+    assert find_text(quote, index) == find_text(quote, CONTEXT) == expected
+    start, end = expected[0]
+    assert CONTEXT[start:end].lower() == quote.lower()
+
+    assert find_start_end_phrase(
+        "glyphosate was administered", "observed in the liver", index
+    ) == reference_find_start_end_phrase(
+        "glyphosate was administered", "observed in the liver", CONTEXT
+    )
+    assert find_text("nothing about fish here", index) == []
+
+
+def test_random_edited_quotes_match_sequence_matcher():
+    rng = random.Random(0)
+    text = " ".join([CONTEXT] * 3).upper()
+    index = SpanIndex(text)
+    for _ in range(100):
+        start = rng.randrange(len(text))
+        quote = "".join(
+            rng.choice("ab \n") if rng.random() < 0.05 else char
+            for char in text[start : start + rng.randint(3, 200)]
+        )
+        half = len(quote) // 2
+        for min_length in (2, 5):
+            assert find_text(quote, index, min_length) == reference_find_text(
+                quote, text, min_length
+            )
+        assert find_start_end_phrase(
+            quote[:half], quote[half:], index
+        ) == reference_find_start_end_phrase(quote[:half], quote[half:], text)
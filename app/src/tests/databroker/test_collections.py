@@ -0,0 +1,55 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from benchmarks.utils import prepare_workdir
+from databroker.databroker import DataBroker
+from orchestrator.config import Chunking
+
+
+@pytest.fixture
+def make_broker(tmp_path, monkeypatch):
+    # prepare_workdir changes into the working directory
+    monkeypatch.chdir(tmp_path)
+    secrets_path = prepare_workdir(str(tmp_path))
+    userpath = os.path.join(str(tmp_path), "user") + "/"
+    os.makedirs(userpath)
+
+    def make_broker(chunking):
+        DataBroker._instances = {}
+        return DataBroker(
+            SimpleNamespace(
+                username="budget",
+                userpath=userpath,
+                embedding_model="hashing",
+                chunking_method="recursive_character",
+                chunking=chunking,
+                pdf_extractor=SimpleNamespace(extraction_method="pypdf2"),
+                vector_store=SimpleNamespace(database="chromadb", host=None, port=None),
+                reranker_model="passthrough",
+            ),
+            secrets_path,
+        )
+
+    return make_broker
+
+
+def test_token_budget_is_part_of_the_collection_names(make_broker):
+    chunking = Chunking(
+        supported_chunkers=["recursive_character"],
+        chunking_method="recursive_character",
+        enforce_token_limits=False,
+    )
+    unlimited = make_broker(chunking).collection_name
+    assert unlimited["user"] == "budget__hashing_recursivecharacter"
+
+    chunking.enforce_token_limits = True
+    chunking.max_chunk_tokens = 256
+    limited = make_broker(chunking).collection_name
+    assert limited["base"] == "chromadb__hashing_recursivecharacter_256tokens"
+    assert limited["user"] == "budget__hashing_recursivecharacter_256tokens"
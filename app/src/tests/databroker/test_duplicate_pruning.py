@@ -0,0 +1,82 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from benchmarks.utils import prepare_workdir
+from databroker.databroker import DataBroker
+from ingestion.chunking import Chunk
+from orchestrator.config import DeduplicationParams
+
+BOILERPLATE = (
+    "This study was conducted in accordance with OECD Test Guideline 408 and "
+    "the principles of Good Laboratory Practice. Groups of ten male and ten "
+    "female rats received the test substance in the diet for ninety days, and "
+    "clinical signs, body weight, food consumption, haematology and clinical "
+    "chemistry were recorded throughout the treatment period."
+)
+DISTINCT = (
+    "Atrazine residues in surface water samples collected downstream of "
+    "treated fields exceeded the interim guideline in three of forty sites, "
+    "with the highest concentrations measured in the weeks after spring "
+    "application and declining steadily through late summer and autumn months."
+)
+
+
+@pytest.fixture
+def broker(tmp_path, monkeypatch):
+    # prepare_workdir changes into the working directory
+    monkeypatch.chdir(tmp_path)
+    secrets_path = prepare_workdir(str(tmp_path))
+    userpath = os.path.join(str(tmp_path), "user") + "/"
+    os.makedirs(userpath)
+    DataBroker._instances = {}
+    return DataBroker(
+        SimpleNamespace(
+            username="dedup",
+            userpath=userpath,
+            embedding_model="hashing",
+            chunking_method="recursive_character",
+            pdf_extractor=SimpleNamespace(extraction_method="pypdf2"),
+            vector_store=SimpleNamespace(database="chromadb", host=None, port=None),
+            reranker_model="passthrough",
+            deduplication=DeduplicationParams(enable=True, threshold=0.8),
+        ),
+        secrets_path,
+    )
+
+
+def test_removing_a_file_restores_the_duplicates_of_its_chunks(broker):
+    store = broker.vectorstore["user"]
+    files = broker.data_cache["user"][broker.collection_name["user"]]
+    broker.insert_chunks(
+        [
+            Chunk(name="a.pdf - Chunk 0", data_type="pdf", text=BOILERPLATE),
+            Chunk(name="a.pdf - Chunk 1", data_type="pdf", text=DISTINCT),
+        ],
+        source="a.pdf",
+        collection="user",
+    )
+    duplicate = Chunk(name="b.pdf - Chunk 0", data_type="pdf", text=BOILERPLATE)
+    broker.insert_chunks([duplicate], source="b.pdf", collection="user")
+    assert sorted(store.get_all_ids()) == ["a.pdf - Chunk 0", "a.pdf - Chunk 1"]
+    assert files == {
+        "a.pdf": ["a.pdf - Chunk 0", "a.pdf - Chunk 1"],
+        "b.pdf": ["b.pdf - Chunk 0"],
+    }
+
+    # a.pdf is deleted from the user folder
+    open(os.path.join(broker.data_roots["user"], "b.pdf"), "w").close()
+    broker._ingest_and_prune_data(collection="user")
+
+    assert store.get_all_ids() == []
+    assert broker.deduplicators["user"].duplicates == {}
+    # b.pdf is no longer cached, so the next pass ingests it again
+    assert files == {}
+
+    broker.insert_chunks([duplicate], source="b.pdf", collection="user")
+    assert store.get_all_ids() == ["b.pdf - Chunk 0"]
@@ -0,0 +1,45 @@
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from benchmarks.utils import prepare_workdir
+from databroker.databroker import DataBroker
+from orchestrator.config import StartupParams
+
+
+def test_only_the_first_initialization_ingests_in_the_background(tmp_path, monkeypatch):
+    ingested = []
+    done = threading.Event()
+
+    def record_ingestion(self):
+        ingested.append(threading.current_thread().name)
+        done.set()
+
+    monkeypatch.setattr(DataBroker, "_ingest_all", record_ingestion)
+    # prepare_workdir changes into the working directory
+    monkeypatch.chdir(tmp_path)
+    secrets_path = prepare_workdir(str(tmp_path))
+    userpath = os.path.join(str(tmp_path), "user") + "/"
+    os.makedirs(userpath)
+    config = SimpleNamespace(
+        username="startup",
+        userpath=userpath,
+        embedding_model="hashing",
+        chunking_method="recursive_character",
+        pdf_extractor=SimpleNamespace(extraction_method="pypdf2"),
+        vector_store=SimpleNamespace(database="chromadb", host=None, port=None),
+        reranker_model="passthrough",
+        startup=StartupParams(background_warmup=False, background_ingestion=True),
+    )
+    DataBroker._instances = {}
+    broker = DataBroker(config, secrets_path)
+    assert done.wait(timeout=10)
+    assert ingested == ["databroker-startup"]
+
+    # e.g. after an upload: the files are ingested before the call returns
+    broker._init_databroker_pipeline(config)
+    assert ingested == ["databroker-startup", threading.current_thread().name]
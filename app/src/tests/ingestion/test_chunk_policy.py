@@ -0,0 +1,73 @@
+import os
+import sys
+
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import WhitespaceSplit
+from transformers import PreTrainedTokenizerFast
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from ingestion.chunk_policy import ChunkPolicy, TokenBudgetChunker
+from ingestion.chunking import Chunk, Chunker
+from ingestion.extraction import Text
+
+
+def _whitespace_tokenizer():
+    # one token per word, built offline
+    tokenizer = Tokenizer(WordLevel({"[UNK]": 0}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = WhitespaceSplit()
+    return PreTrainedTokenizerFast(tokenizer_object=tokenizer, unk_token="[UNK]")
+
+
+class ParagraphChunker(Chunker):
+    def __call__(self, content):
+        return list(self.iter_chunks(content))
+
+    def iter_chunks(self, content):
+        for i, paragraph in enumerate(content.text.split("\n\n")):
+            yield Chunk(
+                text=paragraph,
+                name=f"{content.name} - Chunk {i + 1}",
+                data_type=content.data_type,
+            )
+
+
+def test_budget_is_the_tightest_model_limit():
+    policy = ChunkPolicy.from_models("BAAI/bge-m3", "BAAI/bge-reranker-v2-m3", 64)
+    assert policy.max_tokens == 448
+    assert policy.tokenizer_name == "BAAI/bge-m3"
+
+    capped = ChunkPolicy.from_models("bge-m3:567m", max_tokens=256)
+    assert capped.max_tokens == 256 and capped.tokenizer_name == "BAAI/bge-m3"
+    assert ChunkPolicy.from_models("hashing").max_tokens == 8192
+
+
+def test_long_chunks_are_split_within_the_budget():
+    sentence = "Rats were dosed with glyphosate daily."  # 6 tokens
+    text = "\n\n".join(["A short paragraph.", " ".join([sentence] * 10)])
+    policy = ChunkPolicy(max_tokens=20, tokenizer=_whitespace_tokenizer())
+    chunker = TokenBudgetChunker(ParagraphChunker(), policy)
+
+    chunks = chunker(Text(text=text, name="study.pdf", data_type="pdf"))
+
+    assert [chunk.name for chunk in chunks] == [
+        "study.pdf - Chunk 1",
+        "study.pdf - Chunk 2",
+        "study.pdf - Chunk 2 part 2",
+        "study.pdf - Chunk 2 part 3",
+        "study.pdf - Chunk 2 part 4",
+    ]
+    assert all(length <= 20 for length in policy.count([c.text for c in chunks]))
+    # pieces end on sentence boundaries and nothing is lost
+    assert all(chunk.text.endswith("daily.") for chunk in chunks[1:])
+    assert " ".join(chunk.text for chunk in chunks[1:]) == " ".join([sentence] * 10)
+
+    report = chunker.reports["study.pdf"]
+    assert report["chunks"] == 2 and report["max"] == 60
+    assert report["over_budget"] == 1 and report["split"] == 3
+
+    streamed = list(chunker.iter_chunks(Text(text=text, name="b.pdf", data_type="pdf")))
+    assert [c.text for c in streamed] == [c.text for c in chunks]
+    assert chunker.reports["b.pdf"] == report
@@ -0,0 +1,83 @@
+import os
+import sys
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from ingestion.deduplication import NearDuplicateIndex
+
+BOILERPLATE = (
+    "This study was conducted in accordance with OECD Test Guideline 408 and "
+    "the principles of Good Laboratory Practice. Groups of ten male and ten "
+    "female rats received the test substance in the diet for ninety days, and "
+    "clinical signs, body weight, food consumption, haematology and clinical "
+    "chemistry were recorded throughout the treatment period."
+)
+DISTINCT = (
+    "Atrazine residues in surface water samples collected downstream of "
+    "treated fields exceeded the interim guideline in three of forty sites, "
+    "with the highest concentrations measured in the weeks after spring "
+    "application and declining steadily through late summer and autumn months."
+)
+
+
+def test_near_duplicates_map_to_the_canonical_chunk(tmp_path):
+    index = NearDuplicateIndex(path=str(tmp_path), threshold=0.8)
+    first = index.match(["a - Chunk 0", "a - Chunk 1"], [BOILERPLATE, DISTINCT])
+    assert first == [None, None]
+    index.add(["a - Chunk 0", "a - Chunk 1"], first, source="a.pdf")
+
+    # the same boilerplate with a sentence appended, in another file
+    reissued = BOILERPLATE + " See annex."
+    second = index.match(["b - Chunk 0"], [reissued])
+    assert second == ["a - Chunk 0"]
+    index.add(["b - Chunk 0"], second, source="b.pdf")
+    assert index.duplicate_sources("a - Chunk 0") == ["b.pdf"]
+
+    # the index is persisted per collection
+    reloaded = NearDuplicateIndex(path=str(tmp_path), threshold=0.8)
+    assert reloaded.duplicates == {"b - Chunk 0": "a - Chunk 0"}
+    assert reloaded.match(["c - Chunk 0"], [BOILERPLATE]) == ["a - Chunk 0"]
+
+
+def test_duplicates_within_one_batch_and_short_chunks():
+    index = NearDuplicateIndex(min_words=10)
+    canonicals = index.match(
+        ["a - Chunk 0", "a - Chunk 1", "a - Chunk 2", "a - Chunk 3"],
+        [BOILERPLATE, BOILERPLATE, "Table 1", "Table 1"],
+    )
+    assert canonicals == [None, "a - Chunk 0", None, None]
+
+
+def test_removing_a_canonical_chunk_orphans_its_duplicates():
+    index = NearDuplicateIndex()
+    index.add(["a - Chunk 0"], index.match(["a - Chunk 0"], [BOILERPLATE]), "a.pdf")
+    index.add(["b - Chunk 0"], index.match(["b - Chunk 0"], [BOILERPLATE]), "b.pdf")
+
+    assert index.remove(["a - Chunk 0"]) == ["b - Chunk 0"]
+    assert index.duplicates == {}
+    assert index.match(["c - Chunk 0"], [BOILERPLATE]) == [None]
+
+
+def test_chunks_with_other_numbers_are_not_duplicates():
+    adi = (
+        "Following the evaluation of the available toxicological data, the "
+        "Agency concluded that the substance is not genotoxic and that the "
+        "critical effect is reduced body weight gain in the two-generation "
+        "reproductive toxicity study in rats. Applying the standard uncertainty "
+        "factor of one hundred to the no observed adverse effect level from this "
+        "study, the acceptable daily intake (ADI) was established at {} mg/kg "
+        "bw/day. The acute reference dose was not considered necessary because "
+        "no acute effects were observed at relevant doses. Dietary exposure "
+        "estimates for all registered uses remained below the ADI for every "
+        "population subgroup, including infants and children, and no further "
+        "mitigation measures were required for the proposed use pattern."
+    )
+    for match_numbers, expected in [(True, [None]), (False, ["A"])]:
+        index = NearDuplicateIndex(match_numbers=match_numbers)
+        index.add(["A"], index.match(["A"], [adi.format("0.3")]), "a.pdf")
+        assert index.match(["B"], [adi.format("0.5")]) == expected
+
+    index = NearDuplicateIndex()
+    index.add(["A"], index.match(["A"], [adi.format("0.3")]), "a.pdf")
+    assert index.match(["B"], [adi.format("0.3")]) == ["A"]
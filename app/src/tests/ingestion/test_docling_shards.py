@@ -0,0 +1,88 @@
+import os
+import sys
+
+from docling_core.types.doc import (
+    BoundingBox,
+    DocItemLabel,
+    DoclingDocument,
+    ProvenanceItem,
+    Size,
+)
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from ingestion.extraction import DoclingPDFExtract, merge_documents
+from orchestrator.utils import available_cpus
+
+
+def _shard(first_page, texts):
+    document = DoclingDocument(name="monograph")
+    for offset, text in enumerate(texts):
+        page = first_page + offset
+        document.add_page(page_no=page, size=Size(width=612, height=792))
+        section = document.add_heading(text=f"Section on page {page}")
+        document.add_text(
+            label=DocItemLabel.TEXT,
+            text=text,
+            parent=section,
+            prov=ProvenanceItem(
+                page_no=page,
+                bbox=BoundingBox(l=0, t=10, r=100, b=0),
+                charspan=(0, len(text)),
+            ),
+        )
+    return document
+
+
+def test_merged_shards_keep_order_references_and_pages():
+    merged = merge_documents(
+        [_shard(1, ["methods", "results"]), _shard(3, ["discussion"])],
+        [(1, 2), (3, 3)],
+    )
+
+    assert [item.text for item in merged.texts] == [
+        "Section on page 1",
+        "methods",
+        "Section on page 2",
+        "results",
+        "Section on page 3",
+        "discussion",
+    ]
+    assert [ref.cref for ref in merged.body.children] == [
+        "#/texts/0",
+        "#/texts/2",
+        "#/texts/4",
+    ]
+    discussion = merged.texts[5]
+    assert discussion.self_ref == "#/texts/5"
+    assert discussion.parent.cref == "#/texts/4"
+    assert discussion.prov[0].page_no == 3
+    assert sorted(merged.pages) == [1, 2, 3]
+
+
+def test_shards_numbered_from_one_are_moved_to_their_range():
+    merged = merge_documents(
+        [_shard(1, ["methods"]), _shard(1, ["results"])], [(1, 1), (2, 2)]
+    )
+
+    assert merged.texts[3].prov[0].page_no == 2
+    assert sorted(merged.pages) == [1, 2]
+
+
+def test_shards_numbered_from_one_keep_their_range_without_a_first_page():
+    # the blank first page of the second shard has no page entry
+    merged = merge_documents(
+        [_shard(1, ["methods", "results"]), _shard(2, ["discussion"])],
+        [(1, 2), (3, 4)],
+    )
+
+    assert merged.texts[5].prov[0].page_no == 4
+    assert sorted(merged.pages) == [1, 2, 4]
+
+
+def test_shard_workers_split_the_cpus_by_default():
+    extractor = DoclingPDFExtract(workers=2)
+    assert extractor._shard_options[2] == max(1, available_cpus() // 2)
+    extractor = DoclingPDFExtract(num_threads=8, workers=2)
+    assert extractor._shard_options[2] == 4
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import numpy as np
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from ingestion.chunking import Chunk
+from ingestion.embedding import EmbeddingBatch, HashingEmbedder, sparse_matrix
+
+
+def _chunks(texts):
+    return [
+        Chunk(name=f"doc - Chunk {i}", data_type="pdf", text=text)
+        for i, text in enumerate(texts)
+    ]
+
+
+def test_hashing_embedder_returns_columnar_batch():
+    chunks = _chunks(["glyphosate in rats", "atrazine in fish", ""])
+    batch = HashingEmbedder(embedding_dimension=64)(chunks)
+
+    assert batch.dense.dtype == np.float32 and batch.dense.flags["C_CONTIGUOUS"]
+    assert batch.dense.shape == (3, 64)
+    assert batch.sparse.shape == (3, HashingEmbedder.SPARSE_DIMENSION)
+    assert batch.ids == [chunk.name for chunk in chunks]
+
+    # per-chunk views match the columns
+    view = batch[1]
+    assert view.name == "doc - Chunk 1" and view.docs == "atrazine in fish"
+    np.testing.assert_array_equal(view.dense_vector, batch.dense[1])
+    assert view.sparse_vector == batch.sparse_row(1)
+    assert batch.sparse_row(2) == {}
+
+
+def test_concatenate_and_slice_preserve_rows():
+    first = EmbeddingBatch.from_chunks(
+        _chunks(["a", "b"]),
+        dense=np.eye(2, 3),
+        sparse=sparse_matrix([{0: 1.0}, {4: 0.5}]),
+    )
+    second = EmbeddingBatch.from_chunks(
+        _chunks(["c"]), dense=np.ones((1, 3)), sparse=sparse_matrix([{9: 0.25}])
+    )
+
+    joined = EmbeddingBatch.concatenate([first, second])
+    assert len(joined) == 3
+    assert joined.sparse.shape == (3, 10)
+    assert joined.sparse_rows() == [{0: 1.0}, {4: 0.5}, {9: 0.25}]
+
+    tail = joined[1:]
+    assert tail.texts == ["b", "c"]
+    np.testing.assert_array_equal(tail.dense, joined.dense[1:])
+    assert tail.sparse_rows() == [{4: 0.5}, {9: 0.25}]
+
+    packed = EmbeddingBatch.from_embeddings(list(joined))
+    np.testing.assert_array_equal(packed.dense, joined.dense)
+    assert packed.sparse_rows() == joined.sparse_rows()
@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from ingestion.extraction import ContentExtractor, PDFData, Text
+from ingestion.extraction_cache import CachedExtractor, ExtractionCache
+
+
+class CountingExtract(ContentExtractor):
+    cache_key = "counting"
+
+    def __init__(self):
+        super().__init__(data_type="pdf")
+        self.calls = 0
+
+    def __call__(self, data):
+        self.calls += 1
+        with open(data.filepath) as f:
+            return Text(text=f.read().upper(), name=data.name, data_type="pdf")
+
+    def serialize(self, content):
+        return content.text.encode()
+
+    def deserialize(self, payload, data):
+        return Text(text=payload.decode(), name=data.name, data_type="pdf")
+
+
+def _pdf(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return PDFData(filepath=path, name=name, data_type="pdf")
+
+
+def test_results_are_keyed_by_content(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "cache"))
+    extractor = CachedExtractor(CountingExtract(), cache)
+    first = _pdf(tmp_path, "a.pdf", "methods")
+
+    assert extractor(first).text == "METHODS"
+    assert extractor(first).text == "METHODS"
+    # a renamed copy hits the same entry, under its own name
+    copy = extractor(_pdf(tmp_path, "b.pdf", "methods"))
+    assert copy.text == "METHODS" and copy.name == "b.pdf"
+    assert extractor.extractor.calls == 1
+    assert cache.stats["hits"] == 2
+
+    # a fresh extractor (e.g. after a chunker change) reuses the disk cache
+    again = CachedExtractor(CountingExtract(), ExtractionCache(cache.path))
+    assert again(first).text == "METHODS" and again.extractor.calls == 0
+
+    (tmp_path / "a.pdf").write_text("results")
+    assert extractor(first).text == "RESULTS"
+    assert extractor.extractor.calls == 2
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ExtractionCache(str(tmp_path), max_bytes=2500)
+    payload = os.urandom(1000)  # incompressible
+    cache.put("old", payload)
+    time.sleep(0.01)
+    cache.put("used", payload)
+    time.sleep(0.01)
+    assert cache.get("old") == payload  # refreshes "old"
+    time.sleep(0.01)
+    cache.put("new", payload)
+
+    assert cache.get("used") is None
+    assert cache.get("old") == payload and cache.get("new") == payload
+    assert cache.stats["evictions"] == 1
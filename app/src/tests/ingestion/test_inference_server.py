@@ -0,0 +1,123 @@
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from ingestion import inference_server
+from ingestion.chunking import Chunk
+from ingestion.embedding import HashingEmbedder, RemoteEmbedder
+from ingestion.inference_server import (
+    InferenceServer,
+    MicroBatcher,
+    configured_rerankers,
+)
+from ingestion.reranker import RemoteReranker
+from ingestion.vectordb import SearchResult
+
+
+def test_micro_batcher_groups_concurrent_requests():
+    batches = []
+
+    def double(items):
+        batches.append(list(items))
+        time.sleep(0.01)
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(double, max_batch_size=64, max_wait_ms=50)
+    results = {}
+    threads = [
+        threading.Thread(target=lambda i=i: results.update({i: batcher.submit([i, i])}))
+        for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {i: [2 * i, 2 * i] for i in range(8)}
+    assert len(batches) < 8
+    assert batcher.stats["items"] == 16
+
+
+def test_remote_clients_match_local_models():
+    server = InferenceServer(
+        embedding_model="hashing",
+        reranker_models=["passthrough"],
+        port=0,
+    ).start()
+    try:
+        chunks = [
+            Chunk(name=f"doc - Chunk {i}", data_type="pdf", text=text)
+            for i, text in enumerate(["glyphosate in rats", "atrazine in fish"])
+        ]
+        remote = RemoteEmbedder(server.url, "hashing")(chunks)
+        local = HashingEmbedder()(chunks)
+
+        for r, l in zip(remote, local):
+            np.testing.assert_allclose(r.dense_vector, l.dense_vector, rtol=1e-6)
+            assert r.sparse_vector == l.sparse_vector
+
+        results = [
+            SearchResult(
+                id=c.name, distance=0.0, metadata={}, document=c.text, embedding=[]
+            )
+            for c in chunks
+        ]
+        reranked = RemoteReranker(server.url, "passthrough").rerank(
+            "glyphosate", results, top_k=1
+        )
+        assert [r.id for r in reranked] == ["doc - Chunk 0"]
+    finally:
+        server.stop()
+
+
+def test_only_allowed_models_are_served():
+    server = InferenceServer(
+        embedding_model="hashing",
+        reranker_models=[],
+        port=0,
+        allowed_reranker_models=["passthrough"],
+    ).start()
+    try:
+        request = {"query": "glyphosate", "documents": ["glyphosate in rats"]}
+        assert server.rerank({**request, "model": "passthrough"})["scores"]
+        with pytest.raises(ValueError):
+            server.rerank({**request, "model": "BAAI/bge-reranker-base"})
+        with pytest.raises(ValueError):
+            server.embed({"model": "BAAI/bge-m3", "texts": ["glyphosate"]})
+        assert server.info()["reranker_models"] == ["passthrough"]
+    finally:
+        server.stop()
+
+
+def test_allow_list_comes_from_the_system_config():
+    assert "BAAI/bge-reranker-v2-m3" in configured_rerankers()
+
+
+def test_llm_rerankers_fall_back_to_torch_with_the_onnx_backend(monkeypatch):
+    class StubReranker:
+        def __init__(self, model_name):
+            self.model_name = model_name
+
+        def score_pairs(self, pairs):
+            return [0.0] * len(pairs)
+
+    monkeypatch.setattr(inference_server, "Reranker", StubReranker)
+    model = "BAAI/bge-re-anchor-v2-gemma"
+    server = InferenceServer(
+        embedding_model="hashing",
+        reranker_models=[model],
+        port=0,
+        reranker_onnx_options={"quantize": True},
+    ).start()
+    try:
+        request = {"model": model, "query": "glyphosate", "documents": ["rats"]}
+        assert server.rerank(request) == {"scores": [0.0]}
+    finally:
+        server.stop()
@@ -0,0 +1,47 @@
+import os
+import sys
+
+import numpy as np
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from ingestion.embedding import EmbeddingBatch, sparse_matrix
+from ingestion.onnx_backend import compare_embeddings, compare_rankings
+
+
+def _batch(dense, sparse_rows):
+    return EmbeddingBatch(
+        ids=[f"Text_{i}" for i in range(len(dense))],
+        texts=[""] * len(dense),
+        data_types=["text"] * len(dense),
+        dense=dense,
+        sparse=sparse_matrix(sparse_rows, dimension=16),
+    )
+
+
+def test_compare_embeddings_identical_and_perturbed():
+    rng = np.random.default_rng(0)
+    dense = rng.normal(size=(4, 32)).astype(np.float32)
+    reference = _batch(dense, [{1: 0.5, 7: 0.2}] * 4)
+
+    same = compare_embeddings(reference, reference)
+    assert np.isclose(same["dense_cosine_min"], 1.0)
+    assert np.isclose(same["sparse_cosine_min"], 1.0)
+
+    noisy = _batch(dense + rng.normal(scale=0.5, size=dense.shape), [{1: 0.5}] * 4)
+    result = compare_embeddings(reference, noisy)
+    assert result["dense_cosine_min"] < 1.0
+    assert result["sparse_cosine_mean"] < 1.0
+
+
+def test_compare_rankings():
+    reference = [[0.9, 0.5, 0.1, 0.3], [0.2, 0.8, 0.4, 0.6]]
+    # first query keeps its order, second swaps the two lowest documents
+    candidate = [[0.8, 0.45, 0.12, 0.28], [0.22, 0.79, 0.61, 0.41]]
+
+    result = compare_rankings(reference, candidate, k=2)
+    assert result["top1_agreement"] == 1.0
+    assert result["top2_overlap"] == 0.75
+    assert result["spearman_min"] < result["spearman_mean"] < 1.0
+    assert np.isclose(result["max_abs_score_diff"], 0.21)
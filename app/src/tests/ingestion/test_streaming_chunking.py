@@ -0,0 +1,92 @@
+import os
+import sys
+
+import nltk
+import pytest
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from ingestion.chunking import RecursiveCharacterChunker, SplitSentencesChunker
+from ingestion.extraction import PagedText
+
+
+def _has_punkt():
+    try:
+        nltk.data.find("tokenizers/punkt_tab")
+    except LookupError:
+        return False
+    return True
+
+
+def _paged(pages):
+    read = []
+
+    def read_pages():
+        for page in pages:
+            read.append(page)
+            yield page
+
+    return PagedText(read_pages=read_pages, name="report.pdf", data_type="pdf"), read
+
+
+def _page_text(page_no, sentences=12):
+    # extracted pages are line-broken; the splitter merges lines across pages
+    return "\n".join(
+        f"Page {page_no} sentence {i} reports the dose response in rats."
+        for i in range(sentences)
+    )
+
+
+def test_recursive_chunks_stream_with_page_ranges_and_overlap():
+    pages = [_page_text(page_no) for page_no in range(1, 31)]
+    content, read = _paged(pages)
+    chunker = RecursiveCharacterChunker(chunk_size=300, chunk_overlap=60)
+
+    stream = chunker.iter_chunks(content)
+    first = next(stream)
+    # chunks are emitted before the whole document has been read
+    assert len(read) < len(pages)
+    assert first.name == "report.pdf - Chunk 1" and first.pages == (1, 1)
+
+    chunks = [first, *stream]
+    assert [chunk.name for chunk in chunks] == [
+        f"report.pdf - Chunk {i}" for i in range(1, len(chunks) + 1)
+    ]
+    assert all(len(chunk.text) <= 300 for chunk in chunks)
+    assert chunks[-1].pages == (30, 30)
+    # some chunk spans a page break, and consecutive chunks overlap
+    assert any(
+        first_page < last_page for first_page, last_page in (c.pages for c in chunks)
+    )
+    assert any(a.text[-20:] in b.text for a, b in zip(chunks, chunks[1:]))
+    # every page's text is covered
+    for page_no in range(1, 31):
+        assert any(f"Page {page_no} sentence 11" in chunk.text for chunk in chunks)
+
+
+# the sentence splitter needs the nltk punkt data, which offline runs cannot download
+@pytest.mark.skipif(not _has_punkt(), reason="nltk punkt_tab data not installed")
+def test_sentences_carry_over_page_breaks():
+    content, _ = _paged(
+        [
+            "Rats were dosed daily. The effect on body weight was",
+            "significant at the top dose. No other findings.",
+        ]
+    )
+    chunks = list(SplitSentencesChunker().iter_chunks(content))
+
+    assert [chunk.text for chunk in chunks] == [
+        "Rats were dosed daily.",
+        "The effect on body weight was significant at the top dose.",
+        "No other findings.",
+    ]
+    assert [chunk.pages for chunk in chunks] == [(1, 1), (1, 2), (2, 2)]
+    assert chunks[-1].name == "report.pdf - Sentence 3"
+
+
+def test_whole_text_content_is_chunked_at_once():
+    content, _ = _paged(["Short document."])
+    chunker = RecursiveCharacterChunker(chunk_size=300, chunk_overlap=60)
+
+    assert [chunk.text for chunk in chunker(content)] == ["Short document."]
@@ -0,0 +1,67 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from ingestion.vector_compression import (
+    COMPRESSION_METHODS,
+    CompressedIndex,
+    create_compressor,
+)
+
+
+def _vectors(rows, dimension=64, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(rows, dimension))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+@pytest.mark.parametrize("method", COMPRESSION_METHODS)
+def test_rescored_search_returns_exact_neighbours(method, tmp_path):
+    vectors = _vectors(500)
+    ids = [f"Chunk_{i}" for i in range(len(vectors))]
+    index = CompressedIndex(
+        create_compressor(method, dimension=32),
+        path=str(tmp_path),
+        rescore_multiplier=10,
+        training_size=200,
+    )
+    for start in range(0, len(ids), 100):
+        index.add(ids[start : start + 100], vectors[start : start + 100])
+
+    # each vector is its own nearest neighbour, scored exactly
+    queries = vectors[:20]
+    for row, hits in enumerate(index.search(queries, top_k=3)):
+        assert hits[0][0] == ids[row]
+        assert hits[0][1] == pytest.approx(1.0, abs=1e-5)
+        np.testing.assert_array_equal(hits[0][2], vectors[row])
+    assert index.stats()["compression_ratio"] > 1
+
+
+def test_index_reloads_from_disk_and_honours_deletes(tmp_path):
+    vectors = _vectors(300)
+    ids = [f"Chunk_{i}" for i in range(len(vectors))]
+    index = CompressedIndex(
+        create_compressor("int8"), path=str(tmp_path), training_size=100
+    )
+    index.add(ids, vectors)
+    index.delete(["Chunk_0"])
+
+    reloaded = CompressedIndex(create_compressor("int8"), path=str(tmp_path))
+    assert len(reloaded) == 299
+    hits = reloaded.search(vectors[0], top_k=5)[0]
+    assert "Chunk_0" not in [id for id, _, _ in hits]
+    assert reloaded.search(vectors[1], top_k=1)[0][0][0] == "Chunk_1"
+
+
+def test_vectors_before_training_are_scored_exactly():
+    vectors = _vectors(50)
+    index = CompressedIndex(create_compressor("binary"), training_size=1000)
+    index.add([f"Chunk_{i}" for i in range(50)], vectors)
+
+    assert index.codes is None
+    assert index.search(vectors[7], top_k=1)[0][0][0] == "Chunk_7"
@@ -0,0 +1,118 @@
+import json
+import os
+import sys
+from contextlib import contextmanager
+
+import pytest
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import logs.tracing as tracing
+from logs.tracing import Histogram, MetricsRegistry, current_span, set_tracer, span
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    tracing.metrics.reset()
+    yield
+    tracing.metrics.reset()
+
+
+class FakeTracer:
+    """Records the OpenCensus calls made by spans."""
+
+    def __init__(self):
+        self.spans, self.attributes = [], []
+
+    @contextmanager
+    def span(self, name):
+        self.spans.append(name)
+        yield
+
+    def add_attribute_to_current_span(self, key, value):
+        self.attributes.append((key, value))
+
+
+def test_histogram_summary_and_recent_percentiles():
+    histogram = Histogram(max_samples=100)
+    for value in range(1, 201):
+        histogram.record(float(value))
+
+    summary = histogram.summary()
+    assert summary["count"] == 200
+    assert summary["mean"] == 100.5
+    assert (summary["min"], summary["max"]) == (1.0, 200.0)
+    # percentiles cover only the 100 most recent samples
+    assert summary["p50"] == 151.0
+    assert summary["p99"] == 199.0
+    assert Histogram().summary()["p95"] == 0.0
+
+
+def test_registry_dump_and_reset(tmp_path):
+    registry = MetricsRegistry()
+    registry.record("search.ann.duration_ms", 4.0)
+    registry.record("search.ann.duration_ms", 6.0)
+    registry.record("llm.local.completion_tokens", 120)
+
+    path = tmp_path / "metrics.json"
+    registry.dump(str(path))
+    dumped = json.loads(path.read_text())
+    assert list(dumped) == ["llm.local.completion_tokens", "search.ann.duration_ms"]
+    assert dumped["search.ann.duration_ms"]["mean"] == 5.0
+
+    registry.reset()
+    assert registry.summary() == {}
+
+
+def test_nested_spans_share_the_trace_and_feed_the_histograms():
+    with span("chat.turn", model="llama3") as turn:
+        assert current_span() is turn
+        with span("search.rerank") as rerank:
+            rerank.add_metric("candidates", 25)
+        assert current_span() is turn
+    assert current_span() is None
+
+    assert rerank.trace_id == turn.trace_id
+    assert rerank.parent_id == turn.span_id and turn.parent_id is None
+    assert turn.attributes == {"model": "llama3"}
+    assert turn.duration_ms >= rerank.duration_ms > 0
+
+    summary = tracing.metrics.summary()
+    assert summary["search.rerank.candidates"]["max"] == 25
+    assert summary["chat.turn.duration_ms"]["count"] == 1
+
+
+def test_failed_spans_are_recorded_with_the_error():
+    with pytest.raises(TimeoutError):
+        with span("llm.local") as s:
+            raise TimeoutError()
+    assert s.attributes["error"] == "TimeoutError"
+    assert tracing.metrics.summary()["llm.local.duration_ms"]["count"] == 1
+
+
+def test_jsonl_exporter(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(tracing, "TRACE_JSONL_PATH", str(path))
+    with span("chat.turn"):
+        with span("search.embed", queries=1):
+            pass
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    # children finish, and are exported, first
+    assert [record["name"] for record in records] == ["search.embed", "chat.turn"]
+    assert records[0]["parent_id"] == records[1]["span_id"]
+    assert records[0]["attributes"] == {"queries": 1}
+
+
+def test_spans_are_mirrored_to_the_tracer():
+    tracer = FakeTracer()
+    set_tracer(tracer)
+    try:
+        with span("search.ann", limit=20) as s:
+            s.add_metric("hits", 3)
+    finally:
+        set_tracer(None)
+
+    assert tracer.spans == ["search.ann"]
+    assert tracer.attributes == [("limit", "20"), ("hits", "3")]
@@ -0,0 +1,178 @@
+import asyncio
+import os
+import sys
+
+import aiohttp
+import pytest
+import requests
+from aiohttp import web
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from models.http_client import (
+    CircuitBreaker,
+    CircuitOpenError,
+    EndpointClient,
+    EndpointPolicy,
+    HTTPClientPool,
+)
+
+
+def make_response(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b"{}"
+    return response
+
+
+@pytest.fixture
+def client():
+    policy = EndpointPolicy(
+        max_retries=2, backoff_base=0.0, failure_threshold=3, reset_timeout=60.0
+    )
+    return EndpointClient("http://localhost:11434", policy)
+
+
+def test_retries_connection_errors_then_succeeds(client, monkeypatch):
+    outcomes = [requests.exceptions.ConnectionError(), make_response(200)]
+
+    def fake_request(method, url, **kwargs):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(client.session, "request", fake_request)
+    response = client.post("http://localhost:11434/api/generate")
+    assert response.status_code == 200
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_returns_last_response_after_retryable_statuses(client, monkeypatch):
+    calls = []
+
+    def fake_request(method, url, **kwargs):
+        calls.append(kwargs["timeout"])
+        return make_response(503)
+
+    monkeypatch.setattr(client.session, "request", fake_request)
+    response = client.post("http://localhost:11434/api/generate")
+    assert response.status_code == 503
+    assert len(calls) == 3
+    assert calls[0] == (client.policy.connect_timeout, client.policy.read_timeout)
+
+
+def test_circuit_opens_and_fails_fast(client, monkeypatch):
+    def fake_request(method, url, **kwargs):
+        raise requests.exceptions.ConnectionError()
+
+    monkeypatch.setattr(client.session, "request", fake_request)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.post("http://localhost:11434/api/generate")
+    assert client.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        client.post("http://localhost:11434/api/generate")
+
+
+def test_half_open_allows_single_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_pool_shares_clients_per_host():
+    pool = HTTPClientPool()
+    first = pool.get("http://ollama:11434/api/generate")
+    second = pool.get("http://ollama:11434/api/embeddings")
+    other = pool.get("http://other:11434/api/generate")
+    assert first is second
+    assert first is not other
+
+
+def test_pool_keeps_the_first_policy_of_a_host():
+    pool = HTTPClientPool()
+    configured = EndpointPolicy(read_timeout=300.0)
+    first = pool.get("http://ollama:11434/api/generate", configured)
+    # callers without a policy, or with another one, share the same client
+    assert pool.get("http://ollama:11434/api/embeddings") is first
+    assert pool.get("http://ollama:11434/api/tags", EndpointPolicy()) is first
+    assert first.policy == configured
+
+
+async def serve(handler):
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_async_requests_retry_transient_statuses():
+    statuses = [503, 200]
+
+    async def handler(request):
+        return web.json_response({"response": "ok"}, status=statuses.pop(0))
+
+    async def scenario():
+        runner, url = await serve(handler)
+        client = EndpointClient(url, EndpointPolicy(backoff_base=0.0))
+        try:
+            response = await client.apost(f"{url}/api/generate", json={})
+        finally:
+            await client.aclose()
+            await runner.cleanup()
+        return client, response
+
+    client, response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert response.json() == {"response": "ok"}
+    assert statuses == []
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_async_and_sync_requests_share_the_circuit(client, monkeypatch):
+    def fake_request(method, url, **kwargs):
+        raise requests.exceptions.ConnectionError()
+
+    monkeypatch.setattr(client.session, "request", fake_request)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.post("http://localhost:11434/api/generate")
+
+    async def scenario():
+        try:
+            await client.apost("http://localhost:11434/api/generate")
+        finally:
+            await client.aclose()
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(scenario())
+
+
+def test_async_read_timeouts_are_not_retried():
+    calls = []
+
+    async def handler(request):
+        calls.append(request.path)
+        await asyncio.sleep(1.0)
+        return web.json_response({})
+
+    async def scenario():
+        runner, url = await serve(handler)
+        client = EndpointClient(url, EndpointPolicy(read_timeout=0.1))
+        try:
+            with pytest.raises(aiohttp.SocketTimeoutError):
+                await client.apost(f"{url}/api/generate")
+        finally:
+            await client.aclose()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
+    assert calls == ["/api/generate"]
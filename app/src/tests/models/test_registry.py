@@ -0,0 +1,132 @@
+import json
+import os
+import sys
+
+import pytest
+import requests
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import models.models
+from models.http_client import EndpointPolicy
+from models.models import LocalAIModel, OpenAIChatModel
+from models.registry import ModelRegistry
+from orchestrator.utils import load_config
+
+CONFIG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../configs"))
+LOCAL_MODEL = "llama3:latest"
+
+
+def make_response(status_code, payload=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(payload or {}).encode()
+    return response
+
+
+class StubClient:
+    """Answers every GET with one response (or raises it) and records the calls."""
+
+    def __init__(self, outcome, policy):
+        self.outcome = outcome
+        self.policy = policy
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+@pytest.fixture
+def config():
+    config = load_config(config_name="system_config", config_dir=CONFIG_DIR)
+    config.model_params.model_name = LOCAL_MODEL
+    config.model_auth.macbook_endpoint = "http://ollama:11434/api/generate"
+    config.model_auth.url = "https://example.openai.azure.com/"
+    config.model_auth.api_key = "key"
+    config.model_auth.version = "2024-02-01"
+    return config
+
+
+@pytest.fixture
+def registry():
+    # Clear singleton instance before each test
+    ModelRegistry._instances = {}
+    return ModelRegistry(max_entries=2, health_ttl=60.0)
+
+
+def stub_ollama(registry, config, outcome):
+    model = registry.get_chat_model(LOCAL_MODEL, config)
+    model.client = StubClient(outcome, model.client.policy)
+    return model.client
+
+
+def test_clients_are_reused_per_model_and_params(registry, config):
+    model = registry.get_chat_model(LOCAL_MODEL, config)
+    assert isinstance(model, LocalAIModel)
+    assert registry.get_chat_model(LOCAL_MODEL, config) is model
+
+    config.model_params.temperature = 0.7
+    warmer = registry.get_chat_model(LOCAL_MODEL, config)
+    assert warmer is not model
+    assert isinstance(registry.get_chat_model("GPT-4.0", config), OpenAIChatModel)
+
+    # the least recently used client was evicted
+    config.model_params.temperature = 0.0
+    assert registry.get_chat_model(LOCAL_MODEL, config) is not model
+
+
+def test_ollama_health_check_matches_the_exact_model_name(registry, config):
+    client = stub_ollama(
+        registry,
+        config,
+        make_response(200, {"models": [{"name": "llama3:latest-q4"}]}),
+    )
+    assert not registry.get_chat_model(LOCAL_MODEL, config).test_connection()
+    url, kwargs = client.calls[0]
+    assert url == "http://ollama:11434/api/tags"
+    assert kwargs["timeout"] == (client.policy.connect_timeout, 5.0)
+
+    client.outcome = make_response(200, {"models": [{"name": LOCAL_MODEL}]})
+    assert registry.get_chat_model(LOCAL_MODEL, config).test_connection()
+
+
+@pytest.mark.parametrize(
+    "outcome",
+    [requests.exceptions.ConnectionError(), requests.exceptions.ReadTimeout()],
+)
+def test_ollama_health_check_fails_when_unreachable(registry, config, outcome):
+    stub_ollama(registry, config, outcome)
+    assert not registry.get_chat_model(LOCAL_MODEL, config).test_connection()
+
+
+def test_openai_health_check_lists_models(registry, config, monkeypatch):
+    client = StubClient(make_response(200), EndpointPolicy())
+    monkeypatch.setattr(models.models, "get_http_client", lambda url, policy: client)
+    model = registry.get_chat_model("GPT-4.0", config)
+
+    assert model.test_connection()
+    url, kwargs = client.calls[0]
+    assert url == "https://example.openai.azure.com/openai/models"
+    assert kwargs["params"] == {"api-version": "2024-02-01"}
+    assert kwargs["headers"] == {"api-key": "key"}
+
+    client.outcome = make_response(401)
+    assert not model.test_connection()
+
+
+def test_health_is_cached_for_the_ttl(registry, config):
+    client = stub_ollama(
+        registry, config, make_response(200, {"models": [{"name": LOCAL_MODEL}]})
+    )
+    assert registry.is_healthy(LOCAL_MODEL, config)
+    client.outcome = requests.exceptions.ConnectionError()
+    assert registry.is_healthy(LOCAL_MODEL, config)
+    assert len(client.calls) == 1
+
+    registry.health_ttl = 0.0
+    assert not registry.is_healthy(LOCAL_MODEL, config)
+    assert len(client.calls) == 2
@@ -0,0 +1,46 @@
+import os
+import sys
+import threading
+
+import pytest
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from orchestrator.inference_scheduler import BACKGROUND, InferenceScheduler, priority
+
+
+def test_interactive_jobs_run_before_queued_background_jobs():
+    scheduler = InferenceScheduler(workers=1, intra_op_threads=1)
+    started, release = threading.Event(), threading.Event()
+    order = []
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    blocker = scheduler.submit(block)
+    started.wait(5)
+    with priority(BACKGROUND):
+        background = [scheduler.submit(order.append, f"ingest-{i}") for i in range(2)]
+    interactive = scheduler.submit(order.append, "query")
+    assert scheduler.pending() == {"interactive": 1, "background": 2}
+
+    release.set()
+    for future in [blocker, interactive, *background]:
+        future.result(timeout=5)
+    assert order == ["query", "ingest-0", "ingest-1"]
+    assert scheduler.stats["background"]["completed"] == 2
+
+
+def test_nested_calls_run_inline_and_errors_propagate():
+    scheduler = InferenceScheduler(workers=1, intra_op_threads=1)
+
+    def outer():
+        # would deadlock on a single worker if queued
+        return scheduler.run(lambda: threading.current_thread().name)
+
+    assert scheduler.run(outer) == "inference-worker-0"
+    with pytest.raises(ZeroDivisionError):
+        scheduler.run(lambda: 1 / 0)
+    assert scheduler.stats["interactive"]["failed"] == 1
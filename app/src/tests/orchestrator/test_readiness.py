@@ -0,0 +1,79 @@
+import json
+import os
+import socket
+import sys
+import urllib.error
+import urllib.request
+
+import pytest
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from orchestrator import readiness as readiness_module
+from orchestrator.readiness import FAILED, LOADED, WARM, Readiness, start_health_server
+
+
+def test_ready_once_required_subsystems_are_loaded():
+    state = Readiness()
+    state.register("embedder")
+    state.register("ingestion", required=False)
+    assert not state.is_ready()
+
+    with state.track("embedder"):
+        pass
+    assert state.state("embedder") == LOADED
+    assert state.is_ready()
+
+    state.set("embedder", WARM)
+    assert state.snapshot()["embedder"]["state"] == WARM
+    assert state.snapshot()["embedder"]["load_seconds"] is not None
+
+
+def test_not_ready_until_a_required_subsystem_is_registered():
+    state = Readiness()
+    assert not state.is_ready()
+    state.register("ingestion", required=False)
+    state.set("ingestion", LOADED)
+    assert not state.is_ready()
+
+
+def test_failed_load_is_recorded():
+    state = Readiness()
+    with pytest.raises(RuntimeError):
+        with state.track("reranker"):
+            raise RuntimeError("no weights")
+
+    assert state.state("reranker") == FAILED
+    assert "no weights" in state.snapshot()["reranker"]["error"]
+    assert not state.is_ready()
+
+
+def test_health_endpoints(monkeypatch):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    # a fresh state, since other tests register the data broker's subsystems
+    # in the process-wide one
+    state = Readiness()
+    state.register("test_subsystem")
+    monkeypatch.setattr(readiness_module, "_health_server", None)
+    start_health_server("127.0.0.1", port, state)
+    url = f"http://127.0.0.1:{port}"
+
+    try:
+        assert json.load(urllib.request.urlopen(f"{url}/healthz")) == {"status": "ok"}
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{url}/readyz")
+        assert error.value.code == 503
+
+        state.set("test_subsystem", LOADED)
+        body = json.load(urllib.request.urlopen(f"{url}/readyz"))
+        assert body["ready"]
+        assert body["subsystems"] == {
+            "test_subsystem": state.snapshot()["test_subsystem"]
+        }
+    finally:
+        readiness_module._health_server.shutdown()
+        readiness_module._health_server.server_close()
@@ -0,0 +1,97 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from orchestrator.response_cache import (
+    CachedResponse,
+    ContentVersions,
+    ResponseCache,
+    chunk_ids_from_context,
+    normalize_query,
+)
+
+CONFIG_KEY = ("system prompt", (("model_name", "GPT-4.0"),), ())
+
+
+def make_entry(
+    content_version="base:0", chunk_ids=("a.pdf - Chunk 1",), embedding=None
+):
+    return CachedResponse(
+        prompt="prompt",
+        response="answer",
+        chunks=["Context Source: a.pdf - Chunk 1\nDocument: text\nDistance: 0.9"],
+        rewritten_query="rewritten",
+        chunk_ids=chunk_ids,
+        content_version=content_version,
+        embedding=embedding,
+    )
+
+
+def test_normalize_query():
+    assert normalize_query("  What is the ADI of Glyphosate? ") == normalize_query(
+        "what is the  ADI of glyphosate"
+    )
+
+
+def test_chunk_ids_from_context():
+    chunks = ["Context Source: a.pdf - Chunk 1\nDocument: text\nDistance: 0.9"]
+    assert chunk_ids_from_context(chunks) == ("a.pdf - Chunk 1",)
+
+
+def test_exact_hit_and_content_version_invalidation():
+    cache = ResponseCache()
+    cache.put("What is the ADI?", CONFIG_KEY, make_entry())
+    assert cache.get("what is the adi", CONFIG_KEY, "base:0").response == "answer"
+    assert cache.get("what is the adi", CONFIG_KEY, "base:1") is None
+    # the stale entry is dropped on access
+    assert cache.get("what is the adi", CONFIG_KEY, "base:0") is None
+    assert cache.stats()["hits"]["exact"] == 1
+
+
+def test_ttl_and_size_limit():
+    cache = ResponseCache(max_entries=1, ttl_seconds=0.0)
+    cache.put("q1", CONFIG_KEY, make_entry())
+    assert cache.get("q1", CONFIG_KEY, "base:0") is None
+
+    cache = ResponseCache(max_entries=1)
+    cache.put("q1", CONFIG_KEY, make_entry())
+    cache.put("q2", CONFIG_KEY, make_entry())
+    assert cache.get("q1", CONFIG_KEY, "base:0") is None
+    assert cache.get("q2", CONFIG_KEY, "base:0") is not None
+
+
+@pytest.mark.parametrize(
+    "vector, chunk_ids, expected_hit",
+    [
+        ([1.0, 0.01, 0.0], ("a.pdf - Chunk 1",), True),
+        ([0.0, 1.0, 0.0], ("a.pdf - Chunk 1",), False),
+        ([1.0, 0.01, 0.0], ("b.pdf - Chunk 2",), False),
+    ],
+)
+def test_similar_requires_threshold_and_same_chunks(vector, chunk_ids, expected_hit):
+    cache = ResponseCache(similarity_threshold=0.95)
+    cache.put("q1", CONFIG_KEY, make_entry(embedding=np.array([1.0, 0.0, 0.0])))
+    hit = cache.get_similar(np.array(vector), CONFIG_KEY, "base:0", chunk_ids)
+    assert (hit is not None) == expected_hit
+
+
+def test_content_versions_are_shared_through_the_directory(tmp_path):
+    # e.g. the UI and a replica sharing the vectorstore volume
+    ui, replica = ContentVersions(str(tmp_path)), ContentVersions(str(tmp_path))
+    before = ui.get("milvus_base")
+    assert replica.get("milvus_base") == before
+
+    replica.bump("milvus_base")
+    after = ui.get("milvus_base")
+    assert after != before and after.startswith("milvus_base:")
+    assert ui.get("user_base") == "user_base:"
+
+    cache = ResponseCache()
+    cache.put("What is the ADI?", CONFIG_KEY, make_entry(content_version=after))
+    ui.bump("milvus_base")
+    assert cache.get("What is the ADI?", CONFIG_KEY, replica.get("milvus_base")) is None
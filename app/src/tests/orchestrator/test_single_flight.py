@@ -0,0 +1,61 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from orchestrator.single_flight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_computation():
+    flight = SingleFlight(window=0.0)
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait()
+        return "result"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("key", compute)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    while flight.coalesced < 4:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert all(result == "result" for result, _ in results)
+
+
+def test_window_bounds_reuse_of_finished_calls():
+    flight = SingleFlight(window=60.0)
+    assert flight.do("key", lambda: 1) == (1, False)
+    assert flight.do("key", lambda: 2) == (1, True)
+    assert flight.do("other", lambda: 3) == (3, False)
+
+    flight = SingleFlight(window=0.0)
+    assert flight.do("key", lambda: 1) == (1, False)
+    assert flight.do("key", lambda: 2) == (2, False)
+
+
+def test_errors_are_not_cached():
+    flight = SingleFlight(window=60.0)
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: "ok") == ("ok", False)
@@ -0,0 +1,74 @@
+import os
+import sys
+
+import tiktoken
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from prompt.context_packer import ContextCandidate, ContextPacker, get_token_counter
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def candidate(document, score):
+    return ContextCandidate(text=document, document=document, score=score)
+
+
+def test_orders_by_score_and_respects_budget():
+    packer = ContextPacker(count_words, budget=10, separator=" | ")
+    chunks = packer.pack(
+        [
+            candidate("alpha beta gamma delta", 0.2),
+            candidate("one two three four five six", 0.9),
+            candidate("red green blue", 0.5),
+        ]
+    )
+    assert chunks == ["one two three four five six", "red green blue"]
+    assert count_words(" | ".join(chunks)) <= 10
+
+
+def test_drops_near_duplicates():
+    text = "the acceptable daily intake of glyphosate is 1 mg per kg bw per day"
+    packer = ContextPacker(count_words, budget=100)
+    chunks = packer.pack(
+        [
+            candidate(text, 0.9),
+            candidate(text + " according to the monograph", 0.8),
+            candidate("malathion aquatic toxicity endpoints for fish", 0.7),
+        ]
+    )
+    assert len(chunks) == 2
+    assert chunks[1].startswith("malathion")
+
+
+def test_truncates_top_chunk_when_nothing_fits():
+    packer = ContextPacker(count_words, budget=3)
+    chunks = packer.pack([candidate("one two three four five six", 0.9)])
+    assert len(chunks) == 1
+    assert 0 < count_words(chunks[0]) <= 3
+
+
+def test_max_chunks():
+    packer = ContextPacker(count_words, budget=100, max_chunks=1)
+    chunks = packer.pack([candidate("one two", 0.9), candidate("three four", 0.1)])
+    assert chunks == ["one two"]
+
+
+def test_token_counter_without_tiktoken_encodings(monkeypatch):
+    def offline(*args, **kwargs):
+        raise ConnectionError("no network")
+
+    monkeypatch.setattr(tiktoken, "get_encoding", offline)
+    monkeypatch.setattr(tiktoken, "encoding_for_model", offline)
+    get_token_counter.cache_clear()
+    try:
+        count_tokens = get_token_counter("llama3:latest")
+    finally:
+        get_token_counter.cache_clear()
+    text = "The NOAEL was 300 mg/kg bw/day in the 90-day rat study."
+    # one token per three characters, rounded up
+    assert count_tokens(text) == 19
+    assert count_tokens("") == 0
@@ -0,0 +1,61 @@
+import os
+import sys
+from types import SimpleNamespace
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from benchmarks.utils import prepare_workdir
+from orchestrator.utils import load_config
+from prompt.base_prompt import ConcretePrompt
+
+CONFIG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../configs"))
+
+
+class StubBroker:
+    """Returns one chunk per search and records the searched collections."""
+
+    def __init__(self):
+        self.searches = []
+
+    def search(self, queries, collection, **kwargs):
+        self.searches.append(collection)
+        chunk = SimpleNamespace(
+            id=f"{collection}.pdf - Chunk 0",
+            document=f"Glyphosate residues in the {collection} documents.",
+            distance=0.1,
+        )
+        return [[chunk]]
+
+
+def test_stacked_retrievals_search_each_collection_once(tmp_path, monkeypatch):
+    # the logger reads secrets.toml from the working directory on import
+    monkeypatch.chdir(tmp_path)
+    prepare_workdir(str(tmp_path))
+    import prompt.retrieval
+    from prompt.retrieval import ContextRetrieval
+
+    broker = StubBroker()
+    monkeypatch.setattr(prompt.retrieval, "DataBroker", lambda: broker)
+    monkeypatch.setattr(
+        prompt.retrieval, "get_token_counter", lambda model: lambda t: len(t.split())
+    )
+    config = load_config(config_name="system_config", config_dir=CONFIG_DIR)
+    rewrites = []
+
+    def rewrite_model(rewrite_prompt, override_config=None):
+        rewrites.append(rewrite_prompt)
+        return "glyphosate residues stacked retrieval", 0.5
+
+    base = ContextRetrieval(ConcretePrompt(""), config, rewrite_model=rewrite_model)
+    user = ContextRetrieval(
+        base, config, collection="user", rewrite_model=rewrite_model
+    )
+    text = user.get_prompt("Which glyphosate residues were found? (stacked)")
+
+    assert broker.searches == ["user", "base"]
+    assert "Glyphosate residues in the base documents." in text
+    assert "Glyphosate residues in the user documents." in text
+    # both decorators rewrite the same query, so the second call is shared
+    assert len(rewrites) == 1
+    assert base.cost + user.cost == 0.5
@@ -0,0 +1,72 @@
+import os
+import sys
+
+import pytest
+
+# streaming mode reads workbooks with openpyxl, which is not in the requirements
+Workbook = pytest.importorskip("openpyxl").Workbook
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from reasoning.loaders.excel_loader import ExcelReader, iter_row_windows
+
+
+def write_workbook(path):
+    workbook = Workbook()
+    residues = workbook.active
+    residues.title = "Residues"
+    residues.append(["Substance", "Crop", "MRL"])
+    residues.append(["Glyphosate", "Wheat", 10])
+    residues.append([None, None, None])
+    residues.append(["Atrazine", "Maize", 0.05])
+    residues.append(["Captan", "Apples", 3])
+    toxicity = workbook.create_sheet("Toxicity")
+    toxicity.append(["Substance", "ADI"])
+    toxicity.append(["Glyphosate", 0.5])
+    workbook.save(path)
+
+
+def test_row_windows_skip_empty_rows_and_repeat_the_header(tmp_path):
+    path = tmp_path / "residues.xlsx"
+    write_workbook(path)
+
+    assert list(iter_row_windows(path, rows_per_window=2)) == [
+        (
+            0,
+            "Residues",
+            2,
+            4,
+            "Substance Crop MRL",
+            ["Glyphosate Wheat 10", "Atrazine Maize 0.05"],
+        ),
+        (0, "Residues", 5, 5, "Substance Crop MRL", ["Captan Apples 3"]),
+        (1, "Toxicity", 2, 2, "Substance ADI", ["Glyphosate 0.5"]),
+    ]
+    assert [window[1] for window in iter_row_windows(path, [1])] == ["Toxicity"]
+
+
+def test_streaming_reader_yields_a_document_per_window(tmp_path):
+    path = tmp_path / "residues.xlsx"
+    write_workbook(path)
+    reader = ExcelReader(streaming=True, rows_per_document=2)
+
+    docs = list(
+        reader.lazy_load_data(path, sheet_name="Residues", extra_info={"id": 1})
+    )
+    assert [doc.text for doc in docs] == [
+        "(Sheet Residues of file residues.xlsx, rows 2-4)\n"
+        "Substance Crop MRL\nGlyphosate Wheat 10\nAtrazine Maize 0.05",
+        "(Sheet Residues of file residues.xlsx, rows 5-5)\n"
+        "Substance Crop MRL\nCaptan Apples 3",
+    ]
+    assert docs[1].metadata == {
+        "page_label": 1,
+        "sheet_name": "Residues",
+        "row_start": 5,
+        "row_end": 5,
+        "id": 1,
+    }
+    assert [doc.text for doc in reader.load_data(path)] == [
+        doc.text for doc in reader.lazy_load_data(path)
+    ]
@@ -0,0 +1,24 @@
+import os
+import sys
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from reasoning.indices.ingests.files import DocumentIngestor
+
+
+def test_parallel_reads_keep_file_order_and_skip_failed_files(tmp_path):
+    first, second = tmp_path / "first.txt", tmp_path / "second.txt"
+    first.write_text("Glyphosate residues in wheat grain.")
+    second.write_text("Atrazine residues in surface water.")
+    # removed between listing and reading
+    missing = tmp_path / "missing.txt"
+
+    ingestor = DocumentIngestor(num_workers=2)
+    nodes = ingestor([first, missing, second])
+
+    assert [node.text for node in nodes] == [
+        "Glyphosate residues in wheat grain.",
+        "Atrazine residues in surface water.",
+    ]
+    assert ingestor.last_run.logs(".failed_files") == {"failed_files": [str(missing)]}
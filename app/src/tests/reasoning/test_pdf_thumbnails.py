@@ -0,0 +1,52 @@
+import os
+import sys
+
+import pytest
+
+# PyMuPDF renders the thumbnails and is not in the requirements
+fitz = pytest.importorskip("fitz")
+
+# Jank path fix
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from reasoning.loaders import pdf_loader
+from reasoning.loaders.pdf_loader import (
+    PDFThumbnailReader,
+    ThumbnailCache,
+    resolve_thumbnail,
+)
+
+
+def write_pdf(path, pages):
+    with fitz.open() as doc:
+        for text in pages:
+            doc.new_page().insert_text((72, 72), text)
+        doc.save(path)
+
+
+def test_lazy_thumbnails_are_rendered_on_request_and_evicted(tmp_path, monkeypatch):
+    cache = ThumbnailCache(cache_dir=str(tmp_path / "thumbnails"))
+    monkeypatch.setattr(pdf_loader, "_thumbnail_cache", cache)
+    source = tmp_path / "upload.pdf"
+    write_pdf(source, ["Glyphosate residues", "Atrazine residues"])
+
+    docs = PDFThumbnailReader(lazy_thumbnails=True).load_data(source)
+    thumbnails = [doc for doc in docs if doc.metadata.get("type") == "thumbnail"]
+    assert len(thumbnails) == 2
+    assert all("image_origin" not in doc.metadata for doc in thumbnails)
+    assert list(cache.cache_dir.iterdir()) == []
+
+    first = resolve_thumbnail(thumbnails[0])
+    assert first.startswith("data:image/png;base64,")
+    (entry,) = cache.cache_dir.iterdir()
+
+    # the cache only holds one page, so rendering the second evicts the first
+    cache.max_bytes = entry.stat().st_size
+    os.utime(entry, (0, 0))
+    assert resolve_thumbnail(thumbnails[1]).startswith("data:image/png;base64,")
+    assert not entry.exists()
+
+    # the upload is gone: cached pages still resolve, evicted ones are empty
+    source.unlink()
+    assert resolve_thumbnail(thumbnails[1]).startswith("data:image/png;base64,")
+    assert resolve_thumbnail(thumbnails[0]) == ""